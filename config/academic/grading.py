@@ -6,6 +6,7 @@ Final marks and student grade overview helpers.
 """
 from __future__ import annotations
 
+from collections import defaultdict
 from dataclasses import dataclass
 from decimal import Decimal
 from typing import TYPE_CHECKING
@@ -29,85 +30,74 @@ CURRICULUM_SUBJECT_TOTALS_BY_COURSE = {
 }
 
 
-def final_weighted_grade(subject_edition: SubjectEdition, student_id: int) -> Decimal | None:
-    """
-    Weighted final using STANDARD grades.
+GradeMap = dict[tuple[str, str], Decimal]
 
-    If theory RECOVERY exists and is >= 90, the final used for aggregates is capped at 80.0.
-    """
-    from .models import StudentGrade
 
-    total = Decimal('0')
-    se = subject_edition
-    if se.theory_weight > _WEIGHT_EPS:
-        g = (
-            StudentGrade.objects.filter(
-                student_id=student_id,
-                subject_edition=se,
-                component='theory',
-                test_type='STANDARD',
-            )
-            .values_list('grade', flat=True)
-            .first()
-        )
-        if g is None:
-            return None
-        total += Decimal(str(g)) * se.theory_weight
-    if se.practical_weight > _WEIGHT_EPS:
-        g = (
-            StudentGrade.objects.filter(
-                student_id=student_id,
-                subject_edition=se,
-                component='practical',
-                test_type='STANDARD',
-            )
-            .values_list('grade', flat=True)
-            .first()
-        )
-        if g is None:
-            return None
-        total += Decimal(str(g)) * se.practical_weight
-    raw_final = total.quantize(Decimal('0.1'))
+def _grade_map(rows) -> GradeMap:
+    """``{(component, test_type): grade}`` from ``(component, test_type, grade)`` rows."""
+    return {(component, test_type): Decimal(str(grade)) for component, test_type, grade in rows}
+
 
-    theory_recovery = (
+def _student_edition_grades(subject_edition: SubjectEdition, student_id: int) -> GradeMap:
+    """All grade rows of one student in one edition, in a single query."""
+    from .models import StudentGrade
+
+    return _grade_map(
         StudentGrade.objects.filter(
             student_id=student_id,
-            subject_edition=se,
-            component='theory',
-            test_type='RECOVERY',
-        )
-        .values_list('grade', flat=True)
-        .first()
+            subject_edition=subject_edition,
+        ).values_list('component', 'test_type', 'grade')
     )
-    if theory_recovery is not None and Decimal(str(theory_recovery)) >= RECOVERY_PASSING_GRADE:
+
+
+def compute_final_grade(subject_edition: SubjectEdition, grades: GradeMap) -> Decimal | None:
+    """
+    Weighted final from already loaded grades (see final_weighted_grade).
+    """
+    se = subject_edition
+    total = Decimal('0')
+    for component, weight in (('theory', se.theory_weight), ('practical', se.practical_weight)):
+        if weight > _WEIGHT_EPS:
+            g = grades.get((component, 'STANDARD'))
+            if g is None:
+                return None
+            total += g * weight
+    raw_final = total.quantize(Decimal('0.1'))
+
+    theory_recovery = grades.get(('theory', 'RECOVERY'))
+    if theory_recovery is not None and theory_recovery >= RECOVERY_PASSING_GRADE:
         return STANDARD_PASSING_GRADE.quantize(Decimal('0.1'))
     return raw_final
 
 
-def student_passed_final(subject_edition: SubjectEdition, student_id: int) -> bool | None:
-    """Pass if regular final >= 80; else pass if theory recovery >= 90. None if regular final incomplete."""
-    from .models import StudentGrade
-
-    final = final_weighted_grade(subject_edition, student_id)
+def compute_passed_final(final: Decimal | None, grades: GradeMap) -> bool | None:
+    """
+    Pass outcome from an already computed final and the same grades (see student_passed_final).
+    """
     if final is None:
         return None
     if final >= STANDARD_PASSING_GRADE:
         return True
 
-    theory_recovery = (
-        StudentGrade.objects.filter(
-            student_id=student_id,
-            subject_edition=subject_edition,
-            component='theory',
-            test_type='RECOVERY',
-        )
-        .values_list('grade', flat=True)
-        .first()
-    )
+    theory_recovery = grades.get(('theory', 'RECOVERY'))
     if theory_recovery is None:
         return False
+    return theory_recovery >= RECOVERY_PASSING_GRADE
 
-    return Decimal(str(theory_recovery)) >= RECOVERY_PASSING_GRADE
+
+def final_weighted_grade(subject_edition: SubjectEdition, student_id: int) -> Decimal | None:
+    """
+    Weighted final using STANDARD grades.
+
+    If theory RECOVERY exists and is >= 90, the final used for aggregates is capped at 80.0.
+    """
+    return compute_final_grade(subject_edition, _student_edition_grades(subject_edition, student_id))
+
+
+def student_passed_final(subject_edition: SubjectEdition, student_id: int) -> bool | None:
+    """Pass if regular final >= 80; else pass if theory recovery >= 90. None if regular final incomplete."""
+    grades = _student_edition_grades(subject_edition, student_id)
+    return compute_passed_final(compute_final_grade(subject_edition, grades), grades)
 
 
 def effective_final_grade(subject_edition: SubjectEdition, student_id: int) -> Decimal | None:
@@ -131,6 +121,9 @@ def load_student_grade_overview(user: User) -> StudentGradeOverview:
     """
     Single DB pass for the student's grades and enrollments, plus derived
     final mark and course pass outcome per enrolled edition.
+
+    Finals are computed in memory from the loaded grade rows, so the query
+    count does not grow with the number of enrolled editions.
     """
     from .models import StudentGrade, SubjectEdition
 
@@ -140,15 +133,20 @@ def load_student_grade_overview(user: User) -> StudentGradeOverview:
         .order_by('-date')
     )
     enrolled_editions = tuple(
-        SubjectEdition.objects.filter(students=user).select_related('subject_type')
+        SubjectEdition.objects.filter(students=user).select_related('subject_type', 'instructor')
     )
 
+    grades_by_edition: dict[int, GradeMap] = defaultdict(dict)
+    for row in grades:
+        grades_by_edition[row.subject_edition_id][(row.component, row.test_type)] = Decimal(str(row.grade))
+
     edition_final_grade: dict[int, Decimal | None] = {}
     edition_course_passed: dict[int, bool | None] = {}
-    uid = user.pk
     for edition in enrolled_editions:
-        edition_final_grade[edition.pk] = final_weighted_grade(edition, uid)
-        edition_course_passed[edition.pk] = student_passed_final(edition, uid)
+        edition_grades = grades_by_edition.get(edition.pk, {})
+        final = compute_final_grade(edition, edition_grades)
+        edition_final_grade[edition.pk] = final
+        edition_course_passed[edition.pk] = compute_passed_final(final, edition_grades)
 
     return StudentGradeOverview(
         grades=grades,
@@ -158,6 +156,46 @@ def load_student_grade_overview(user: User) -> StudentGradeOverview:
     )
 
 
+@dataclass(frozen=True)
+class RosterFinal:
+    """Final mark and course pass outcome of one enrolled student."""
+
+    final_grade: Decimal | None
+    passed: bool | None
+
+
+def load_roster_finals(subject_editions) -> dict[int, dict[int, RosterFinal]]:
+    """
+    Finals of every enrolled student in each edition: ``{edition_id: {student_id: RosterFinal}}``.
+
+    Two queries (enrollments and grade rows) whatever the number of editions
+    or students, for instructor and staff class reports.
+    """
+    from .models import StudentGrade, SubjectEdition
+
+    editions = {edition.pk: edition for edition in subject_editions}
+    enrollments = SubjectEdition.students.through.objects.filter(
+        subjectedition_id__in=list(editions),
+    ).values_list('subjectedition_id', 'user_id')
+
+    grades: dict[tuple[int, int], GradeMap] = defaultdict(dict)
+    rows = StudentGrade.objects.filter(subject_edition_id__in=list(editions)).values_list(
+        'subject_edition_id', 'student_id', 'component', 'test_type', 'grade'
+    )
+    for edition_id, student_id, component, test_type, grade in rows:
+        grades[(edition_id, student_id)][(component, test_type)] = Decimal(str(grade))
+
+    roster: dict[int, dict[int, RosterFinal]] = {edition_id: {} for edition_id in editions}
+    for edition_id, student_id in enrollments:
+        student_grades = grades.get((edition_id, student_id), {})
+        final = compute_final_grade(editions[edition_id], student_grades)
+        roster[edition_id][student_id] = RosterFinal(
+            final_grade=final,
+            passed=compute_passed_final(final, student_grades),
+        )
+    return roster
+
+
 def subject_options_for_overview(overview: StudentGradeOverview):
     """Distinct subject types present in the student's grade rows."""
     from .models import SubjectType
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.reference_cache import COURSE_TYPES, invalidate
+from .models import CourseType
+
+
+@receiver([post_save, post_delete], sender=CourseType)
+def invalidate_cached_course_types(sender, instance, **kwargs):
+    """Drop the cached course type codes when a course type changes."""
+    invalidate(COURSE_TYPES)
@@ -5,7 +5,9 @@ from __future__ import annotations
 from decimal import Decimal
 
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -14,7 +16,10 @@ from accounts.models import InstructorProfile, StudentProfile, User
 from .grading import (
     RECOVERY_PASSING_GRADE,
     STANDARD_PASSING_GRADE,
+    RosterFinal,
     final_weighted_grade,
+    load_roster_finals,
+    load_student_grade_overview,
     student_passed_final,
 )
 from .models import CourseType, StudentGrade, SubjectEdition, SubjectType
@@ -195,6 +200,117 @@ class StudentPassedFinalTests(GradingTestCase):
         self.assertTrue(student_passed_final(self.edition_mixed, self.student.pk))
 
 
+class GradeOverviewQueryTests(GradingTestCase):
+    def _add_edition(self, theory_weight='1', practical_weight='0'):
+        today = timezone.now().date()
+        edition = SubjectEdition(
+            subject_type=self.subject_type,
+            instructor=self.instructor,
+            time_slot='M',
+            start_date=today,
+            end_date=today,
+            start_time=timezone.datetime.strptime('09:00', '%H:%M').time(),
+            end_time=timezone.datetime.strptime('12:00', '%H:%M').time(),
+            theory_weight=Decimal(theory_weight),
+            practical_weight=Decimal(practical_weight),
+        )
+        edition.save()
+        edition.students.add(self.student)
+        return edition
+
+    def _add_student(self, username):
+        student = User.objects.create_user(
+            username=username,
+            email=f'{username}@test.nav',
+            national_id=self._next_national_id(),
+            password='x',
+            role=User.Role.STUDENT,
+            first_name='S',
+            last_name=username,
+        )
+        StudentProfile.objects.create(user=student, student_age=20)
+        return student
+
+    def _count_overview_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            overview = load_student_grade_overview(self.student)
+        return overview, len(queries)
+
+    def test_overview_matches_per_edition_helpers(self):
+        self._add_grade(self.edition_theory_only, 'theory', Decimal('79'))
+        self._add_grade(self.edition_theory_only, 'theory', Decimal('95'), test_type='RECOVERY')
+        self._add_grade(self.edition_mixed, 'theory', 75)
+        self._add_grade(self.edition_mixed, 'practical', 100)
+
+        overview, _ = self._count_overview_queries()
+
+        for edition in (self.edition_theory_only, self.edition_mixed):
+            self.assertEqual(
+                overview.edition_final_grade[edition.pk],
+                final_weighted_grade(edition, self.student.pk),
+            )
+            self.assertEqual(
+                overview.edition_course_passed[edition.pk],
+                student_passed_final(edition, self.student.pk),
+            )
+        self.assertEqual(overview.edition_final_grade[self.edition_theory_only.pk], Decimal('80.0'))
+        self.assertTrue(overview.edition_course_passed[self.edition_mixed.pk])
+
+    def test_overview_query_count_does_not_grow_with_enrollments(self):
+        self._add_grade(self.edition_theory_only, 'theory', 85)
+        _, baseline = self._count_overview_queries()
+
+        for grade in (70, 90, 95):
+            self._add_grade(self._add_edition(), 'theory', grade)
+        overview, queries = self._count_overview_queries()
+
+        self.assertEqual(len(overview.enrolled_editions), 5)
+        self.assertEqual(queries, baseline)
+        self.assertEqual(queries, 2)
+
+    def test_grade_log_view_query_count_does_not_grow_with_enrollments(self):
+        self._add_grade(self.edition_theory_only, 'theory', 85)
+        self.client.force_login(self.student)
+        url = reverse('academic:grade_logs')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(url)
+
+        for grade in (70, 90, 95):
+            self._add_grade(self._add_edition(), 'theory', grade)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), len(baseline))
+
+    def test_roster_finals_for_whole_editions_in_two_queries(self):
+        other = self._add_student('stu_roster')
+        self.edition_mixed.students.add(other)
+        self._add_grade(self.edition_mixed, 'theory', 80)
+        self._add_grade(self.edition_mixed, 'practical', 100)
+        StudentGrade.objects.create(
+            subject_edition=self.edition_mixed,
+            student=other,
+            instructor=self.instructor,
+            component='theory',
+            grade=Decimal('60'),
+        )
+        self._add_grade(self.edition_theory_only, 'theory', 70)
+
+        with self.assertNumQueries(2):
+            roster = load_roster_finals([self.edition_theory_only, self.edition_mixed])
+
+        self.assertEqual(roster[self.edition_mixed.pk], {
+            self.student.pk: RosterFinal(final_grade=Decimal('84.0'), passed=True),
+            other.pk: RosterFinal(final_grade=None, passed=None),
+        })
+        self.assertEqual(
+            roster[self.edition_theory_only.pk][self.student.pk],
+            RosterFinal(final_grade=Decimal('70.0'), passed=False),
+        )
+
+
 class StudentGradeValidationTests(GradingTestCase):
     def test_submission_preserves_one_decimal_grade_precision(self):
         self.client.force_login(self.instructor)
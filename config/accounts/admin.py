@@ -1,6 +1,8 @@
 # Admin customization
 from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
+from django.db import transaction
+from transactions import balances
 from .models import User, StudentProfile, InstructorProfile, StaffProfile
 
 class CustomUserAdmin(UserAdmin):
@@ -33,7 +35,7 @@ class StudentProfileAdmin(admin.ModelAdmin):
     list_display = ('get_username', 'get_student_id', 'student_phase', 'get_course_type',
                     'get_course_edition', 'student_license_type', 'balance', 'flight_rate',
                     'nav_flight_hours', 'flight_hours', 'sim_hours')
-    list_filter = ('student_phase', 'student_license_type', 'advanced_student', 'has_credit', 'has_temp_permission')
+    list_filter = ('student_phase', 'current_course_type', 'student_license_type', 'advanced_student', 'has_credit', 'has_temp_permission')
     search_fields = ('user__username', 'user__national_id', 'user__first_name', 'user__last_name')
     readonly_fields = ('get_course_type', 'get_course_edition')
     actions = ('run_aura_pending_for_students',)
@@ -55,6 +57,23 @@ class StudentProfileAdmin(admin.ModelAdmin):
         }),
     )
 
+    def save_model(self, request, obj, form, change):
+        """Apply balance edits as a ledger adjustment instead of overwriting the balance."""
+        balance_change = None
+        if change and 'balance' in form.changed_data:
+            balance_change = obj.balance - form.initial['balance']
+            obj.balance = form.initial['balance']
+
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if balance_change:
+                balances.adjust_student(
+                    obj,
+                    reason=balances.MANUAL_ADJUSTMENT,
+                    reference=f"admin:{request.user.username}",
+                    balance=balance_change,
+                )
+
     def get_username(self, obj):
         return obj.user.username if obj.user else '-'
     get_username.short_description = 'Usuario'
@@ -68,10 +87,12 @@ class StudentProfileAdmin(admin.ModelAdmin):
     def get_course_type(self, obj):
         return obj.current_course_type
     get_course_type.short_description = 'Curso'
+    get_course_type.admin_order_field = 'current_course_type'
 
     def get_course_edition(self, obj):
         return obj.current_course_edition
     get_course_edition.short_description = 'Edición de Curso'
+    get_course_edition.admin_order_field = 'current_course_edition'
 
     @admin.action(description='Procesar AURA (estudiantes seleccionados)')
     def run_aura_pending_for_students(self, request, queryset):
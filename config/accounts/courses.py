@@ -0,0 +1,74 @@
+"""
+Current course of every student.
+
+A student's current course is the course edition they are enrolled in with
+the latest start date. StudentProfile stores its course type code and
+edition number in the indexed ``current_course_type`` and
+``current_course_edition`` columns so lists and headers read them with the
+profile. ``accounts.signals`` refreshes them with sync_current_course()
+whenever an enrollment, a course edition or a course type changes, which
+also refreshes the students' search text (``accounts.student_search``).
+
+with_current_course() resolves the same values from the enrollments for any
+StudentProfile queryset in a single query.
+"""
+
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from constants import COURSE_NA
+
+from .models import StudentProfile
+from .student_search import refresh_student_search
+
+
+def _current_course(user_ref, field_name):
+    from academic.models import CourseEdition
+
+    return Subquery(
+        CourseEdition.objects.filter(students=user_ref)
+        .order_by('-start_date', '-pk')
+        .values(field_name)[:1]
+    )
+
+
+def current_course_expressions(user_field='user'):
+    """
+    Return the ``current_course_type`` and ``current_course_edition`` expressions
+    of the student whose user id is in ``user_field`` of the outer query.
+    """
+    user_ref = OuterRef(user_field)
+    return {
+        'current_course_type': Coalesce(_current_course(user_ref, 'course_type__code'), Value(COURSE_NA)),
+        'current_course_edition': _current_course(user_ref, 'edition'),
+    }
+
+
+def with_current_course(queryset):
+    """
+    Annotate StudentProfile rows with ``resolved_course_type`` and ``resolved_course_edition``.
+
+    The values are read from the enrollments, not from the stored columns.
+    """
+    expressions = current_course_expressions()
+    return queryset.annotate(
+        resolved_course_type=expressions['current_course_type'],
+        resolved_course_edition=expressions['current_course_edition'],
+    )
+
+
+def sync_current_course(user_ids=None):
+    """
+    Store the current course of the students with ``user_ids`` (default: all).
+
+    The columns are set with a single UPDATE; returns the number of profiles written.
+    """
+    profiles = StudentProfile.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+        profiles = profiles.filter(user_id__in=user_ids)
+    updated = profiles.update(**current_course_expressions())
+    refresh_student_search(user_ids)
+    return updated
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:22
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_current_course(apps, schema_editor):
+    """Store every student's current course (mirrors accounts.courses.sync_current_course)."""
+    StudentProfile = apps.get_model('accounts', 'StudentProfile')
+    CourseEdition = apps.get_model('academic', 'CourseEdition')
+
+    def current(field_name):
+        return Subquery(
+            CourseEdition.objects.filter(students=OuterRef('user'))
+            .order_by('-start_date', '-pk')
+            .values(field_name)[:1]
+        )
+
+    StudentProfile.objects.update(
+        current_course_type=Coalesce(current('course_type__code'), Value('N/A')),
+        current_course_edition=current('edition'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0041_alter_coursetype_code_alter_coursetype_name_and_more'),
+        ('accounts', '0044_staffprofile_production_permission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='current_course_edition',
+            field=models.IntegerField(blank=True, editable=False, null=True, verbose_name='Edición de curso'),
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='current_course_type',
+            field=models.CharField(db_index=True, default='N/A', editable=False, max_length=10, verbose_name='Curso'),
+        ),
+        migrations.RunPython(fill_current_course, migrations.RunPython.noop),
+    ]
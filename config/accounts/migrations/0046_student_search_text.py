@@ -0,0 +1,72 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:40
+
+import unicodedata
+
+from django.db import migrations, models, transaction
+
+
+def _normalize(*parts):
+    text = ' '.join(str(part) for part in parts if part not in (None, ''))
+    text = ''.join(
+        char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char)
+    )
+    return ' '.join(text.casefold().split())
+
+
+def fill_search_text(apps, schema_editor):
+    """Build every student's search text (mirrors accounts.student_search.refresh_student_search)."""
+    StudentProfile = apps.get_model('accounts', 'StudentProfile')
+
+    profiles = []
+    for profile in StudentProfile.objects.select_related('user').iterator(chunk_size=500):
+        user = profile.user
+        profile.search_text = _normalize(
+            user.first_name,
+            user.last_name,
+            user.username,
+            user.national_id,
+            profile.student_phase,
+            profile.student_license_type,
+            profile.current_course_type,
+            profile.current_course_edition,
+        )
+        profiles.append(profile)
+    StudentProfile.objects.bulk_update(profiles, ['search_text'], batch_size=500)
+
+
+def create_trigram_index(apps, schema_editor):
+    """On PostgreSQL, index the search text for ``icontains`` with pg_trgm when it is available."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except Exception:
+        # Without the extension the search still works, with a sequential scan.
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS students_search_text_trgm '
+        'ON students_db USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS students_search_text_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0045_student_current_course'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto de búsqueda'),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
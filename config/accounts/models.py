@@ -204,6 +204,27 @@ class StudentProfile(models.Model):
         default=False,
         help_text='Permiso temporal para solicitar vuelos sin restricciones de balance. Debe ser reactivado antes de cada vuelo.',
     )
+    # Latest course edition the student is enrolled in, kept by accounts.courses.
+    current_course_type = models.CharField(
+        max_length=10,
+        default=COURSE_NA,
+        db_index=True,
+        editable=False,
+        verbose_name='Curso',
+    )
+    current_course_edition = models.IntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Edición de curso',
+    )
+    # Normalized name, ids, phase, license and course, kept by accounts.student_search.
+    search_text = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Texto de búsqueda',
+    )
     #endregion
 
     class Meta:
@@ -215,20 +236,6 @@ class StudentProfile(models.Model):
     def __str__(self):
         return f'{self.user.username} [ID: {self.user.national_id}] ({self.student_phase} - {self.current_course_type})'
     
-    @property
-    def current_course_type(self):
-        """Get the current course type code or 'N/A' if not enrolled."""
-        from academic.models import CourseEdition
-        current_course = CourseEdition.objects.filter(students=self.user).order_by('-start_date').first()
-        return current_course.course_type.code if current_course else COURSE_NA
-
-    @property
-    def current_course_edition(self):
-        """Get the current course edition number or None if not enrolled."""
-        from academic.models import CourseEdition
-        current_course = CourseEdition.objects.filter(students=self.user).order_by('-start_date').first()
-        return current_course.edition if current_course else None
-    
     def get_current_course(self):
         """
         Get the student's current course edition.
@@ -239,20 +246,12 @@ class StudentProfile(models.Model):
 
     def update_course_info(self):
         """
-        Update student_course_type and student_course_edition based on current enrollment.
-        If not enrolled, sets course_type to "No inscrito" and course_edition to None.
+        Refresh current_course_type and current_course_edition from the student's enrollments.
+        If not enrolled, sets course_type to "N/A" and course_edition to None.
         """
-        # Get the most recent course enrollment
-        from academic.models import CourseEdition
-        current_course = CourseEdition.objects.filter(students=self.user).order_by('-start_date').first()
-        
-        if current_course:
-            self.student_course_type = current_course.course_type.code
-            self.student_course_edition = current_course.edition
-        else:
-            # Student is not enrolled in any course
-            self.student_course_type = COURSE_NA
-            self.student_course_edition = None
+        from .courses import sync_current_course
+        sync_current_course(user_ids=[self.user_id])
+        self.refresh_from_db(fields=['current_course_type', 'current_course_edition', 'search_text'])
 
 class InstructorProfile(models.Model):
     """Model for storing instructor-specific information and flight training credentials."""
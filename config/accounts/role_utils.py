@@ -1,3 +1,5 @@
+from config.reference_cache import ROLES, cached
+
 ROLE_LABELS = {
     "STUDENT": "Estudiante",
     "INSTRUCTOR": "Instructor",
@@ -16,7 +18,13 @@ def has_profile(user, profile_name):
 
 
 def get_available_roles(user):
-    """Return the roles the current user can activate."""
+    """Return the roles the current user can activate (cached per user, see config/reference_cache.py)."""
+    if getattr(user, "pk", None) is None:
+        return _probe_available_roles(user)
+    return list(cached(ROLES, user.pk, lambda: _probe_available_roles(user)))
+
+
+def _probe_available_roles(user):
     available_roles = []
 
     if has_profile(user, "student_profile"):
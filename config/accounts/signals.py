@@ -0,0 +1,98 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from academic.models import CourseEdition, CourseType
+from config.reference_cache import INSTRUCTORS, ROLES, invalidate
+from .courses import sync_current_course
+from .models import InstructorProfile, StaffProfile, StudentProfile, User
+from .student_search import refresh_student_search, search_text_for
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_instructor_roster(sender, instance, **kwargs):
+    """Drop the cached instructor roster when a user changes (logins only touch last_login)."""
+    if kwargs.get('update_fields') == frozenset({'last_login'}):
+        return
+    invalidate(INSTRUCTORS)
+    if kwargs.get('signal') is post_delete:
+        invalidate(ROLES, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=StudentProfile)
+@receiver([post_save, post_delete], sender=InstructorProfile)
+@receiver([post_save, post_delete], sender=StaffProfile)
+def invalidate_cached_roles(sender, instance, **kwargs):
+    """Drop the cached roles of a user when one of their profiles is created or deleted."""
+    if kwargs.get('created') or kwargs.get('signal') is post_delete:
+        invalidate(ROLES, instance.user_id)
+    # The roster filters on instructor_type, which can change on any save.
+    if sender is InstructorProfile:
+        invalidate(INSTRUCTORS)
+
+
+@receiver(post_save, sender=StudentProfile)
+def sync_student_course_and_search(sender, instance, created, **kwargs):
+    """Fill in the current course of a new profile and keep the search text of every profile."""
+    if created:
+        # Also builds the search text.
+        instance.update_course_info()
+        return
+
+    text = search_text_for(instance)
+    if text != instance.search_text:
+        StudentProfile.objects.filter(pk=instance.pk).update(search_text=text)
+        instance.search_text = text
+
+
+@receiver(post_save, sender=User)
+def refresh_user_student_search(sender, instance, **kwargs):
+    """Rebuild the search text of a student whose name, username or id may have changed."""
+    if kwargs.get('update_fields') == frozenset({'last_login'}):
+        return
+    refresh_student_search([instance.pk])
+
+
+@receiver(m2m_changed, sender=CourseEdition.students.through)
+def sync_enrolled_students_course(sender, instance, action, reverse, pk_set, **kwargs):
+    """Refresh the current course of the students enrolled in or removed from an edition."""
+    if action == 'pre_clear' and not reverse:
+        instance._cleared_student_ids = list(instance.students.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        user_ids = [instance.pk]
+    elif action == 'post_clear':
+        user_ids = getattr(instance, '_cleared_student_ids', [])
+    else:
+        user_ids = pk_set or []
+    sync_current_course(user_ids)
+
+
+@receiver(post_save, sender=CourseEdition)
+def sync_edition_students_course(sender, instance, created, **kwargs):
+    """Refresh the students of an edition whose type, number or start date may have changed."""
+    if not created:
+        sync_current_course(instance.students.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=CourseEdition)
+def remember_edition_students(sender, instance, **kwargs):
+    """Keep the students of an edition being deleted; its enrollments go with it."""
+    instance._deleted_student_ids = list(instance.students.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=CourseEdition)
+def sync_deleted_edition_students_course(sender, instance, **kwargs):
+    """Move the students of a deleted edition to their next latest course."""
+    sync_current_course(getattr(instance, '_deleted_student_ids', []))
+
+
+@receiver(post_save, sender=CourseType)
+def sync_course_type_students_course(sender, instance, created, **kwargs):
+    """Refresh the students of every edition of a course type whose code may have changed."""
+    if not created:
+        sync_current_course(
+            User.objects.filter(enrolled_courses__course_type=instance).values_list('pk', flat=True).distinct()
+        )
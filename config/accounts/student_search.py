@@ -0,0 +1,75 @@
+"""
+Search index of the student list.
+
+StudentProfile.search_text holds the student's name, username, national id,
+phase, license and current course, lowercased and without accents, so a
+search is one ``icontains`` per word on a single column. On PostgreSQL the
+column has a pg_trgm GIN index (see migration 0046) that serves those
+substring matches; other databases scan the narrow column.
+
+The text is rebuilt by ``accounts.signals`` when a profile or its user is
+saved, and by sync_current_course() when the course changes. Code that
+changes these fields with ``QuerySet.update`` must call
+refresh_student_search() itself.
+"""
+
+import unicodedata
+
+from django.db.models import Q
+
+from .models import StudentProfile
+
+
+def normalize_search_text(*parts):
+    """Join ``parts`` into lowercase words without accents; empty parts are skipped."""
+    text = ' '.join(str(part) for part in parts if part not in (None, ''))
+    text = ''.join(
+        char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char)
+    )
+    return ' '.join(text.casefold().split())
+
+
+def search_text_for(profile):
+    """Return the search text of a StudentProfile (its user must be loaded or loadable)."""
+    user = profile.user
+    return normalize_search_text(
+        user.first_name,
+        user.last_name,
+        user.username,
+        user.national_id,
+        profile.student_phase,
+        profile.student_license_type,
+        profile.current_course_type,
+        profile.current_course_edition,
+    )
+
+
+def refresh_student_search(user_ids=None, batch_size=500):
+    """
+    Rebuild the search text of the students with ``user_ids`` (default: all).
+
+    Only rows whose text changed are written; returns how many were.
+    """
+    profiles = StudentProfile.objects.select_related('user').order_by('pk')
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0
+        profiles = profiles.filter(user_id__in=user_ids)
+
+    changed = []
+    for profile in profiles.iterator(chunk_size=batch_size):
+        text = search_text_for(profile)
+        if text != profile.search_text:
+            profile.search_text = text
+            changed.append(profile)
+    StudentProfile.objects.bulk_update(changed, ['search_text'], batch_size=batch_size)
+    return len(changed)
+
+
+def search_students(queryset, term):
+    """Filter a StudentProfile queryset to rows whose search text contains every word of ``term``."""
+    condition = Q()
+    for word in normalize_search_text(term).split():
+        condition &= Q(search_text__icontains=word)
+    return queryset.filter(condition)
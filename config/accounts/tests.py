@@ -1,3 +1,83 @@
+from datetime import date
+
 from django.test import TestCase
 
-# Create your tests here.
+from academic.models import CourseEdition, CourseType
+from constants import COURSE_NA
+
+from .courses import with_current_course
+from .models import StudentProfile, User
+
+
+class CurrentCourseTests(TestCase):
+    """The stored current course follows enrollments, editions and course types."""
+
+    def setUp(self):
+        self.private = CourseType.objects.create(code='PPA', name='Piloto Privado', credit_hours=10)
+        self.commercial = CourseType.objects.create(code='PCA', name='Piloto Comercial', credit_hours=10)
+        self.first = CourseEdition.objects.create(
+            course_type=self.private, edition=1, start_date=date(2026, 1, 10),
+        )
+        self.second = CourseEdition.objects.create(
+            course_type=self.commercial, edition=2, start_date=date(2026, 6, 10),
+        )
+        self.student = self.create_student(30_100_001)
+
+    def create_student(self, national_id):
+        user = User.objects.create_user(
+            username=f'student{national_id}',
+            email=f'student{national_id}@test.nav',
+            national_id=national_id,
+            password='x',
+            role=User.Role.STUDENT,
+        )
+        StudentProfile.objects.create(user=user, student_age=20)
+        return user
+
+    def assertCurrentCourse(self, user, course_type, edition):
+        profile = StudentProfile.objects.get(user=user)
+        self.assertEqual((profile.current_course_type, profile.current_course_edition), (course_type, edition))
+
+    def test_new_student_is_not_enrolled(self):
+        self.assertCurrentCourse(self.student, COURSE_NA, None)
+
+    def test_enrollment_changes_keep_the_latest_edition(self):
+        self.first.students.add(self.student)
+        self.assertCurrentCourse(self.student, 'PPA', 1)
+
+        self.student.enrolled_courses.add(self.second)
+        self.assertCurrentCourse(self.student, 'PCA', 2)
+
+        self.second.students.remove(self.student)
+        self.assertCurrentCourse(self.student, 'PPA', 1)
+
+        self.first.students.clear()
+        self.assertCurrentCourse(self.student, COURSE_NA, None)
+
+    def test_edition_and_course_type_changes_refresh_their_students(self):
+        self.first.students.add(self.student)
+        self.second.students.add(self.student)
+
+        self.first.start_date = date(2026, 9, 1)
+        self.first.save()
+        self.assertCurrentCourse(self.student, 'PPA', 1)
+
+        self.private.code = 'PPA-A'
+        self.private.save()
+        self.assertCurrentCourse(self.student, 'PPA-A', 1)
+
+        self.first.delete()
+        self.assertCurrentCourse(self.student, 'PCA', 2)
+
+    def test_with_current_course_resolves_every_profile_in_one_query(self):
+        other = self.create_student(30_100_002)
+        self.first.students.add(self.student, other)
+        self.second.students.add(other)
+
+        with self.assertNumQueries(1):
+            resolved = {
+                profile.user_id: (profile.resolved_course_type, profile.resolved_course_edition)
+                for profile in with_current_course(StudentProfile.objects.all())
+            }
+
+        self.assertEqual(resolved, {self.student.pk: ('PPA', 1), other.pk: ('PCA', 2)})
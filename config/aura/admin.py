@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import IndividualReview, GlobalReview
+from .models import IndividualReview, GlobalReview, SessionJob
 
 
 @admin.register(IndividualReview)
@@ -69,3 +69,32 @@ class GlobalReviewAdmin(admin.ModelAdmin):
         "based_on_to",
     )
 
+
+
+@admin.register(SessionJob)
+class SessionJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "source_model",
+        "source_id",
+        "student_id",
+        "session_date",
+        "status",
+        "attempts",
+        "lease_owner",
+        "lease_expires_at",
+    )
+    list_filter = (
+        "status",
+        "source_model",
+    )
+    search_fields = (
+        "id",
+        "source_id",
+        "student_id",
+        "lease_owner",
+    )
+    readonly_fields = (
+        "created_at",
+        "updated_at",
+    )
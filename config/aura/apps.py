@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AuraConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'aura'
+
+    def ready(self):
+        import aura.signals  # noqa: F401
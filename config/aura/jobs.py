@@ -0,0 +1,199 @@
+"""
+Lease-based job queue for AURA pending sessions.
+
+Every FMS training session saved with ``aura_processed=False`` gets one
+SessionJob. Workers claim jobs with a lease (visibility timeout) before
+calling OpenAI, so several worker processes can run at once without sending
+the same session twice. On PostgreSQL candidates are locked with
+``SELECT ... FOR UPDATE SKIP LOCKED``; other backends (SQLite) fall back to a
+conditional UPDATE per job, which only one worker can win.
+"""
+
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from fms.models import (
+    FlightEvaluation0_100,
+    FlightEvaluation100_120,
+    FlightEvaluation120_170,
+    SessionLedgerEntry,
+    SimEvaluation,
+)
+from .models import SessionJob
+
+
+# source key -> (model, AURA session type), in sweep order
+JOB_SOURCES = {
+    SessionLedgerEntry.SOURCE_SIM: (SimEvaluation, "SIM"),
+    SessionLedgerEntry.SOURCE_0_100: (FlightEvaluation0_100, "FLIGHT"),
+    SessionLedgerEntry.SOURCE_100_120: (FlightEvaluation100_120, "FLIGHT"),
+    SessionLedgerEntry.SOURCE_120_170: (FlightEvaluation120_170, "FLIGHT"),
+}
+JOB_SOURCE_KEYS = {model: key for key, (model, _session_type) in JOB_SOURCES.items()}
+
+
+def worker_name() -> str:
+    """
+    Identify the current worker process in ``lease_owner``.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_session(session) -> None:
+    """
+    Queue an unprocessed session, or re-queue it after aura_processed was reset.
+    """
+    if session.aura_processed:
+        return
+    source_model = JOB_SOURCE_KEYS[type(session)]
+    # ignore_conflicts keeps concurrent saves of the same session from failing.
+    SessionJob.objects.bulk_create(
+        [
+            SessionJob(
+                source_model=source_model,
+                source_id=session.pk,
+                student_id=session.student_id,
+                session_date=session.session_date,
+            )
+        ],
+        ignore_conflicts=True,
+    )
+    SessionJob.objects.filter(
+        source_model=source_model,
+        source_id=session.pk,
+    ).exclude(status=SessionJob.STATUS_PENDING).update(
+        status=SessionJob.STATUS_PENDING,
+        attempts=0,
+        lease_owner="",
+        lease_expires_at=None,
+        updated_at=timezone.now(),
+    )
+
+
+def enqueue_pending_sessions() -> int:
+    """
+    Queue every unprocessed session that has no job yet.
+
+    Catches sessions written without signals (bulk_create, raw SQL, data
+    migrations). Returns the number of jobs created.
+    """
+    created = 0
+    for source_model, (model, _session_type) in JOB_SOURCES.items():
+        queued = SessionJob.objects.filter(source_model=source_model).values("source_id")
+        rows = (
+            model.objects.filter(aura_processed=False)
+            .exclude(pk__in=queued)
+            .values_list("pk", "student_id", "session_date")
+        )
+        jobs = [
+            SessionJob(
+                source_model=source_model,
+                source_id=pk,
+                student_id=student_id,
+                session_date=session_date,
+            )
+            for pk, student_id, session_date in rows
+        ]
+        SessionJob.objects.bulk_create(jobs, ignore_conflicts=True)
+        created += len(jobs)
+    return created
+
+
+def _available_jobs(now, student_id=None):
+    """
+    Pending jobs whose lease is free, skipping students another worker is on.
+
+    Skipping busy students keeps each student's sessions in date order, which
+    incremental global reviews depend on.
+    """
+    busy_students = SessionJob.objects.filter(
+        status=SessionJob.STATUS_PENDING,
+        lease_expires_at__gt=now,
+    ).values("student_id")
+    jobs = SessionJob.objects.filter(
+        Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now),
+        status=SessionJob.STATUS_PENDING,
+        attempts__lt=settings.AURA_JOB_MAX_ATTEMPTS,
+    ).exclude(student_id__in=busy_students)
+    if student_id is not None:
+        jobs = jobs.filter(student_id=student_id)
+    return jobs.order_by("session_date", "id")
+
+
+def fail_exhausted_jobs() -> int:
+    """
+    Give up on jobs whose lease expired too many times (a session that keeps crashing workers).
+    """
+    return SessionJob.objects.filter(
+        Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=timezone.now()),
+        status=SessionJob.STATUS_PENDING,
+        attempts__gte=settings.AURA_JOB_MAX_ATTEMPTS,
+    ).update(status=SessionJob.STATUS_FAILED, lease_owner="", lease_expires_at=None)
+
+
+def claim_jobs(owner: str, limit: int = 1, student_id: int | None = None) -> list[SessionJob]:
+    """
+    Lease up to ``limit`` pending jobs for ``owner``, oldest sessions first.
+    """
+    fail_exhausted_jobs()
+    now = timezone.now()
+    lease = {
+        "lease_owner": owner,
+        "lease_expires_at": now + timedelta(seconds=settings.AURA_JOB_VISIBILITY_TIMEOUT),
+        "attempts": F("attempts") + 1,
+        "updated_at": now,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            claimed = list(
+                _available_jobs(now, student_id)
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)[:limit]
+            )
+            SessionJob.objects.filter(pk__in=claimed).update(**lease)
+    else:
+        claimed = []
+        for pk in _available_jobs(now, student_id).values_list("pk", flat=True)[:limit]:
+            # The lease conditions are re-checked in the UPDATE; a worker that
+            # lost the race updates no row and moves on.
+            won = SessionJob.objects.filter(
+                Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now),
+                pk=pk,
+                status=SessionJob.STATUS_PENDING,
+            ).update(**lease)
+            if won:
+                claimed.append(pk)
+
+    return list(SessionJob.objects.filter(pk__in=claimed).order_by("session_date", "id"))
+
+
+def load_session(job: SessionJob):
+    """
+    Return ``(session, session_type)`` for a job; session is None if it was deleted.
+    """
+    model, session_type = JOB_SOURCES[job.source_model]
+    return model.objects.filter(pk=job.source_id).first(), session_type
+
+
+def complete_job(job: SessionJob, owner: str) -> bool:
+    """
+    Mark a leased job as done. Returns False if the lease was lost to another worker.
+    """
+    return bool(
+        SessionJob.objects.filter(
+            pk=job.pk,
+            status=SessionJob.STATUS_PENDING,
+            lease_owner=owner,
+        ).update(
+            status=SessionJob.STATUS_DONE,
+            lease_expires_at=None,
+            updated_at=timezone.now(),
+        )
+    )
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-18 03:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aura', '0004_globalreview_generation_mode_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_model', models.CharField(max_length=20)),
+                ('source_id', models.PositiveIntegerField()),
+                ('student_id', models.PositiveIntegerField()),
+                ('session_date', models.DateField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Number of times a worker has claimed this job.')),
+                ('lease_owner', models.CharField(blank=True, help_text='Worker currently holding the job.', max_length=100)),
+                ('lease_expires_at', models.DateTimeField(blank=True, help_text='The job becomes visible to other workers after this time.', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'AURA session job',
+                'verbose_name_plural': 'AURA session jobs',
+                'indexes': [models.Index(condition=models.Q(('status', 'PENDING')), fields=['session_date', 'id'], name='aura_job_claim_idx'), models.Index(condition=models.Q(('status', 'PENDING')), fields=['student_id', 'lease_expires_at'], name='aura_job_student_idx')],
+                'constraints': [models.UniqueConstraint(fields=('source_model', 'source_id'), name='aura_session_job_source_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-18 04:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aura', '0005_session_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='globalreview',
+            name='lineage_root',
+            field=models.ForeignKey(blank=True, help_text='Full-rebuild snapshot this incremental chain started from (empty for a full rebuild).', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lineage_snapshots', to='aura.globalreview'),
+        ),
+        migrations.AlterField(
+            model_name='globalreview',
+            name='individual_reviews',
+            field=models.ManyToManyField(blank=True, help_text='Individual reviews added by this snapshot (all of them for a full rebuild).', related_name='global_reviews', to='aura.individualreview'),
+        ),
+    ]
@@ -184,12 +184,22 @@ class GlobalReview(models.Model):
         help_text="Previous global review snapshot used as the baseline for an incremental update.",
     )
 
-    # Optional M2M link to the individual reviews used to build this snapshot
+    lineage_root = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        related_name="lineage_snapshots",
+        blank=True,
+        null=True,
+        help_text="Full-rebuild snapshot this incremental chain started from (empty for a full rebuild).",
+    )
+
+    # Append-only M2M link: a full rebuild links every review it was built from,
+    # an incremental update only the reviews it added (see contributing_reviews).
     individual_reviews = models.ManyToManyField(
         IndividualReview,
         related_name="global_reviews",
         blank=True,
-        help_text="Individual reviews that were aggregated to build this profile.",
+        help_text="Individual reviews added by this snapshot (all of them for a full rebuild).",
     )
 
     # AI lifecycle and results
@@ -245,3 +255,119 @@ class GlobalReview(models.Model):
     def __str__(self) -> str:
         return f"GlobalReview #{self.id} for {self.student} ({self.scope_type}, {self.time_window})"
 
+    def lineage_ids(self) -> list[int]:
+        """
+        Ids of this snapshot and its ancestors back to the full rebuild, in one query.
+        """
+        root_id = self.lineage_root_id or self.pk
+        parents = dict(
+            GlobalReview.objects.filter(Q(pk=root_id) | Q(lineage_root_id=root_id)).values_list(
+                "pk", "previous_global_review_id"
+            )
+        )
+        ids = []
+        current = self.pk
+        while current is not None:
+            ids.append(current)
+            # Stop at the root; snapshots created before lineage was recorded are roots too.
+            current = parents.get(current) if current != root_id else None
+        return ids
+
+    def contributing_reviews(self):
+        """
+        All individual reviews this snapshot is based on.
+
+        Rebuilt from the reviews each snapshot in the lineage added, limited to
+        this snapshot's window (based_on_from..based_on_to).
+        """
+        reviews = IndividualReview.objects.filter(global_reviews__in=self.lineage_ids())
+        if self.based_on_from:
+            reviews = reviews.filter(created_at__gte=self.based_on_from)
+        if self.based_on_to:
+            reviews = reviews.filter(created_at__lte=self.based_on_to)
+        return reviews.distinct().order_by("created_at")
+
+
+
+class SessionJob(models.Model):
+    """
+    Queue entry for one FMS session waiting for its AURA individual review.
+
+    Workers lease jobs before calling OpenAI so two workers never send the
+    same session. A lease that expires (e.g. a crashed worker) makes the job
+    visible again.
+    """
+
+    STATUS_PENDING = "PENDING"
+    STATUS_DONE = "DONE"
+    STATUS_FAILED = "FAILED"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    # fms.SessionLedgerEntry source keys (sim, 0_100, 100_120, 120_170)
+    source_model = models.CharField(max_length=20)
+    source_id = models.PositiveIntegerField()
+
+    # Student national id, as stored on the evaluation
+    student_id = models.PositiveIntegerField()
+    session_date = models.DateField()
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+    )
+
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Number of times a worker has claimed this job.",
+    )
+
+    lease_owner = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Worker currently holding the job.",
+    )
+
+    lease_expires_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="The job becomes visible to other workers after this time.",
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = "AURA session job"
+        verbose_name_plural = "AURA session jobs"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source_model", "source_id"],
+                name="aura_session_job_source_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["session_date", "id"],
+                name="aura_job_claim_idx",
+                condition=Q(status="PENDING"),
+            ),
+            models.Index(
+                fields=["student_id", "lease_expires_at"],
+                name="aura_job_student_idx",
+                condition=Q(status="PENDING"),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"SessionJob #{self.id} ({self.source_model}:{self.source_id}, status={self.status})"
@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+"""
+AURA asyncio worker.
+
+Processes pending FMS sessions like aura_worker.py, claiming them from the
+same AURA job queue, but keeps several OpenAI requests in flight at once. A concurrency limit caps parallel requests, a
+token bucket replaces the fixed sleep between sessions, and 429/5xx answers
+are retried with exponential backoff. Sessions of the same student are still
+processed in order so incremental global reviews see their reviews in
+sequence. Database work runs on the calling thread through sync_to_async.
+
+Usage:
+    python aura/scripts/aura_async_worker.py [--once] [--concurrency N]
+        [--requests-per-minute N] [--max-retries N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+import django
+
+# Add Django project to Python path
+project_dir = os.path.dirname(os.path.abspath(__file__))
+django_dir = os.path.join(project_dir, "..", "..")
+sys.path.insert(0, django_dir)
+
+# Set Django environment
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+import openai  # noqa: E402
+from asgiref.sync import async_to_sync, sync_to_async  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from aura.jobs import (  # noqa: E402
+    claim_jobs,
+    complete_job,
+    enqueue_pending_sessions,
+    load_session,
+    worker_name,
+)
+from aura.scripts.aura_worker import complete_session, prepare_session  # noqa: E402
+from aura.views import (  # noqa: E402
+    build_individual_review_request,
+    render_individual_review_prompt,
+)
+from config.db_connections import close_stale_connections  # noqa: E402
+from config.openai_client import build_async_openai_client  # noqa: E402
+
+
+RETRYABLE_STATUS_CODES = {429}
+MAX_BACKOFF_SECONDS = 60.0
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket: ``rate`` tokens per second, bursts up to ``capacity``.
+
+    A rate of zero or less disables the limit.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Return True for rate limits, server errors and connection failures.
+    """
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return isinstance(error, openai.APIConnectionError)
+
+
+def backoff_delay(error: Exception, attempt: int, base_delay: float) -> float:
+    """
+    Seconds to wait before retry ``attempt`` (0-based), honoring Retry-After.
+    """
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        except ValueError:
+            pass
+    delay = min(base_delay * (2 ** attempt), MAX_BACKOFF_SECONDS)
+    return delay + random.uniform(0, base_delay)
+
+
+async def request_individual_review(
+    client,
+    bucket: TokenBucket,
+    session_comment: str,
+    max_retries: int,
+    base_delay: float = 1.0,
+) -> str:
+    """
+    Send one AURA individual review request, retrying rate limits and 5xx answers.
+
+    Returns the response text, or a string starting with "Error:" like
+    run_ai_analysis_for_individual_review().
+    """
+    base_prompt = settings.AURA_INDIVIDUAL_REVIEW_PROMPT
+    if not base_prompt:
+        return "Error: AURA_INDIVIDUAL_REVIEW_PROMPT is empty or not loaded."
+
+    request = build_individual_review_request(
+        base_prompt,
+        render_individual_review_prompt(base_prompt, session_comment),
+    )
+    attempt = 0
+    while True:
+        await bucket.acquire()
+        try:
+            response = await client.responses.create(**request)
+            return response.output_text
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                print(f"[{timezone.now()}] OpenAI request failed after {attempt + 1} attempt(s): {e}")
+                return f"Error: {e}"
+            delay = backoff_delay(e, attempt, base_delay)
+            print(f"[{timezone.now()}] OpenAI request failed ({e}); retrying in {delay:.1f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+async def process_pending_sessions_async(
+    client=None,
+    concurrency: int | None = None,
+    requests_per_minute: float | None = None,
+    max_retries: int | None = None,
+    base_delay: float = 1.0,
+) -> dict:
+    """
+    Process every pending session with up to ``concurrency`` OpenAI requests in flight.
+
+    Returns:
+        dict with keys: reviews_created (int), sessions_scanned (int)
+    """
+    concurrency = concurrency or settings.AURA_WORKER_CONCURRENCY
+    if requests_per_minute is None:
+        requests_per_minute = settings.AURA_WORKER_REQUESTS_PER_MINUTE
+    if max_retries is None:
+        max_retries = settings.AURA_WORKER_MAX_RETRIES
+
+    options = (concurrency, requests_per_minute, max_retries, base_delay)
+    if client is not None:
+        return await _process_queue(client, *options)
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        print(f"[{timezone.now()}] OpenAI API key not found in environment variables.")
+        return {"reviews_created": 0, "sessions_scanned": 0}
+    # Retries are handled here so they share the token bucket.
+    client = build_async_openai_client(api_key, max_retries=0)
+    try:
+        return await _process_queue(client, *options)
+    finally:
+        # The client is built for this batch only; release its connection pool.
+        await client.close()
+
+
+async def _process_queue(client, concurrency, requests_per_minute, max_retries, base_delay) -> dict:
+    queued = await sync_to_async(enqueue_pending_sessions)()
+    print("[{}] Queued {} new pending sessions for AURA".format(timezone.now(), queued))
+
+    owner = worker_name()
+    bucket = TokenBucket(requests_per_minute / 60, capacity=concurrency)
+    in_flight = asyncio.Semaphore(concurrency)
+    student_locks = defaultdict(asyncio.Lock)
+
+    async def handle(job):
+        session, session_type = await sync_to_async(load_session)(job)
+        if session is None:
+            await sync_to_async(complete_job)(job, owner)
+            return None
+        # asyncio.Lock is FIFO, so sessions of one student keep their order.
+        async with student_locks[session.student_id]:
+            prepared = await sync_to_async(prepare_session)(session, session_type)
+            if prepared is None:
+                await sync_to_async(complete_job)(job, owner)
+                return False
+            comments, student_user, instructor_user, session_comment_text = prepared
+            async with in_flight:
+                response_text = await request_individual_review(
+                    client,
+                    bucket,
+                    session_comment_text,
+                    max_retries,
+                    base_delay,
+                )
+            created = await sync_to_async(complete_session)(
+                session,
+                comments,
+                student_user,
+                instructor_user,
+                response_text,
+            )
+            await sync_to_async(complete_job)(job, owner)
+            return created
+
+    reviews_created = 0
+    sessions_scanned = 0
+    while True:
+        await sync_to_async(close_stale_connections)()
+        # Claim a few batches' worth so every slot stays busy while leases stay short.
+        jobs = await sync_to_async(claim_jobs)(owner, limit=concurrency * 2)
+        if not jobs:
+            break
+        results = await asyncio.gather(*(handle(job) for job in jobs))
+        reviews_created += sum(1 for result in results if result)
+        sessions_scanned += sum(1 for result in results if result is not None)
+    return {"reviews_created": reviews_created, "sessions_scanned": sessions_scanned}
+
+
+def run_pending_sessions(**kwargs) -> dict:
+    """
+    Synchronous entry point; database calls run on the calling thread.
+    """
+    return async_to_sync(process_pending_sessions_async)(**kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AURA asyncio worker")
+    parser.add_argument("--once", action="store_true", help="Process the current backlog and exit.")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--requests-per-minute", type=float, default=None)
+    parser.add_argument("--max-retries", type=int, default=None)
+    args = parser.parse_args()
+
+    options = {
+        "concurrency": args.concurrency,
+        "requests_per_minute": args.requests_per_minute,
+        "max_retries": args.max_retries,
+    }
+
+    print("[{}] AURA async worker started".format(timezone.now()))
+    while True:
+        try:
+            close_stale_connections()
+            result = run_pending_sessions(**options)
+            print("[{}] AURA async batch finished: {}".format(timezone.now(), result))
+            if args.once:
+                break
+            time.sleep(30)
+        except KeyboardInterrupt:
+            print("[{}] AURA async worker stopped by user".format(timezone.now()))
+            break
+        except Exception as e:
+            print("[{}] AURA async worker error: {}".format(timezone.now(), str(e)))
+            if args.once:
+                raise
+            time.sleep(60)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,10 @@
 """
 AURA AI Analysis Worker for PythonAnywhere Always-On Task
 
-This script continuously scans simulator and flight evaluation tables (FMS app)
-for unprocessed sessions and generates AURA IndividualReview records using the
-OpenAI API and the AURA prompt.
+This script continuously claims unprocessed simulator and flight sessions (FMS
+app) from the AURA job queue and generates AURA IndividualReview records using
+the OpenAI API and the AURA prompt. Several workers can run at once; each
+session is leased to a single worker (see aura/jobs.py).
 """
 
 import os
@@ -27,17 +28,19 @@ django.setup()
 
 # Import Django models and functions AFTER django.setup()
 from accounts.models import User  # noqa: E402
-from aura.models import IndividualReview, GlobalReview  # noqa: E402
+from aura.jobs import (  # noqa: E402
+    claim_jobs,
+    complete_job,
+    enqueue_pending_sessions,
+    load_session,
+    worker_name,
+)
+from aura.models import IndividualReview, GlobalReview, SessionJob  # noqa: E402
 from aura.views import (  # noqa: E402
     run_ai_analysis_for_individual_review,
     generate_incremental_global_review_for_student,
 )
-from fms.models import (  # noqa: E402
-    SimEvaluation,
-    FlightEvaluation0_100,
-    FlightEvaluation100_120,
-    FlightEvaluation120_170,
-)
+from config.db_connections import close_stale_connections  # noqa: E402
 
 
 def build_session_comment(session, session_type: str) -> str:
@@ -85,20 +88,24 @@ def get_or_none_user_by_national_id(national_id: int, role: str) -> User | None:
         return None
 
 
-def process_single_session(session, session_type: str) -> bool:
+def prepare_session(session, session_type: str):
     """
-    Process one FMS session (sim or flight) and create an IndividualReview.
+    Resolve the people of one FMS session and build the text AURA analyzes.
+
+    Returns a (comments, student_user, instructor_user, session_comment_text)
+    tuple, or None when the session must not be sent to OpenAI (it is then
+    marked as processed, exactly as before).
     """
     # Avoid re-processing
     if getattr(session, "aura_processed", False):
-        return False
+        return None
 
     # Skip if there are no comments
     comments = getattr(session, "comments", "") or ""
     if not comments.strip():
         session.aura_processed = True
         session.save(update_fields=["aura_processed"])
-        return False
+        return None
 
     print(f"[{timezone.now()}] Processing {session_type} session id={session.id}")
 
@@ -118,17 +125,36 @@ def process_single_session(session, session_type: str) -> bool:
         print(f"[{timezone.now()}] Skipping session id={session.id}: student user not found.")
         session.aura_processed = True
         session.save(update_fields=["aura_processed"])
-        return False
+        return None
 
     # Build input text
     session_comment_text = build_session_comment(session, session_type=session_type)
+    return comments, student_user, instructor_user, session_comment_text
+
+
+def process_single_session(session, session_type: str) -> bool:
+    """
+    Process one FMS session (sim or flight) and create an IndividualReview.
+    """
+    prepared = prepare_session(session, session_type)
+    if prepared is None:
+        return False
+    comments, student_user, instructor_user, session_comment_text = prepared
 
     # Call OpenAI via AURA helper
     response_text = run_ai_analysis_for_individual_review(
         session_comment=session_comment_text,
         session_type=session_type,
     )
+    return complete_session(session, comments, student_user, instructor_user, response_text)
+
 
+def complete_session(session, comments, student_user, instructor_user, response_text) -> bool:
+    """
+    Store the AURA response of one session as an IndividualReview.
+
+    Every outcome, including errors, marks the session as processed.
+    """
     print(
         "[{}] AURA API response type: {}, length: {}, preview: '{}'".format(
             timezone.now(),
@@ -245,101 +271,75 @@ def process_single_session(session, session_type: str) -> bool:
     return True
 
 
-def process_pending_sessions_for_student(student_user: User, sleep_seconds: float = 3.0) -> dict:
+def process_claimed_jobs(owner: str, student_id: int | None = None, sleep_seconds: float = 3.0) -> dict:
     """
-    Process pending FMS sessions for one student (matches evaluation.student_id to user.national_id).
+    Claim jobs one at a time and process their sessions until none are left.
 
     Returns:
-        dict with keys: reviews_created (int), sessions_scanned (int), pending_before (int)
+        dict with keys: reviews_created (int), sessions_scanned (int)
     """
-    nid = student_user.national_id
-    sim_pending = SimEvaluation.objects.filter(
-        aura_processed=False, student_id=nid
-    ).order_by("session_date", "id")
-    f0_pending = FlightEvaluation0_100.objects.filter(
-        aura_processed=False, student_id=nid
-    ).order_by("session_date", "id")
-    f1_pending = FlightEvaluation100_120.objects.filter(
-        aura_processed=False, student_id=nid
-    ).order_by("session_date", "id")
-    f2_pending = FlightEvaluation120_170.objects.filter(
-        aura_processed=False, student_id=nid
-    ).order_by("session_date", "id")
-
-    pending_before = (
-        sim_pending.count() + f0_pending.count() + f1_pending.count() + f2_pending.count()
-    )
-    print(
-        "[{}] AURA student id={} national_id={}: {} pending session(s)".format(
-            timezone.now(), student_user.id, nid, pending_before
-        )
-    )
-
     reviews_created = 0
     sessions_scanned = 0
 
-    for session in sim_pending:
-        sessions_scanned += 1
-        if process_single_session(session, session_type="SIM"):
-            reviews_created += 1
-        time.sleep(sleep_seconds)
-
-    for session in f0_pending:
-        sessions_scanned += 1
-        if process_single_session(session, session_type="FLIGHT"):
-            reviews_created += 1
-        time.sleep(sleep_seconds)
-
-    for session in f1_pending:
-        sessions_scanned += 1
-        if process_single_session(session, session_type="FLIGHT"):
-            reviews_created += 1
-        time.sleep(sleep_seconds)
-
-    for session in f2_pending:
-        sessions_scanned += 1
-        if process_single_session(session, session_type="FLIGHT"):
-            reviews_created += 1
-        time.sleep(sleep_seconds)
+    while True:
+        # Each job is a unit of work; recycle broken or expired connections between them.
+        close_stale_connections()
+        jobs = claim_jobs(owner, limit=1, student_id=student_id)
+        if not jobs:
+            break
+        job = jobs[0]
+        session, session_type = load_session(job)
+        if session is not None:
+            sessions_scanned += 1
+            if process_single_session(session, session_type=session_type):
+                reviews_created += 1
+        complete_job(job, owner)
+        if session is not None:
+            time.sleep(sleep_seconds)
 
     return {
         "reviews_created": reviews_created,
         "sessions_scanned": sessions_scanned,
-        "pending_before": pending_before,
     }
 
 
-def process_pending_sessions():
+def process_pending_sessions_for_student(student_user: User, sleep_seconds: float = 3.0) -> dict:
     """
-    Find and process all pending (aura_processed=False) sessions.
+    Process pending FMS sessions for one student (matches evaluation.student_id to user.national_id).
+
+    Returns:
+        dict with keys: reviews_created (int), sessions_scanned (int), pending_before (int)
     """
-    # Sim sessions
-    sim_pending = SimEvaluation.objects.filter(aura_processed=False).order_by("session_date", "id")
-    # Flight sessions (three ranges)
-    f0_pending = FlightEvaluation0_100.objects.filter(aura_processed=False).order_by("session_date", "id")
-    f1_pending = FlightEvaluation100_120.objects.filter(aura_processed=False).order_by("session_date", "id")
-    f2_pending = FlightEvaluation120_170.objects.filter(aura_processed=False).order_by("session_date", "id")
-
-    total_pending = (
-        sim_pending.count() + f0_pending.count() + f1_pending.count() + f2_pending.count()
+    nid = student_user.national_id
+    enqueue_pending_sessions()
+    pending_before = SessionJob.objects.filter(
+        status=SessionJob.STATUS_PENDING, student_id=nid
+    ).count()
+    print(
+        "[{}] AURA student id={} national_id={}: {} pending session(s)".format(
+            timezone.now(), student_user.id, nid, pending_before
+        )
     )
-    print("[{}] Found {} pending sessions for AURA".format(timezone.now(), total_pending))
 
-    for session in sim_pending:
-        process_single_session(session, session_type="SIM")
-        time.sleep(3)
+    result = process_claimed_jobs(worker_name(), student_id=nid, sleep_seconds=sleep_seconds)
+    return {**result, "pending_before": pending_before}
 
-    for session in f0_pending:
-        process_single_session(session, session_type="FLIGHT")
-        time.sleep(3)
 
-    for session in f1_pending:
-        process_single_session(session, session_type="FLIGHT")
-        time.sleep(3)
+def process_pending_sessions() -> dict:
+    """
+    Queue and process all pending (aura_processed=False) sessions.
 
-    for session in f2_pending:
-        process_single_session(session, session_type="FLIGHT")
-        time.sleep(3)
+    Sessions are claimed through the AURA job queue, so this can run next to
+    other workers without processing a session twice.
+    """
+    queued = enqueue_pending_sessions()
+    total_pending = SessionJob.objects.filter(status=SessionJob.STATUS_PENDING).count()
+    print(
+        "[{}] Found {} pending sessions for AURA ({} newly queued)".format(
+            timezone.now(), total_pending, queued
+        )
+    )
+    return process_claimed_jobs(worker_name())
 
 
 def main_worker_loop():
@@ -351,6 +351,7 @@ def main_worker_loop():
 
     while True:
         try:
+            close_stale_connections()
             process_pending_sessions()
             time.sleep(30)
         except KeyboardInterrupt:
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save
+
+from .jobs import JOB_SOURCES, enqueue_session
+
+
+def enqueue_aura_job(sender, instance, raw=False, **kwargs):
+    """Queue a saved training session for its AURA individual review."""
+    if raw:
+        return
+    enqueue_session(instance)
+
+
+for _model, _session_type in JOB_SOURCES.values():
+    post_save.connect(enqueue_aura_job, sender=_model, dispatch_uid=f'aura_job_save_{_model.__name__}')
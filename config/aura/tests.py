@@ -1,7 +1,43 @@
-from django.test import TestCase
+import json
+import logging
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import openai
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from accounts.models import InstructorProfile, StaffProfile, StudentProfile, User
+from aura.jobs import claim_jobs, complete_job, enqueue_pending_sessions
+from aura.models import GlobalReview, IndividualReview, SessionJob
+from aura.scripts.aura_async_worker import TokenBucket, run_pending_sessions
+from aura.scripts.aura_worker import process_pending_sessions
+from aura.views import generate_incremental_global_review_for_student, run_ai_analysis_for_individual_review
+from config.openai_client import (
+    build_openai_client,
+    get_openai_client,
+    reset_openai_client,
+    set_openai_client,
+)
+from fleet.models import Simulator
+from fms.models import SimEvaluation
+
+
+def silence_aura_analysis_log(test_case):
+    """Keep the AURA analysis logger from appending to the tracked aura/logs file during ``test_case``."""
+    quiet = logging.getLogger("aura.tests.analysis")
+    quiet.handlers = [logging.NullHandler()]
+    quiet.propagate = False
+    patcher = patch("aura.views.aura_individual_review_logger", return_value=quiet)
+    patcher.start()
+    test_case.addCleanup(patcher.stop)
 
 
 class AuraAccessTests(TestCase):
@@ -180,3 +216,453 @@ class AuraAccessTests(TestCase):
             reverse("dashboard:dashboard"),
             fetch_redirect_response=False,
         )
+
+
+class FakeOpenAIServer:
+    """
+    Minimal local stand-in for the OpenAI responses endpoint.
+
+    ``statuses`` is consumed one entry per request; once empty every request
+    succeeds. The server records the peak number of requests in flight and
+    the number of TCP connections opened.
+    """
+
+    def __init__(self, statuses=(), delay=0.05):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler_class())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with fake.lock:
+                    fake.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake.lock:
+                    fake.requests += 1
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                    status = fake.statuses.pop(0) if fake.statuses else 200
+                time.sleep(fake.delay)
+                with fake.lock:
+                    fake.in_flight -= 1
+
+                if status == 200:
+                    body = {
+                        "id": f"resp_{fake.requests}",
+                        "object": "response",
+                        "created_at": 0,
+                        "model": "gpt-5.1",
+                        "status": "completed",
+                        "output": [{
+                            "type": "message",
+                            "id": "msg_1",
+                            "role": "assistant",
+                            "status": "completed",
+                            "content": [{
+                                "type": "output_text",
+                                "text": json.dumps({"summary": "ok"}),
+                                "annotations": [],
+                            }],
+                        }],
+                        "parallel_tool_calls": True,
+                        "tool_choice": "auto",
+                        "tools": [],
+                    }
+                else:
+                    body = {"error": {"message": f"status {status}", "type": "test"}}
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@patch("aura.scripts.aura_worker.generate_incremental_global_review_for_student", return_value=None)
+class AuraAsyncWorkerTests(TestCase):
+    def setUp(self):
+        silence_aura_analysis_log(self)
+        self.simulator, _ = Simulator.objects.get_or_create(name="FPT")
+        self.students = []
+        for index in range(3):
+            student = User.objects.create(
+                username=f"async-student-{index}",
+                email=f"async-student-{index}@example.com",
+                national_id=3000001 + index,
+                role=User.Role.STUDENT,
+            )
+            StudentProfile.objects.create(user=student, student_age=20)
+            self.students.append(student)
+
+    def create_sessions(self, per_student, comments="Buen control de la aeronave."):
+        SimEvaluation.objects.bulk_create([
+            SimEvaluation(
+                student_id=student.national_id,
+                student_license_type="PPA",
+                student_license_number=student.national_id,
+                instructor_id=4000001,
+                instructor_license_number=4000001,
+                session_date=date(2026, 6, day + 1),
+                session_sim_hours=1,
+                simulator_rate_applied=0,
+                instructor_rate_applied=0,
+                simulator=self.simulator,
+                comments=comments,
+            )
+            for student in self.students
+            for day in range(per_student)
+        ])
+
+    def run_worker(self, server, **options):
+        client = openai.AsyncOpenAI(api_key="test", base_url=server.base_url, max_retries=0)
+        options.setdefault("requests_per_minute", 0)
+        return run_pending_sessions(client=client, base_delay=0.01, **options)
+
+    def test_processes_every_session_within_the_concurrency_limit(self, _global_review):
+        self.create_sessions(per_student=3)
+
+        with FakeOpenAIServer() as server:
+            result = self.run_worker(server, concurrency=2, max_retries=0)
+
+        self.assertEqual(result, {"reviews_created": 9, "sessions_scanned": 9})
+        self.assertEqual(IndividualReview.objects.count(), 9)
+        self.assertFalse(SimEvaluation.objects.filter(aura_processed=False).exists())
+        self.assertFalse(SimEvaluation.objects.filter(aura_review__isnull=True).exists())
+        self.assertEqual(server.max_in_flight, 2)
+
+    def test_rate_limits_and_server_errors_are_retried(self, _global_review):
+        self.create_sessions(per_student=1)
+
+        with FakeOpenAIServer(statuses=[429, 503, 500]) as server:
+            result = self.run_worker(server, concurrency=1, max_retries=3)
+
+        self.assertEqual(result["reviews_created"], 3)
+        self.assertEqual(server.requests, 6)
+
+    def test_exhausted_retries_mark_the_session_processed_without_a_review(self, _global_review):
+        self.create_sessions(per_student=1)
+
+        with FakeOpenAIServer(statuses=[503, 503]) as server:
+            result = self.run_worker(server, concurrency=1, max_retries=1)
+
+        self.assertEqual(result["reviews_created"], 2)
+        self.assertEqual(IndividualReview.objects.count(), 2)
+        self.assertEqual(SimEvaluation.objects.filter(aura_review__isnull=True).count(), 1)
+        self.assertFalse(SimEvaluation.objects.filter(aura_processed=False).exists())
+
+    def test_sessions_without_comments_skip_openai(self, _global_review):
+        self.create_sessions(per_student=1, comments="   ")
+
+        with FakeOpenAIServer() as server:
+            result = self.run_worker(server, concurrency=2)
+
+        self.assertEqual(result["reviews_created"], 0)
+        self.assertEqual(server.requests, 0)
+        self.assertFalse(SimEvaluation.objects.filter(aura_processed=False).exists())
+
+    def test_a_client_built_by_the_worker_is_closed(self, _global_review):
+        self.create_sessions(per_student=1)
+
+        with FakeOpenAIServer() as server:
+            client = openai.AsyncOpenAI(api_key="test", base_url=server.base_url, max_retries=0)
+            with patch.dict("os.environ", {"OPENAI_API_KEY": "test"}), \
+                    patch("aura.scripts.aura_async_worker.build_async_openai_client", return_value=client):
+                result = run_pending_sessions(requests_per_minute=0, base_delay=0.01)
+
+        self.assertEqual(result["reviews_created"], 3)
+        self.assertTrue(client.is_closed())
+
+
+@patch("aura.scripts.aura_worker.generate_incremental_global_review_for_student", return_value=None)
+class AuraSessionJobTests(TestCase):
+    def setUp(self):
+        self.simulator, _ = Simulator.objects.get_or_create(name="FPT")
+        self.sessions = []
+        for index in range(2):
+            student = User.objects.create(
+                username=f"queue-student-{index}",
+                email=f"queue-student-{index}@example.com",
+                national_id=5000001 + index,
+                role=User.Role.STUDENT,
+            )
+            StudentProfile.objects.create(user=student, student_age=20)
+            self.sessions += SimEvaluation.objects.bulk_create([
+                SimEvaluation(
+                    student_id=student.national_id,
+                    student_license_type="PPA",
+                    student_license_number=student.national_id,
+                    instructor_id=4000001,
+                    instructor_license_number=4000001,
+                    session_date=date(2026, 6, index + 1),
+                    session_sim_hours=1,
+                    simulator_rate_applied=0,
+                    instructor_rate_applied=0,
+                    simulator=self.simulator,
+                    comments="Buen control de la aeronave.",
+                )
+            ])
+
+    def test_saving_an_unprocessed_session_queues_it_once(self, _global_review):
+        session = self.sessions[0]
+        session.save()
+        session.save()
+
+        self.assertEqual(SessionJob.objects.count(), 1)
+        job = SessionJob.objects.get()
+        self.assertEqual((job.source_model, job.source_id, job.student_id), ("sim", session.pk, 5000001))
+
+        claim_jobs("worker-a")
+        complete_job(job, "worker-a")
+        # Resetting the flag is how a session is sent to AURA again.
+        session.save()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, SessionJob.STATUS_PENDING)
+        self.assertEqual(job.attempts, 0)
+
+    def test_sweep_queues_sessions_saved_without_signals(self, _global_review):
+        self.assertEqual(enqueue_pending_sessions(), 2)
+        self.assertEqual(enqueue_pending_sessions(), 0)
+
+    def test_claimed_job_is_hidden_from_other_workers(self, _global_review):
+        enqueue_pending_sessions()
+
+        first = claim_jobs("worker-a", limit=1)
+        second = claim_jobs("worker-b", limit=5)
+
+        self.assertEqual([job.source_id for job in first], [self.sessions[0].pk])
+        self.assertEqual([job.source_id for job in second], [self.sessions[1].pk])
+        self.assertEqual(claim_jobs("worker-c", limit=5), [])
+
+    def test_expired_lease_is_claimed_by_another_worker(self, _global_review):
+        enqueue_pending_sessions()
+        [job] = claim_jobs("worker-a", limit=1)
+        SessionJob.objects.filter(pk=job.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+        [reclaimed] = claim_jobs("worker-b", limit=1)
+
+        self.assertEqual(reclaimed.pk, job.pk)
+        self.assertEqual(reclaimed.attempts, 2)
+        self.assertFalse(complete_job(job, "worker-a"))
+        self.assertTrue(complete_job(reclaimed, "worker-b"))
+
+    def test_job_is_given_up_after_max_attempts(self, _global_review):
+        enqueue_pending_sessions()
+        SessionJob.objects.update(attempts=3)
+
+        with self.settings(AURA_JOB_MAX_ATTEMPTS=3):
+            self.assertEqual(claim_jobs("worker-a", limit=5), [])
+
+        self.assertEqual(SessionJob.objects.filter(status=SessionJob.STATUS_FAILED).count(), 2)
+
+    @patch("aura.scripts.aura_worker.time.sleep")
+    @patch("aura.scripts.aura_worker.run_ai_analysis_for_individual_review", return_value='{"summary": "ok"}')
+    def test_worker_processes_each_session_once(self, analysis, _sleep, _global_review):
+        first = process_pending_sessions()
+        second = process_pending_sessions()
+
+        self.assertEqual(first, {"reviews_created": 2, "sessions_scanned": 2})
+        self.assertEqual(second, {"reviews_created": 0, "sessions_scanned": 0})
+        self.assertEqual(analysis.call_count, 2)
+        self.assertEqual(SessionJob.objects.filter(status=SessionJob.STATUS_DONE).count(), 2)
+
+
+class TokenBucketTests(TestCase):
+    def test_bucket_spaces_requests_after_the_burst(self):
+        from asgiref.sync import async_to_sync
+
+        async def acquire_many():
+            bucket = TokenBucket(rate=20, capacity=2)
+            started = time.monotonic()
+            for _ in range(4):
+                await bucket.acquire()
+            return time.monotonic() - started
+
+        elapsed = async_to_sync(acquire_many)()
+
+        # Two tokens are available immediately; the other two need 1/20 s each.
+        self.assertGreaterEqual(elapsed, 0.09)
+
+
+class SharedOpenAIClientTests(TestCase):
+    def setUp(self):
+        silence_aura_analysis_log(self)
+
+    def tearDown(self):
+        reset_openai_client()
+
+    @override_settings(OPENAI_TIMEOUT=45, OPENAI_CONNECT_TIMEOUT=3, OPENAI_MAX_RETRIES=4)
+    def test_client_is_created_once_with_configured_policy(self):
+        reset_openai_client()
+
+        with patch.dict("os.environ", {"OPENAI_API_KEY": "test"}):
+            client = get_openai_client()
+            self.assertIs(get_openai_client(), client)
+
+        self.assertEqual(client.max_retries, 4)
+        self.assertEqual(client.timeout.read, 45)
+        self.assertEqual(client.timeout.connect, 3)
+
+    def test_injected_client_is_used_by_aura_calls(self):
+        fake_client = SimpleNamespace(
+            responses=SimpleNamespace(create=lambda **request: SimpleNamespace(output_text="{}")),
+        )
+        set_openai_client(fake_client)
+
+        with patch.dict("os.environ", {"OPENAI_API_KEY": "test"}):
+            result = run_ai_analysis_for_individual_review("Buen vuelo.", "SIM")
+
+        self.assertEqual(result, "{}")
+
+    def test_consecutive_calls_reuse_one_connection(self):
+        with FakeOpenAIServer(delay=0) as server:
+            with patch.dict("os.environ", {"OPENAI_API_KEY": "test", "OPENAI_BASE_URL": server.base_url}):
+                set_openai_client(build_openai_client())
+                for _ in range(3):
+                    run_ai_analysis_for_individual_review("Buen vuelo.", "SIM")
+
+        self.assertEqual(server.requests, 3)
+        self.assertEqual(server.connections, 1)
+
+
+PROFILE_RESPONSE = json.dumps({
+    "summary_text": "Progreso estable.",
+    "global_strengths": ["Control"],
+    "global_weaknesses": ["Radio"],
+    "domains": {},
+    "next_session_awareness": "Repasar fraseología.",
+})
+
+
+@patch("aura.views.run_ai_analysis_for_incremental_global_review", return_value=PROFILE_RESPONSE)
+@patch("aura.views.run_ai_analysis_for_global_review", return_value=PROFILE_RESPONSE)
+class GlobalReviewLineageTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create(
+            username="lineage-student",
+            email="lineage-student@example.com",
+            national_id=5100001,
+            role=User.Role.STUDENT,
+        )
+        StudentProfile.objects.create(user=self.student, student_age=20)
+        self.start = timezone.now() - timedelta(days=30)
+
+    def add_review(self, day):
+        review = IndividualReview.objects.create(
+            student=self.student,
+            source_comment_text=f"Sesión {day}",
+            ai_status=IndividualReview.STATUS_COMPLETED,
+        )
+        IndividualReview.objects.filter(pk=review.pk).update(created_at=self.start + timedelta(days=day))
+        review.refresh_from_db()
+        return review
+
+    def incremental(self, review, **window):
+        return generate_incremental_global_review_for_student(
+            self.student,
+            review,
+            time_window=GlobalReview.WINDOW_LAST_90_DAYS,
+            **window,
+        )
+
+    def test_incremental_snapshots_only_link_the_new_review(self, _full, _incremental):
+        reviews = [self.add_review(day) for day in range(3)]
+        baseline = self.incremental(reviews[-1])
+        self.assertEqual(baseline.generation_mode, GlobalReview.GENERATION_FULL_REBUILD)
+        self.assertEqual(baseline.individual_reviews.count(), 3)
+
+        latest = baseline
+        query_counts = set()
+        for day in range(3, 8):
+            review = self.add_review(day)
+            reviews.append(review)
+            with CaptureQueriesContext(connection) as queries:
+                latest = self.incremental(review)
+            query_counts.add(len(queries))
+            self.assertEqual(list(latest.individual_reviews.all()), [review])
+            self.assertEqual(latest.lineage_root_id, baseline.pk)
+
+        # Snapshot cost does not grow with the number of reviews already summarised.
+        self.assertEqual(len(query_counts), 1)
+
+        through = GlobalReview.individual_reviews.through.objects
+        self.assertEqual(through.count(), 3 + 5)
+        self.assertEqual(list(latest.contributing_reviews()), reviews)
+        self.assertEqual(list(baseline.contributing_reviews()), reviews[:3])
+
+    def test_resolver_respects_the_snapshot_window(self, _full, _incremental):
+        reviews = [self.add_review(day) for day in range(4)]
+        self.incremental(reviews[-1])
+        new_review = self.add_review(10)
+
+        latest = self.incremental(new_review, start_date=reviews[2].created_at)
+
+        self.assertEqual(list(latest.contributing_reviews()), [reviews[2], reviews[3], new_review])
+
+    def test_inclusion_flags_are_set_once(self, _full, _incremental):
+        first = self.add_review(0)
+        baseline = self.incremental(first)
+        first.refresh_from_db()
+        included_at = first.first_included_in_global_review_at
+
+        self.incremental(self.add_review(1))
+
+        first.refresh_from_db()
+        self.assertTrue(first.has_been_included_in_global_review)
+        self.assertEqual(first.first_included_in_global_review_at, included_at)
+        self.assertFalse(
+            IndividualReview.objects.filter(global_reviews__isnull=False, has_been_included_in_global_review=False).exists()
+        )
+        self.assertEqual(baseline.lineage_ids(), [baseline.pk])
+
+    def test_snapshot_without_lineage_is_its_own_root(self, _full, _incremental):
+        reviews = [self.add_review(day) for day in range(2)]
+        legacy = GlobalReview.objects.create(
+            student=self.student,
+            time_window=GlobalReview.WINDOW_LAST_90_DAYS,
+            generation_mode=GlobalReview.GENERATION_INCREMENTAL_UPDATE,
+            ai_status=GlobalReview.STATUS_COMPLETED,
+            ai_result=json.loads(PROFILE_RESPONSE),
+            based_on_from=reviews[0].created_at,
+            based_on_to=reviews[1].created_at,
+        )
+        legacy.individual_reviews.set(reviews)
+        new_review = self.add_review(2)
+
+        latest = self.incremental(new_review)
+
+        self.assertEqual(latest.lineage_root_id, legacy.pk)
+        self.assertEqual(list(latest.contributing_reviews()), reviews + [new_review])
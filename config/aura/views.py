@@ -3,22 +3,20 @@ import logging
 import os
 import sys
 from datetime import timedelta
-from pathlib import Path
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.contrib.staticfiles.finders import find
+from django.db import transaction
 from django.db.models import Q
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
-from openai import OpenAI
-import weasyprint
 
 from accounts.models import StudentProfile
+from config.openai_client import get_openai_client
+from config.pdf_renderer import logo_data_uri, render_pdf, stylesheet
 from .access import get_aura_capabilities
 from .models import IndividualReview, GlobalReview
 
@@ -52,6 +50,34 @@ def aura_individual_review_logger():
     return logger
 
 
+def render_individual_review_prompt(base_prompt: str, session_comment: str) -> str:
+    """
+    Render the AURA individual review prompt with a session comment.
+    """
+    # IMPORTANT: do NOT use str.format() on the whole prompt because it contains
+    # many JSON curly braces. We only want to replace the {session_comment}
+    # placeholder literally.
+    return base_prompt.replace("{session_comment}", session_comment or "")
+
+
+def build_individual_review_request(base_prompt: str, rendered_prompt: str) -> dict:
+    """
+    Return the responses.create() arguments for an AURA individual review.
+
+    Shared by the synchronous helper below and the asyncio worker so both send
+    exactly the same request.
+    """
+    # Configure model and response options (aligned with SMS usage)
+    return {
+        "model": "gpt-5.1",
+        "tools": [{"type": "web_search"}],
+        "reasoning": {"effort": "medium"},
+        "text": {"verbosity": "medium"},
+        "instructions": base_prompt,
+        "input": rendered_prompt,
+    }
+
+
 def run_ai_analysis_for_individual_review(session_comment: str, session_type: str = "UNKNOWN") -> str:
     """
     Run the AURA AI analysis for a single training session comment.
@@ -77,11 +103,7 @@ def run_ai_analysis_for_individual_review(session_comment: str, session_type: st
 
     logger.info("AURA prompt loaded, length: %d characters", len(base_prompt))
 
-    # Render prompt with the session comment.
-    # IMPORTANT: do NOT use str.format() on the whole prompt because it contains
-    # many JSON curly braces. We only want to replace the {session_comment}
-    # placeholder literally.
-    rendered_prompt = base_prompt.replace("{session_comment}", session_comment or "")
+    rendered_prompt = render_individual_review_prompt(base_prompt, session_comment)
     logger.info("Rendered prompt length: %d characters", len(rendered_prompt))
 
     # Retrieve the API key from environment variables
@@ -96,31 +118,17 @@ def run_ai_analysis_for_individual_review(session_comment: str, session_type: st
     logger.info("API key retrieved successfully (length: %d characters)", len(api_key) if api_key else 0)
 
     try:
-        logger.info("Attempting to initialize OpenAI client")
-        client = OpenAI(api_key=api_key)
-        logger.info("OpenAI client initialized successfully")
-
-        # Configure model and response options (aligned with SMS usage)
-        model = "gpt-5.1"
-        tools = [{"type": "web_search"}]
-        reasoning = {"effort": "medium"}
-        text = {"verbosity": "medium"}
+        client = get_openai_client()
 
+        request = build_individual_review_request(base_prompt, rendered_prompt)
         logger.info(
             "Making API request to OpenAI responses endpoint (model=%s, effort=%s, verbosity=%s)",
-            model,
-            reasoning["effort"],
-            text["verbosity"],
+            request["model"],
+            request["reasoning"]["effort"],
+            request["text"]["verbosity"],
         )
 
-        response = client.responses.create(
-            model=model,
-            tools=tools,
-            reasoning=reasoning,
-            text=text,
-            instructions=base_prompt,
-            input=rendered_prompt,
-        )
+        response = client.responses.create(**request)
 
         logger.info("API request completed successfully")
 
@@ -197,9 +205,7 @@ def _run_global_review_completion(base_prompt: str, rendered_prompt: str, reques
     logger.info("API key retrieved successfully (length: %d characters)", len(api_key) if api_key else 0)
 
     try:
-        logger.info("Attempting to initialize OpenAI client for %s", request_label)
-        client = OpenAI(api_key=api_key)
-        logger.info("OpenAI client initialized successfully for %s", request_label)
+        client = get_openai_client()
 
         model = "gpt-5-nano"
         tools = [{"type": "web_search"}]
@@ -351,28 +357,59 @@ def _create_global_review_snapshot(
     generation_mode,
     previous_global_review=None,
 ):
+    """
+    Store a GlobalReview and link only the reviews it adds to its lineage.
+
+    A full rebuild links its whole review set. An incremental update links the
+    reviews newer than the previous snapshot and points at it, so each new
+    session writes a constant number of rows; contributing_reviews() rebuilds
+    the full set on demand.
+    """
     first_review = reviews_qs.first()
     last_review = reviews_qs.last()
     now = timezone.now()
 
-    global_review = GlobalReview.objects.create(
-        student=student,
-        scope_type=scope_type,
-        time_window=time_window,
-        generation_mode=generation_mode,
-        previous_global_review=previous_global_review,
-        ai_status=GlobalReview.STATUS_COMPLETED,
-        ai_raw_response=response_text,
-        ai_result=parsed_response,
-        based_on_from=first_review.created_at if first_review else None,
-        based_on_to=last_review.created_at if last_review else None,
-    )
+    if previous_global_review is not None:
+        added_qs = reviews_qs
+        if previous_global_review.based_on_to:
+            added_qs = reviews_qs.filter(created_at__gt=previous_global_review.based_on_to)
+        lineage_root_id = previous_global_review.lineage_root_id or previous_global_review.pk
+    else:
+        added_qs = reviews_qs
+        lineage_root_id = None
+    added_ids = list(added_qs.values_list("pk", flat=True))
 
-    global_review.individual_reviews.set(reviews_qs)
+    with transaction.atomic():
+        global_review = GlobalReview.objects.create(
+            student=student,
+            scope_type=scope_type,
+            time_window=time_window,
+            generation_mode=generation_mode,
+            previous_global_review=previous_global_review,
+            lineage_root_id=lineage_root_id,
+            ai_status=GlobalReview.STATUS_COMPLETED,
+            ai_raw_response=response_text,
+            ai_result=parsed_response,
+            based_on_from=first_review.created_at if first_review else None,
+            based_on_to=last_review.created_at if last_review else None,
+        )
 
-    qs_without_flag = reviews_qs.filter(has_been_included_in_global_review=False)
-    reviews_qs.update(has_been_included_in_global_review=True)
-    qs_without_flag.update(first_included_in_global_review_at=now)
+        GlobalReview.individual_reviews.through.objects.bulk_create(
+            [
+                GlobalReview.individual_reviews.through(globalreview_id=global_review.pk, individualreview_id=pk)
+                for pk in added_ids
+            ],
+            batch_size=500,
+        )
+
+        # Reviews already flagged keep their first inclusion time; one UPDATE sets both fields.
+        IndividualReview.objects.filter(
+            pk__in=added_ids,
+            has_been_included_in_global_review=False,
+        ).update(
+            has_been_included_in_global_review=True,
+            first_included_in_global_review_at=now,
+        )
 
     return global_review
 
@@ -703,15 +740,13 @@ def download_global_review_pdf(request, student_profile_id: int):
         return redirect("aura:student_global_review", student_profile_id=student_profile.id)
 
     try:
-        raw_logo_path = find("aura/img/evaluation_logo.png")
-        if raw_logo_path:
-            logo_path = Path(raw_logo_path).as_posix()
-            logo_uri = f"file:///{logo_path}"
-        else:
-            logo_uri = ""
+        css = stylesheet("aura/aura_pdf_global_review.css")
+        if css is None:
+            messages.error(request, "No se encontró el archivo CSS para generar el PDF AURA.")
+            return redirect("aura:student_global_review", student_profile_id=student_profile.id)
 
         snap = _global_review_public_snapshot(latest_review)
-        html_string = render_to_string(
+        pdf = render_pdf(
             "aura/pdf_global_review.html",
             {
                 "student_profile": student_profile,
@@ -720,20 +755,12 @@ def download_global_review_pdf(request, student_profile_id: int):
                 "aura_global_strengths": snap["global_strengths"],
                 "aura_global_weaknesses": snap["global_weaknesses"],
                 "aura_next_session_awareness": snap["next_session_awareness"],
-                "logo_path": logo_uri,
+                "logo_path": logo_data_uri("aura/img/evaluation_logo.png"),
                 "generated_at": timezone.now(),
             },
+            stylesheets=[css],
         )
 
-        base_url = request.build_absolute_uri()
-        css_path = find("aura/aura_pdf_global_review.css")
-        if not css_path:
-            messages.error(request, "No se encontró el archivo CSS para generar el PDF AURA.")
-            return redirect("aura:student_global_review", student_profile_id=student_profile.id)
-
-        html_doc = weasyprint.HTML(string=html_string, base_url=base_url)
-        pdf = html_doc.write_pdf(stylesheets=[weasyprint.CSS(filename=css_path)])
-
         response = HttpResponse(pdf, content_type="application/pdf")
         response["Content-Disposition"] = (
             f'attachment; filename="aura_global_review_{student_user.username}_{latest_review.created_at.strftime("%Y%m%d")}.pdf"'
@@ -0,0 +1,65 @@
+"""
+Database connection helpers shared by the web process and the workers.
+
+With CONN_MAX_AGE > 0 (or the psycopg pool, see DB_POOL in settings.py) a
+connection outlives the request that opened it. Django recycles connections
+at request boundaries; long-running scripts have no requests, so they call
+close_stale_connections() between units of work instead.
+
+ConnectionTimingMiddleware measures how long each request waits for its
+database connection and reports it in a ``Server-Timing`` header and the
+``config.db_connections`` logger, which shows what persistent or pooled
+connections save on every page.
+"""
+
+import logging
+import time
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def close_stale_connections() -> None:
+    """
+    Close connections that are broken or older than CONN_MAX_AGE.
+
+    The worker-loop equivalent of the request_started/request_finished
+    handlers. Connections inside a transaction are left alone.
+    """
+    for conn in connections.all(initialized_only=True):
+        if not conn.in_atomic_block:
+            conn.close_if_unusable_or_obsolete()
+
+
+def acquire_connection(alias: str = "default") -> float:
+    """
+    Make sure ``alias`` has a healthy connection; return the seconds it took.
+
+    Reusing a persistent connection costs a health check at most, a new one
+    costs a full connect (or a checkout from the pool).
+    """
+    conn = connections[alias]
+    started = time.perf_counter()
+    conn.close_if_health_check_failed()
+    conn.ensure_connection()
+    return time.perf_counter() - started
+
+
+class ConnectionTimingMiddleware:
+    """
+    Acquire the default connection up front and report how long it took.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        acquire_ms = acquire_connection() * 1000
+        response = self.get_response(request)
+        timing = f"db-connect;dur={acquire_ms:.2f}"
+        if response.has_header("Server-Timing"):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response["Server-Timing"] = timing
+        logger.debug("DB connection acquired in %.2f ms for %s", acquire_ms, request.path)
+        return response
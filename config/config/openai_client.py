@@ -0,0 +1,107 @@
+"""
+Process-wide OpenAI client shared by AURA and SARA.
+
+Building an ``OpenAI`` client creates a new httpx connection pool, so every
+call that built its own client paid a fresh TCP/TLS handshake. The client is
+created lazily on first use, reused afterwards, and keeps idle connections
+alive between requests. Timeouts, pool size and retry policy come from the
+OPENAI_* settings. Tests can inject a client with ``set_openai_client``.
+"""
+
+import os
+import threading
+
+import httpx
+from django.conf import settings
+from openai import AsyncOpenAI, OpenAI
+
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def client_options() -> dict:
+    """
+    Keyword arguments shared by the sync and async OpenAI clients.
+    """
+    return {
+        "timeout": httpx.Timeout(
+            settings.OPENAI_TIMEOUT,
+            connect=settings.OPENAI_CONNECT_TIMEOUT,
+        ),
+        "max_retries": settings.OPENAI_MAX_RETRIES,
+    }
+
+
+def connection_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+    )
+
+
+def build_openai_client(api_key: str | None = None) -> OpenAI:
+    """
+    Create an OpenAI client with a keep-alive connection pool.
+    """
+    options = client_options()
+    return OpenAI(
+        api_key=api_key,
+        http_client=httpx.Client(timeout=options["timeout"], limits=connection_limits()),
+        **options,
+    )
+
+
+def build_async_openai_client(api_key: str | None = None, **overrides) -> AsyncOpenAI:
+    """
+    Create an AsyncOpenAI client with the same pool and timeouts as the shared client.
+
+    Async clients are bound to an event loop, so callers own their lifetime.
+    """
+    options = {**client_options(), **overrides}
+    return AsyncOpenAI(
+        api_key=api_key,
+        http_client=httpx.AsyncClient(timeout=options["timeout"], limits=connection_limits()),
+        **options,
+    )
+
+
+def get_openai_client() -> OpenAI:
+    """
+    Return the shared OpenAI client, creating it on first use.
+
+    A forked worker process builds its own client instead of reusing the
+    parent's sockets.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _lock:
+        if _client is None or _client_pid != pid:
+            _client = build_openai_client()
+            _client_pid = pid
+        return _client
+
+
+def set_openai_client(client):
+    """
+    Replace the shared client, e.g. with a fake in tests. Returns the previous one.
+    """
+    global _client, _client_pid
+    with _lock:
+        previous = _client
+        _client = client
+        _client_pid = os.getpid() if client is not None else None
+        return previous
+
+
+def reset_openai_client() -> None:
+    """
+    Close and drop the shared client; the next call builds a new one.
+    """
+    previous = set_openai_client(None)
+    if previous is not None and hasattr(previous, "close"):
+        previous.close()
@@ -0,0 +1,122 @@
+"""
+Process-wide WeasyPrint renderer shared by the FMS, SMS and AURA PDFs.
+
+Every PDF view used to locate its stylesheet and logo with the staticfiles
+finders, parse the CSS and load fonts again on each request. Stylesheets are
+now compiled once per process against a single ``FontConfiguration``, and
+logos are inlined as pre-encoded data URIs, so a render only lays out the
+HTML. Nothing is fetched over HTTP, which also avoids the proxy problems
+described in the FMS PDF templates.
+"""
+
+import base64
+import mimetypes
+import os
+import threading
+from pathlib import Path
+
+import weasyprint
+from django.conf import settings
+from django.contrib.staticfiles.finders import find
+from django.template.loader import render_to_string
+from weasyprint.text.fonts import FontConfiguration
+
+
+# Stylesheets compiled by warm_pdf_renderer() when a process starts.
+PDF_STYLESHEETS = (
+    "fms/pdf.css",
+    "sms/pdf_vhr.css",
+    "aura/aura_pdf_global_review.css",
+)
+
+_font_config = None
+_stylesheets = {}
+_logos = {}
+_owner_pid = None
+_lock = threading.Lock()
+
+
+def _check_process() -> None:
+    """
+    Drop state inherited from a parent process; fontconfig handles are not fork-safe.
+    """
+    global _font_config, _owner_pid
+    pid = os.getpid()
+    if _owner_pid != pid:
+        _font_config = None
+        _stylesheets.clear()
+        _logos.clear()
+        _owner_pid = pid
+
+
+def font_config() -> FontConfiguration:
+    """
+    Return the shared font configuration, creating it on first use.
+    """
+    global _font_config
+    with _lock:
+        _check_process()
+        if _font_config is None:
+            _font_config = FontConfiguration()
+        return _font_config
+
+
+def stylesheet(static_path: str):
+    """
+    Return the compiled stylesheet of a static CSS file, or None if it does not exist.
+    """
+    fonts = font_config()
+    with _lock:
+        if static_path not in _stylesheets:
+            css_path = find(static_path)
+            _stylesheets[static_path] = (
+                weasyprint.CSS(filename=css_path, font_config=fonts) if css_path else None
+            )
+        return _stylesheets[static_path]
+
+
+def logo_data_uri(static_path: str) -> str:
+    """
+    Return a static image as a base64 data URI, or an empty string if it does not exist.
+    """
+    with _lock:
+        _check_process()
+        if static_path not in _logos:
+            image_path = find(static_path)
+            if image_path:
+                mime_type = mimetypes.guess_type(image_path)[0] or "image/png"
+                encoded = base64.b64encode(Path(image_path).read_bytes()).decode("ascii")
+                _logos[static_path] = f"data:{mime_type};base64,{encoded}"
+            else:
+                _logos[static_path] = ""
+        return _logos[static_path]
+
+
+def render_pdf(template_name: str, context: dict, stylesheets=()) -> bytes:
+    """
+    Render a template to PDF bytes with the shared fonts and compiled stylesheets.
+    """
+    html_string = render_to_string(template_name, context)
+    html_doc = weasyprint.HTML(string=html_string, base_url=str(settings.BASE_DIR))
+    return html_doc.write_pdf(
+        stylesheets=[css for css in stylesheets if css is not None] or None,
+        font_config=font_config(),
+    )
+
+
+def warm_pdf_renderer(static_paths=PDF_STYLESHEETS) -> None:
+    """
+    Load fonts and compile stylesheets up front, e.g. when a worker starts.
+    """
+    for static_path in static_paths:
+        stylesheet(static_path)
+
+
+def reset_pdf_renderer() -> None:
+    """
+    Forget fonts, stylesheets and logos; the next render loads them again.
+    """
+    global _owner_pid
+    with _lock:
+        _owner_pid = None
+        _check_process()
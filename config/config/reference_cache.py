@@ -0,0 +1,212 @@
+"""
+Cache for near-static reference data shared by every app.
+
+Aircraft, simulators, the flight instructor roster, course types and the
+roles each user can activate are read on most pages but change rarely. They
+are cached in ``caches[REFERENCE_CACHE_ALIAS]`` (see CACHES in settings.py)
+under one group per kind of data:
+
+* every key includes its group's version token, so ``invalidate(group)``
+  drops the whole group by storing a new token; ``invalidate(group, key)``
+  drops a single entry;
+* the owning apps invalidate from ``post_save``/``post_delete`` receivers in
+  their ``signals.py``. Code that changes these rows with ``QuerySet.update``
+  must call ``invalidate`` itself;
+* reads inside a transaction bypass the cache, so a value that may still be
+  rolled back is never stored, and invalidation is repeated on commit so
+  other processes cannot re-cache the old rows meanwhile;
+* invalidation only reaches the processes that share the cache backend, so
+  user roles, which decide what a user may open, are not cached at all on a
+  per-process backend (LocMemCache); see is_shared_cache().
+
+Hits and misses are counted per group in the cache itself (approximately,
+the increments are not atomic on every backend); see reference_cache_stats()
+and the ``reference_cache_stats`` management command.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+
+AIRCRAFT = "aircraft"
+SIMULATORS = "simulators"
+INSTRUCTORS = "instructors"
+COURSE_TYPES = "course_types"
+ROLES = "roles"
+
+GROUPS = (AIRCRAFT, SIMULATORS, INSTRUCTORS, COURSE_TYPES, ROLES)
+# Authorization data is only cached where every process sees its invalidation.
+SHARED_ONLY_GROUPS = (ROLES,)
+
+_MISSING = object()
+
+
+def _cache():
+    return caches[settings.REFERENCE_CACHE_ALIAS]
+
+
+def is_shared_cache(cache) -> bool:
+    """
+    Return whether ``cache`` is shared by every process (not a per-process LocMemCache or DummyCache).
+    """
+    return not isinstance(cache, (LocMemCache, DummyCache))
+
+
+def _version(group: str) -> str:
+    version_key = f"ref:{group}:version"
+    version = _cache().get(version_key)
+    if version is None:
+        _cache().add(version_key, uuid.uuid4().hex, None)
+        version = _cache().get(version_key)
+    return version
+
+
+def _entry_key(group: str, key) -> str:
+    return f"ref:{group}:{_version(group)}:{key}"
+
+
+def _count(group: str, outcome: str) -> None:
+    stats_key = f"ref:stats:{group}:{outcome}"
+    try:
+        _cache().incr(stats_key)
+    except ValueError:
+        if not _cache().add(stats_key, 1, None):
+            _cache().incr(stats_key)
+
+
+def cached(group: str, key, loader):
+    """
+    Return the cached value of ``key`` in ``group``, calling ``loader()`` on a miss.
+
+    ``loader`` may return None; that result is cached too.
+    """
+    if connection.in_atomic_block:
+        return loader()
+    if group in SHARED_ONLY_GROUPS and not is_shared_cache(_cache()):
+        return loader()
+
+    entry_key = _entry_key(group, key)
+    value = _cache().get(entry_key, _MISSING)
+    if value is not _MISSING:
+        _count(group, "hits")
+        return value
+
+    _count(group, "misses")
+    value = loader()
+    _cache().set(entry_key, value, settings.REFERENCE_CACHE_TIMEOUT)
+    return value
+
+
+def _drop(group: str, key=None) -> None:
+    if key is None:
+        _cache().set(f"ref:{group}:version", uuid.uuid4().hex, None)
+    else:
+        _cache().delete(_entry_key(group, key))
+
+
+def invalidate(group: str, key=None) -> None:
+    """
+    Forget every entry of ``group``, or only ``key``, now and when the current transaction commits.
+    """
+    _drop(group, key)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _drop(group, key))
+
+
+def clear_reference_cache() -> None:
+    """
+    Forget every cached entry (hit and miss counters are kept).
+    """
+    for group in GROUPS:
+        _drop(group)
+
+
+def reference_cache_stats() -> dict:
+    """
+    Return ``{group: {"hits": int, "misses": int}}`` for every group.
+    """
+    keys = [f"ref:stats:{group}:{outcome}" for group in GROUPS for outcome in ("hits", "misses")]
+    values = _cache().get_many(keys)
+    return {
+        group: {
+            outcome: values.get(f"ref:stats:{group}:{outcome}", 0)
+            for outcome in ("hits", "misses")
+        }
+        for group in GROUPS
+    }
+
+
+def reset_reference_cache_stats() -> None:
+    """
+    Set every hit and miss counter back to zero.
+    """
+    _cache().delete_many([f"ref:stats:{group}:{outcome}" for group in GROUPS for outcome in ("hits", "misses")])
+
+
+# ============================================================================
+# LOOKUPS
+# ============================================================================
+
+def get_aircraft(registration: str):
+    """
+    Return the aircraft with ``registration``; raise Aircraft.DoesNotExist if there is none.
+    """
+    from fleet.models import Aircraft
+
+    aircraft = cached(
+        AIRCRAFT,
+        f"registration:{registration}",
+        lambda: Aircraft.objects.filter(registration=registration).first(),
+    )
+    if aircraft is None:
+        raise Aircraft.DoesNotExist(f"Aircraft {registration} does not exist.")
+    return aircraft
+
+
+def get_active_simulator(name: str):
+    """
+    Return the active simulator called ``name``, or None.
+    """
+    from fleet.models import Simulator
+
+    return cached(
+        SIMULATORS,
+        f"active:{name}",
+        lambda: Simulator.objects.filter(is_active=True, name=name).first(),
+    )
+
+
+def get_flight_instructors() -> list[dict]:
+    """
+    Return the active flight (VUELO or DUAL) instructors as id/username/first_name/last_name dicts.
+    """
+    from accounts.models import User
+
+    return cached(
+        INSTRUCTORS,
+        "flight",
+        lambda: list(
+            User.objects.filter(
+                role="INSTRUCTOR",
+                instructor_profile__instructor_type__in=["VUELO", "DUAL"],
+                is_active=True,
+            ).values("id", "username", "first_name", "last_name")
+        ),
+    )
+
+
+def get_course_type_codes() -> list[str]:
+    """
+    Return the codes of every course type, sorted.
+    """
+    from academic.models import CourseType
+
+    return cached(
+        COURSE_TYPES,
+        "codes",
+        lambda: list(CourseType.objects.order_by("code").values_list("code", flat=True)),
+    )
@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 import os
+import sys
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -60,6 +62,7 @@ INSTALLED_APPS = [
     'sms',
     'aura',
     'prod',
+    'notifications',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -69,6 +72,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.db_connections.ConnectionTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -103,7 +107,24 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Connections are persistent (DB_CONN_MAX_AGE seconds) and health checked
+# before reuse. DB_POOL=true switches to Django's native psycopg pool when
+# psycopg 3 and psycopg_pool are installed; Django requires CONN_MAX_AGE=0
+# with a pool. Workers call config.db_connections.close_stale_connections()
+# between jobs.
+DB_POOL = os.getenv("DB_POOL", "false").lower() == "true"
+
 if os.getenv("DB_ENGINE", "sqlite").lower() == "postgresql":
+    db_options = {}
+    db_conn_max_age = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+    if DB_POOL and find_spec("psycopg") and find_spec("psycopg_pool"):
+        db_options["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            "timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+        }
+        db_conn_max_age = 0
+
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.postgresql",
@@ -112,7 +133,9 @@ if os.getenv("DB_ENGINE", "sqlite").lower() == "postgresql":
             "PASSWORD": os.environ["DB_PASSWORD"],
             "HOST": os.environ["DB_HOST"],
             "PORT": os.environ["DB_PORT"],
-            "CONN_MAX_AGE": 0,
+            "CONN_MAX_AGE": db_conn_max_age,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": db_options,
         }
     }
 else:
@@ -124,6 +147,41 @@ else:
     }
 
 
+# Cache used by config/reference_cache.py (aircraft, simulators, instructor
+# roster, course types and user roles) and by the rendered flight period grids
+# of scheduler/grids.py. Entries are invalidated by the process that changes
+# the rows, so by default the cache lives in files shared by the web workers
+# and the worker scripts. CACHE_BACKEND=locmem keeps it per process, which is
+# only safe with a single process; user roles are then never cached. The test
+# suite always uses its own per-process cache, so it never reads or clears the
+# cache of the checkout it runs in; tests that need a shared cache point CACHES
+# at a temporary directory.
+TESTING = sys.argv[1:2] == ["test"]
+
+if os.getenv("CACHE_BACKEND", "file").lower() == "file" and not TESTING:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_DIR", str(BASE_DIR / "cache")),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "nav-default",
+        }
+    }
+
+REFERENCE_CACHE_ALIAS = "default"
+REFERENCE_CACHE_TIMEOUT = int(os.getenv("REFERENCE_CACHE_TIMEOUT", "3600"))
+
+# Rendered flight period grids of the student panel (scheduler/grids.py); they
+# are only cached when this alias is shared by every process.
+SCHEDULER_GRID_CACHE_ALIAS = "default"
+SCHEDULER_GRID_CACHE_TIMEOUT = int(os.getenv("SCHEDULER_GRID_CACHE_TIMEOUT", "600"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -220,6 +278,23 @@ EMAIL_HOST_USER = os.getenv('EMAIL_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_PASSWORD')
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Notification outbox (see notifications/outbox.py). Signals queue emails and
+# notifications/scripts/email_worker.py delivers them in batches.
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+# First retry delay; doubles on every failed attempt, capped at one hour.
+EMAIL_OUTBOX_RETRY_SECONDS = int(os.getenv('EMAIL_OUTBOX_RETRY_SECONDS', '60'))
+# Seconds a claimed email stays hidden from other dispatchers.
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.getenv('EMAIL_OUTBOX_LEASE_SECONDS', '300'))
+# Digest emails wait this long so a burst of notifications goes out as one email.
+EMAIL_DIGEST_WINDOW_SECONDS = int(os.getenv('EMAIL_DIGEST_WINDOW_SECONDS', '60'))
+EMAIL_OUTBOX_KEEP_DAYS = int(os.getenv('EMAIL_OUTBOX_KEEP_DAYS', '30'))
+
+# Student balance ledger (see transactions/ledger.py): a checkpoint is stored
+# every LEDGER_CHECKPOINT_INTERVAL entries per student, which bounds how many
+# entries a historical balance query has to add up.
+LEDGER_CHECKPOINT_INTERVAL = int(os.getenv('LEDGER_CHECKPOINT_INTERVAL', '50'))
+
 # WhatsApp contact number
 STAFF_WHATSAPP = os.getenv('STAFF_WHATSAPP', '')
 
@@ -292,5 +367,30 @@ if AURA_INCREMENTAL_GLOBAL_REVIEW_PROMPT_PATH:
 else:
     raise RuntimeError("AURA_INCREMENTAL_GLOBAL_REVIEW_PROMPT_PATH is not set in the .env file")
 
+# AURA asyncio worker
+AURA_WORKER_CONCURRENCY = int(os.getenv('AURA_WORKER_CONCURRENCY', '4'))
+AURA_WORKER_REQUESTS_PER_MINUTE = float(os.getenv('AURA_WORKER_REQUESTS_PER_MINUTE', '20'))
+AURA_WORKER_MAX_RETRIES = int(os.getenv('AURA_WORKER_MAX_RETRIES', '5'))
+
+# AURA job queue: seconds a claimed session stays hidden from other workers,
+# and how many claims a session gets before it is marked as failed
+AURA_JOB_VISIBILITY_TIMEOUT = int(os.getenv('AURA_JOB_VISIBILITY_TIMEOUT', '900'))
+AURA_JOB_MAX_ATTEMPTS = int(os.getenv('AURA_JOB_MAX_ATTEMPTS', '3'))
+
+# Shared OpenAI client (config/openai_client.py); timeouts in seconds
+OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '300'))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '10'))
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '2'))
+OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '10'))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', '60'))
+
+# FMS evaluation PDFs: cache directory, seconds a queued PDF waits for the
+# worker before the polling request renders it, and seconds before a stuck
+# render may be retried
+FMS_PDF_CACHE_DIR = os.getenv('FMS_PDF_CACHE_DIR', str(BASE_DIR / 'pdf_cache'))
+FMS_PDF_INLINE_AFTER_SECONDS = int(os.getenv('FMS_PDF_INLINE_AFTER_SECONDS', '15'))
+FMS_PDF_RENDER_TIMEOUT = int(os.getenv('FMS_PDF_RENDER_TIMEOUT', '120'))
+FMS_PDF_CACHE_MAX_AGE_DAYS = int(os.getenv('FMS_PDF_CACHE_MAX_AGE_DAYS', '30'))
+
 # Google Analytics ID
 GOOGLE_ANALYTICS_ID = os.getenv('GOOGLE_ANALYTICS_ID')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from config.reference_cache import clear_reference_cache, reference_cache_stats, reset_reference_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show the hit and miss counters of the reference data cache (meaningful with CACHE_BACKEND=file).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Set the counters back to zero after printing them.',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Forget every cached entry.',
+        )
+
+    def handle(self, *args, **options):
+        for group, counts in reference_cache_stats().items():
+            lookups = counts['hits'] + counts['misses']
+            hit_rate = f'{100 * counts["hits"] / lookups:.1f}%' if lookups else '-'
+            self.stdout.write(f'{group}: hits={counts["hits"]} misses={counts["misses"]} hit_rate={hit_rate}')
+
+        if options['reset']:
+            reset_reference_cache_stats()
+            self.stdout.write('Counters reset.')
+        if options['clear']:
+            clear_reference_cache()
+            self.stdout.write('Cache cleared.')
@@ -1,6 +1,25 @@
-from django.test import RequestFactory, TestCase
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
 
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from academic.models import CourseType
 from accounts.models import InstructorProfile, StaffProfile, StudentProfile, User
+from accounts.role_utils import get_available_roles
+from config.db_connections import close_stale_connections
+from config.reference_cache import (
+    get_aircraft,
+    get_course_type_codes,
+    get_flight_instructors,
+    reference_cache_stats,
+    reset_reference_cache_stats,
+)
+from fleet.models import Aircraft
 from dashboard.views import _build_launchpad_apps
 
 
@@ -56,3 +75,154 @@ class AuraLaunchpadVisibilityTests(TestCase):
         )
 
         self.assertFalse(self.aura_is_visible(user, "STUDENT", profile))
+
+
+class DatabaseConnectionTimingTests(TestCase):
+    def test_dashboard_reports_connection_acquire_time(self):
+        user = User.objects.create_user(
+            username="timing",
+            email="timing@example.com",
+            national_id=1000005,
+            password="test-password",
+            role=User.Role.STAFF,
+        )
+        StaffProfile.objects.create(user=user)
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("dashboard:dashboard"))
+
+        self.assertRegex(response["Server-Timing"], r"^db-connect;dur=\d+\.\d{2}$")
+
+
+class CloseStaleConnectionsTests(SimpleTestCase):
+    def test_only_connections_outside_a_transaction_are_recycled(self):
+        idle = mock.Mock(in_atomic_block=False)
+        busy = mock.Mock(in_atomic_block=True)
+
+        with mock.patch("config.db_connections.connections.all", return_value=[idle, busy]) as all_connections:
+            close_stale_connections()
+
+        all_connections.assert_called_once_with(initialized_only=True)
+        idle.close_if_unusable_or_obsolete.assert_called_once_with()
+        busy.close_if_unusable_or_obsolete.assert_not_called()
+
+    def test_expired_connection_is_closed(self):
+        with mock.patch.object(connection, "in_atomic_block", False), \
+                mock.patch.object(connection, "connection", object()), \
+                mock.patch.object(connection, "close_at", 0), \
+                mock.patch.object(connection, "get_autocommit", return_value=True), \
+                mock.patch.object(connection, "close") as close:
+            close_stale_connections()
+
+        close.assert_called_once_with()
+
+
+class ReferenceCacheTests(TransactionTestCase):
+    # The cache is bypassed inside transactions, so these tests run in autocommit mode.
+
+    def setUp(self):
+        # Invalidation must reach other processes, so roles are only cached in a shared (file) cache.
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": cache_dir},
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_reference_cache_stats()
+
+    def create_user(self, username, role, national_id):
+        return User.objects.create_user(
+            username=username,
+            email=f"{username}@example.com",
+            national_id=national_id,
+            password="test-password",
+            role=role,
+        )
+
+    def create_aircraft(self, registration, **fields):
+        return Aircraft.objects.create(
+            manufacturer="Cessna",
+            model="172",
+            registration=registration,
+            serial_number=f"SN-{registration}",
+            year_manufactured=2001,
+            **fields,
+        )
+
+    def test_roles_are_cached_until_a_profile_is_added(self):
+        user = self.create_user("roles", User.Role.STUDENT, 2000001)
+        StudentProfile.objects.create(user=user, student_age=20)
+
+        self.assertEqual(get_available_roles(User.objects.get(pk=user.pk)), ["STUDENT"])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_available_roles(User(pk=user.pk)), ["STUDENT"])
+
+        StaffProfile.objects.create(user=user)
+
+        self.assertEqual(get_available_roles(User.objects.get(pk=user.pk)), ["STUDENT", "STAFF"])
+        self.assertEqual(reference_cache_stats()["roles"], {"hits": 1, "misses": 2})
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_roles_are_not_cached_in_a_per_process_cache(self):
+        user = self.create_user("local-roles", User.Role.STUDENT, 2000002)
+        StudentProfile.objects.create(user=user, student_age=20)
+
+        self.assertEqual(get_available_roles(User.objects.get(pk=user.pk)), ["STUDENT"])
+        with self.assertNumQueries(3):
+            self.assertEqual(get_available_roles(User(pk=user.pk)), ["STUDENT"])
+
+    def test_aircraft_lookups_follow_saves_and_deletes(self):
+        aircraft = self.create_aircraft("YV900E", hourly_rate=100)
+
+        self.assertEqual(get_aircraft("YV900E").hourly_rate, 100)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_aircraft("YV900E").pk, aircraft.pk)
+
+        aircraft.hourly_rate = 150
+        aircraft.save()
+        self.assertEqual(get_aircraft("YV900E").hourly_rate, 150)
+
+        aircraft.delete()
+        with self.assertRaises(Aircraft.DoesNotExist):
+            get_aircraft("YV900E")
+        self.assertEqual(reference_cache_stats()["aircraft"], {"hits": 1, "misses": 3})
+
+    def test_instructor_roster_and_course_types_are_invalidated(self):
+        roster = get_flight_instructors()
+        codes = get_course_type_codes()
+
+        instructor = self.create_user("flight", User.Role.INSTRUCTOR, 2000002)
+        InstructorProfile.objects.create(user=instructor, instructor_type="VUELO")
+        CourseType.objects.create(code="XX", name="Curso de prueba")
+
+        self.assertEqual([row["id"] for row in get_flight_instructors()], [row["id"] for row in roster] + [instructor.pk])
+        self.assertEqual(get_course_type_codes(), sorted(codes + ["XX"]))
+
+        # Logging in only updates last_login and keeps the roster cached.
+        instructor.last_login = instructor.date_joined
+        instructor.save(update_fields=["last_login"])
+        with self.assertNumQueries(0):
+            get_flight_instructors()
+
+    def test_reads_inside_a_transaction_are_not_cached(self):
+        with transaction.atomic():
+            self.create_aircraft("YV901E")
+            get_aircraft("YV901E")
+            transaction.set_rollback(True)
+
+        with self.assertRaises(Aircraft.DoesNotExist):
+            get_aircraft("YV901E")
+        self.assertEqual(reference_cache_stats()["aircraft"], {"hits": 0, "misses": 1})
+
+    def test_stats_command_reports_hit_rate(self):
+        self.create_aircraft("YV900E")
+        get_aircraft("YV900E")
+        get_aircraft("YV900E")
+        out = StringIO()
+
+        call_command("reference_cache_stats", "--reset", stdout=out)
+
+        self.assertIn("aircraft: hits=1 misses=1 hit_rate=50.0%", out.getvalue())
+        self.assertIn("roles: hits=0 misses=0 hit_rate=-", out.getvalue())
+        self.assertEqual(reference_cache_stats()["aircraft"], {"hits": 0, "misses": 0})
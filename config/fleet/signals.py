@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.reference_cache import AIRCRAFT, SIMULATORS, invalidate
+from .models import Aircraft, Simulator
+
+
+@receiver([post_save, post_delete], sender=Aircraft)
+def invalidate_cached_aircraft(sender, instance, **kwargs):
+    """Drop cached aircraft lookups when an aircraft changes."""
+    invalidate(AIRCRAFT)
+
+
+@receiver([post_save, post_delete], sender=Simulator)
+def invalidate_cached_simulators(sender, instance, **kwargs):
+    """Drop cached simulator lookups when a simulator changes."""
+    invalidate(SIMULATORS)
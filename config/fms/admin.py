@@ -4,6 +4,7 @@ from django.db import transaction
 from django.shortcuts import redirect
 from accounts.models import StudentProfile
 from fleet.models import Aircraft
+from transactions import balances
 from .models import SimEvaluation, FlightEvaluation0_100, FlightEvaluation100_120, FlightEvaluation120_170, ExternalFlightEvaluation, FlightReport, DiscrepancyReport
 
 
@@ -100,13 +101,20 @@ class FlightEvaluationCorrectionAdminMixin:
         obj.session_flight_hours = new_hours
         super().save_model(request, obj, form, change)
 
-        student.flight_hours = new_student_hours
-        student.nav_flight_hours = new_nav_hours
-        student.balance += old_charge - new_charge
-        student.save(update_fields=['flight_hours', 'nav_flight_hours', 'balance'])
-
-        aircraft.total_hours = new_aircraft_hours
-        aircraft.save(update_fields=['total_hours'])
+        balances.adjust_student(
+            student,
+            reason=balances.FLIGHT_EVALUATION_CORRECTED,
+            reference=balances.reference_to(obj),
+            flight_hours=hours_difference,
+            nav_flight_hours=hours_difference,
+            balance=old_charge - new_charge,
+        )
+        balances.adjust_aircraft_hours(
+            aircraft,
+            hours_difference,
+            reason=balances.FLIGHT_EVALUATION_CORRECTED,
+            reference=balances.reference_to(obj),
+        )
 
 @admin.register(SimEvaluation)
 class SimEvaluationAdmin(admin.ModelAdmin):
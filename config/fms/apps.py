@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FmsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'fms'
+
+    def ready(self):
+        import fms.signals  # noqa: F401
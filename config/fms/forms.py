@@ -3,15 +3,14 @@ from django.db import transaction
 from .models import FlightEvaluation0_100, FlightEvaluation100_120, FlightEvaluation120_170, ExternalFlightEvaluation, SimEvaluation, FlightReport, DiscrepancyReport
 from accounts.models import StudentProfile
 from fleet.models import Simulator, Aircraft
+from config.reference_cache import get_active_simulator, get_course_type_codes
+from transactions import balances
+from constants import COURSE_NA
 
 
 def build_course_type_field(field, include_empty=False, current_value=None):
     """Build a course field backed by the course types managed in Academic."""
-    from academic.models import CourseType
-
-    course_codes = CourseType.objects.order_by('code').values_list(
-        'code', flat=True
-    )
+    course_codes = get_course_type_codes()
     choices = [(code, code) for code in course_codes]
     known_codes = {code for code, _label in choices}
 
@@ -325,7 +324,7 @@ class SimEvaluationForm(forms.ModelForm):
         # Set default simulator to FPT if no initial value is provided
         if not self.initial.get('simulator'):
             try:
-                default_simulator = Simulator.objects.filter(is_active=True, name='FPT').first()
+                default_simulator = get_active_simulator('FPT')
                 if default_simulator:
                     self.initial['simulator'] = default_simulator
             except:
@@ -351,16 +350,24 @@ class SimEvaluationForm(forms.ModelForm):
             session_sim_hours = self.cleaned_data.get('session_sim_hours')
             
             if student_id and session_sim_hours:
-                student_profile = StudentProfile.objects.get(user__national_id=student_id)
-                student_profile.sim_hours += session_sim_hours
-                student_profile.save()
+                student_profile = StudentProfile.objects.only('pk').get(user__national_id=student_id)
+                balances.adjust_student(
+                    student_profile,
+                    reason=balances.SIM_EVALUATION,
+                    reference=balances.reference_to(instance),
+                    sim_hours=session_sim_hours,
+                )
 
                 # Get the simulator object directly from cleaned_data (it's already a Simulator instance)
                 sim = self.cleaned_data.get('simulator')
 
                 # Add session hours to simulator's total hours
-                sim.total_hours += session_sim_hours
-                sim.save()
+                balances.adjust_simulator_hours(
+                    sim,
+                    session_sim_hours,
+                    reason=balances.SIM_EVALUATION,
+                    reference=balances.reference_to(instance),
+                )
 
         return instance
 
@@ -654,20 +661,27 @@ class FlightEvaluation0_100Form(forms.ModelForm):
             
             if aircraft:
                 if student_id and session_flight_hours:
-                    student_profile = StudentProfile.objects.get(user__national_id=student_id)
+                    student_profile = StudentProfile.objects.only('pk').get(user__national_id=student_id)
                     # Update student's accumulated flight hours and flight balance
-                    student_profile.flight_hours += session_flight_hours
-                    student_profile.nav_flight_hours += session_flight_hours
-
-                    student_profile.balance -= round(
-                        session_flight_hours * instance.hourly_rate_applied
-                        + instance.fuel_rate_applied * fuel_consumed,
-                        2,
+                    balances.adjust_student(
+                        student_profile,
+                        reason=balances.FLIGHT_EVALUATION,
+                        reference=balances.reference_to(instance),
+                        flight_hours=session_flight_hours,
+                        nav_flight_hours=session_flight_hours,
+                        balance=-round(
+                            session_flight_hours * instance.hourly_rate_applied
+                            + instance.fuel_rate_applied * fuel_consumed,
+                            2,
+                        ),
                     )
-                    student_profile.save()
                     # Update aircraft's total hours
-                    aircraft.total_hours += session_flight_hours
-                    aircraft.save()
+                    balances.adjust_aircraft_hours(
+                        aircraft,
+                        session_flight_hours,
+                        reason=balances.FLIGHT_EVALUATION,
+                        reference=balances.reference_to(instance),
+                    )
 
                 # Create discrepancy report if description is provided
                 discrepancy_description = self.cleaned_data.get('discrepancy_description')
@@ -991,20 +1005,27 @@ class FlightEvaluation100_120Form(forms.ModelForm):
 
             if aircraft:
                 if student_id and session_flight_hours:
-                    student_profile = StudentProfile.objects.get(user__national_id=student_id)
+                    student_profile = StudentProfile.objects.only('pk').get(user__national_id=student_id)
                     # Update student's accumulated flight hours and flight balance
-                    student_profile.flight_hours += session_flight_hours
-                    student_profile.nav_flight_hours += session_flight_hours
-
-                    student_profile.balance -= round(
-                        session_flight_hours * instance.hourly_rate_applied
-                        + instance.fuel_rate_applied * fuel_consumed,
-                        2,
+                    balances.adjust_student(
+                        student_profile,
+                        reason=balances.FLIGHT_EVALUATION,
+                        reference=balances.reference_to(instance),
+                        flight_hours=session_flight_hours,
+                        nav_flight_hours=session_flight_hours,
+                        balance=-round(
+                            session_flight_hours * instance.hourly_rate_applied
+                            + instance.fuel_rate_applied * fuel_consumed,
+                            2,
+                        ),
                     )
-                    student_profile.save()
                     # Update aircraft's total hours
-                    aircraft.total_hours += session_flight_hours
-                    aircraft.save()
+                    balances.adjust_aircraft_hours(
+                        aircraft,
+                        session_flight_hours,
+                        reason=balances.FLIGHT_EVALUATION,
+                        reference=balances.reference_to(instance),
+                    )
 
                 # Create discrepancy report if description is provided
                 discrepancy_description = self.cleaned_data.get('discrepancy_description')
@@ -1344,20 +1365,27 @@ class FlightEvaluation120_170Form(forms.ModelForm):
 
             if aircraft:
                 if student_id and session_flight_hours:
-                    student_profile = StudentProfile.objects.get(user__national_id=student_id)
+                    student_profile = StudentProfile.objects.only('pk').get(user__national_id=student_id)
                     # Update student's accumulated flight hours and flight balance
-                    student_profile.flight_hours += session_flight_hours
-                    student_profile.nav_flight_hours += session_flight_hours
-
-                    student_profile.balance -= round(
-                        session_flight_hours * instance.hourly_rate_applied
-                        + instance.fuel_rate_applied * fuel_consumed,
-                        2,
+                    balances.adjust_student(
+                        student_profile,
+                        reason=balances.FLIGHT_EVALUATION,
+                        reference=balances.reference_to(instance),
+                        flight_hours=session_flight_hours,
+                        nav_flight_hours=session_flight_hours,
+                        balance=-round(
+                            session_flight_hours * instance.hourly_rate_applied
+                            + instance.fuel_rate_applied * fuel_consumed,
+                            2,
+                        ),
                     )
-                    student_profile.save()
                     # Update aircraft's total hours
-                    aircraft.total_hours += session_flight_hours
-                    aircraft.save()
+                    balances.adjust_aircraft_hours(
+                        aircraft,
+                        session_flight_hours,
+                        reason=balances.FLIGHT_EVALUATION,
+                        reference=balances.reference_to(instance),
+                    )
 
                  # Create discrepancy report if description is provided
                 discrepancy_description = self.cleaned_data.get('discrepancy_description')
@@ -1641,8 +1669,12 @@ class FlightReportForm(forms.ModelForm):
 
             if flight_hours and aircraft:
                 # Update aircraft's total hours
-                aircraft.total_hours += flight_hours
-                aircraft.save()
+                balances.adjust_aircraft_hours(
+                    aircraft,
+                    flight_hours,
+                    reason=balances.FLIGHT_REPORT,
+                    reference=balances.reference_to(instance),
+                )
 
                 # Create discrepancy report if description is provided
                 discrepancy_description = self.cleaned_data.get('discrepancy_description')
@@ -1698,3 +1730,54 @@ class FlightReportForm(forms.ModelForm):
             )        
     
         return cleaned_data
+
+
+class StudentListFilterForm(forms.Form):
+    """GET search, filters and sort order of the student list; every field is optional."""
+
+    SORT_CHOICES = [
+        ('name', 'Nombre'),
+        ('id', 'ID'),
+        ('course', 'Curso'),
+        ('-balance', 'Mayor balance'),
+        ('balance', 'Menor balance'),
+        ('-flight_hours', 'Más horas de vuelo'),
+    ]
+
+    q = forms.CharField(
+        required=False,
+        max_length=100,
+        widget=forms.TextInput(attrs={
+            'id': 'student-search-input',
+            'class': 'student-search-input',
+            'placeholder': 'Nombre, usuario o ID',
+            'autocomplete': 'off',
+        }),
+    )
+    phase = forms.ChoiceField(
+        required=False,
+        choices=[('', 'Todas las fases'), *StudentProfile.STUDENT_PHASE],
+        widget=forms.Select(attrs={'class': 'student-filter-select'}),
+    )
+    license = forms.ChoiceField(
+        required=False,
+        choices=[('', 'Todas las licencias'), *StudentProfile.LICENSE_TYPES],
+        widget=forms.Select(attrs={'class': 'student-filter-select'}),
+    )
+    course = forms.ChoiceField(
+        required=False,
+        widget=forms.Select(attrs={'class': 'student-filter-select'}),
+    )
+    sort = forms.ChoiceField(
+        required=False,
+        choices=SORT_CHOICES,
+        widget=forms.Select(attrs={'class': 'student-filter-select'}),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['course'].choices = [
+            ('', 'Todos los cursos'),
+            (COURSE_NA, 'No inscrito'),
+            *((code, code) for code in get_course_type_codes()),
+        ]
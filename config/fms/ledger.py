@@ -0,0 +1,239 @@
+import base64
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import (
+    ExternalFlightEvaluation,
+    FlightEvaluation0_100,
+    FlightEvaluation100_120,
+    FlightEvaluation120_170,
+    FlightReport,
+    SessionLedgerEntry,
+    SimEvaluation,
+)
+from .rollups import apply_daily_change, rebuild_daily_rollups
+from .stats import apply_ledger_change, rebuild_flight_stats
+
+
+SOURCE_MODELS = {
+    SessionLedgerEntry.SOURCE_SIM: SimEvaluation,
+    SessionLedgerEntry.SOURCE_0_100: FlightEvaluation0_100,
+    SessionLedgerEntry.SOURCE_100_120: FlightEvaluation100_120,
+    SessionLedgerEntry.SOURCE_120_170: FlightEvaluation120_170,
+    SessionLedgerEntry.SOURCE_EXTERNAL: ExternalFlightEvaluation,
+    SessionLedgerEntry.SOURCE_REPORT: FlightReport,
+}
+SOURCE_KEYS = {model: key for key, model in SOURCE_MODELS.items()}
+
+# Sources shown as separate columns in the flight log pages.
+LOG_SOURCES = (
+    SessionLedgerEntry.SOURCE_0_100,
+    SessionLedgerEntry.SOURCE_100_120,
+    SessionLedgerEntry.SOURCE_120_170,
+    SessionLedgerEntry.SOURCE_SIM,
+)
+
+
+def source_key(instance):
+    """Return the ledger ``source_model`` key for an evaluation or report."""
+    return SOURCE_KEYS[type(instance)]
+
+
+def entry_values(instance):
+    """Return the ledger columns for one evaluation or flight report."""
+    key = source_key(instance)
+
+    if key == SessionLedgerEntry.SOURCE_REPORT:
+        return {
+            'session_date': instance.flight_date,
+            'aircraft_id': instance.aircraft_id,
+            'aircraft_registration': instance.aircraft.registration,
+            'hours': instance.flight_hours,
+            'fuel_consumed': instance.fuel_consumed,
+            'fuel_rate_applied': instance.fuel_rate_applied,
+        }
+
+    values = {
+        'session_date': instance.session_date,
+        'student_id': instance.student_id,
+        'student_first_name': instance.student_first_name,
+        'student_last_name': instance.student_last_name,
+        'instructor_id': instance.instructor_id,
+        'instructor_first_name': instance.instructor_first_name,
+        'instructor_last_name': instance.instructor_last_name,
+        'session_number': instance.session_number,
+        'session_letter': instance.session_letter,
+        'session_grade': instance.session_grade,
+    }
+
+    if key == SessionLedgerEntry.SOURCE_SIM:
+        values.update({
+            'simulator_id': instance.simulator_id,
+            'hours': instance.session_sim_hours,
+            'resource_rate_applied': instance.simulator_rate_applied,
+            'instructor_rate_applied': instance.instructor_rate_applied,
+        })
+    elif key == SessionLedgerEntry.SOURCE_EXTERNAL:
+        values.update({
+            'aircraft_registration': instance.aircraft_registration,
+            'hours': instance.session_flight_hours,
+            'fuel_consumed': instance.fuel_consumed,
+            'fuel_rate_applied': instance.fuel_rate_applied,
+        })
+    else:
+        values.update({
+            'aircraft_id': instance.aircraft_id,
+            'aircraft_registration': instance.aircraft.registration,
+            'hours': instance.session_flight_hours,
+            'fuel_consumed': instance.fuel_consumed,
+            'hourly_rate_applied': instance.hourly_rate_applied,
+            'resource_rate_applied': instance.aircraft_rate_applied,
+            'instructor_rate_applied': instance.instructor_rate_applied,
+            'fuel_rate_applied': instance.fuel_rate_applied,
+        })
+    return values
+
+
+def record_session(instance):
+    """
+    Create or refresh the ledger row of a saved evaluation or report.
+
+    The previous row is read with a row lock, so concurrent saves of the
+    same evaluation apply their rollup deltas one after the other.
+    """
+    key = source_key(instance)
+    values = entry_values(instance)
+    with transaction.atomic():
+        rows = SessionLedgerEntry.objects.select_for_update().filter(source_model=key, source_id=instance.pk)
+        previous = rows.first()
+        if previous is None:
+            try:
+                with transaction.atomic():
+                    entry = SessionLedgerEntry.objects.create(source_model=key, source_id=instance.pk, **values)
+            except IntegrityError:
+                # Created concurrently: wait for that row and update it instead.
+                previous = rows.get()
+        if previous is not None:
+            entry, _created = SessionLedgerEntry.objects.update_or_create(
+                source_model=key,
+                source_id=instance.pk,
+                defaults=values,
+            )
+        apply_ledger_change(previous, entry)
+        apply_daily_change(previous, entry)
+    return entry
+
+
+def forget_session(instance):
+    """Delete the ledger row of an evaluation or report."""
+    with transaction.atomic():
+        previous = SessionLedgerEntry.objects.select_for_update().filter(
+            source_model=source_key(instance),
+            source_id=instance.pk,
+        ).first()
+        if previous is not None:
+            previous.delete()
+            apply_ledger_change(previous, None)
+            apply_daily_change(previous, None)
+
+
+def rebuild_session_ledger(batch_size=500):
+    """Rebuild every ledger row, the flight statistics and the daily production rollup; return the row count."""
+    total = 0
+    with transaction.atomic():
+        SessionLedgerEntry.objects.all().delete()
+        for key, model in SOURCE_MODELS.items():
+            queryset = model.objects.order_by('pk')
+            if key not in (SessionLedgerEntry.SOURCE_SIM, SessionLedgerEntry.SOURCE_EXTERNAL):
+                queryset = queryset.select_related('aircraft')
+
+            batch = []
+            for instance in queryset.iterator(chunk_size=batch_size):
+                batch.append(SessionLedgerEntry(
+                    source_model=key,
+                    source_id=instance.pk,
+                    **entry_values(instance),
+                ))
+                if len(batch) >= batch_size:
+                    SessionLedgerEntry.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                SessionLedgerEntry.objects.bulk_create(batch)
+                total += len(batch)
+        rebuild_flight_stats()
+        rebuild_daily_rollups(batch_size=batch_size)
+    return total
+
+
+def latest_sessions_queryset(limit, sources=LOG_SOURCES, **filters):
+    """Return ledger rows ranked per source, keeping the newest ``limit`` of each."""
+    return (
+        SessionLedgerEntry.objects.filter(source_model__in=sources, **filters)
+        .select_related('simulator')
+        .annotate(
+            source_rank=Window(
+                expression=RowNumber(),
+                partition_by=F('source_model'),
+                order_by=(F('session_date').desc(), F('source_id').desc()),
+            )
+        )
+        .filter(source_rank__lte=limit)
+        .order_by('source_model', '-session_date', '-source_id')
+    )
+
+
+def latest_sessions_by_source(limit, sources=LOG_SOURCES, **filters):
+    """
+    Return the newest ``limit`` ledger rows of each source in a single query.
+
+    The result maps every requested source key to a list of rows ordered by
+    most recent session first. ``filters`` are applied to the ledger (for
+    example ``student_id=...`` or ``instructor_id=...``).
+    """
+    grouped = {source: [] for source in sources}
+    for row in latest_sessions_queryset(limit, sources, **filters):
+        grouped[row.source_model].append(row)
+    return grouped
+
+
+def encode_cursor(entry):
+    """Return the opaque keyset cursor pointing just after ``entry``."""
+    raw = f'{entry.session_date.isoformat()}|{entry.source_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the ``(session_date, source_id)`` pair of a cursor; raise ValueError if malformed."""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    raw_date, raw_id = base64.urlsafe_b64decode(padded).decode().split('|')
+    return date.fromisoformat(raw_date), int(raw_id)
+
+
+def after_cursor(queryset, session_date, source_id):
+    """Filter ledger rows to those older than ``(session_date, source_id)``."""
+    # The redundant ``session_date <=`` bound lets the database seek the index.
+    return queryset.filter(
+        Q(session_date__lt=session_date) | Q(source_id__lt=source_id),
+        session_date__lte=session_date,
+    )
+
+
+def sessions_page(queryset, cursor=None, limit=20):
+    """
+    Return one keyset page of ledger rows and the cursor of the next page.
+
+    ``queryset`` must be ordered by ``-session_date, -source_id``, so every
+    page is an index seek that costs the same regardless of depth. The next
+    cursor is ``None`` when no rows remain.
+    """
+    if cursor:
+        queryset = after_cursor(queryset, *decode_cursor(cursor))
+    rows = list(queryset[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from fms.query_plans import explain_query_shapes
+
+
+class Command(BaseCommand):
+    help = 'Run the FMS query shapes through EXPLAIN and flag sequential scans.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--show-plans',
+            action='store_true',
+            help='Print the full EXPLAIN output of every query.',
+        )
+        parser.add_argument(
+            '--fail-on-seq-scan',
+            action='store_true',
+            help='Exit with an error when any query needs a sequential scan.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            results = explain_query_shapes()
+        except NotImplementedError as exc:
+            raise CommandError(str(exc)) from exc
+
+        flagged = 0
+        for result in results:
+            if result.sequential_scans:
+                flagged += 1
+                tables = ', '.join(result.sequential_scans)
+                self.stdout.write(self.style.WARNING(f'SEQ SCAN  {result.name} ({tables})'))
+            else:
+                self.stdout.write(f'OK        {result.name}')
+            if options['show_plans']:
+                self.stdout.write(f'{result.plan}\n')
+
+        self.stdout.write(f'Queries checked: {len(results)}, sequential scans: {flagged}')
+        if flagged and options['fail_on_seq_scan']:
+            raise CommandError(f'{flagged} query shape(s) need a sequential scan.')
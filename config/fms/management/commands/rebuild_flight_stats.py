@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from fms.stats import rebuild_flight_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-student, per-instructor and per-aircraft flight statistics from the session ledger.'
+
+    def handle(self, *args, **options):
+        total = rebuild_flight_stats()
+        self.stdout.write(f'Flight statistics rows: {total}')
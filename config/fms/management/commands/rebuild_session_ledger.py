@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from fms.ledger import rebuild_session_ledger
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the FMS session ledger from every evaluation and flight report.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows read and inserted per batch (default: 500).',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer.')
+
+        total = rebuild_session_ledger(batch_size=batch_size)
+        self.stdout.write(f'Session ledger rows: {total}')
@@ -0,0 +1,134 @@
+# Generated by Django 5.2.3 on 2026-10-18 03:14
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+TRAINING_FLIGHT_MODELS = (
+    ('0_100', 'FlightEvaluation0_100'),
+    ('100_120', 'FlightEvaluation100_120'),
+    ('120_170', 'FlightEvaluation120_170'),
+)
+
+
+def _people_values(evaluation):
+    return {
+        'session_date': evaluation.session_date,
+        'student_id': evaluation.student_id,
+        'student_first_name': evaluation.student_first_name,
+        'student_last_name': evaluation.student_last_name,
+        'instructor_id': evaluation.instructor_id,
+        'instructor_first_name': evaluation.instructor_first_name,
+        'instructor_last_name': evaluation.instructor_last_name,
+        'session_number': evaluation.session_number,
+        'session_letter': evaluation.session_letter,
+        'session_grade': evaluation.session_grade,
+    }
+
+
+def backfill_session_ledger(apps, schema_editor):
+    SessionLedgerEntry = apps.get_model('fms', 'SessionLedgerEntry')
+    entries = []
+
+    for source_model, model_name in TRAINING_FLIGHT_MODELS:
+        model = apps.get_model('fms', model_name)
+        for evaluation in model.objects.select_related('aircraft').iterator():
+            entries.append(SessionLedgerEntry(
+                source_model=source_model,
+                source_id=evaluation.pk,
+                aircraft_id=evaluation.aircraft_id,
+                aircraft_registration=evaluation.aircraft.registration,
+                hours=evaluation.session_flight_hours,
+                fuel_consumed=evaluation.fuel_consumed,
+                hourly_rate_applied=evaluation.hourly_rate_applied,
+                resource_rate_applied=evaluation.aircraft_rate_applied,
+                instructor_rate_applied=evaluation.instructor_rate_applied,
+                fuel_rate_applied=evaluation.fuel_rate_applied,
+                **_people_values(evaluation),
+            ))
+
+    SimEvaluation = apps.get_model('fms', 'SimEvaluation')
+    for evaluation in SimEvaluation.objects.iterator():
+        entries.append(SessionLedgerEntry(
+            source_model='sim',
+            source_id=evaluation.pk,
+            simulator_id=evaluation.simulator_id,
+            hours=evaluation.session_sim_hours,
+            resource_rate_applied=evaluation.simulator_rate_applied,
+            instructor_rate_applied=evaluation.instructor_rate_applied,
+            **_people_values(evaluation),
+        ))
+
+    ExternalFlightEvaluation = apps.get_model('fms', 'ExternalFlightEvaluation')
+    for evaluation in ExternalFlightEvaluation.objects.iterator():
+        entries.append(SessionLedgerEntry(
+            source_model='external',
+            source_id=evaluation.pk,
+            aircraft_registration=evaluation.aircraft_registration,
+            hours=evaluation.session_flight_hours,
+            fuel_consumed=evaluation.fuel_consumed,
+            fuel_rate_applied=evaluation.fuel_rate_applied,
+            **_people_values(evaluation),
+        ))
+
+    FlightReport = apps.get_model('fms', 'FlightReport')
+    for report in FlightReport.objects.select_related('aircraft').iterator():
+        entries.append(SessionLedgerEntry(
+            source_model='report',
+            source_id=report.pk,
+            session_date=report.flight_date,
+            aircraft_id=report.aircraft_id,
+            aircraft_registration=report.aircraft.registration,
+            hours=report.flight_hours,
+            fuel_consumed=report.fuel_consumed,
+            fuel_rate_applied=report.fuel_rate_applied,
+        ))
+
+    SessionLedgerEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0009_aircraft_hour_correction_factor'),
+        ('fms', '0064_production_rate_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_model', models.CharField(choices=[('sim', 'Simulador'), ('0_100', 'Vuelo 0-100'), ('100_120', 'Vuelo 100-120'), ('120_170', 'Vuelo 120-170'), ('external', 'Multimotor / Otro'), ('report', 'Reporte de vuelo')], max_length=10, verbose_name='Origen')),
+                ('source_id', models.PositiveBigIntegerField(verbose_name='ID de origen')),
+                ('session_date', models.DateField(verbose_name='Fecha')),
+                ('student_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='ID alumno')),
+                ('student_first_name', models.CharField(blank=True, default='', max_length=50, verbose_name='Nombre del alumno')),
+                ('student_last_name', models.CharField(blank=True, default='', max_length=50, verbose_name='Apellido del alumno')),
+                ('instructor_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='ID instructor')),
+                ('instructor_first_name', models.CharField(blank=True, default='', max_length=50, verbose_name='Nombre del instructor')),
+                ('instructor_last_name', models.CharField(blank=True, default='', max_length=50, verbose_name='Apellido del instructor')),
+                ('session_number', models.CharField(blank=True, default='', max_length=3, verbose_name='Número')),
+                ('session_letter', models.CharField(blank=True, default='', max_length=1, verbose_name='Repetición de la sesión')),
+                ('session_grade', models.CharField(blank=True, default='', max_length=2, verbose_name='Nota')),
+                ('aircraft_registration', models.CharField(blank=True, default='', max_length=255, verbose_name='Matrícula de aeronave')),
+                ('hours', models.DecimalField(decimal_places=1, default=Decimal('0.0'), max_digits=4, verbose_name='Horas sesión')),
+                ('fuel_consumed', models.DecimalField(decimal_places=1, default=Decimal('0.0'), max_digits=4, verbose_name='Combustible consumido (litros)')),
+                ('hourly_rate_applied', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=6, verbose_name='Tarifa de estudiante aplicada ($/h)')),
+                ('resource_rate_applied', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=6, verbose_name='Tarifa de aeronave o simulador aplicada ($/h)')),
+                ('instructor_rate_applied', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=6, verbose_name='Tarifa de instructor aplicada ($/h)')),
+                ('fuel_rate_applied', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=6, verbose_name='Tarifa de combustible aplicada ($/litro)')),
+                ('aircraft', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='fleet.aircraft', verbose_name='Aeronave')),
+                ('simulator', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='fleet.simulator', verbose_name='Simulador')),
+            ],
+            options={
+                'verbose_name': 'Registro de sesión',
+                'verbose_name_plural': 'Registro de sesiones',
+                'ordering': ['-session_date', '-source_id'],
+                'indexes': [models.Index(fields=['student_id', 'source_model', '-session_date', '-source_id'], name='fms_ledger_student_idx'), models.Index(fields=['instructor_id', 'source_model', '-session_date', '-source_id'], name='fms_ledger_instructor_idx'), models.Index(fields=['aircraft', 'source_model', '-session_date'], name='fms_ledger_aircraft_idx'), models.Index(fields=['session_date', 'source_model'], name='fms_ledger_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('source_model', 'source_id'), name='unique_session_ledger_source')],
+            },
+        ),
+        migrations.RunPython(backfill_session_ledger, migrations.RunPython.noop),
+    ]
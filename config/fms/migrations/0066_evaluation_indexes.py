@@ -0,0 +1,111 @@
+# Generated by Django 5.2.3 on 2026-10-18 03:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aura', '0004_globalreview_generation_mode_and_more'),
+        ('fleet', '0009_aircraft_hour_correction_factor'),
+        ('fms', '0065_session_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='externalflightevaluation',
+            index=models.Index(fields=['student_id', '-session_date'], name='fms_external_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='externalflightevaluation',
+            index=models.Index(fields=['instructor_id', '-session_date'], name='fms_external_instructor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='externalflightevaluation',
+            index=models.Index(fields=['session_date'], name='fms_external_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation0_100',
+            index=models.Index(fields=['student_id', '-session_date'], name='fms_f0_100_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation0_100',
+            index=models.Index(fields=['instructor_id', '-session_date'], name='fms_f0_100_instructor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation0_100',
+            index=models.Index(fields=['aircraft', '-session_date'], name='fms_f0_100_aircraft_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation0_100',
+            index=models.Index(condition=models.Q(('aura_processed', False)), fields=['session_date', 'id'], name='fms_f0_100_aura_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation0_100',
+            index=models.Index(fields=['session_date'], name='fms_f0_100_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation100_120',
+            index=models.Index(fields=['student_id', '-session_date'], name='fms_f100_120_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation100_120',
+            index=models.Index(fields=['instructor_id', '-session_date'], name='fms_f100_120_instructor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation100_120',
+            index=models.Index(fields=['aircraft', '-session_date'], name='fms_f100_120_aircraft_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation100_120',
+            index=models.Index(condition=models.Q(('aura_processed', False)), fields=['session_date', 'id'], name='fms_f100_120_aura_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation100_120',
+            index=models.Index(fields=['session_date'], name='fms_f100_120_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation120_170',
+            index=models.Index(fields=['student_id', '-session_date'], name='fms_f120_170_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation120_170',
+            index=models.Index(fields=['instructor_id', '-session_date'], name='fms_f120_170_instructor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation120_170',
+            index=models.Index(fields=['aircraft', '-session_date'], name='fms_f120_170_aircraft_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation120_170',
+            index=models.Index(condition=models.Q(('aura_processed', False)), fields=['session_date', 'id'], name='fms_f120_170_aura_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightevaluation120_170',
+            index=models.Index(fields=['session_date'], name='fms_f120_170_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightreport',
+            index=models.Index(fields=['aircraft', '-flight_date'], name='fms_report_aircraft_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightreport',
+            index=models.Index(fields=['flight_date'], name='fms_report_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sessionledgerentry',
+            index=models.Index(fields=['source_model', '-session_date', '-source_id'], name='fms_ledger_source_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='simevaluation',
+            index=models.Index(fields=['student_id', '-session_date'], name='fms_sim_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='simevaluation',
+            index=models.Index(fields=['instructor_id', '-session_date'], name='fms_sim_instructor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='simevaluation',
+            index=models.Index(condition=models.Q(('aura_processed', False)), fields=['session_date', 'id'], name='fms_sim_aura_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.3 on 2026-10-18 03:50
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+TRAINING_FLIGHT_SOURCES = ('0_100', '100_120', '120_170')
+AIRCRAFT_SOURCES = TRAINING_FLIGHT_SOURCES + ('report',)
+
+
+def backfill_flight_stats(apps, schema_editor):
+    """Build the rollup from the session ledger (mirrors fms.stats.rebuild_flight_stats)."""
+    SessionLedgerEntry = apps.get_model('fms', 'SessionLedgerEntry')
+    FlightStatsRollup = apps.get_model('fms', 'FlightStatsRollup')
+
+    rows = []
+    for role, person_field, sources in (
+        ('student', 'student_id', TRAINING_FLIGHT_SOURCES),
+        ('instructor', 'instructor_id', TRAINING_FLIGHT_SOURCES),
+        ('aircraft', None, AIRCRAFT_SOURCES),
+    ):
+        queryset = SessionLedgerEntry.objects.filter(source_model__in=sources, aircraft__isnull=False)
+        group_by = ['aircraft_id']
+        if person_field:
+            queryset = queryset.filter(**{f'{person_field}__isnull': False}).exclude(**{person_field: 0})
+            group_by.append(person_field)
+        totals = queryset.values(*group_by).annotate(
+            total_sessions=Count('id'),
+            total_hours=Sum('hours'),
+            total_fuel=Sum('fuel_consumed'),
+        ).order_by()
+        for row in totals:
+            rows.append(FlightStatsRollup(
+                role=role,
+                person_id=row[person_field] if person_field else 0,
+                aircraft_id=row['aircraft_id'],
+                sessions=row['total_sessions'],
+                hours=row['total_hours'] or Decimal('0.0'),
+                fuel_consumed=row['total_fuel'] or Decimal('0.0'),
+            ))
+    FlightStatsRollup.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0009_aircraft_hour_correction_factor'),
+        ('fms', '0066_evaluation_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('student', 'Alumno'), ('instructor', 'Instructor'), ('aircraft', 'Aeronave')], max_length=10, verbose_name='Rol')),
+                ('person_id', models.PositiveIntegerField(default=0, verbose_name='ID persona')),
+                ('sessions', models.PositiveIntegerField(default=0, verbose_name='Sesiones')),
+                ('hours', models.DecimalField(decimal_places=1, default=Decimal('0.0'), max_digits=9, verbose_name='Horas de vuelo')),
+                ('fuel_consumed', models.DecimalField(decimal_places=1, default=Decimal('0.0'), max_digits=10, verbose_name='Combustible consumido (litros)')),
+                ('aircraft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='fleet.aircraft', verbose_name='Aeronave')),
+            ],
+            options={
+                'verbose_name': 'Estadística de vuelo',
+                'verbose_name_plural': 'Estadísticas de vuelo',
+                'constraints': [models.UniqueConstraint(fields=('role', 'person_id', 'aircraft'), name='unique_flight_stats_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_flight_stats, migrations.RunPython.noop),
+    ]
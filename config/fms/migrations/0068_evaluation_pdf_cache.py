@@ -0,0 +1,56 @@
+# Generated by Django 5.2.3 on 2026-10-18 03:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fms', '0067_flight_stats_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='externalflightevaluation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='flightevaluation0_100',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='flightevaluation100_120',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='flightevaluation120_170',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='simevaluation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.CreateModel(
+            name='PdfRenderJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('form_type', models.CharField(max_length=10, verbose_name='Tipo de evaluación')),
+                ('evaluation_id', models.PositiveBigIntegerField(verbose_name='ID de evaluación')),
+                ('cache_key', models.CharField(max_length=64, unique=True, verbose_name='Clave de caché')),
+                ('status', models.CharField(choices=[('PENDING', 'Pendiente'), ('RENDERING', 'Generando'), ('READY', 'Listo'), ('FAILED', 'Fallido')], default='PENDING', max_length=10, verbose_name='Estado')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+            ],
+            options={
+                'verbose_name': 'Generación de PDF',
+                'verbose_name_plural': 'Generaciones de PDF',
+                'indexes': [models.Index(condition=models.Q(('status', 'PENDING')), fields=['created_at'], name='fms_pdf_job_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:16
+
+from collections import defaultdict
+from decimal import Decimal
+from django.db import migrations, models
+
+
+KEY_FIELDS = (
+    'session_date', 'source_model', 'aircraft_registration', 'simulator_id',
+    'instructor_id', 'instructor_first_name', 'instructor_last_name',
+    'student_id', 'student_first_name', 'student_last_name',
+)
+
+
+def backfill_daily_production(apps, schema_editor):
+    """Build the rollup from the session ledger (mirrors fms.rollups.rebuild_daily_rollups)."""
+    SessionLedgerEntry = apps.get_model('fms', 'SessionLedgerEntry')
+    DailyProductionRollup = apps.get_model('fms', 'DailyProductionRollup')
+
+    zero = Decimal('0')
+    totals = defaultdict(lambda: [0, zero, zero, zero, zero, zero, zero])
+    for entry in SessionLedgerEntry.objects.order_by().iterator(chunk_size=500):
+        key = []
+        for name in KEY_FIELDS:
+            value = getattr(entry, name)
+            if name.endswith('_id'):
+                value = value or 0
+            elif name != 'session_date':
+                value = value or ''
+            key.append(value)
+        hours = entry.hours or zero
+        fuel = entry.fuel_consumed or zero
+        total = totals[tuple(key)]
+        total[0] += 1
+        total[1] += hours
+        total[2] += fuel
+        total[3] += fuel * entry.fuel_rate_applied
+        total[4] += hours * entry.resource_rate_applied
+        total[5] += hours * entry.instructor_rate_applied
+        total[6] += hours * entry.hourly_rate_applied
+
+    DailyProductionRollup.objects.bulk_create(
+        [
+            DailyProductionRollup(
+                **dict(zip(KEY_FIELDS, key)),
+                sessions=total[0],
+                hours=total[1],
+                fuel_consumed=total[2],
+                fuel_cost=total[3],
+                resource_income=total[4],
+                instructor_cost=total[5],
+                student_value=total[6],
+            )
+            for key, total in totals.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fms', '0068_evaluation_pdf_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProductionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_date', models.DateField(verbose_name='Fecha')),
+                ('source_model', models.CharField(choices=[('sim', 'Simulador'), ('0_100', 'Vuelo 0-100'), ('100_120', 'Vuelo 100-120'), ('120_170', 'Vuelo 120-170'), ('external', 'Multimotor / Otro'), ('report', 'Reporte de vuelo')], max_length=10, verbose_name='Origen')),
+                ('aircraft_registration', models.CharField(blank=True, default='', max_length=255, verbose_name='Matrícula de aeronave')),
+                ('simulator_id', models.PositiveIntegerField(default=0, verbose_name='ID simulador')),
+                ('instructor_id', models.PositiveIntegerField(default=0, verbose_name='ID instructor')),
+                ('instructor_first_name', models.CharField(blank=True, default='', max_length=50, verbose_name='Nombre del instructor')),
+                ('instructor_last_name', models.CharField(blank=True, default='', max_length=50, verbose_name='Apellido del instructor')),
+                ('student_id', models.PositiveIntegerField(default=0, verbose_name='ID alumno')),
+                ('student_first_name', models.CharField(blank=True, default='', max_length=50, verbose_name='Nombre del alumno')),
+                ('student_last_name', models.CharField(blank=True, default='', max_length=50, verbose_name='Apellido del alumno')),
+                ('sessions', models.PositiveIntegerField(default=0, verbose_name='Sesiones')),
+                ('hours', models.DecimalField(decimal_places=1, default=Decimal('0.0'), max_digits=7, verbose_name='Horas')),
+                ('fuel_consumed', models.DecimalField(decimal_places=1, default=Decimal('0.0'), max_digits=8, verbose_name='Combustible consumido (litros)')),
+                ('fuel_cost', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=12, verbose_name='Costo de combustible ($)')),
+                ('resource_income', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=12, verbose_name='Ingreso de aeronave o simulador ($)')),
+                ('instructor_cost', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=12, verbose_name='Costo de instructor ($)')),
+                ('student_value', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=12, verbose_name='Valor para el alumno ($)')),
+            ],
+            options={
+                'verbose_name': 'Producción diaria',
+                'verbose_name_plural': 'Producción diaria',
+                'constraints': [models.UniqueConstraint(fields=('session_date', 'source_model', 'aircraft_registration', 'simulator_id', 'instructor_id', 'instructor_first_name', 'instructor_last_name', 'student_id', 'student_first_name', 'student_last_name'), name='unique_daily_production_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_production, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,7 @@ from django.core.exceptions import ValidationError
 from accounts.models import InstructorProfile, StudentProfile
 from django.utils import timezone
 from fleet.models import Simulator, Aircraft
+from transactions import balances
 
 
 # Custom validators with Spanish messages
@@ -778,6 +779,10 @@ class SimEvaluation(models.Model):
         verbose_name='Comentarios',
         validators=[MinLengthValidator(15), MaxLengthValidator(1000)],
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última modificación',
+    )
     aura_processed = models.BooleanField(
         default=False,
         verbose_name='Procesado por AURA',
@@ -815,19 +820,26 @@ class SimEvaluation(models.Model):
     def delete(self, *args, **kwargs):
         # Subtract session hours from student's accumulated hours
         try:
-            student_profile = StudentProfile.objects.get(user__national_id=self.student_id)
-            student_profile.sim_hours -= self.session_sim_hours
-            # Ensure hours don't go negative
-            if student_profile.sim_hours < 0:
-                student_profile.sim_hours = 0
-            student_profile.save()
+            student_profile = StudentProfile.objects.only('pk').get(user__national_id=self.student_id)
+            balances.adjust_student(
+                student_profile,
+                reason=balances.SIM_EVALUATION_DELETED,
+                reference=balances.reference_to(self),
+                # Ensure hours don't go negative
+                floor_at_zero=('sim_hours',),
+                sim_hours=-self.session_sim_hours,
+            )
         except StudentProfile.DoesNotExist:
             # If student profile doesn't exist, continue with deletion
             pass
 
         # Subtract session hours from simulator's total hours
-        self.simulator.total_hours -= self.session_sim_hours
-        self.simulator.save()
+        balances.adjust_simulator_hours(
+            self.simulator,
+            -self.session_sim_hours,
+            reason=balances.SIM_EVALUATION_DELETED,
+            reference=balances.reference_to(self),
+        )
         
         # Delete the evaluation record using the evaluation_id
         super().delete(*args, **kwargs)
@@ -835,6 +847,21 @@ class SimEvaluation(models.Model):
     class Meta:
         verbose_name = 'Evaluación de simulador'
         verbose_name_plural = 'Evaluaciones de simulador'
+        indexes = [
+            models.Index(
+                fields=['student_id', '-session_date'],
+                name='fms_sim_student_idx',
+            ),
+            models.Index(
+                fields=['instructor_id', '-session_date'],
+                name='fms_sim_instructor_idx',
+            ),
+            models.Index(
+                fields=['session_date', 'id'],
+                name='fms_sim_aura_idx',
+                condition=models.Q(aura_processed=False),
+            ),
+        ]
 
 class FlightEvaluation0_100(models.Model):
     """
@@ -1460,6 +1487,10 @@ class FlightEvaluation0_100(models.Model):
         verbose_name='Comentarios',
         validators=[MinLengthValidator(15), MaxLengthValidator(1000)],
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última modificación',
+    )
     aura_processed = models.BooleanField(
         default=False,
         verbose_name='Procesado por AURA',
@@ -1514,21 +1545,28 @@ class FlightEvaluation0_100(models.Model):
     def delete(self, *args, **kwargs):
         # Subtract session hours from student's accumulated hours and add to balance
         try:
-            student_profile = StudentProfile.objects.get(user__national_id=self.student_id)
-            student_profile.flight_hours -= self.session_flight_hours
-            student_profile.nav_flight_hours -= self.session_flight_hours
-            student_profile.balance += round(self.session_flight_hours*self.hourly_rate_applied + self.fuel_rate_applied*self.fuel_consumed, 2)
-            # Ensure hours don't go negative
-            if student_profile.flight_hours < 0:
-                student_profile.flight_hours = 0
-            student_profile.save()
+            student_profile = StudentProfile.objects.only('pk').get(user__national_id=self.student_id)
+            balances.adjust_student(
+                student_profile,
+                reason=balances.FLIGHT_EVALUATION_DELETED,
+                reference=balances.reference_to(self),
+                # Ensure hours don't go negative
+                floor_at_zero=('flight_hours',),
+                flight_hours=-self.session_flight_hours,
+                nav_flight_hours=-self.session_flight_hours,
+                balance=round(self.session_flight_hours*self.hourly_rate_applied + self.fuel_rate_applied*self.fuel_consumed, 2),
+            )
         except StudentProfile.DoesNotExist:
             # If student profile doesn't exist, continue with deletion
             pass
             
         # Subtract session hours from aircraft's total hours
-        self.aircraft.total_hours -= self.session_flight_hours
-        self.aircraft.save()
+        balances.adjust_aircraft_hours(
+            self.aircraft,
+            -self.session_flight_hours,
+            reason=balances.FLIGHT_EVALUATION_DELETED,
+            reference=balances.reference_to(self),
+        )
         
         # Delete the evaluation record using the primary id
         super().delete(*args, **kwargs)
@@ -1536,6 +1574,29 @@ class FlightEvaluation0_100(models.Model):
     class Meta:
         verbose_name = 'Evaluación de vuelo 0-100'
         verbose_name_plural = 'Evaluaciones de vuelo 0-100'
+        indexes = [
+            models.Index(
+                fields=['student_id', '-session_date'],
+                name='fms_f0_100_student_idx',
+            ),
+            models.Index(
+                fields=['instructor_id', '-session_date'],
+                name='fms_f0_100_instructor_idx',
+            ),
+            models.Index(
+                fields=['aircraft', '-session_date'],
+                name='fms_f0_100_aircraft_idx',
+            ),
+            models.Index(
+                fields=['session_date', 'id'],
+                name='fms_f0_100_aura_idx',
+                condition=models.Q(aura_processed=False),
+            ),
+            models.Index(
+                fields=['session_date'],
+                name='fms_f0_100_date_idx',
+            ),
+        ]
 
 class FlightEvaluation100_120(models.Model):
     """
@@ -2125,6 +2186,10 @@ class FlightEvaluation100_120(models.Model):
         verbose_name='Comentarios',
         validators=[MinLengthValidator(15), MaxLengthValidator(1000)],
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última modificación',
+    )
     aura_processed = models.BooleanField(
         default=False,
         verbose_name='Procesado por AURA',
@@ -2179,21 +2244,28 @@ class FlightEvaluation100_120(models.Model):
     def delete(self, *args, **kwargs):
         # Subtract session hours from student's accumulated hours and add to balance
         try:
-            student_profile = StudentProfile.objects.get(user__national_id=self.student_id)
-            student_profile.flight_hours -= self.session_flight_hours
-            student_profile.nav_flight_hours -= self.session_flight_hours
-            student_profile.balance += round(self.session_flight_hours*self.hourly_rate_applied + self.fuel_rate_applied*self.fuel_consumed, 2)
-            # Ensure hours don't go negative
-            if student_profile.flight_hours < 0:
-                student_profile.flight_hours = 0
-            student_profile.save()
+            student_profile = StudentProfile.objects.only('pk').get(user__national_id=self.student_id)
+            balances.adjust_student(
+                student_profile,
+                reason=balances.FLIGHT_EVALUATION_DELETED,
+                reference=balances.reference_to(self),
+                # Ensure hours don't go negative
+                floor_at_zero=('flight_hours',),
+                flight_hours=-self.session_flight_hours,
+                nav_flight_hours=-self.session_flight_hours,
+                balance=round(self.session_flight_hours*self.hourly_rate_applied + self.fuel_rate_applied*self.fuel_consumed, 2),
+            )
         except StudentProfile.DoesNotExist:
             # If student profile doesn't exist, continue with deletion
             pass
             
         # Subtract session hours from aircraft's total hours
-        self.aircraft.total_hours -= self.session_flight_hours
-        self.aircraft.save()
+        balances.adjust_aircraft_hours(
+            self.aircraft,
+            -self.session_flight_hours,
+            reason=balances.FLIGHT_EVALUATION_DELETED,
+            reference=balances.reference_to(self),
+        )
         
         # Delete the evaluation record using the evaluation_id
         super().delete(*args, **kwargs)
@@ -2201,6 +2273,29 @@ class FlightEvaluation100_120(models.Model):
     class Meta:
         verbose_name = 'Evaluación de vuelo 100-120'
         verbose_name_plural = 'Evaluaciones de vuelo 100-120'
+        indexes = [
+            models.Index(
+                fields=['student_id', '-session_date'],
+                name='fms_f100_120_student_idx',
+            ),
+            models.Index(
+                fields=['instructor_id', '-session_date'],
+                name='fms_f100_120_instructor_idx',
+            ),
+            models.Index(
+                fields=['aircraft', '-session_date'],
+                name='fms_f100_120_aircraft_idx',
+            ),
+            models.Index(
+                fields=['session_date', 'id'],
+                name='fms_f100_120_aura_idx',
+                condition=models.Q(aura_processed=False),
+            ),
+            models.Index(
+                fields=['session_date'],
+                name='fms_f100_120_date_idx',
+            ),
+        ]
 
 class FlightEvaluation120_170(models.Model):
     """
@@ -2835,6 +2930,10 @@ class FlightEvaluation120_170(models.Model):
         verbose_name='Comentarios',
         validators=[MinLengthValidator(15), MaxLengthValidator(1000)],
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última modificación',
+    )
     aura_processed = models.BooleanField(
         default=False,
         verbose_name='Procesado por AURA',
@@ -2889,21 +2988,28 @@ class FlightEvaluation120_170(models.Model):
     def delete(self, *args, **kwargs):
         # Subtract session hours from student's accumulated hours and add to balance
         try:
-            student_profile = StudentProfile.objects.get(user__national_id=self.student_id)
-            student_profile.flight_hours -= self.session_flight_hours
-            student_profile.nav_flight_hours -= self.session_flight_hours
-            student_profile.balance += round(self.session_flight_hours*self.hourly_rate_applied + self.fuel_rate_applied*self.fuel_consumed, 2)
-            # Ensure hours don't go negative
-            if student_profile.flight_hours < 0:
-                student_profile.flight_hours = 0
-            student_profile.save()
+            student_profile = StudentProfile.objects.only('pk').get(user__national_id=self.student_id)
+            balances.adjust_student(
+                student_profile,
+                reason=balances.FLIGHT_EVALUATION_DELETED,
+                reference=balances.reference_to(self),
+                # Ensure hours don't go negative
+                floor_at_zero=('flight_hours',),
+                flight_hours=-self.session_flight_hours,
+                nav_flight_hours=-self.session_flight_hours,
+                balance=round(self.session_flight_hours*self.hourly_rate_applied + self.fuel_rate_applied*self.fuel_consumed, 2),
+            )
         except StudentProfile.DoesNotExist:
             # If student profile doesn't exist, continue with deletion
             pass
             
         # Subtract session hours from aircraft's total hours
-        self.aircraft.total_hours -= self.session_flight_hours
-        self.aircraft.save()
+        balances.adjust_aircraft_hours(
+            self.aircraft,
+            -self.session_flight_hours,
+            reason=balances.FLIGHT_EVALUATION_DELETED,
+            reference=balances.reference_to(self),
+        )
         
         # Delete the evaluation record using the evaluation_id
         super().delete(*args, **kwargs)
@@ -2911,6 +3017,29 @@ class FlightEvaluation120_170(models.Model):
     class Meta:
         verbose_name = 'Evaluación de vuelo 120-170'
         verbose_name_plural = 'Evaluaciones de vuelo 120-170'
+        indexes = [
+            models.Index(
+                fields=['student_id', '-session_date'],
+                name='fms_f120_170_student_idx',
+            ),
+            models.Index(
+                fields=['instructor_id', '-session_date'],
+                name='fms_f120_170_instructor_idx',
+            ),
+            models.Index(
+                fields=['aircraft', '-session_date'],
+                name='fms_f120_170_aircraft_idx',
+            ),
+            models.Index(
+                fields=['session_date', 'id'],
+                name='fms_f120_170_aura_idx',
+                condition=models.Q(aura_processed=False),
+            ),
+            models.Index(
+                fields=['session_date'],
+                name='fms_f120_170_date_idx',
+            ),
+        ]
 
 
 class ExternalFlightEvaluation(models.Model):
@@ -3062,6 +3191,10 @@ class ExternalFlightEvaluation(models.Model):
         validators=[MinLengthValidator(15), MaxLengthValidator(1000)], 
         verbose_name='Comentarios'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última modificación'
+    )
 
     @property
     def total_flight_hours(self):
@@ -3084,6 +3217,20 @@ class ExternalFlightEvaluation(models.Model):
         verbose_name = 'Multimotor / Otro'
         verbose_name_plural = 'Multimotor / Otro'
         ordering = ['-session_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['student_id', '-session_date'],
+                name='fms_external_student_idx',
+            ),
+            models.Index(
+                fields=['instructor_id', '-session_date'],
+                name='fms_external_instructor_idx',
+            ),
+            models.Index(
+                fields=['session_date'],
+                name='fms_external_date_idx',
+            ),
+        ]
 
 class FlightReport(models.Model):
     """
@@ -3210,8 +3357,12 @@ class FlightReport(models.Model):
     
     def delete(self, *args, **kwargs):
         # Subtract flight hours from aircraft's total hours
-        self.aircraft.total_hours -= self.flight_hours
-        self.aircraft.save()
+        balances.adjust_aircraft_hours(
+            self.aircraft,
+            -self.flight_hours,
+            reason=balances.FLIGHT_REPORT_DELETED,
+            reference=balances.reference_to(self),
+        )
         
         # Delete the flight report record using the primary id
         super().delete(*args, **kwargs)
@@ -3219,7 +3370,488 @@ class FlightReport(models.Model):
     class Meta:
         verbose_name = 'Reporte de vuelo'
         verbose_name_plural = 'Reportes de vuelo'
+        indexes = [
+            models.Index(
+                fields=['aircraft', '-flight_date'],
+                name='fms_report_aircraft_idx',
+            ),
+            models.Index(
+                fields=['flight_date'],
+                name='fms_report_date_idx',
+            ),
+        ]
+
+
+class SessionLedgerEntry(models.Model):
+    """
+    Session Ledger Model
+
+    Narrow copy of the accounting columns of every simulator session,
+    flight evaluation and flight report. Rows are maintained on write by
+    ``fms.signals`` so flight logs, statistics and production reports can
+    read one indexed table instead of every wide evaluation table.
+    """
+
+    #region CHOICES DEFINITIONS
+
+    # Source models (keys match the ``form_type`` used in the FMS urls)
+    SOURCE_SIM = 'sim'
+    SOURCE_0_100 = '0_100'
+    SOURCE_100_120 = '100_120'
+    SOURCE_120_170 = '120_170'
+    SOURCE_EXTERNAL = 'external'
+    SOURCE_REPORT = 'report'
+
+    SOURCE_CHOICES = [
+        (SOURCE_SIM, 'Simulador'),
+        (SOURCE_0_100, 'Vuelo 0-100'),
+        (SOURCE_100_120, 'Vuelo 100-120'),
+        (SOURCE_120_170, 'Vuelo 120-170'),
+        (SOURCE_EXTERNAL, 'Multimotor / Otro'),
+        (SOURCE_REPORT, 'Reporte de vuelo'),
+    ]
+
+    TRAINING_FLIGHT_SOURCES = (SOURCE_0_100, SOURCE_100_120, SOURCE_120_170)
+    #endregion
+
+    #region SOURCE DATA
+    source_model = models.CharField(
+        max_length=10,
+        choices=SOURCE_CHOICES,
+        verbose_name='Origen'
+    )
+    source_id = models.PositiveBigIntegerField(
+        verbose_name='ID de origen'
+    )
+    session_date = models.DateField(
+        verbose_name='Fecha'
+    )
+    #endregion
+
+    #region PEOPLE
+    student_id = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='ID alumno'
+    )
+    student_first_name = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name='Nombre del alumno'
+    )
+    student_last_name = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name='Apellido del alumno'
+    )
+    instructor_id = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='ID instructor'
+    )
+    instructor_first_name = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name='Nombre del instructor'
+    )
+    instructor_last_name = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name='Apellido del instructor'
+    )
+    #endregion
+
+    #region SESSION DATA
+    session_number = models.CharField(
+        max_length=3,
+        blank=True,
+        default='',
+        verbose_name='Número'
+    )
+    session_letter = models.CharField(
+        max_length=1,
+        blank=True,
+        default='',
+        verbose_name='Repetición de la sesión'
+    )
+    session_grade = models.CharField(
+        max_length=2,
+        blank=True,
+        default='',
+        verbose_name='Nota'
+    )
+    aircraft = models.ForeignKey(
+        Aircraft,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name='Aeronave',
+    )
+    aircraft_registration = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        verbose_name='Matrícula de aeronave'
+    )
+    simulator = models.ForeignKey(
+        Simulator,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name='Simulador'
+    )
+    hours = models.DecimalField(
+        max_digits=4,
+        decimal_places=1,
+        default=Decimal('0.0'),
+        verbose_name='Horas sesión'
+    )
+    fuel_consumed = models.DecimalField(
+        max_digits=4,
+        decimal_places=1,
+        default=Decimal('0.0'),
+        verbose_name='Combustible consumido (litros)'
+    )
+    #endregion
 
+    #region RATE SNAPSHOTS
+    hourly_rate_applied = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='Tarifa de estudiante aplicada ($/h)'
+    )
+    resource_rate_applied = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='Tarifa de aeronave o simulador aplicada ($/h)'
+    )
+    instructor_rate_applied = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='Tarifa de instructor aplicada ($/h)'
+    )
+    fuel_rate_applied = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='Tarifa de combustible aplicada ($/litro)'
+    )
+    #endregion
+
+    def __str__(self):
+        return f'{self.get_source_model_display()} #{self.source_id} - {self.session_date} - {self.hours} hrs'
+
+    class Meta:
+        verbose_name = 'Registro de sesión'
+        verbose_name_plural = 'Registro de sesiones'
+        ordering = ['-session_date', '-source_id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source_model', 'source_id'],
+                name='unique_session_ledger_source',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['student_id', 'source_model', '-session_date', '-source_id'],
+                name='fms_ledger_student_idx',
+            ),
+            models.Index(
+                fields=['instructor_id', 'source_model', '-session_date', '-source_id'],
+                name='fms_ledger_instructor_idx',
+            ),
+            models.Index(
+                fields=['aircraft', 'source_model', '-session_date'],
+                name='fms_ledger_aircraft_idx',
+            ),
+            models.Index(
+                fields=['source_model', '-session_date', '-source_id'],
+                name='fms_ledger_source_idx',
+            ),
+            models.Index(
+                fields=['session_date', 'source_model'],
+                name='fms_ledger_date_idx',
+            ),
+        ]
+
+
+
+class FlightStatsRollup(models.Model):
+    """
+    Flight Statistics Rollup Model
+
+    Running totals of flight hours and fuel per (role, person, aircraft),
+    kept up to date from the session ledger by ``fms.stats``. Student and
+    instructor rows sum their training flights; aircraft rows (person 0)
+    also include flight reports. Costs are derived at read time from the
+    current aircraft rates.
+    """
+
+    #region CHOICES DEFINITIONS
+    ROLE_STUDENT = 'student'
+    ROLE_INSTRUCTOR = 'instructor'
+    ROLE_AIRCRAFT = 'aircraft'
+
+    ROLE_CHOICES = [
+        (ROLE_STUDENT, 'Alumno'),
+        (ROLE_INSTRUCTOR, 'Instructor'),
+        (ROLE_AIRCRAFT, 'Aeronave'),
+    ]
+    #endregion
+
+    #region KEY
+    role = models.CharField(
+        max_length=10,
+        choices=ROLE_CHOICES,
+        verbose_name='Rol'
+    )
+    person_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name='ID persona'
+    )
+    aircraft = models.ForeignKey(
+        Aircraft,
+        on_delete=models.CASCADE,
+        verbose_name='Aeronave',
+    )
+    #endregion
+
+    #region TOTALS
+    sessions = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Sesiones'
+    )
+    hours = models.DecimalField(
+        max_digits=9,
+        decimal_places=1,
+        default=Decimal('0.0'),
+        verbose_name='Horas de vuelo'
+    )
+    fuel_consumed = models.DecimalField(
+        max_digits=10,
+        decimal_places=1,
+        default=Decimal('0.0'),
+        verbose_name='Combustible consumido (litros)'
+    )
+    #endregion
+
+    def __str__(self):
+        return f'{self.get_role_display()} {self.person_id} - {self.aircraft_id} - {self.hours} hrs'
+
+    class Meta:
+        verbose_name = 'Estadística de vuelo'
+        verbose_name_plural = 'Estadísticas de vuelo'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['role', 'person_id', 'aircraft'],
+                name='unique_flight_stats_rollup',
+            ),
+        ]
+
+
+class DailyProductionRollup(models.Model):
+    """
+    Daily Production Rollup Model
+
+    Production totals per date, source, aircraft or simulator, instructor
+    and student, kept up to date from the session ledger by
+    ``fms.rollups``. Money columns are the sums of hours (or liters) times
+    the rate snapshot of each session, so production and fuel reports for
+    any date range add up these rows instead of the ledger. People without
+    an id (flight reports) and sessions without a simulator use 0.
+    """
+
+    #region KEY
+    session_date = models.DateField(
+        verbose_name='Fecha'
+    )
+    source_model = models.CharField(
+        max_length=10,
+        choices=SessionLedgerEntry.SOURCE_CHOICES,
+        verbose_name='Origen'
+    )
+    aircraft_registration = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        verbose_name='Matrícula de aeronave'
+    )
+    simulator_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name='ID simulador'
+    )
+    instructor_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name='ID instructor'
+    )
+    instructor_first_name = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name='Nombre del instructor'
+    )
+    instructor_last_name = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name='Apellido del instructor'
+    )
+    student_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name='ID alumno'
+    )
+    student_first_name = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name='Nombre del alumno'
+    )
+    student_last_name = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name='Apellido del alumno'
+    )
+    #endregion
+
+    #region TOTALS
+    sessions = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Sesiones'
+    )
+    hours = models.DecimalField(
+        max_digits=7,
+        decimal_places=1,
+        default=Decimal('0.0'),
+        verbose_name='Horas'
+    )
+    fuel_consumed = models.DecimalField(
+        max_digits=8,
+        decimal_places=1,
+        default=Decimal('0.0'),
+        verbose_name='Combustible consumido (litros)'
+    )
+    fuel_cost = models.DecimalField(
+        max_digits=12,
+        decimal_places=3,
+        default=Decimal('0.000'),
+        verbose_name='Costo de combustible ($)'
+    )
+    resource_income = models.DecimalField(
+        max_digits=12,
+        decimal_places=3,
+        default=Decimal('0.000'),
+        verbose_name='Ingreso de aeronave o simulador ($)'
+    )
+    instructor_cost = models.DecimalField(
+        max_digits=12,
+        decimal_places=3,
+        default=Decimal('0.000'),
+        verbose_name='Costo de instructor ($)'
+    )
+    student_value = models.DecimalField(
+        max_digits=12,
+        decimal_places=3,
+        default=Decimal('0.000'),
+        verbose_name='Valor para el alumno ($)'
+    )
+    #endregion
+
+    def __str__(self):
+        return f'{self.session_date} - {self.get_source_model_display()} - {self.sessions} sesiones'
+
+    class Meta:
+        verbose_name = 'Producción diaria'
+        verbose_name_plural = 'Producción diaria'
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    'session_date', 'source_model', 'aircraft_registration', 'simulator_id',
+                    'instructor_id', 'instructor_first_name', 'instructor_last_name',
+                    'student_id', 'student_first_name', 'student_last_name',
+                ],
+                name='unique_daily_production_rollup',
+            ),
+        ]
+
+
+class PdfRenderJob(models.Model):
+    """
+    PDF Render Job Model
+
+    One background render of an evaluation PDF. ``cache_key`` identifies
+    the evaluation version (id plus last modification) and names the file
+    in the PDF cache, so a finished job is served straight from disk.
+    """
+
+    #region CHOICES DEFINITIONS
+    STATUS_PENDING = 'PENDING'
+    STATUS_RENDERING = 'RENDERING'
+    STATUS_READY = 'READY'
+    STATUS_FAILED = 'FAILED'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendiente'),
+        (STATUS_RENDERING, 'Generando'),
+        (STATUS_READY, 'Listo'),
+        (STATUS_FAILED, 'Fallido'),
+    ]
+    #endregion
+
+    #region JOB DATA
+    form_type = models.CharField(
+        max_length=10,
+        verbose_name='Tipo de evaluación'
+    )
+    evaluation_id = models.PositiveBigIntegerField(
+        verbose_name='ID de evaluación'
+    )
+    cache_key = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='Clave de caché'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name='Estado'
+    )
+    error = models.TextField(
+        blank=True,
+        default='',
+        verbose_name='Error'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de creación'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha de actualización'
+    )
+    #endregion
+
+    def __str__(self):
+        return f'PDF {self.form_type} #{self.evaluation_id} - {self.get_status_display()}'
+
+    class Meta:
+        verbose_name = 'Generación de PDF'
+        verbose_name_plural = 'Generaciones de PDF'
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                name='fms_pdf_job_pending_idx',
+                condition=models.Q(status='PENDING'),
+            ),
+        ]
 
 class DiscrepancyReport(models.Model):
     """Discrepancy Report Model for Fleet Management System (FMS)"""
@@ -0,0 +1,166 @@
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from config.pdf_renderer import logo_data_uri, render_pdf, stylesheet
+
+from .models import PdfRenderJob
+
+
+def evaluation_cache_key(form_type, evaluation):
+    """Return the content address of an evaluation PDF: its id plus last modification."""
+    version = f'{form_type}:{evaluation.pk}:{evaluation.updated_at.isoformat()}'
+    return hashlib.sha256(version.encode()).hexdigest()
+
+
+def cache_path(cache_key):
+    """Return the file that holds (or will hold) the PDF of ``cache_key``."""
+    return Path(settings.FMS_PDF_CACHE_DIR) / cache_key[:2] / f'{cache_key}.pdf'
+
+
+def cached_pdf(cache_key):
+    """Return the cached PDF path, or None if it has not been rendered yet."""
+    path = cache_path(cache_key)
+    return path if path.exists() else None
+
+
+def store_pdf(cache_key, pdf):
+    """Write a rendered PDF into the cache atomically and return its path."""
+    path = cache_path(cache_key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write next to the target and rename, so readers never see a partial file.
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(pdf)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return path
+
+
+def render_evaluation_pdf(form_type, evaluation, template_name):
+    """Render an evaluation with the shared PDF renderer and return the PDF bytes."""
+    # The CSS is passed to WeasyPrint directly (do not rely on <link> in templates — fetching
+    # CSS via HTTP behind Cloudflare/proxies can fail or trigger WeasyPrint recursion errors).
+    return render_pdf(
+        template_name,
+        {
+            'evaluation': evaluation,
+            'logo_path': logo_data_uri('fms/img/evaluation_logo.png'),
+        },
+        stylesheets=[stylesheet('fms/pdf.css')],
+    )
+
+
+def request_evaluation_pdf(form_type, evaluation, retry_failed=False):
+    """
+    Return the render job of the current version of an evaluation, queuing it if needed.
+
+    A job whose file is already cached is returned as ready without queuing
+    anything. Failed jobs are queued again only when ``retry_failed`` is set.
+    """
+    cache_key = evaluation_cache_key(form_type, evaluation)
+    job, created = PdfRenderJob.objects.get_or_create(
+        cache_key=cache_key,
+        defaults={'form_type': form_type, 'evaluation_id': evaluation.pk},
+    )
+    retry = retry_failed and job.status == PdfRenderJob.STATUS_FAILED
+    if retry or (job.status == PdfRenderJob.STATUS_READY and cached_pdf(cache_key) is None):
+        # Failed before, or the cache was cleared; render the file again.
+        job.status = PdfRenderJob.STATUS_PENDING
+        job.save(update_fields=['status', 'updated_at'])
+    elif created and cached_pdf(cache_key) is not None:
+        job.status = PdfRenderJob.STATUS_READY
+        job.save(update_fields=['status', 'updated_at'])
+    return job
+
+
+def claim_job(job):
+    """
+    Move a job to RENDERING if nobody else is rendering it; return True on success.
+
+    A render that has not finished after FMS_PDF_RENDER_TIMEOUT seconds is
+    assumed dead and can be claimed again.
+    """
+    stale = timezone.now() - timedelta(seconds=settings.FMS_PDF_RENDER_TIMEOUT)
+    return bool(
+        PdfRenderJob.objects.filter(
+            Q(status=PdfRenderJob.STATUS_PENDING)
+            | Q(status=PdfRenderJob.STATUS_RENDERING, updated_at__lt=stale),
+            pk=job.pk,
+        ).update(status=PdfRenderJob.STATUS_RENDERING, updated_at=timezone.now())
+    )
+
+
+def render_job(job):
+    """Render a claimed job into the cache and record the outcome."""
+    from .views import get_evaluation_and_template
+
+    try:
+        evaluation, template_name = get_evaluation_and_template(job.form_type, job.evaluation_id)
+        pdf = render_evaluation_pdf(job.form_type, evaluation, template_name)
+        store_pdf(job.cache_key, pdf)
+    except Exception as exc:
+        PdfRenderJob.objects.filter(pk=job.pk).update(
+            status=PdfRenderJob.STATUS_FAILED,
+            error=str(exc),
+            updated_at=timezone.now(),
+        )
+        return False
+
+    PdfRenderJob.objects.filter(pk=job.pk).update(
+        status=PdfRenderJob.STATUS_READY,
+        error='',
+        updated_at=timezone.now(),
+    )
+    return True
+
+
+def render_if_unclaimed(job):
+    """
+    Render a job in the calling process when no worker picked it up in time.
+
+    Keeps downloads working while the PDF worker is down, at the old cost of
+    rendering inside the request.
+    """
+    waited = timezone.now() - job.updated_at
+    if job.status != PdfRenderJob.STATUS_PENDING:
+        return False
+    if waited < timedelta(seconds=settings.FMS_PDF_INLINE_AFTER_SECONDS):
+        return False
+    return claim_job(job) and render_job(job)
+
+
+def process_pending_pdf_jobs(limit=None):
+    """Render pending jobs, oldest first, and return how many were rendered."""
+    rendered = 0
+    pending = PdfRenderJob.objects.filter(status=PdfRenderJob.STATUS_PENDING).order_by('created_at')
+    for job in pending[:limit] if limit else pending:
+        if claim_job(job) and render_job(job):
+            rendered += 1
+    return rendered
+
+
+def prune_pdf_cache(max_age_days):
+    """Delete cached PDFs not written for ``max_age_days`` and return how many were removed."""
+    cache_dir = Path(settings.FMS_PDF_CACHE_DIR)
+    if not cache_dir.exists():
+        return 0
+
+    cutoff = timezone.now() - timedelta(days=max_age_days)
+    removed_keys = []
+    for path in cache_dir.glob('*/*.pdf'):
+        if path.stat().st_mtime < cutoff.timestamp():
+            path.unlink(missing_ok=True)
+            removed_keys.append(path.stem)
+    PdfRenderJob.objects.filter(cache_key__in=removed_keys).delete()
+    return len(removed_keys)
@@ -0,0 +1,209 @@
+import re
+from dataclasses import dataclass
+from datetime import date
+
+from django.db import connection, transaction
+
+from .ledger import LOG_SOURCES, after_cursor, latest_sessions_queryset
+from .models import (
+    ExternalFlightEvaluation,
+    FlightEvaluation0_100,
+    FlightEvaluation100_120,
+    FlightEvaluation120_170,
+    FlightReport,
+    FlightStatsRollup,
+    SessionLedgerEntry,
+    SimEvaluation,
+)
+
+
+TRAINING_MODELS = (
+    SimEvaluation,
+    FlightEvaluation0_100,
+    FlightEvaluation100_120,
+    FlightEvaluation120_170,
+)
+FLIGHT_MODELS = (
+    FlightEvaluation0_100,
+    FlightEvaluation100_120,
+    FlightEvaluation120_170,
+)
+
+# Sample values only shape the SQL; EXPLAIN never needs matching rows.
+SAMPLE_PERSON_ID = 1
+SAMPLE_AIRCRAFT_ID = 1
+SAMPLE_START_DATE = date(2025, 1, 1)
+SAMPLE_END_DATE = date(2025, 12, 31)
+
+POSTGRES_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+SQLITE_SCAN = re.compile(r'\bSCAN (\S+)(.*)$')
+SQLITE_DERIVED = re.compile(r'\b(?:CO-ROUTINE|MATERIALIZE) (\S+)')
+
+
+@dataclass
+class QueryPlan:
+    """EXPLAIN output for one named query shape."""
+
+    name: str
+    plan: str
+    sequential_scans: list[str]
+
+
+def query_shapes():
+    """Return ``(name, queryset)`` pairs for the lookups the FMS pages and workers run."""
+
+    shapes = [
+        ('flightlog: student', latest_sessions_queryset(10, LOG_SOURCES, student_id=SAMPLE_PERSON_ID)),
+        ('flightlog: instructor', latest_sessions_queryset(10, LOG_SOURCES, instructor_id=SAMPLE_PERSON_ID)),
+        ('flightlog: staff', latest_sessions_queryset(10, LOG_SOURCES)),
+        (
+            'load more: student',
+            SessionLedgerEntry.objects.filter(
+                source_model=SessionLedgerEntry.SOURCE_0_100,
+                student_id=SAMPLE_PERSON_ID,
+            ).order_by('-session_date', '-source_id')[:20],
+        ),
+        (
+            'load more: instructor',
+            SessionLedgerEntry.objects.filter(
+                source_model=SessionLedgerEntry.SOURCE_0_100,
+                instructor_id=SAMPLE_PERSON_ID,
+            ).order_by('-session_date', '-source_id')[:20],
+        ),
+        (
+            'load more: staff page',
+            after_cursor(
+                SessionLedgerEntry.objects.filter(source_model=SessionLedgerEntry.SOURCE_0_100),
+                SAMPLE_END_DATE,
+                SAMPLE_PERSON_ID,
+            ).order_by('-session_date', '-source_id')[:20],
+        ),
+        (
+            'user stats',
+            FlightStatsRollup.objects.filter(
+                role=FlightStatsRollup.ROLE_STUDENT,
+                person_id=SAMPLE_PERSON_ID,
+            ).select_related('aircraft'),
+        ),
+        (
+            'aircraft stats',
+            FlightStatsRollup.objects.filter(
+                role=FlightStatsRollup.ROLE_AIRCRAFT,
+                person_id=0,
+                aircraft_id=SAMPLE_AIRCRAFT_ID,
+            ),
+        ),
+        (
+            'production report',
+            SessionLedgerEntry.objects.filter(
+                session_date__range=(SAMPLE_START_DATE, SAMPLE_END_DATE),
+            ),
+        ),
+        (
+            'flight reports: aircraft',
+            FlightReport.objects.filter(aircraft_id=SAMPLE_AIRCRAFT_ID).order_by('-flight_date')[:50],
+        ),
+        (
+            'flight reports: date range',
+            FlightReport.objects.filter(flight_date__range=(SAMPLE_START_DATE, SAMPLE_END_DATE)),
+        ),
+        (
+            'external evaluations: student',
+            ExternalFlightEvaluation.objects.filter(student_id=SAMPLE_PERSON_ID),
+        ),
+    ]
+
+    for model in TRAINING_MODELS:
+        label = model._meta.model_name
+        shapes += [
+            (
+                f'{label}: aura pending',
+                model.objects.filter(aura_processed=False).order_by('session_date', 'id'),
+            ),
+            (
+                f'{label}: aura pending for student',
+                model.objects.filter(
+                    aura_processed=False,
+                    student_id=SAMPLE_PERSON_ID,
+                ).order_by('session_date', 'id'),
+            ),
+            (
+                f'{label}: student evaluations',
+                model.objects.filter(student_id=SAMPLE_PERSON_ID).order_by('-session_date'),
+            ),
+            (
+                f'{label}: instructor evaluations',
+                model.objects.filter(instructor_id=SAMPLE_PERSON_ID).order_by('-session_date'),
+            ),
+        ]
+
+    for model in FLIGHT_MODELS:
+        label = model._meta.model_name
+        shapes += [
+            (
+                f'{label}: fuel date range',
+                model.objects.filter(session_date__range=(SAMPLE_START_DATE, SAMPLE_END_DATE)),
+            ),
+            (
+                f'{label}: aircraft flights',
+                model.objects.filter(aircraft_id=SAMPLE_AIRCRAFT_ID).order_by('-session_date')[:50],
+            ),
+        ]
+
+    return shapes
+
+
+def find_sequential_scans(plan, vendor):
+    """Return the tables read with a full sequential scan in an EXPLAIN plan."""
+
+    if vendor == 'postgresql':
+        return POSTGRES_SEQ_SCAN.findall(plan)
+
+    # Co-routines and materialized subqueries are scanned by name, not read from disk.
+    derived = set(SQLITE_DERIVED.findall(plan))
+    tables = []
+    for line in plan.splitlines():
+        match = SQLITE_SCAN.search(line)
+        if not match:
+            continue
+        table, rest = match.groups()
+        if table.startswith('(') or table in derived or table == 'CONSTANT' or 'USING' in rest:
+            continue
+        tables.append(table)
+    return tables
+
+
+def explain(queryset):
+    """Return the EXPLAIN output of a queryset as text.
+
+    The SQL is explained through a cursor rather than ``QuerySet.explain()``,
+    which cannot wrap the subquery Django emits when filtering on a window
+    function.
+    """
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+        rows = cursor.fetchall()
+    # PostgreSQL returns one text column; SQLite returns (id, parent, notused, detail).
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+def explain_query_shapes(shapes=None):
+    """Run every query shape through EXPLAIN and collect the sequential scans found."""
+
+    vendor = connection.vendor
+    if vendor not in ('postgresql', 'sqlite'):
+        raise NotImplementedError(f'EXPLAIN analysis is not supported on {vendor}.')
+
+    results = []
+    with transaction.atomic():
+        if vendor == 'postgresql':
+            # Small tables make the planner prefer sequential scans; disabling them
+            # only for this transaction reports whether a usable index exists.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for name, queryset in shapes or query_shapes():
+            plan = explain(queryset)
+            results.append(QueryPlan(name, plan, find_sequential_scans(plan, vendor)))
+    return results
@@ -0,0 +1,169 @@
+"""
+Daily production rollup.
+
+DailyProductionRollup keeps one row per date, source, aircraft or simulator,
+instructor and student with the sessions, hours, fuel and money those
+sessions produced at their rate snapshots. ``record_session`` and
+``forget_session`` move every ledger change into it with apply_daily_change(),
+so the production and fuel reports add up a few rows per day whatever range
+they are asked for. rebuild_daily_rollups() recomputes it from the ledger;
+see the ``backfill_production_rollups`` management command.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Count, F, Sum
+from django.db.models.functions import Cast, Round
+
+from .models import DailyProductionRollup, SessionLedgerEntry
+
+
+KEY_FIELDS = (
+    'session_date',
+    'source_model',
+    'aircraft_registration',
+    'simulator_id',
+    'instructor_id',
+    'instructor_first_name',
+    'instructor_last_name',
+    'student_id',
+    'student_first_name',
+    'student_last_name',
+)
+TOTAL_FIELDS = (
+    'sessions',
+    'hours',
+    'fuel_consumed',
+    'fuel_cost',
+    'resource_income',
+    'instructor_cost',
+    'student_value',
+)
+
+
+def _normalized_key(values):
+    """Return the rollup key of a ledger entry or row, with 0 and '' for missing values."""
+    key = {}
+    for name in KEY_FIELDS:
+        value = values[name]
+        if name.endswith('_id'):
+            value = value or 0
+        elif name != 'session_date':
+            value = value or ''
+        key[name] = value
+    return tuple(key.items())
+
+
+def rollup_key(entry):
+    """Return the ``((field, value), ...)`` key of the rollup row a ledger entry counts towards."""
+    return _normalized_key({name: getattr(entry, name) for name in KEY_FIELDS})
+
+
+def rollup_totals(entry):
+    """Return what one ledger entry adds to each rollup total."""
+    hours = entry.hours or 0
+    fuel = entry.fuel_consumed or 0
+    return {
+        'sessions': 1,
+        'hours': hours,
+        'fuel_consumed': fuel,
+        'fuel_cost': fuel * (entry.fuel_rate_applied or 0),
+        'resource_income': hours * (entry.resource_rate_applied or 0),
+        'instructor_cost': hours * (entry.instructor_rate_applied or 0),
+        'student_value': hours * (entry.hourly_rate_applied or 0),
+    }
+
+
+def apply_daily_change(previous, current):
+    """
+    Move the contribution of a ledger entry from its previous to its current values.
+
+    ``previous`` is None for a new entry and ``current`` is None for a deleted
+    one. Rows left without sessions are deleted, so a range never reports an
+    empty day or a person who no longer has sessions in it.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(TOTAL_FIELDS, 0))
+    for entry, sign in ((previous, -1), (current, 1)):
+        if entry is None:
+            continue
+        delta = deltas[rollup_key(entry)]
+        for name, value in rollup_totals(entry).items():
+            delta[name] += sign * value
+
+    changed = {key: delta for key, delta in deltas.items() if any(delta.values())}
+    if not changed:
+        return
+
+    with transaction.atomic():
+        for key, delta in changed.items():
+            key = dict(key)
+            DailyProductionRollup.objects.get_or_create(**key)
+            # F() expressions keep concurrent updates of the same row from losing writes.
+            DailyProductionRollup.objects.filter(**key).update(
+                **{name: F(name) + value for name, value in delta.items() if value}
+            )
+            DailyProductionRollup.objects.filter(sessions=0, **key).delete()
+
+
+def _scaled(field_name, decimal_places):
+    return Cast(Round(F(field_name) * 10 ** decimal_places), BigIntegerField())
+
+
+def _ledger_sums():
+    """Return ``{total: (aggregate, decimal places)}`` of integer sums over ledger rows."""
+    hours = _scaled('hours', 1)
+    fuel = _scaled('fuel_consumed', 1)
+    return {
+        'sessions': (Count('id'), 0),
+        'hours': (Sum(hours), 1),
+        'fuel_consumed': (Sum(fuel), 1),
+        'fuel_cost': (Sum(fuel * _scaled('fuel_rate_applied', 2)), 3),
+        'resource_income': (Sum(hours * _scaled('resource_rate_applied', 2)), 3),
+        'instructor_cost': (Sum(hours * _scaled('instructor_rate_applied', 2)), 3),
+        'student_value': (Sum(hours * _scaled('hourly_rate_applied', 2)), 3),
+    }
+
+
+def rebuild_daily_rollups(start_date=None, end_date=None, batch_size=500):
+    """
+    Recompute the rollup rows of a date range (default: all) from the session ledger.
+
+    Returns the number of rows written. Sums are taken over integer tenths and
+    thousandths, so they are exact on every database.
+    """
+    ledger = SessionLedgerEntry.objects.order_by()
+    rollups = DailyProductionRollup.objects.all()
+    if start_date is not None:
+        ledger = ledger.filter(session_date__gte=start_date)
+        rollups = rollups.filter(session_date__gte=start_date)
+    if end_date is not None:
+        ledger = ledger.filter(session_date__lte=end_date)
+        rollups = rollups.filter(session_date__lte=end_date)
+
+    sums = _ledger_sums()
+    grouped = ledger.values(*KEY_FIELDS).annotate(
+        **{f'sum_{name}': aggregate for name, (aggregate, _places) in sums.items()}
+    )
+    # Missing ids and names become 0 and '', which can merge ledger groups.
+    totals = defaultdict(lambda: dict.fromkeys(sums, 0))
+    for row in grouped.iterator(chunk_size=batch_size):
+        total = totals[_normalized_key(row)]
+        for name in sums:
+            total[name] += row[f'sum_{name}'] or 0
+
+    rows = [
+        DailyProductionRollup(
+            **dict(key),
+            **{
+                name: Decimal(value).scaleb(-sums[name][1]) if sums[name][1] else value
+                for name, value in total.items()
+            },
+        )
+        for key, total in totals.items()
+    ]
+    with transaction.atomic():
+        rollups.delete()
+        DailyProductionRollup.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+FMS Evaluation PDF Worker for PythonAnywhere Always-On Task
+
+This script renders queued evaluation PDFs (see fms/pdf_jobs.py) into the PDF
+cache, so download requests only stream an already rendered file. Fonts and
+stylesheets are loaded once at startup (see config/pdf_renderer.py). Cached
+files that have not been rewritten for FMS_PDF_CACHE_MAX_AGE_DAYS are pruned
+once an hour.
+"""
+
+import os
+import sys
+import time
+
+import django
+from django.utils import timezone
+
+# Add Django project to Python path
+project_dir = os.path.dirname(os.path.abspath(__file__))
+django_dir = os.path.join(project_dir, "..", "..")
+sys.path.insert(0, django_dir)
+
+# Set Django environment
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+# Import Django settings and functions AFTER django.setup()
+from django.conf import settings  # noqa: E402
+from config.db_connections import close_stale_connections  # noqa: E402
+from config.pdf_renderer import warm_pdf_renderer  # noqa: E402
+from fms.pdf_jobs import process_pending_pdf_jobs, prune_pdf_cache  # noqa: E402
+
+POLL_SECONDS = 2
+PRUNE_EVERY_SECONDS = 3600
+
+
+def main_worker_loop(once: bool = False):
+    """
+    Main worker loop that continuously renders pending PDFs.
+    """
+    print("[{}] FMS PDF Worker started".format(timezone.now()))
+    warm_pdf_renderer()
+    last_prune = 0.0
+
+    while True:
+        try:
+            close_stale_connections()
+            rendered = process_pending_pdf_jobs()
+            if rendered:
+                print("[{}] Rendered {} PDF(s)".format(timezone.now(), rendered))
+
+            if time.monotonic() - last_prune >= PRUNE_EVERY_SECONDS:
+                removed = prune_pdf_cache(settings.FMS_PDF_CACHE_MAX_AGE_DAYS)
+                if removed:
+                    print("[{}] Pruned {} cached PDF(s)".format(timezone.now(), removed))
+                last_prune = time.monotonic()
+
+            if once:
+                break
+            time.sleep(POLL_SECONDS)
+        except KeyboardInterrupt:
+            print("[{}] FMS PDF Worker stopped by user".format(timezone.now()))
+            break
+        except Exception as e:
+            print("[{}] FMS PDF Worker error: {}".format(timezone.now(), str(e)))
+            if once:
+                break
+            time.sleep(30)
+
+
+if __name__ == "__main__":
+    main_worker_loop(once="--once" in sys.argv)
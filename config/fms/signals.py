@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from fleet.models import Aircraft
+from .ledger import SOURCE_MODELS, forget_session, record_session
+from .models import SessionLedgerEntry
+
+
+def update_session_ledger(sender, instance, raw=False, **kwargs):
+    """Keep the session ledger row in sync with a saved evaluation or report."""
+    if raw:
+        return
+    record_session(instance)
+
+
+def remove_from_session_ledger(sender, instance, **kwargs):
+    """Drop the session ledger row of a deleted evaluation or report."""
+    forget_session(instance)
+
+
+for _model in SOURCE_MODELS.values():
+    post_save.connect(update_session_ledger, sender=_model, dispatch_uid=f'session_ledger_save_{_model.__name__}')
+    post_delete.connect(remove_from_session_ledger, sender=_model, dispatch_uid=f'session_ledger_delete_{_model.__name__}')
+
+
+@receiver(post_save, sender=Aircraft)
+def refresh_ledger_registration(sender, instance, raw=False, **kwargs):
+    """Propagate registration changes to the denormalized ledger column."""
+    if raw:
+        return
+    SessionLedgerEntry.objects.filter(aircraft=instance).exclude(
+        aircraft_registration=instance.registration,
+    ).update(aircraft_registration=instance.registration)
@@ -1,41 +1,41 @@
 document.addEventListener('DOMContentLoaded', function() {
     const loadMoreButtons = document.querySelectorAll('.load-more-btn');
-    
+
     loadMoreButtons.forEach(button => {
         const flightList = button.previousElementSibling;
         const type = button.getAttribute('data-type');
         const role = button.getAttribute('data-role');
         const loadMoreUrl = button.getAttribute('data-url');
-        
-        // Count how many items are already displayed
-        const existingItems = flightList.querySelectorAll('.flight-item, a.flight-item').length;
-        let offset = existingItems;
+
+        // The server renders the cursor of the last displayed item, empty when nothing else remains
+        let cursor = button.getAttribute('data-cursor');
         let isLoading = false;
-        
-        // Check if we should show the button initially
-        checkIfMoreAvailable(button, type, role, offset, loadMoreUrl);
-        
+
+        // Show the button only if there are more flights after the initial page
+        if (cursor) {
+            button.style.display = 'block';
+        }
+
         button.addEventListener('click', function() {
-            if (isLoading) return;
-            
+            if (isLoading || !cursor) return;
+
             isLoading = true;
             button.textContent = 'Cargando...';
             button.disabled = true;
-            
-            fetch(`${loadMoreUrl}?type=${type}&role=${role}&offset=${offset}&limit=20`)
+
+            const params = new URLSearchParams({type: type, role: role, cursor: cursor, limit: 20});
+            fetch(`${loadMoreUrl}?${params.toString()}`)
                 .then(response => response.json())
                 .then(data => {
                     if (data.html) {
                         flightList.insertAdjacentHTML('beforeend', data.html);
-                        offset += data.loaded_count;
-                        
-                        if (data.has_more) {
-                            button.textContent = 'Cargar más';
-                            button.disabled = false;
-                            button.style.display = 'block';
-                        } else {
-                            button.style.display = 'none';
-                        }
+                    }
+                    cursor = data.next_cursor;
+
+                    if (data.has_more && cursor) {
+                        button.textContent = 'Cargar más';
+                        button.disabled = false;
+                        button.style.display = 'block';
                     } else {
                         button.style.display = 'none';
                     }
@@ -49,18 +49,4 @@ document.addEventListener('DOMContentLoaded', function() {
                 });
         });
     });
-    
-    function checkIfMoreAvailable(button, type, role, currentOffset, loadMoreUrl) {
-        fetch(`${loadMoreUrl}?type=${type}&role=${role}&offset=${currentOffset}&limit=1`)
-            .then(response => response.json())
-            .then(data => {
-                if (data.has_more) {
-                    button.style.display = 'block';
-                }
-            })
-            .catch(error => {
-                console.error('Error checking for more flights:', error);
-            });
-    }
 });
-
@@ -1,6 +1,10 @@
 // Get data from Django template variables via data attributes
 const pdfDataElement = document.getElementById('pdf-data');
 const pdfUrl = pdfDataElement.getAttribute('data-pdf-url');
+const statusUrl = pdfDataElement.getAttribute('data-status-url');
+const statusMessage = document.getElementById('pdf-status-message');
+
+const POLL_INTERVAL_MS = 1000;
 
 // Synthetic <a download> + programmatic .click() is not a user gesture on WebKit
 // (iOS/iPadOS; all browsers there use WebKit) and often does nothing. Top-level
@@ -9,9 +13,30 @@ const pdfUrl = pdfDataElement.getAttribute('data-pdf-url');
 // Run auto-navigation at most once per evaluation so "Back" from the PDF viewer
 // does not immediately trigger another download.
 const autoKey = 'fms-pdf-auto:' + pdfUrl;
-if (!sessionStorage.getItem(autoKey)) {
+
+function downloadOnce() {
+  if (sessionStorage.getItem(autoKey)) return;
   sessionStorage.setItem(autoKey, '1');
   requestAnimationFrame(function () {
     window.location.assign(pdfUrl);
   });
 }
+
+// The PDF is rendered by a background worker; poll until it is in the cache.
+function pollStatus() {
+  fetch(statusUrl, { headers: { 'Accept': 'application/json' } })
+    .then(response => response.json())
+    .then(data => {
+      if (data.ready) {
+        statusMessage.textContent = 'La planilla está lista. Si no se descarga sola, pulse el botón de abajo.';
+        downloadOnce();
+      } else if (data.failed) {
+        statusMessage.textContent = 'No se pudo generar la planilla. Intente de nuevo más tarde.';
+      } else {
+        setTimeout(pollStatus, POLL_INTERVAL_MS);
+      }
+    })
+    .catch(() => setTimeout(pollStatus, POLL_INTERVAL_MS * 3));
+}
+
+pollStatus();
@@ -0,0 +1,131 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from .models import FlightStatsRollup, SessionLedgerEntry
+
+
+# Sources counted per person; aircraft totals also include flight reports.
+PERSON_SOURCES = SessionLedgerEntry.TRAINING_FLIGHT_SOURCES
+AIRCRAFT_SOURCES = SessionLedgerEntry.TRAINING_FLIGHT_SOURCES + (SessionLedgerEntry.SOURCE_REPORT,)
+
+LITERS_PER_GALLON = Decimal('3.78541')
+
+
+def rollup_keys(entry):
+    """Return the ``(role, person_id, aircraft_id)`` rollup rows a ledger entry counts towards."""
+    if entry is None or entry.aircraft_id is None:
+        return []
+
+    keys = []
+    if entry.source_model in AIRCRAFT_SOURCES:
+        keys.append((FlightStatsRollup.ROLE_AIRCRAFT, 0, entry.aircraft_id))
+    if entry.source_model in PERSON_SOURCES:
+        if entry.student_id:
+            keys.append((FlightStatsRollup.ROLE_STUDENT, entry.student_id, entry.aircraft_id))
+        if entry.instructor_id:
+            keys.append((FlightStatsRollup.ROLE_INSTRUCTOR, entry.instructor_id, entry.aircraft_id))
+    return keys
+
+
+def apply_ledger_change(previous, current):
+    """
+    Move the contribution of a ledger entry from its previous to its current values.
+
+    ``previous`` is None for a new entry and ``current`` is None for a deleted
+    one. Only the rollup rows whose totals actually change are written.
+    """
+    deltas = defaultdict(lambda: [0, Decimal('0.0'), Decimal('0.0')])
+    for entry, sign in ((previous, -1), (current, 1)):
+        for key in rollup_keys(entry):
+            delta = deltas[key]
+            delta[0] += sign
+            delta[1] += sign * (entry.hours or 0)
+            delta[2] += sign * (entry.fuel_consumed or 0)
+
+    changed = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not changed:
+        return
+
+    with transaction.atomic():
+        for (role, person_id, aircraft_id), (sessions, hours, fuel) in changed.items():
+            FlightStatsRollup.objects.get_or_create(
+                role=role,
+                person_id=person_id,
+                aircraft_id=aircraft_id,
+            )
+            # F() expressions keep concurrent updates of the same row from losing writes.
+            FlightStatsRollup.objects.filter(
+                role=role,
+                person_id=person_id,
+                aircraft_id=aircraft_id,
+            ).update(
+                sessions=F('sessions') + sessions,
+                hours=F('hours') + hours,
+                fuel_consumed=F('fuel_consumed') + fuel,
+            )
+
+
+def rebuild_flight_stats():
+    """Recompute every rollup row from the session ledger and return the row count."""
+    grouped = [
+        (FlightStatsRollup.ROLE_STUDENT, 'student_id', PERSON_SOURCES),
+        (FlightStatsRollup.ROLE_INSTRUCTOR, 'instructor_id', PERSON_SOURCES),
+        (FlightStatsRollup.ROLE_AIRCRAFT, None, AIRCRAFT_SOURCES),
+    ]
+
+    rows = []
+    for role, person_field, sources in grouped:
+        queryset = SessionLedgerEntry.objects.filter(
+            source_model__in=sources,
+            aircraft__isnull=False,
+        )
+        group_by = ['aircraft_id']
+        if person_field:
+            queryset = queryset.filter(**{f'{person_field}__isnull': False}).exclude(**{person_field: 0})
+            group_by.append(person_field)
+
+        totals = queryset.values(*group_by).annotate(
+            total_sessions=Count('id'),
+            total_hours=Sum('hours'),
+            total_fuel=Sum('fuel_consumed'),
+        ).order_by()
+        for row in totals:
+            rows.append(FlightStatsRollup(
+                role=role,
+                person_id=row[person_field] if person_field else 0,
+                aircraft_id=row['aircraft_id'],
+                sessions=row['total_sessions'],
+                hours=row['total_hours'] or Decimal('0.0'),
+                fuel_consumed=row['total_fuel'] or Decimal('0.0'),
+            ))
+
+    with transaction.atomic():
+        FlightStatsRollup.objects.all().delete()
+        FlightStatsRollup.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def aircraft_cost_stats(hours, fuel_liters, hourly_rate, fuel_cost):
+    """Derive the cost and fuel-flow figures shown on the statistics pages."""
+    hours = hours or Decimal('0.0')
+    fuel_liters = fuel_liters or Decimal('0.0')
+    fuel_gallons = fuel_liters / LITERS_PER_GALLON if fuel_liters > 0 else Decimal('0.0')
+
+    hours_dollars = hours * hourly_rate
+    fuel_dollars = fuel_liters * fuel_cost
+    total_cost = hours_dollars + fuel_dollars
+
+    return {
+        'total_flight_hours': hours,
+        'total_consumed_liters': fuel_liters,
+        'total_consumed_gallons': fuel_gallons,
+        'total_flight_hours_dollars': hours_dollars,
+        'total_fuel_cost': fuel_dollars,
+        'total_cost': total_cost,
+        'fuel_rate_liters': fuel_liters / hours if hours > 0 else Decimal('0.0'),
+        'fuel_rate_gallons': fuel_gallons / hours if hours > 0 else Decimal('0.0'),
+        'flight_hour_cost': total_cost / hours if hours > 0 else Decimal('0.0'),
+    }
@@ -220,7 +220,7 @@ class FlightEvaluationAccountingTests(TestCase):
         )
         self.assertTrue(form.is_valid(), msg=form.errors.as_json())
 
-        with patch.object(Aircraft, 'save', side_effect=DatabaseError('fleet update failed')):
+        with patch('transactions.balances.adjust_aircraft_hours', side_effect=DatabaseError('fleet update failed')):
             with self.assertRaises(DatabaseError):
                 form.save()
 
@@ -318,7 +318,7 @@ class FlightEvaluationAccountingTests(TestCase):
         evaluation.fuel_consumed = Decimal('7.0')
         model_admin = admin.site._registry[type(evaluation)]
 
-        with patch.object(Aircraft, 'save', side_effect=DatabaseError('fleet update failed')):
+        with patch('transactions.balances.adjust_aircraft_hours', side_effect=DatabaseError('fleet update failed')):
             with self.assertRaises(DatabaseError):
                 model_admin.save_model(None, evaluation, None, True)
 
@@ -0,0 +1,115 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from fleet.models import Aircraft
+from fms.models import FlightEvaluation100_120, FlightReport, FlightStatsRollup
+from fms.views import calculate_aircraft_stats, calculate_user_stats
+
+from .test_session_ledger import LedgerFixtures
+
+
+class FlightStatsRollupTests(LedgerFixtures, TestCase):
+    def rollup(self, role, person_id, aircraft=None):
+        return FlightStatsRollup.objects.get(role=role, person_id=person_id, aircraft=aircraft or self.aircraft)
+
+    def snapshot(self):
+        return sorted(
+            FlightStatsRollup.objects.values_list('role', 'person_id', 'aircraft_id', 'sessions', 'hours', 'fuel_consumed')
+        )
+
+    def create_report(self, **overrides):
+        values = {
+            'pilot_id': 3000001,
+            'pilot_license_number': 3000001,
+            'flight_date': date(2026, 6, 12),
+            'flight_hours': Decimal('1.0'),
+            'fuel_consumed': Decimal('3.0'),
+            'aircraft': self.aircraft,
+        }
+        values.update(overrides)
+        return FlightReport.objects.create(**values)
+
+    def test_evaluations_and_reports_update_the_rollup(self):
+        self.create_flight()
+        self.create_flight(model=FlightEvaluation100_120, session_flight_hours=Decimal('1.0'))
+        self.create_report()
+        self.create_sim()
+
+        student = self.rollup(FlightStatsRollup.ROLE_STUDENT, self.student.national_id)
+        self.assertEqual((student.sessions, student.hours, student.fuel_consumed), (2, Decimal('2.5'), Decimal('40.0')))
+        instructor = self.rollup(FlightStatsRollup.ROLE_INSTRUCTOR, self.instructor.national_id)
+        self.assertEqual(instructor.hours, Decimal('2.5'))
+        aircraft = self.rollup(FlightStatsRollup.ROLE_AIRCRAFT, 0)
+        self.assertEqual((aircraft.sessions, aircraft.hours, aircraft.fuel_consumed), (3, Decimal('3.5'), Decimal('43.0')))
+
+    def test_updates_deletes_and_aircraft_changes_move_the_totals(self):
+        other = Aircraft.objects.create(
+            manufacturer='Cessna',
+            model='172',
+            registration='YV-OTRO',
+            serial_number='OTRO-001',
+            year_manufactured=1990,
+            hourly_rate=Decimal('150.0'),
+            fuel_cost=Decimal('5.00'),
+            total_hours=Decimal('500.0'),
+        )
+        evaluation = self.create_flight()
+        evaluation.session_flight_hours = Decimal('2.0')
+        evaluation.save()
+        self.assertEqual(self.rollup(FlightStatsRollup.ROLE_STUDENT, self.student.national_id).hours, Decimal('2.0'))
+
+        evaluation.aircraft = other
+        evaluation.save()
+        self.assertEqual(self.rollup(FlightStatsRollup.ROLE_STUDENT, self.student.national_id).sessions, 0)
+        self.assertEqual(self.rollup(FlightStatsRollup.ROLE_STUDENT, self.student.national_id, other).hours, Decimal('2.0'))
+
+        evaluation.delete()
+        self.assertEqual(self.rollup(FlightStatsRollup.ROLE_AIRCRAFT, 0, other).hours, Decimal('0.0'))
+
+    def test_rebuild_matches_the_incremental_totals(self):
+        self.create_flight()
+        self.create_flight(session_flight_hours=Decimal('0.8'), fuel_consumed=Decimal('11.0'))
+        self.create_report()
+        incremental = [row for row in self.snapshot() if row[3]]
+
+        FlightStatsRollup.objects.all().delete()
+        output = StringIO()
+        call_command('rebuild_flight_stats', stdout=output)
+
+        self.assertIn('Flight statistics rows: 3', output.getvalue())
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_user_and_aircraft_stats_cover_any_aircraft(self):
+        self.create_flight()
+        self.create_report()
+
+        stats = calculate_user_stats(self.instructor.national_id, 'instructor', Decimal('20.0'))
+        self.assertEqual([row['registration'] for row in stats['aircraft']], ['YV-LEDG'])
+        self.assertEqual(stats['total_flight_hours_dollars'], Decimal('195.00'))
+        self.assertEqual(stats['total_fuel_cost'], Decimal('80.000'))
+        self.assertEqual(stats['total_paid_to_instructor'], Decimal('30.00'))
+
+        aircraft_stats = calculate_aircraft_stats(self.aircraft.id)
+        self.assertEqual(aircraft_stats['total_flight_hours'], Decimal('2.5'))
+        self.assertEqual(aircraft_stats['total_consumed_liters'], Decimal('23.0'))
+
+    def test_student_stats_page_reads_a_constant_number_of_queries(self):
+        self.client.force_login(self.student)
+        self.create_flight()
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get(reverse('fms:student_stats_page'))
+        self.assertContains(response, 'Estadísticas YV-LEDG')
+
+        for day in range(1, 6):
+            self.create_flight(session_date=date(2026, 7, day))
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(reverse('fms:student_stats_page'))
+
+        self.assertEqual(len(many), len(few))
@@ -0,0 +1,176 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from config import pdf_renderer
+from fms.models import PdfRenderJob
+from fms.pdf_jobs import (
+    cached_pdf,
+    evaluation_cache_key,
+    process_pending_pdf_jobs,
+    prune_pdf_cache,
+    request_evaluation_pdf,
+    store_pdf,
+)
+
+from .test_session_ledger import LedgerFixtures
+
+
+FAKE_PDF = b'%PDF-1.4 fake'
+
+
+class EvaluationPdfCacheTests(LedgerFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        settings_override = override_settings(FMS_PDF_CACHE_DIR=self.cache_dir, FMS_PDF_INLINE_AFTER_SECONDS=15)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        render = mock.patch('fms.pdf_jobs.render_evaluation_pdf', return_value=FAKE_PDF)
+        self.render = render.start()
+        self.addCleanup(render.stop)
+
+        self.evaluation = self.create_flight()
+        self.client.force_login(self.instructor)
+
+    def download_url(self):
+        return reverse('fms:download_pdf', args=['0_100', self.evaluation.pk])
+
+    def status_url(self):
+        return reverse('fms:pdf_status', args=['0_100', self.evaluation.pk])
+
+    def test_cache_key_changes_when_the_evaluation_is_saved(self):
+        before = evaluation_cache_key('0_100', self.evaluation)
+        self.evaluation.comments = 'Corregido'
+        self.evaluation.save()
+
+        self.assertNotEqual(evaluation_cache_key('0_100', self.evaluation), before)
+        self.assertNotEqual(evaluation_cache_key('sim', self.evaluation), before)
+
+    def test_download_waits_for_the_worker_then_serves_the_cached_file(self):
+        response = self.client.get(self.download_url())
+        self.assertRedirects(
+            response,
+            reverse('fms:pdf_download_waiting_page', args=['0_100', self.evaluation.pk]),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(self.client.get(self.status_url()).json(), {'ready': False, 'failed': False})
+        self.render.assert_not_called()
+
+        self.assertEqual(process_pending_pdf_jobs(), 1)
+        self.assertEqual(self.client.get(self.status_url()).json(), {'ready': True, 'failed': False})
+
+        response = self.client.get(self.download_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), FAKE_PDF)
+        self.assertIn('attachment', response['Content-Disposition'])
+
+        # Further downloads of the same version never render again.
+        self.client.get(self.download_url()).close()
+        self.assertEqual(process_pending_pdf_jobs(), 0)
+        self.render.assert_called_once()
+
+    def test_editing_the_evaluation_queues_a_new_render(self):
+        request_evaluation_pdf('0_100', self.evaluation)
+        process_pending_pdf_jobs()
+
+        self.evaluation.comments = 'Corregido'
+        self.evaluation.save()
+        response = self.client.get(self.download_url())
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(process_pending_pdf_jobs(), 1)
+        self.assertEqual(PdfRenderJob.objects.count(), 2)
+
+    def test_status_renders_inline_when_no_worker_claims_the_job(self):
+        job = request_evaluation_pdf('0_100', self.evaluation)
+        PdfRenderJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(seconds=30))
+
+        self.assertEqual(self.client.get(self.status_url()).json(), {'ready': True, 'failed': False})
+        self.assertIsNotNone(cached_pdf(job.cache_key))
+
+    def test_failed_render_is_reported_and_retried_from_the_waiting_page(self):
+        self.render.side_effect = RuntimeError('fuente no disponible')
+        job = request_evaluation_pdf('0_100', self.evaluation)
+
+        self.assertEqual(process_pending_pdf_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (PdfRenderJob.STATUS_FAILED, 'fuente no disponible'))
+        self.assertEqual(self.client.get(self.status_url()).json(), {'ready': False, 'failed': True})
+
+        self.render.side_effect = None
+        self.client.get(reverse('fms:pdf_download_waiting_page', args=['0_100', self.evaluation.pk]))
+        self.assertEqual(process_pending_pdf_jobs(), 1)
+
+    def test_claimed_job_is_rendered_once(self):
+        job = request_evaluation_pdf('0_100', self.evaluation)
+        PdfRenderJob.objects.filter(pk=job.pk).update(status=PdfRenderJob.STATUS_RENDERING)
+
+        self.assertEqual(process_pending_pdf_jobs(), 0)
+        self.render.assert_not_called()
+
+    def test_prune_drops_old_files_and_their_jobs(self):
+        job = request_evaluation_pdf('0_100', self.evaluation)
+        process_pending_pdf_jobs()
+
+        self.assertEqual(prune_pdf_cache(max_age_days=1), 0)
+        with mock.patch('fms.pdf_jobs.timezone.now', return_value=timezone.now() + timedelta(days=2)):
+            self.assertEqual(prune_pdf_cache(max_age_days=1), 1)
+        self.assertIsNone(cached_pdf(job.cache_key))
+        self.assertFalse(PdfRenderJob.objects.filter(pk=job.pk).exists())
+
+    def test_existing_file_marks_a_new_job_ready(self):
+        store_pdf(evaluation_cache_key('0_100', self.evaluation), FAKE_PDF)
+
+        job = request_evaluation_pdf('0_100', self.evaluation)
+
+        self.assertEqual(job.status, PdfRenderJob.STATUS_READY)
+
+
+class SharedPdfRendererTests(SimpleTestCase):
+    def setUp(self):
+        pdf_renderer.reset_pdf_renderer()
+        self.addCleanup(pdf_renderer.reset_pdf_renderer)
+
+    def test_stylesheets_are_compiled_once_per_process(self):
+        with mock.patch.object(pdf_renderer.weasyprint, 'CSS', wraps=pdf_renderer.weasyprint.CSS) as css:
+            pdf_renderer.warm_pdf_renderer()
+            first = pdf_renderer.stylesheet('fms/pdf.css')
+            second = pdf_renderer.stylesheet('fms/pdf.css')
+
+        self.assertIs(first, second)
+        self.assertEqual(css.call_count, len(pdf_renderer.PDF_STYLESHEETS))
+        for call in css.call_args_list:
+            self.assertIs(call.kwargs['font_config'], pdf_renderer.font_config())
+        self.assertIsNone(pdf_renderer.stylesheet('fms/missing.css'))
+
+    def test_logo_is_inlined_as_a_data_uri(self):
+        logo = pdf_renderer.logo_data_uri('fms/img/evaluation_logo.png')
+
+        self.assertTrue(logo.startswith('data:image/png;base64,'))
+        self.assertIs(pdf_renderer.logo_data_uri('fms/img/evaluation_logo.png'), logo)
+        self.assertEqual(pdf_renderer.logo_data_uri('fms/img/missing.png'), '')
+
+    def test_render_uses_the_shared_fonts_and_stylesheets(self):
+        css = pdf_renderer.stylesheet('sms/pdf_vhr.css')
+        with mock.patch.object(pdf_renderer.weasyprint, 'HTML') as html:
+            html.return_value.write_pdf.return_value = FAKE_PDF
+            pdf = pdf_renderer.render_pdf('fms/pdf_download.html', {}, stylesheets=[css])
+
+        self.assertEqual(pdf, FAKE_PDF)
+        html.return_value.write_pdf.assert_called_once_with(
+            stylesheets=[css],
+            font_config=pdf_renderer.font_config(),
+        )
+
+    def test_forked_process_loads_its_own_fonts(self):
+        fonts = pdf_renderer.font_config()
+        with mock.patch('config.pdf_renderer.os.getpid', return_value=-1):
+            self.assertIsNot(pdf_renderer.font_config(), fonts)
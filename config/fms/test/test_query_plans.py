@@ -0,0 +1,61 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from fms.models import SimEvaluation
+from fms.query_plans import explain_query_shapes, find_sequential_scans
+
+
+class FindSequentialScansTests(TestCase):
+    def test_postgres_seq_scans_are_reported(self):
+        plan = (
+            'Limit  (cost=0.00..1.10 rows=10 width=8)\n'
+            '  ->  Seq Scan on fms_simevaluation  (cost=0.00..11.00 rows=100 width=8)\n'
+            '        Filter: (student_id = 1)'
+        )
+
+        self.assertEqual(find_sequential_scans(plan, 'postgresql'), ['fms_simevaluation'])
+
+    def test_postgres_index_scans_are_not_reported(self):
+        plan = 'Index Scan using fms_sim_student_idx on fms_simevaluation  (cost=0.15..8.17 rows=1 width=8)'
+
+        self.assertEqual(find_sequential_scans(plan, 'postgresql'), [])
+
+    def test_sqlite_table_scans_are_reported(self):
+        plan = 'SCAN fms_simevaluation\nUSE TEMP B-TREE FOR ORDER BY'
+
+        self.assertEqual(find_sequential_scans(plan, 'sqlite'), ['fms_simevaluation'])
+
+    def test_sqlite_index_and_subquery_scans_are_not_reported(self):
+        plan = (
+            'CO-ROUTINE qualify\n'
+            'SEARCH fms_sessionledgerentry USING INDEX fms_ledger_student_idx (student_id=?)\n'
+            'SCAN fms_simevaluation USING INDEX fms_sim_aura_idx\n'
+            'SCAN (subquery-3)\n'
+            'SCAN qualify'
+        )
+
+        self.assertEqual(find_sequential_scans(plan, 'sqlite'), [])
+
+
+class ExplainFmsQueriesCommandTests(TestCase):
+    def test_every_query_shape_uses_an_index(self):
+        flagged = [result.name for result in explain_query_shapes() if result.sequential_scans]
+
+        self.assertEqual(flagged, [])
+
+    def test_unindexed_shape_is_flagged(self):
+        shapes = [('sim by comments', SimEvaluation.objects.filter(comments='x'))]
+
+        results = explain_query_shapes(shapes)
+
+        self.assertEqual(results[0].sequential_scans, ['fms_simevaluation'])
+
+    def test_command_reports_every_query(self):
+        output = StringIO()
+
+        call_command('explain_fms_queries', '--fail-on-seq-scan', stdout=output)
+
+        self.assertIn('sequential scans: 0', output.getvalue())
+        self.assertIn('OK        flightlog: student', output.getvalue())
@@ -0,0 +1,269 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import InstructorProfile
+from fleet.models import Aircraft, Simulator
+from fms.ledger import latest_sessions_by_source, rebuild_session_ledger, record_session
+from fms.models import (
+    DailyProductionRollup,
+    FlightEvaluation0_100,
+    FlightEvaluation120_170,
+    FlightReport,
+    FlightStatsRollup,
+    SessionLedgerEntry,
+    SimEvaluation,
+)
+
+from .factories import StudentProfileFactory, UserFactory
+
+
+class LedgerFixtures:
+    """Student, instructor, aircraft and simulator shared by the ledger-backed tests."""
+
+    def setUp(self):
+        self.student = UserFactory(role='STUDENT')
+        StudentProfileFactory(user=self.student, balance=Decimal('1000.00'))
+        self.instructor = UserFactory(role='INSTRUCTOR')
+        InstructorProfile.objects.create(
+            user=self.instructor,
+            instructor_type='DUAL',
+            instructor_license_type='PCA',
+            flight_instructor_hourly_rate=Decimal('20.0'),
+            sim_instructor_hourly_rate=Decimal('15.0'),
+        )
+        self.aircraft = Aircraft.objects.create(
+            manufacturer='Piper',
+            model='PA-28',
+            registration='YV-LEDG',
+            serial_number='LEDG-001',
+            year_manufactured=1980,
+            hourly_rate=Decimal('130.0'),
+            fuel_cost=Decimal('4.00'),
+            total_hours=Decimal('1000.0'),
+        )
+        self.simulator, _ = Simulator.objects.get_or_create(name='FPT')
+
+    def people(self):
+        return {
+            'student_id': self.student.national_id,
+            'student_first_name': self.student.first_name,
+            'student_last_name': self.student.last_name,
+            'student_license_type': 'PPA',
+            'student_license_number': self.student.national_id,
+            'instructor_id': self.instructor.national_id,
+            'instructor_first_name': self.instructor.first_name,
+            'instructor_last_name': self.instructor.last_name,
+            'instructor_license_number': self.instructor.national_id,
+        }
+
+    def create_flight(self, model=FlightEvaluation0_100, **overrides):
+        values = {
+            **self.people(),
+            'session_date': date(2026, 6, 10),
+            'session_flight_hours': Decimal('1.5'),
+            'fuel_consumed': Decimal('20.0'),
+            'aircraft': self.aircraft,
+        }
+        values.update(overrides)
+        return model.objects.create(**values)
+
+    def create_sim(self, **overrides):
+        values = {
+            **self.people(),
+            'session_date': date(2026, 6, 11),
+            'session_sim_hours': Decimal('2.0'),
+            'simulator': self.simulator,
+        }
+        values.update(overrides)
+        return SimEvaluation.objects.create(**values)
+
+
+class SessionLedgerTests(LedgerFixtures, TestCase):
+    def test_saving_an_evaluation_records_a_ledger_row(self):
+        evaluation = self.create_flight()
+
+        entry = SessionLedgerEntry.objects.get(source_model='0_100', source_id=evaluation.pk)
+        self.assertEqual(entry.student_id, self.student.national_id)
+        self.assertEqual(entry.instructor_id, self.instructor.national_id)
+        self.assertEqual(entry.aircraft_registration, 'YV-LEDG')
+        self.assertEqual(entry.hours, Decimal('1.5'))
+        self.assertEqual(entry.fuel_consumed, Decimal('20.0'))
+        self.assertEqual(entry.resource_rate_applied, Decimal('130.00'))
+        self.assertEqual(entry.instructor_rate_applied, Decimal('20.00'))
+
+    def test_updating_and_deleting_keep_the_ledger_in_sync(self):
+        evaluation = self.create_flight()
+        evaluation.fuel_consumed = Decimal('25.0')
+        evaluation.save()
+
+        entry = SessionLedgerEntry.objects.get(source_model='0_100', source_id=evaluation.pk)
+        self.assertEqual(entry.fuel_consumed, Decimal('25.0'))
+
+        evaluation.delete()
+        self.assertFalse(SessionLedgerEntry.objects.exists())
+
+    def test_simulator_sessions_and_reports_are_recorded(self):
+        sim = self.create_sim()
+        report = FlightReport.objects.create(
+            pilot_id=3000001,
+            pilot_license_number=3000001,
+            flight_date=date(2026, 6, 12),
+            flight_hours=Decimal('1.0'),
+            fuel_consumed=Decimal('3.0'),
+            aircraft=self.aircraft,
+        )
+
+        sim_entry = SessionLedgerEntry.objects.get(source_model='sim', source_id=sim.pk)
+        self.assertEqual(sim_entry.simulator, self.simulator)
+        self.assertEqual(sim_entry.hours, Decimal('2.0'))
+        report_entry = SessionLedgerEntry.objects.get(source_model='report', source_id=report.pk)
+        self.assertIsNone(report_entry.student_id)
+        self.assertEqual(report_entry.session_date, date(2026, 6, 12))
+
+    def test_a_row_recorded_concurrently_is_not_counted_twice(self):
+        evaluation = self.create_flight()
+
+        def rollups():
+            return (
+                list(FlightStatsRollup.objects.order_by('pk').values()),
+                list(DailyProductionRollup.objects.order_by('pk').values()),
+            )
+
+        before = rollups()
+        real_first = QuerySet.first
+        lookups = []
+
+        def miss_first_lookup(queryset):
+            # Another transaction inserts the row right after this one looked for it.
+            lookups.append(queryset)
+            return None if len(lookups) == 1 else real_first(queryset)
+
+        with mock.patch.object(QuerySet, 'first', miss_first_lookup):
+            record_session(evaluation)
+
+        self.assertEqual(SessionLedgerEntry.objects.count(), 1)
+        self.assertEqual(rollups(), before)
+
+    def test_aircraft_registration_changes_reach_the_ledger(self):
+        self.create_flight()
+        self.aircraft.registration = 'YV-NEW'
+        self.aircraft.save()
+
+        self.assertEqual(
+            SessionLedgerEntry.objects.get().aircraft_registration,
+            'YV-NEW',
+        )
+
+    def test_latest_sessions_are_limited_per_source_in_one_query(self):
+        for day in range(1, 5):
+            self.create_flight(session_date=date(2026, 6, day))
+            self.create_sim(session_date=date(2026, 6, day))
+        self.create_flight(FlightEvaluation120_170, session_date=date(2026, 6, 1))
+
+        with CaptureQueriesContext(connection) as queries:
+            latest = latest_sessions_by_source(2, student_id=self.student.national_id)
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            [entry.session_date.day for entry in latest['0_100']],
+            [4, 3],
+        )
+        self.assertEqual(len(latest['sim']), 2)
+        self.assertEqual(len(latest['120_170']), 1)
+        self.assertEqual(latest['100_120'], [])
+
+    def test_flightlog_and_load_more_read_the_ledger(self):
+        evaluation = self.create_flight()
+        self.client.force_login(self.student)
+
+        response = self.client.get(reverse('fms:student_flightlog'))
+        self.assertEqual(
+            [entry.source_id for entry in response.context['latest_flight_0_100']],
+            [evaluation.pk],
+        )
+
+        response = self.client.get(
+            reverse('fms:load_more_flights'),
+            {'type': '0_100', 'role': 'student', 'limit': 20},
+        )
+        data = response.json()
+        self.assertEqual(data['total_count'], 1)
+        self.assertIn(
+            reverse('fms:session_detail', args=['0_100', evaluation.pk]),
+            data['html'],
+        )
+
+    def test_rebuild_restores_missing_rows(self):
+        self.create_flight()
+        self.create_sim()
+        SessionLedgerEntry.objects.all().delete()
+
+        self.assertEqual(rebuild_session_ledger(batch_size=1), 2)
+
+        output = StringIO()
+        call_command('rebuild_session_ledger', stdout=output)
+        self.assertIn('Session ledger rows: 2', output.getvalue())
+        self.assertEqual(SessionLedgerEntry.objects.count(), 2)
+
+    def test_load_more_walks_every_page_with_a_cursor(self):
+        # Two sessions per day so the cursor must break ties on the id.
+        evaluations = [
+            self.create_flight(session_date=date(2026, 6, 1 + index // 2))
+            for index in range(25)
+        ]
+        expected = [
+            evaluation.pk
+            for evaluation in sorted(
+                evaluations,
+                key=lambda item: (item.session_date, item.pk),
+                reverse=True,
+            )
+        ]
+        self.client.force_login(self.student)
+
+        response = self.client.get(reverse('fms:student_flightlog'))
+        seen = [entry.source_id for entry in response.context['latest_flight_0_100']]
+        cursor = response.context['next_cursors']['0_100']
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(response.context['next_cursors']['sim'], '')
+        self.assertContains(response, f'data-cursor="{cursor}"')
+
+        pages = 0
+        while cursor:
+            with CaptureQueriesContext(connection) as queries:
+                data = self.client.get(
+                    reverse('fms:load_more_flights'),
+                    {'type': '0_100', 'role': 'student', 'cursor': cursor, 'limit': 4},
+                ).json()
+            self.assertNotIn('total_count', data)
+            self.assertFalse(any('COUNT(' in query['sql'] for query in queries))
+            self.assertEqual(data['has_more'], data['next_cursor'] is not None)
+            seen += [
+                evaluation_id
+                for evaluation_id in expected
+                if reverse('fms:session_detail', args=['0_100', evaluation_id]) + '"' in data['html']
+            ]
+            cursor = data['next_cursor']
+            pages += 1
+
+        self.assertEqual(pages, 4)
+        self.assertEqual(seen, expected)
+
+    def test_load_more_rejects_a_malformed_cursor(self):
+        self.client.force_login(self.student)
+
+        response = self.client.get(
+            reverse('fms:load_more_flights'),
+            {'type': '0_100', 'role': 'student', 'cursor': 'not-a-cursor'},
+        )
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,67 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import StudentProfile
+
+from .factories import StudentProfileFactory, UserFactory
+
+
+class StudentListViewTests(TestCase):
+    def setUp(self):
+        self.viewer = UserFactory(username='viewer', role='INSTRUCTOR')
+        self.client.force_login(self.viewer)
+        self.ivan = StudentProfileFactory(
+            user=UserFactory(first_name='Iván', last_name='Pérez', username='iperez'),
+            student_phase=StudentProfile.FLYING,
+            balance=200,
+        )
+        self.ana = StudentProfileFactory(
+            user=UserFactory(first_name='Ana', last_name='Gómez', username='agomez'),
+            student_license_type=StudentProfile.LICENSE_PPA,
+            balance=900,
+        )
+
+    def get_usernames(self, **params):
+        response = self.client.get(reverse('fms:student_list'), params)
+        self.assertEqual(response.status_code, 200)
+        return [student['username'] for student in response.context['students']]
+
+    def test_search_ignores_case_and_accents_and_matches_every_word(self):
+        self.assertEqual(self.get_usernames(q='IVAN'), ['iperez'])
+        self.assertEqual(self.get_usernames(q='gomez ana'), ['agomez'])
+        self.assertEqual(self.get_usernames(q=str(self.ana.user.national_id)), ['agomez'])
+        self.assertEqual(self.get_usernames(q='ana perez'), [])
+
+    def test_search_text_follows_user_and_profile_changes(self):
+        user = self.ana.user
+        user.last_name = 'Núñez'
+        user.save()
+        self.ana.refresh_from_db()
+        self.ana.student_phase = StudentProfile.FLYING
+        self.ana.save()
+
+        self.assertEqual(self.get_usernames(q='nunez vuelo'), ['agomez'])
+
+    def test_filters_and_sorting_run_in_the_database(self):
+        self.assertEqual(self.get_usernames(phase=StudentProfile.FLYING), ['iperez'])
+        self.assertEqual(self.get_usernames(license=StudentProfile.LICENSE_PPA), ['agomez'])
+        self.assertEqual(self.get_usernames(sort='-balance'), ['agomez', 'iperez'])
+        self.assertEqual(self.get_usernames(sort='balance'), ['iperez', 'agomez'])
+        # Unknown values fall back to every student in name order.
+        self.assertEqual(self.get_usernames(sort='password'), ['agomez', 'iperez'])
+
+    def test_pages_keep_a_constant_query_count(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.get_usernames()
+            return len(queries)
+
+        baseline = count_queries()
+        StudentProfileFactory.create_batch(60)
+
+        self.assertEqual(count_queries(), baseline)
+        response = self.client.get(reverse('fms:student_list'), {'page': 2})
+        self.assertEqual(len(response.context['students']), 12)
+        self.assertEqual(response.context['page_obj'].paginator.count, 62)
@@ -29,5 +29,6 @@ urlpatterns = [
     path('instructor_stats/<int:instructor_id>/', views.instructor_stats_page, name='instructor_stats_detail'),
      path('pdf_download_waiting_page/<str:form_type>/<int:evaluation_id>/', views.pdf_download_waiting_page, name='pdf_download_waiting_page'),
      path('download_pdf/<str:form_type>/<int:evaluation_id>/', views.download_pdf, name='download_pdf'),
+     path('pdf_status/<str:form_type>/<int:evaluation_id>/', views.pdf_status, name='pdf_status'),
      path('session_detail/<str:form_type>/<int:evaluation_id>/', views.session_detail, name='session_detail'),
 ]
@@ -2,18 +2,22 @@ from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponse
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.paginator import Paginator
+from django.http import FileResponse, JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.template.loader import render_to_string
-from django.contrib.staticfiles.finders import find
 from django.contrib.auth.models import Group
-from django.db.models import Sum, Q
+from django.db.models import F, Sum, Q
 from decimal import Decimal
 from accounts.models import User, StudentProfile, InstructorProfile
-from .forms import FlightEvaluation0_100Form, FlightEvaluation100_120Form, FlightEvaluation120_170Form, ExternalFlightEvaluationForm, SimEvaluationForm, FlightReportForm
-from .models import SimEvaluation, FlightEvaluation0_100, FlightEvaluation100_120, FlightEvaluation120_170, ExternalFlightEvaluation, FlightReport
-import weasyprint
-from pathlib import Path
+from accounts.student_search import search_students
+from config.reference_cache import get_aircraft
+from .forms import FlightEvaluation0_100Form, FlightEvaluation100_120Form, FlightEvaluation120_170Form, ExternalFlightEvaluationForm, SimEvaluationForm, FlightReportForm, StudentListFilterForm
+from .models import SimEvaluation, FlightEvaluation0_100, FlightEvaluation100_120, FlightEvaluation120_170, ExternalFlightEvaluation, FlightReport, SessionLedgerEntry, FlightStatsRollup, PdfRenderJob
+from .ledger import LOG_SOURCES, encode_cursor, latest_sessions_by_source, sessions_page
+from .stats import aircraft_cost_stats
+from .pdf_jobs import cached_pdf, render_if_unclaimed, request_evaluation_pdf
 from urllib.parse import urlparse, quote
 
 
@@ -40,6 +44,22 @@ def get_back_url(request, default_back):
     return default_back
 
 
+FLIGHTLOG_PAGE_SIZE = 10
+
+
+def first_flightlog_pages(**filters):
+    """
+    Return the first flight log page of every evaluation type and the cursor
+    the "load more" button continues from ('' when nothing else remains).
+    """
+    latest = latest_sessions_by_source(FLIGHTLOG_PAGE_SIZE + 1, **filters)
+    pages = {}
+    cursors = {}
+    for source, rows in latest.items():
+        pages[source] = rows[:FLIGHTLOG_PAGE_SIZE]
+        cursors[source] = encode_cursor(pages[source][-1]) if len(rows) > FLIGHTLOG_PAGE_SIZE else ''
+    return pages, cursors
+
 @login_required
 def student_flightlog(request):
     """
@@ -47,36 +67,19 @@ def student_flightlog(request):
     """
     user = request.user
     
-    # Get student's national ID
-    student_id = user.national_id
-    
-    # Query flight evaluations for the student, separated by evaluation type
-    latest_flight_0_100 = FlightEvaluation0_100.objects.filter(
-        student_id=student_id
-    ).order_by('-session_date')[:10]
-    
-    latest_flight_100_120 = FlightEvaluation100_120.objects.filter(
-        student_id=student_id
-    ).order_by('-session_date')[:10]
-    
-    latest_flight_120_170 = FlightEvaluation120_170.objects.filter(
-        student_id=student_id
-    ).order_by('-session_date')[:10]
-    
-    # Fetch simulator logs for the student
-    latest_sim_sessions = SimEvaluation.objects.filter(
-        student_id=student_id
-    ).order_by('-session_date')[:10]
+    # Latest sessions of every evaluation type, read from the session ledger in one query
+    latest, next_cursors = first_flightlog_pages(student_id=user.national_id)
     
     # Determine user role from session or user
     selected_role = request.session.get('selected_role', None)
     user_role = 'student' if selected_role == 'STUDENT' else (selected_role or 'student').lower()
     
     context = {
-        'latest_flight_0_100': latest_flight_0_100,
-        'latest_flight_100_120': latest_flight_100_120,
-        'latest_flight_120_170': latest_flight_120_170,
-        'latest_sim_sessions': latest_sim_sessions,
+        'latest_flight_0_100': latest[SessionLedgerEntry.SOURCE_0_100],
+        'latest_flight_100_120': latest[SessionLedgerEntry.SOURCE_100_120],
+        'latest_flight_120_170': latest[SessionLedgerEntry.SOURCE_120_170],
+        'latest_sim_sessions': latest[SessionLedgerEntry.SOURCE_SIM],
+        'next_cursors': next_cursors,
         'user': user,
         'user_role': user_role,
     }
@@ -90,36 +93,19 @@ def instructor_flightlog(request):
     """
     user = request.user
     
-    # Get instructor's national ID
-    instructor_id = user.national_id
-    
-    # Query flight evaluations for the instructor, separated by evaluation type
-    latest_flight_0_100 = FlightEvaluation0_100.objects.filter(
-        instructor_id=instructor_id
-    ).order_by('-session_date')[:10]
-    
-    latest_flight_100_120 = FlightEvaluation100_120.objects.filter(
-        instructor_id=instructor_id
-    ).order_by('-session_date')[:10]
-    
-    latest_flight_120_170 = FlightEvaluation120_170.objects.filter(
-        instructor_id=instructor_id
-    ).order_by('-session_date')[:10]
-    
-    # Fetch simulator logs for the instructor
-    latest_sim_sessions = SimEvaluation.objects.filter(
-        instructor_id=instructor_id
-    ).order_by('-session_date')[:10]
+    # Latest sessions of every evaluation type, read from the session ledger in one query
+    latest, next_cursors = first_flightlog_pages(instructor_id=user.national_id)
     
     # Determine user role from session or user
     selected_role = request.session.get('selected_role', None)
     user_role = 'instructor' if selected_role == 'INSTRUCTOR' else (selected_role or 'instructor').lower()
     
     context = {
-        'latest_flight_0_100': latest_flight_0_100,
-        'latest_flight_100_120': latest_flight_100_120,
-        'latest_flight_120_170': latest_flight_120_170,
-        'latest_sim_sessions': latest_sim_sessions,
+        'latest_flight_0_100': latest[SessionLedgerEntry.SOURCE_0_100],
+        'latest_flight_100_120': latest[SessionLedgerEntry.SOURCE_100_120],
+        'latest_flight_120_170': latest[SessionLedgerEntry.SOURCE_120_170],
+        'latest_sim_sessions': latest[SessionLedgerEntry.SOURCE_SIM],
+        'next_cursors': next_cursors,
         'user': user,
         'user_role': user_role,
     }
@@ -132,6 +118,10 @@ def load_more_flights(request):
     """
     AJAX endpoint to load more flight logs for flightlog pages.
     Supports different evaluation types and user roles.
+
+    Pages are addressed by an opaque keyset cursor over (session_date, id)
+    instead of an offset, so deep pages cost the same as the first one. The
+    total count is only computed when no cursor is given.
     """
     user = request.user
     user_id = user.national_id
@@ -139,59 +129,29 @@ def load_more_flights(request):
     # Get parameters from request
     evaluation_type = request.GET.get('type')  # '0_100', '100_120', '120_170', 'sim'
     user_role = request.GET.get('role')  # 'student', 'instructor', 'staff'
-    offset = int(request.GET.get('offset', 0))
-    limit = int(request.GET.get('limit', 20))
+    cursor = request.GET.get('cursor') or None
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
     
-    # Get the queryset based on evaluation type and user role
-    if evaluation_type == '0_100':
-        if user_role == 'student':
-            queryset = FlightEvaluation0_100.objects.filter(student_id=user_id).order_by('-session_date')
-        elif user_role == 'instructor':
-            queryset = FlightEvaluation0_100.objects.filter(instructor_id=user_id).order_by('-session_date')
-        else:  # staff - show all
-            queryset = FlightEvaluation0_100.objects.all().order_by('-session_date')
-        template_name = 'fms/partials/flight_card_0_100.html'
-    elif evaluation_type == '100_120':
-        if user_role == 'student':
-            queryset = FlightEvaluation100_120.objects.filter(student_id=user_id).order_by('-session_date')
-        elif user_role == 'instructor':
-            queryset = FlightEvaluation100_120.objects.filter(instructor_id=user_id).order_by('-session_date')
-        else:  # staff - show all
-            queryset = FlightEvaluation100_120.objects.all().order_by('-session_date')
-        template_name = 'fms/partials/flight_card_100_120.html'
-    elif evaluation_type == '120_170':
-        if user_role == 'student':
-            queryset = FlightEvaluation120_170.objects.filter(student_id=user_id).order_by('-session_date')
-        elif user_role == 'instructor':
-            queryset = FlightEvaluation120_170.objects.filter(instructor_id=user_id).order_by('-session_date')
-        else:  # staff - show all
-            queryset = FlightEvaluation120_170.objects.all().order_by('-session_date')
-        template_name = 'fms/partials/flight_card_120_170.html'
-    elif evaluation_type == 'sim':
-        if user_role == 'student':
-            queryset = SimEvaluation.objects.filter(student_id=user_id).order_by('-session_date')
-        elif user_role == 'instructor':
-            queryset = SimEvaluation.objects.filter(instructor_id=user_id).order_by('-session_date')
-        else:  # staff - show all
-            queryset = SimEvaluation.objects.all().order_by('-session_date')
-        template_name = 'fms/partials/flight_card_sim.html'
-    else:
+    if evaluation_type not in LOG_SOURCES:
         return JsonResponse({'error': 'Invalid evaluation type'}, status=400)
+    template_name = f'fms/partials/flight_card_{evaluation_type}.html'
     
-    # Get total count before pagination
-    total_count = queryset.count()
+    # Every evaluation type lives in the session ledger, filtered by role
+    queryset = SessionLedgerEntry.objects.filter(source_model=evaluation_type)
+    if user_role == 'student':
+        queryset = queryset.filter(student_id=user_id)
+    elif user_role == 'instructor':
+        queryset = queryset.filter(instructor_id=user_id)
+    # staff - show all
+    queryset = queryset.select_related('simulator').order_by('-session_date', '-source_id')
     
-    # Apply pagination
-    sessions = list(queryset[offset:offset+limit])
-    
-    # Check if there are more flights available
-    # has_more should be true if there are records beyond what we've fetched
-    if limit == 1:
-        # When checking (limit=1), if offset < total_count, there are records at that offset to show
-        has_more = offset < total_count
-    else:
-        # When loading (limit=20), check if there are more beyond what we fetched
-        has_more = (offset + len(sessions)) < total_count
+    try:
+        sessions, next_cursor = sessions_page(queryset, cursor, limit)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
     
     # Render the flight cards HTML
     flight_cards_html = render_to_string(template_name, {
@@ -199,12 +159,15 @@ def load_more_flights(request):
         'user_role': user_role,
     })
     
-    return JsonResponse({
+    data = {
         'html': flight_cards_html,
-        'has_more': has_more,
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor,
         'loaded_count': len(sessions),
-        'total_count': total_count
-    })
+    }
+    if cursor is None:
+        data['total_count'] = queryset.count()
+    return JsonResponse(data)
 
 @login_required
 def instructor_student_evaluations(request):
@@ -277,10 +240,11 @@ def instructor_student_evaluations(request):
 def fms_dashboard(request):
     """FMS Dashboard view showing latest flights and sessions."""
     # Get latest 10 records for each category
-    latest_sim_sessions = SimEvaluation.objects.all().order_by('-session_date')[:10]
-    latest_flight_0_100 = FlightEvaluation0_100.objects.all().order_by('-session_date')[:10]
-    latest_flight_100_120 = FlightEvaluation100_120.objects.all().order_by('-session_date')[:10]
-    latest_flight_120_170 = FlightEvaluation120_170.objects.all().order_by('-session_date')[:10]
+    latest, next_cursors = first_flightlog_pages()
+    latest_sim_sessions = latest[SessionLedgerEntry.SOURCE_SIM]
+    latest_flight_0_100 = latest[SessionLedgerEntry.SOURCE_0_100]
+    latest_flight_100_120 = latest[SessionLedgerEntry.SOURCE_100_120]
+    latest_flight_120_170 = latest[SessionLedgerEntry.SOURCE_120_170]
     latest_flight_reports = FlightReport.objects.all().order_by('-flight_date')[:10]
     
     # Determine user role from session or user
@@ -293,6 +257,7 @@ def fms_dashboard(request):
         'latest_flight_100_120': latest_flight_100_120,
         'latest_flight_120_170': latest_flight_120_170,
         'latest_flight_reports': latest_flight_reports,
+        'next_cursors': next_cursors,
         'user_role': user_role,
         'can_access_user_stats': request.user.has_perm('accounts.can_view_user_stats'),
     }
@@ -515,12 +480,14 @@ def get_evaluation_and_template(form_type, evaluation_id):
 
 @login_required
 def pdf_download_waiting_page(request, form_type, evaluation_id):
-    """Show intermediate page for PDF download."""
+    """Show intermediate page for PDF download while the PDF is rendered in the background."""
     try:
         evaluation, _ = get_evaluation_and_template(form_type, evaluation_id)
+        request_evaluation_pdf(form_type, evaluation, retry_failed=True)
         
         context = {
             'pdf_url': f'/fms/download_pdf/{form_type}/{evaluation_id}/',
+            'status_url': reverse('fms:pdf_status', args=[form_type, evaluation_id]),
             'dashboard_url': '/dashboard/'
         }
         
@@ -530,62 +497,84 @@ def pdf_download_waiting_page(request, form_type, evaluation_id):
         messages.error(request, f'Error: {str(e)}')
         return redirect('dashboard:dashboard')
 
+@login_required
+@require_http_methods(["GET"])
+def pdf_status(request, form_type, evaluation_id):
+    """Report whether the PDF of the current version of an evaluation is ready (polled by the waiting page)."""
+    try:
+        evaluation, _ = get_evaluation_and_template(form_type, evaluation_id)
+    except (ValueError, ObjectDoesNotExist):
+        return JsonResponse({'error': 'Evaluación no encontrada'}, status=404)
+
+    job = request_evaluation_pdf(form_type, evaluation)
+    if render_if_unclaimed(job):
+        job.refresh_from_db()
+
+    return JsonResponse({
+        'ready': job.status == PdfRenderJob.STATUS_READY,
+        'failed': job.status == PdfRenderJob.STATUS_FAILED,
+    })
+
+STUDENTS_PER_PAGE = 50
+
+# Sort options of the student list; every ordering ends on a unique column.
+STUDENT_LIST_ORDERINGS = {
+    'name': ('user__first_name', 'user__last_name', 'pk'),
+    'id': ('user__national_id',),
+    'course': ('current_course_type', 'current_course_edition', 'user__first_name', 'user__last_name', 'pk'),
+    '-balance': ('-balance', 'pk'),
+    'balance': ('balance', 'pk'),
+    '-flight_hours': ('-flight_hours', 'pk'),
+}
+
+
 @login_required
 def student_list(request):
-    """Display a list of all students with their information."""
-    search_term = request.GET.get('q', '').strip()
+    """Display one page of students, searched, filtered and sorted by the database."""
+    form = StudentListFilterForm(request.GET or None)
+    filters = form.cleaned_data if form.is_valid() else {}
+    search_term = filters.get('q', '')
 
-    # Get all students with their profiles
-    students = User.objects.filter(role='STUDENT').select_related('student_profile').order_by('first_name', 'last_name')
+    students = StudentProfile.objects.filter(user__role='STUDENT')
     total_students = students.count()
-    
+    if search_term:
+        students = search_students(students, search_term)
+    if filters.get('phase'):
+        students = students.filter(student_phase=filters['phase'])
+    if filters.get('license'):
+        students = students.filter(student_license_type=filters['license'])
+    if filters.get('course'):
+        students = students.filter(current_course_type=filters['course'])
+
+    students = students.order_by(*STUDENT_LIST_ORDERINGS[filters.get('sort') or 'name']).values(
+        'student_phase',
+        'student_license_type',
+        'balance',
+        'flight_hours',
+        'nav_flight_hours',
+        'sim_hours',
+        'has_temp_permission',
+        username=F('user__username'),
+        student_id=F('user__national_id'),
+        first_name=F('user__first_name'),
+        last_name=F('user__last_name'),
+        course_type=F('current_course_type'),
+        course_edition=F('current_course_edition'),
+    )
+    page_obj = Paginator(students, STUDENTS_PER_PAGE).get_page(request.GET.get('page'))
+
+    # Pagination links keep the search, filters and sort order.
+    query = request.GET.copy()
+    query.pop('page', None)
+
     # Check if user is in director group
     is_director = request.user.groups.filter(name='director').exists()
-    
-    # Create a list of student data similar to admin list_display
-    student_data = []
-    for student in students:
-        try:
-            profile = student.student_profile
-            student_info = {
-                'username': student.username,
-                'student_id': student.national_id,
-                'first_name': student.first_name,
-                'last_name': student.last_name,
-                'student_phase': profile.student_phase,
-                'course_type': profile.current_course_type,
-                'course_edition': profile.current_course_edition,
-                'balance': profile.balance,
-                'flight_hours': profile.flight_hours,
-                'nav_flight_hours': profile.nav_flight_hours,
-                'sim_hours': profile.sim_hours,
-                'student_license_type': profile.student_license_type,
-                'has_temp_permission': profile.has_temp_permission,
-            }
-            student_data.append(student_info)
-        except Exception as e:
-            # Handle students without profiles
-            continue
 
-    if search_term:
-        normalized_search = search_term.lower()
-        student_data = [
-            student
-            for student in student_data
-            if normalized_search in ' '.join([
-                str(student['first_name']),
-                str(student['last_name']),
-                str(student['username']),
-                str(student['student_id']),
-                str(student['student_phase']),
-                str(student['student_license_type']),
-                str(student['course_type']),
-                str(student['course_edition']),
-            ]).lower()
-        ]
-    
     context = {
-        'students': student_data,
+        'form': form,
+        'students': page_obj,
+        'page_obj': page_obj,
+        'query_string': query.urlencode(),
         'total_students': total_students,
         'search_term': search_term,
         'is_director': is_director,
@@ -639,40 +628,17 @@ def toggle_temp_permission(request):
 
 @login_required
 def download_pdf(request, form_type, evaluation_id):
-    """Download PDF for a specific evaluation."""
+    """Download PDF for a specific evaluation, served from the PDF cache."""
     try:
-        evaluation, template_name = get_evaluation_and_template(form_type, evaluation_id)
-        
-        # Find the static image path (logo)
-        raw_logo_path = find('fms/img/evaluation_logo.png')
-        if raw_logo_path:
-            logo_path = Path(raw_logo_path).as_posix()
-            logo_uri = f'file:///{logo_path}'
-        else:
-            logo_uri = ''
-
-        # Render the PDF template with evaluation data and logo path
-        html_string = render_to_string(template_name, {
-            'evaluation': evaluation,
-            'logo_path': logo_uri
-        })
-        
-        # Get the base URL for static files
-        base_url = request.build_absolute_uri()
-
-        # Find the CSS file path (do not rely on <link> in templates — fetching CSS via HTTP
-        # behind Cloudflare/proxies can fail or trigger WeasyPrint recursion errors on some hosts).
-        css_path = find('fms/pdf.css')
-
-        # Generate PDF using WeasyPrint with CSS
-        html_doc = weasyprint.HTML(string=html_string, base_url=base_url)
-        pdf = html_doc.write_pdf(stylesheets=[weasyprint.CSS(filename=css_path)] if css_path else None)
-        
-        # Create HTTP response with PDF content
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="flight_evaluation_{form_type}_{evaluation.student_id}_{evaluation.session_number}.pdf"'
-        
-        return response
+        evaluation, _ = get_evaluation_and_template(form_type, evaluation_id)
+        job = request_evaluation_pdf(form_type, evaluation)
+        path = cached_pdf(job.cache_key)
+        if path is None:
+            # Not rendered yet: the waiting page polls until the worker is done.
+            return redirect('fms:pdf_download_waiting_page', form_type=form_type, evaluation_id=evaluation_id)
+
+        filename = f'flight_evaluation_{form_type}_{evaluation.student_id}_{evaluation.session_number}.pdf'
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type='application/pdf')
         
     except Exception as e:
         messages.error(request, f'Error al generar el PDF: {str(e)}')
@@ -809,197 +775,67 @@ def session_detail(request, form_type, evaluation_id):
         messages.error(request, f'Error al cargar la sesión: {str(e)}')
         return redirect('dashboard:dashboard')
 
+STATS_TOTAL_KEYS = (
+    'total_flight_hours',
+    'total_consumed_liters',
+    'total_consumed_gallons',
+    'total_flight_hours_dollars',
+    'total_fuel_cost',
+    'total_cost',
+    'total_paid_to_instructor',
+)
+
+
+def round_stats(stats):
+    """Round every Decimal figure of a statistics dict to one decimal place."""
+    return {key: round(value, 1) if isinstance(value, Decimal) else value for key, value in stats.items()}
+
+
 def calculate_user_stats(user_id, role_type='student', flight_instructor_hourly_rate=None, student_hourly_rate=None):
     """
     Helper function to calculate statistics for a user (student or instructor).
-    
+
+    Reads the user's rows of the flight statistics rollup, one per aircraft
+    flown, so the cost is the same for any amount of history.
+
     Args:
         user_id: The national_id of the user
-        role_type: Either 'student' or 'instructor' to determine which field to filter by
+        role_type: Either 'student' or 'instructor' to determine which rollup rows to read
         flight_instructor_hourly_rate: The hourly rate of the instructor
         student_hourly_rate: The hourly rate of the student
     Returns:
-        Dictionary with all calculated statistics.
-    
-    Raises:
-        Aircraft.DoesNotExist if aircraft are not found.
+        Dictionary with the overall totals and an ``aircraft`` list holding
+        the same figures (plus the registration) for every aircraft.
     """
-    from fleet.models import Aircraft
-    
-    # Get aircraft data
-    yv204e = Aircraft.objects.get(registration='YV204E')
-    yv206e = Aircraft.objects.get(registration='YV206E')
-    hourly_rate_yv204e = yv204e.hourly_rate
-    hourly_rate_yv206e = yv206e.hourly_rate
-    fuel_cost_yv204e = yv204e.fuel_cost
-    fuel_cost_yv206e = yv206e.fuel_cost
-
-    if role_type == 'student' and student_hourly_rate is not None:
-        hourly_rate_yv204e = student_hourly_rate
-        hourly_rate_yv206e = student_hourly_rate
-
-    # Determine which field to filter by based on role
-    filter_field = 'student_id' if role_type == 'student' else 'instructor_id'
-
-    # Initialize totals
-    total_flight_hours = Decimal('0.0')
-    total_flight_hours_yv204e = Decimal('0.0')
-    total_flight_hours_yv206e = Decimal('0.0')
-    total_consumed_liters_yv204e = Decimal('0.0')
-    total_consumed_liters_yv206e = Decimal('0.0')
-    total_consumed_gallons_yv204e = Decimal('0.0')
-    total_consumed_gallons_yv206e = Decimal('0.0')
-    fuel_rate_liters_yv204e = Decimal('0.0')
-    fuel_rate_liters_yv206e = Decimal('0.0')
-    fuel_rate_gallons_yv204e = Decimal('0.0')
-    fuel_rate_gallons_yv206e = Decimal('0.0')
-    flight_hour_cost_yv204e = Decimal('0.0')
-    flight_hour_cost_yv206e = Decimal('0.0')
-    total_paid_to_instructor_yv204e = Decimal('0.0')
-    total_paid_to_instructor_yv206e = Decimal('0.0')
-    total_paid_to_instructor = Decimal('0.0')
-    
-    # Build filter kwargs dynamically
-    filter_kwargs_yv204e = {filter_field: user_id, 'aircraft__registration': 'YV204E'}
-    filter_kwargs_yv206e = {filter_field: user_id, 'aircraft__registration': 'YV206E'}
-    
-    # Sum flight hours and fuel from all three evaluation types
-    flight_0_100_stats_yv204e = FlightEvaluation0_100.objects.filter(
-        **filter_kwargs_yv204e
-    ).aggregate(
-        total_hours=Sum('session_flight_hours'),
-        total_fuel=Sum('fuel_consumed')
-    )
-    flight_0_100_stats_yv206e = FlightEvaluation0_100.objects.filter(
-        **filter_kwargs_yv206e
-    ).aggregate(
-        total_hours=Sum('session_flight_hours'),
-        total_fuel=Sum('fuel_consumed')
-    )
-
-    flight_100_120_stats_yv204e = FlightEvaluation100_120.objects.filter(
-        **filter_kwargs_yv204e
-    ).aggregate(
-        total_hours=Sum('session_flight_hours'),
-        total_fuel=Sum('fuel_consumed')
-    )
-    flight_100_120_stats_yv206e = FlightEvaluation100_120.objects.filter(
-        **filter_kwargs_yv206e
-    ).aggregate(
-        total_hours=Sum('session_flight_hours'),
-        total_fuel=Sum('fuel_consumed')
-    )
-    
-    flight_120_170_stats_yv204e = FlightEvaluation120_170.objects.filter(
-        **filter_kwargs_yv204e
-    ).aggregate(
-        total_hours=Sum('session_flight_hours'),
-        total_fuel=Sum('fuel_consumed')
-    )
-    flight_120_170_stats_yv206e = FlightEvaluation120_170.objects.filter(
-        **filter_kwargs_yv206e
-    ).aggregate(
-        total_hours=Sum('session_flight_hours'),
-        total_fuel=Sum('fuel_consumed')
-    )
-    
-    # Add up all the totals
-    if flight_0_100_stats_yv204e['total_hours']:
-        total_flight_hours_yv204e += flight_0_100_stats_yv204e['total_hours']
-    if flight_0_100_stats_yv204e['total_fuel']:
-        total_consumed_liters_yv204e += flight_0_100_stats_yv204e['total_fuel']
-    if flight_0_100_stats_yv206e['total_hours']:
-        total_flight_hours_yv206e += flight_0_100_stats_yv206e['total_hours']
-    if flight_0_100_stats_yv206e['total_fuel']:
-        total_consumed_liters_yv206e += flight_0_100_stats_yv206e['total_fuel']
-    
-    if flight_100_120_stats_yv204e['total_hours']:
-        total_flight_hours_yv204e += flight_100_120_stats_yv204e['total_hours']
-    if flight_100_120_stats_yv204e['total_fuel']:
-        total_consumed_liters_yv204e += flight_100_120_stats_yv204e['total_fuel']
-    if flight_100_120_stats_yv206e['total_hours']:
-        total_flight_hours_yv206e += flight_100_120_stats_yv206e['total_hours']
-    if flight_100_120_stats_yv206e['total_fuel']:
-        total_consumed_liters_yv206e += flight_100_120_stats_yv206e['total_fuel']
-    
-    if flight_120_170_stats_yv204e['total_hours']:
-        total_flight_hours_yv204e += flight_120_170_stats_yv204e['total_hours']
-    if flight_120_170_stats_yv204e['total_fuel']:
-        total_consumed_liters_yv204e += flight_120_170_stats_yv204e['total_fuel']
-    if flight_120_170_stats_yv206e['total_hours']:
-        total_flight_hours_yv206e += flight_120_170_stats_yv206e['total_hours']
-    if flight_120_170_stats_yv206e['total_fuel']:
-        total_consumed_liters_yv206e += flight_120_170_stats_yv206e['total_fuel']
-    
-    # Calculate fuel gallons consumed
-    if total_consumed_liters_yv204e > 0:
-        total_consumed_gallons_yv204e = total_consumed_liters_yv204e / Decimal('3.78541')
-    if total_consumed_liters_yv206e > 0:
-        total_consumed_gallons_yv206e = total_consumed_liters_yv206e / Decimal('3.78541')
-    
-    # Calculate fuel rate (flight hours / consumed fuel)
-    if total_flight_hours_yv204e > 0:
-        fuel_rate_liters_yv204e = total_consumed_liters_yv204e / total_flight_hours_yv204e
-        fuel_rate_gallons_yv204e = total_consumed_gallons_yv204e / total_flight_hours_yv204e
-    if total_flight_hours_yv206e > 0:
-        fuel_rate_liters_yv206e = total_consumed_liters_yv206e / total_flight_hours_yv206e
-        fuel_rate_gallons_yv206e = total_consumed_gallons_yv206e / total_flight_hours_yv206e
-
-    # Calculate total flight hours and fuel cost
-    total_flight_hours = total_flight_hours_yv204e + total_flight_hours_yv206e
-    total_flight_hours_dollars_yv204e = total_flight_hours_yv204e * hourly_rate_yv204e
-    total_flight_hours_dollars_yv206e = total_flight_hours_yv206e * hourly_rate_yv206e
-    total_flight_hours_dollars = total_flight_hours_dollars_yv204e + total_flight_hours_dollars_yv206e
-    total_fuel_cost_yv204e = total_consumed_liters_yv204e * fuel_cost_yv204e
-    total_fuel_cost_yv206e = total_consumed_liters_yv206e * fuel_cost_yv206e
-    total_fuel_cost = total_fuel_cost_yv204e + total_fuel_cost_yv206e
-    total_consumed_liters = total_consumed_liters_yv204e + total_consumed_liters_yv206e
-    total_consumed_gallons = total_consumed_gallons_yv204e + total_consumed_gallons_yv206e
-    total_cost = total_flight_hours_dollars + total_fuel_cost
-    
-    # Calculate flight hour cost (cost per hour) - handle division by zero
-    if total_flight_hours_yv204e > 0:
-        flight_hour_cost_yv204e = (total_flight_hours_dollars_yv204e + total_fuel_cost_yv204e) / total_flight_hours_yv204e
-    if total_flight_hours_yv206e > 0:
-        flight_hour_cost_yv206e = (total_flight_hours_dollars_yv206e + total_fuel_cost_yv206e) / total_flight_hours_yv206e
-
-    if role_type == 'instructor' and flight_instructor_hourly_rate is not None:
-        total_paid_to_instructor_yv204e = total_flight_hours_yv204e * flight_instructor_hourly_rate
-        total_paid_to_instructor_yv206e = total_flight_hours_yv206e * flight_instructor_hourly_rate
-        total_paid_to_instructor = total_paid_to_instructor_yv204e + total_paid_to_instructor_yv206e
-
-    return {
-        'total_flight_hours_yv204e': total_flight_hours_yv204e,
-        'total_flight_hours_yv206e': total_flight_hours_yv206e,
-        'total_flight_hours': total_flight_hours,
-        'total_flight_hours_dollars_yv204e': total_flight_hours_dollars_yv204e,
-        'total_flight_hours_dollars_yv206e': total_flight_hours_dollars_yv206e,
-        'total_flight_hours_dollars': total_flight_hours_dollars,
-        'total_fuel_cost_yv204e': total_fuel_cost_yv204e,
-        'total_fuel_cost_yv206e': total_fuel_cost_yv206e,
-        'total_fuel_cost': total_fuel_cost,
-        'total_consumed_liters': total_consumed_liters,
-        'total_consumed_liters_yv204e': total_consumed_liters_yv204e,
-        'total_consumed_liters_yv206e': total_consumed_liters_yv206e,
-        'total_consumed_gallons': total_consumed_gallons,
-        'total_consumed_gallons_yv204e': total_consumed_gallons_yv204e,
-        'total_consumed_gallons_yv206e': total_consumed_gallons_yv206e,
-        'fuel_rate_liters_yv204e': fuel_rate_liters_yv204e,
-        'fuel_rate_liters_yv206e': fuel_rate_liters_yv206e,
-        'fuel_rate_gallons_yv204e': fuel_rate_gallons_yv204e,
-        'fuel_rate_gallons_yv206e': fuel_rate_gallons_yv206e,
-        'total_cost': total_cost,
-        'flight_hour_cost_yv204e': flight_hour_cost_yv204e,
-        'flight_hour_cost_yv206e': flight_hour_cost_yv206e,
-        'total_paid_to_instructor_yv204e': total_paid_to_instructor_yv204e,
-        'total_paid_to_instructor_yv206e': total_paid_to_instructor_yv206e,
-        'total_paid_to_instructor': total_paid_to_instructor,
-    }
+    role = FlightStatsRollup.ROLE_STUDENT if role_type == 'student' else FlightStatsRollup.ROLE_INSTRUCTOR
+    rollups = FlightStatsRollup.objects.filter(
+        role=role,
+        person_id=user_id,
+    ).select_related('aircraft').order_by('aircraft__registration')
+
+    totals = {key: Decimal('0.0') for key in STATS_TOTAL_KEYS}
+    per_aircraft = []
+    for rollup in rollups:
+        aircraft = rollup.aircraft
+        hourly_rate = aircraft.hourly_rate
+        if role_type == 'student' and student_hourly_rate is not None:
+            hourly_rate = student_hourly_rate
+
+        stats = aircraft_cost_stats(rollup.hours, rollup.fuel_consumed, hourly_rate, aircraft.fuel_cost)
+        stats['registration'] = aircraft.registration
+        stats['total_paid_to_instructor'] = Decimal('0.0')
+        if role_type == 'instructor' and flight_instructor_hourly_rate is not None:
+            stats['total_paid_to_instructor'] = rollup.hours * flight_instructor_hourly_rate
+
+        for key in STATS_TOTAL_KEYS:
+            totals[key] += stats[key]
+        per_aircraft.append(stats)
+
+    return {**totals, 'aircraft': per_aircraft}
 
 @login_required
 def student_stats_page(request, student_id=None):
     """Display statistics page for a student."""
-    from fleet.models import Aircraft
     from accounts.models import StudentProfile
     from transactions.models import StudentTransaction
     
@@ -1048,47 +884,25 @@ def student_stats_page(request, student_id=None):
     # Take into the account all the extra debits of type FLIGHT.
     debit_corrections = student_profile.transactions.filter(type=StudentTransaction.DEBIT, category=StudentTransaction.FLIGHT).aggregate(total=Sum('amount'))['total'] or Decimal('0.0')
 
-    try:
-        stats = calculate_user_stats(user_id, 'student', None, student_hourly_rate)
-    except Aircraft.DoesNotExist:
-        messages.error(request, 'Aeronave no encontrada')
-        if student_id:
-            return redirect('fms:user_stats_page')
-        return redirect('dashboard:dashboard')
+    stats = calculate_user_stats(user_id, 'student', None, student_hourly_rate)
 
     context = {
         'student': student,
         'balance': balance,
         'total_paid': round(total_paid, 2),
-        'total_flight_hours_yv204e': round(stats['total_flight_hours_yv204e'], 1),
-        'total_flight_hours_yv206e': round(stats['total_flight_hours_yv206e'], 1),
         'total_flight_hours': round(stats['total_flight_hours'], 1),
-        'total_flight_hours_dollars_yv204e': round(stats['total_flight_hours_dollars_yv204e'], 1),
-        'total_flight_hours_dollars_yv206e': round(stats['total_flight_hours_dollars_yv206e'], 1),
         'total_flight_hours_dollars': round(stats['total_flight_hours_dollars'], 1),
-        'total_fuel_cost_yv204e': round(stats['total_fuel_cost_yv204e'], 1),
-        'total_fuel_cost_yv206e': round(stats['total_fuel_cost_yv206e'], 1),
         'total_fuel_cost': round(stats['total_fuel_cost'], 1),
         'total_consumed_liters': round(stats['total_consumed_liters'], 1),
-        'total_consumed_liters_yv204e': round(stats['total_consumed_liters_yv204e'], 1),
-        'total_consumed_liters_yv206e': round(stats['total_consumed_liters_yv206e'], 1),
         'total_consumed_gallons': round(stats['total_consumed_gallons'], 1),
-        'total_consumed_gallons_yv204e': round(stats['total_consumed_gallons_yv204e'], 1),
-        'total_consumed_gallons_yv206e': round(stats['total_consumed_gallons_yv206e'], 1),
-        'fuel_rate_liters_yv204e': round(stats['fuel_rate_liters_yv204e'], 1),
-        'fuel_rate_liters_yv206e': round(stats['fuel_rate_liters_yv206e'], 1),
-        'fuel_rate_gallons_yv204e': round(stats['fuel_rate_gallons_yv204e'], 1),
-        'fuel_rate_gallons_yv206e': round(stats['fuel_rate_gallons_yv206e'], 1),
         'total_cost': round(stats['total_cost'] + debit_corrections, 1),
-        'flight_hour_cost_yv204e': round(stats['flight_hour_cost_yv204e'], 1),
-        'flight_hour_cost_yv206e': round(stats['flight_hour_cost_yv206e'], 1),
+        'aircraft_stats': [round_stats(aircraft_stats) for aircraft_stats in stats['aircraft']],
     }
     return render(request, 'fms/student_stats.html', context)
 
 @login_required
 def instructor_stats_page(request, instructor_id=None):
     """Display statistics page for an instructor."""
-    from fleet.models import Aircraft
     from accounts.models import InstructorProfile
     
     user = request.user
@@ -1130,41 +944,18 @@ def instructor_stats_page(request, instructor_id=None):
             messages.error(request, 'Acceso no autorizado')
             return redirect('dashboard:dashboard')
 
-    try:
-        stats = calculate_user_stats(user_id, 'instructor', flight_instructor_hourly_rate, None)
-    except Aircraft.DoesNotExist:
-        messages.error(request, 'Aeronave no encontrada')
-        if instructor_id:
-            return redirect('fms:user_stats_page')
-        return redirect('dashboard:dashboard')
+    stats = calculate_user_stats(user_id, 'instructor', flight_instructor_hourly_rate, None)
 
     context = {
         'instructor': instructor,
-        'total_flight_hours_yv204e': round(stats['total_flight_hours_yv204e'], 1),
-        'total_flight_hours_yv206e': round(stats['total_flight_hours_yv206e'], 1),
         'total_flight_hours': round(stats['total_flight_hours'], 1),
-        'total_flight_hours_dollars_yv204e': round(stats['total_flight_hours_dollars_yv204e'], 1),
-        'total_flight_hours_dollars_yv206e': round(stats['total_flight_hours_dollars_yv206e'], 1),
         'total_flight_hours_dollars': round(stats['total_flight_hours_dollars'], 1),
-        'total_fuel_cost_yv204e': round(stats['total_fuel_cost_yv204e'], 1),
-        'total_fuel_cost_yv206e': round(stats['total_fuel_cost_yv206e'], 1),
         'total_fuel_cost': round(stats['total_fuel_cost'], 1),
         'total_consumed_liters': round(stats['total_consumed_liters'], 1),
-        'total_consumed_liters_yv204e': round(stats['total_consumed_liters_yv204e'], 1),
-        'total_consumed_liters_yv206e': round(stats['total_consumed_liters_yv206e'], 1),
         'total_consumed_gallons': round(stats['total_consumed_gallons'], 1),
-        'total_consumed_gallons_yv204e': round(stats['total_consumed_gallons_yv204e'], 1),
-        'total_consumed_gallons_yv206e': round(stats['total_consumed_gallons_yv206e'], 1),
-        'fuel_rate_liters_yv204e': round(stats['fuel_rate_liters_yv204e'], 1),
-        'fuel_rate_liters_yv206e': round(stats['fuel_rate_liters_yv206e'], 1),
-        'fuel_rate_gallons_yv204e': round(stats['fuel_rate_gallons_yv204e'], 1),
-        'fuel_rate_gallons_yv206e': round(stats['fuel_rate_gallons_yv206e'], 1),
         'total_cost': round(stats['total_cost'], 1),
-        'flight_hour_cost_yv204e': round(stats['flight_hour_cost_yv204e'], 1),
-        'flight_hour_cost_yv206e': round(stats['flight_hour_cost_yv206e'], 1),
-        'total_paid_to_instructor_yv204e': round(stats['total_paid_to_instructor_yv204e'], 1),
-        'total_paid_to_instructor_yv206e': round(stats['total_paid_to_instructor_yv206e'], 1),
         'total_paid_to_instructor': round(stats['total_paid_to_instructor'], 1),
+        'aircraft_stats': [round_stats(aircraft_stats) for aircraft_stats in stats['aircraft']],
     }
     if instructor_id:
         return render(request, 'fms/instructor_stats.html', context)
@@ -1194,39 +985,22 @@ def user_stats_page(request):
 
 def fleet_flights_page(request):
     """Display a page listing all flights and flight reports for the fleet."""
-    from fleet.models import Aircraft
-    from .models import FlightEvaluation0_100, FlightEvaluation100_120, FlightEvaluation120_170, FlightReport
-    
-    yv204e = Aircraft.objects.get(registration='YV204E')
-    yv206e = Aircraft.objects.get(registration='YV206E')
+    yv204e = get_aircraft('YV204E')
+    yv206e = get_aircraft('YV206E')
 
-    flights_yv204e_0_100 = FlightEvaluation0_100.objects.filter(aircraft=yv204e).order_by('-session_date')[:50]
-    flights_yv204e_100_120 = FlightEvaluation100_120.objects.filter(aircraft=yv204e).order_by('-session_date')[:50]
-    flights_yv204e_120_170 = FlightEvaluation120_170.objects.filter(aircraft=yv204e).order_by('-session_date')[:50]
     flights_yv204e_reports = FlightReport.objects.filter(aircraft=yv204e).order_by('-flight_date')[:50]
-
-    flights_yv206e_0_100 = FlightEvaluation0_100.objects.filter(aircraft=yv206e).order_by('-session_date')[:50]
-    flights_yv206e_100_120 = FlightEvaluation100_120.objects.filter(aircraft=yv206e).order_by('-session_date')[:50]
-    flights_yv206e_120_170 = FlightEvaluation120_170.objects.filter(aircraft=yv206e).order_by('-session_date')[:50]
     flights_yv206e_reports = FlightReport.objects.filter(aircraft=yv206e).order_by('-flight_date')[:50]
 
+    # Latest 50 flights of each evaluation type per aircraft, read from the session ledger
     training_flights_yv204e = []
-    for flight in flights_yv204e_0_100:
-        training_flights_yv204e.append(flight)
-    for flight in flights_yv204e_100_120:
-        training_flights_yv204e.append(flight)
-    for flight in flights_yv204e_120_170:
-        training_flights_yv204e.append(flight)
+    for flights in latest_sessions_by_source(50, SessionLedgerEntry.TRAINING_FLIGHT_SOURCES, aircraft=yv204e).values():
+        training_flights_yv204e.extend(flights)
     # Sort by session_date in descending order (most recent first)
     training_flights_yv204e.sort(key=lambda x: x.session_date, reverse=True)
 
     training_flights_yv206e = []
-    for flight in flights_yv206e_0_100:
-        training_flights_yv206e.append(flight)
-    for flight in flights_yv206e_100_120:
-        training_flights_yv206e.append(flight)
-    for flight in flights_yv206e_120_170:
-        training_flights_yv206e.append(flight)
+    for flights in latest_sessions_by_source(50, SessionLedgerEntry.TRAINING_FLIGHT_SOURCES, aircraft=yv206e).values():
+        training_flights_yv206e.extend(flights)
     # Sort by session_date in descending order (most recent first)
     training_flights_yv206e.sort(key=lambda x: x.session_date, reverse=True)
 
@@ -1248,103 +1022,30 @@ def fleet_flights_page(request):
 def calculate_aircraft_stats(aircraft_id):
     """
     Helper function to calculate statistics for a specific aircraft.
-    
+
+    Reads the aircraft's row of the flight statistics rollup (training
+    flights and flight reports).
+
     Args:
         aircraft_id: The id of the aircraft
     Returns:
         Dictionary with all calculated statistics.
-    
+
     Raises:
         Aircraft.DoesNotExist if the aircraft is not found.
     """
     from fleet.models import Aircraft
-    
-    # Get aircraft data
+
     aircraft = Aircraft.objects.get(id=aircraft_id)
-    hourly_rate = aircraft.hourly_rate
-    fuel_cost = aircraft.fuel_cost
-
-    # Initialize totals
-    total_flight_hours = Decimal('0.0')
-    total_consumed_liters = Decimal('0.0')
-    total_consumed_gallons = Decimal('0.0')
-    fuel_rate_liters = Decimal('0.0')
-    fuel_rate_gallons = Decimal('0.0')
-    total_flight_hours_dollars = Decimal('0.0')
-    total_fuel_cost = Decimal('0.0')
-    total_cost = Decimal('0.0')
-    flight_hour_cost = Decimal('0.0')
-    
-    # Sum flight hours and fuel from all three evaluation types
-    flight_0_100_stats = FlightEvaluation0_100.objects.filter(aircraft=aircraft).aggregate(
-        total_hours=Sum('session_flight_hours'),
-        total_fuel=Sum('fuel_consumed')
-    )
-    flight_100_120_stats = FlightEvaluation100_120.objects.filter(aircraft=aircraft).aggregate(
-        total_hours=Sum('session_flight_hours'),
-        total_fuel=Sum('fuel_consumed')
-    )
-    
-    flight_120_170_stats = FlightEvaluation120_170.objects.filter(aircraft=aircraft).aggregate(
-        total_hours=Sum('session_flight_hours'),
-        total_fuel=Sum('fuel_consumed')
-    )
+    rollup = FlightStatsRollup.objects.filter(
+        role=FlightStatsRollup.ROLE_AIRCRAFT,
+        person_id=0,
+        aircraft=aircraft,
+    ).first()
 
-    flight_reports_stats = FlightReport.objects.filter(aircraft=aircraft).aggregate(
-        total_hours=Sum('flight_hours'),
-        total_fuel=Sum('fuel_consumed')
-    )
-    
-    # Add up all the totals
-    if flight_0_100_stats['total_hours']:
-        total_flight_hours += flight_0_100_stats['total_hours']
-    if flight_0_100_stats['total_fuel']:
-        total_consumed_liters += flight_0_100_stats['total_fuel']
-
-    if flight_100_120_stats['total_hours']:
-        total_flight_hours += flight_100_120_stats['total_hours']
-    if flight_100_120_stats['total_fuel']:
-        total_consumed_liters += flight_100_120_stats['total_fuel']
-    
-    if flight_120_170_stats['total_hours']:
-        total_flight_hours += flight_120_170_stats['total_hours']
-    if flight_120_170_stats['total_fuel']:
-        total_consumed_liters += flight_120_170_stats['total_fuel']
-
-    if flight_reports_stats['total_hours']:
-        total_flight_hours += flight_reports_stats['total_hours']
-    if flight_reports_stats['total_fuel']:
-        total_consumed_liters += flight_reports_stats['total_fuel']
-    
-    # Calculate fuel gallons consumed
-    if total_consumed_liters > 0:
-        total_consumed_gallons = total_consumed_liters / Decimal('3.78541')
-    
-    # Calculate fuel rate (flight hours / consumed fuel)
-    if total_flight_hours > 0:
-        fuel_rate_liters = total_consumed_liters / total_flight_hours
-        fuel_rate_gallons = total_consumed_gallons / total_flight_hours
-
-    # Calculate total flight hours and fuel cost
-    total_flight_hours_dollars = total_flight_hours * hourly_rate
-    total_fuel_cost = total_consumed_liters * fuel_cost
-    total_cost = total_flight_hours_dollars + total_fuel_cost
-    
-    # Calculate flight hour cost (cost per hour) - handle division by zero
-    if total_flight_hours > 0:
-        flight_hour_cost = total_cost / total_flight_hours
-
-    return {
-        'total_flight_hours': total_flight_hours,
-        'total_flight_hours_dollars': total_flight_hours_dollars,
-        'total_fuel_cost': total_fuel_cost,
-        'total_consumed_liters': total_consumed_liters,
-        'total_consumed_gallons': total_consumed_gallons,
-        'fuel_rate_liters': fuel_rate_liters,
-        'fuel_rate_gallons': fuel_rate_gallons,
-        'total_cost': total_cost,
-        'flight_hour_cost': flight_hour_cost,
-    }
+    hours = rollup.hours if rollup else Decimal('0.0')
+    fuel_consumed = rollup.fuel_consumed if rollup else Decimal('0.0')
+    return aircraft_cost_stats(hours, fuel_consumed, aircraft.hourly_rate, aircraft.fuel_cost)
 
 @login_required
 def fleet_stats_page(request, aircraft_registration):
@@ -1352,7 +1053,7 @@ def fleet_stats_page(request, aircraft_registration):
     from fleet.models import Aircraft
     
     try:
-        aircraft = Aircraft.objects.get(registration=aircraft_registration)
+        aircraft = get_aircraft(aircraft_registration)
         stats = calculate_aircraft_stats(aircraft.id)
         
         context = {
@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'digest_key', 'created_at', 'sent_at')
+    list_filter = ('status', 'digest_key')
+    search_fields = ('subject', 'to')
+    readonly_fields = (
+        'subject', 'body', 'from_email', 'to', 'digest_key', 'digest_subject',
+        'attempts', 'lease_owner', 'last_error', 'created_at', 'sent_at',
+    )
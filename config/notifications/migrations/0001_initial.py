@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Asunto')),
+                ('body', models.TextField(verbose_name='Mensaje')),
+                ('from_email', models.CharField(max_length=254, verbose_name='Remitente')),
+                ('to', models.JSONField(default=list, verbose_name='Destinatarios')),
+                ('digest_key', models.CharField(blank=True, default='', help_text='Los correos pendientes con la misma clave y destinatarios se envían juntos.', max_length=100, verbose_name='Clave de resumen')),
+                ('digest_subject', models.CharField(blank=True, default='', max_length=255, verbose_name='Asunto del resumen')),
+                ('status', models.CharField(choices=[('PENDING', 'Pendiente'), ('SENT', 'Enviado'), ('FAILED', 'Fallido')], default='PENDING', max_length=10, verbose_name='Estado')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('next_attempt_at', models.DateTimeField(verbose_name='Próximo intento')),
+                ('lease_owner', models.CharField(blank=True, default='', max_length=64, verbose_name='Enviando por')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Último error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de envío')),
+            ],
+            options={
+                'verbose_name': 'Correo saliente',
+                'verbose_name_plural': 'Correos salientes',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='notif_email_due_idx'), models.Index(fields=['status', 'digest_key'], name='notif_email_digest_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,104 @@
+from django.db import models
+
+
+class OutboundEmail(models.Model):
+    """
+    Outbound Email Model
+
+    One notification email in the outbox. Signals write rows inside the
+    transaction that triggered them, and the email worker
+    (notifications/scripts/email_worker.py) delivers them over a single SMTP
+    connection, retrying failures with backoff. Pending rows that share a
+    ``digest_key``, sender and recipients are sent together as one digest.
+    """
+
+    #region CHOICES DEFINITIONS
+    STATUS_PENDING = 'PENDING'
+    STATUS_SENT = 'SENT'
+    STATUS_FAILED = 'FAILED'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendiente'),
+        (STATUS_SENT, 'Enviado'),
+        (STATUS_FAILED, 'Fallido'),
+    ]
+    #endregion
+
+    #region MESSAGE DATA
+    subject = models.CharField(
+        max_length=255,
+        verbose_name='Asunto'
+    )
+    body = models.TextField(
+        verbose_name='Mensaje'
+    )
+    from_email = models.CharField(
+        max_length=254,
+        verbose_name='Remitente'
+    )
+    to = models.JSONField(
+        default=list,
+        verbose_name='Destinatarios'
+    )
+    digest_key = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        verbose_name='Clave de resumen',
+        help_text='Los correos pendientes con la misma clave y destinatarios se envían juntos.'
+    )
+    digest_subject = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        verbose_name='Asunto del resumen'
+    )
+    #endregion
+
+    #region DELIVERY DATA
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name='Estado'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Intentos'
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='Próximo intento'
+    )
+    lease_owner = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        verbose_name='Enviando por'
+    )
+    last_error = models.TextField(
+        blank=True,
+        default='',
+        verbose_name='Último error'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de creación'
+    )
+    sent_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Fecha de envío'
+    )
+    #endregion
+
+    class Meta:
+        verbose_name = 'Correo saliente'
+        verbose_name_plural = 'Correos salientes'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notif_email_due_idx'),
+            models.Index(fields=['status', 'digest_key'], name='notif_email_digest_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} → {", ".join(self.to)} ({self.get_status_display()})'
@@ -0,0 +1,187 @@
+"""
+Transactional email outbox.
+
+Signals call queue_email() instead of send_mail(): the email is stored in the
+same transaction as the change that triggered it, so a rolled back request
+sends nothing and a request never waits on SMTP. dispatch_pending_emails(),
+run by notifications/scripts/email_worker.py, sends due emails over one SMTP
+connection. Failed emails are retried with exponential backoff.
+
+Emails queued with a ``digest_key`` wait EMAIL_DIGEST_WINDOW_SECONDS before
+they are due. When the first of them is sent, every pending email with the
+same key, sender and recipients goes out with it as a single digest, so a
+burst of notifications reaches the inbox as one message.
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+MAX_RETRY_SECONDS = 3600
+
+
+def queue_email(subject, body, to, from_email=None, digest_key='', digest_subject=''):
+    """
+    Store an email in the outbox and return it, or None without a sender or recipients.
+    """
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+    recipients = [address for address in to if address]
+    if not from_email or not recipients:
+        return None
+
+    now = timezone.now()
+    delay = settings.EMAIL_DIGEST_WINDOW_SECONDS if digest_key else 0
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        to=recipients,
+        digest_key=digest_key,
+        digest_subject=digest_subject,
+        next_attempt_at=now + timedelta(seconds=delay),
+    )
+
+
+def _claim_batch(now, owner, batch_size):
+    """
+    Lease the oldest due emails plus the pending emails of their digests.
+
+    The UPDATE re-checks that each row is still free, so when two
+    dispatchers race only one of them gets the row.
+    """
+    due = list(
+        OutboundEmail.objects.filter(
+            status=OutboundEmail.STATUS_PENDING,
+            next_attempt_at__lte=now,
+        )
+        .order_by('next_attempt_at', 'id')
+        .values_list('pk', 'digest_key')[:batch_size]
+    )
+    if not due:
+        return []
+
+    ids = {pk for pk, _digest_key in due}
+    digest_keys = {digest_key for _pk, digest_key in due if digest_key}
+    if digest_keys:
+        # Emails still inside their digest window join the digest being sent.
+        ids.update(
+            OutboundEmail.objects.filter(
+                status=OutboundEmail.STATUS_PENDING,
+                digest_key__in=digest_keys,
+                lease_owner='',
+            ).values_list('pk', flat=True)
+        )
+
+    OutboundEmail.objects.filter(
+        Q(next_attempt_at__lte=now) | Q(lease_owner=''),
+        pk__in=ids,
+        status=OutboundEmail.STATUS_PENDING,
+    ).update(
+        lease_owner=owner,
+        attempts=F('attempts') + 1,
+        next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS),
+    )
+    return list(OutboundEmail.objects.filter(pk__in=ids, lease_owner=owner).order_by('id'))
+
+
+def _group_batch(emails):
+    """
+    Split claimed emails into messages: one per digest, one per plain email.
+    """
+    groups = {}
+    for email in emails:
+        key = (email.digest_key or f'#{email.pk}', email.from_email, tuple(email.to))
+        groups.setdefault(key, []).append(email)
+    return list(groups.values())
+
+
+def build_message(emails, connection=None):
+    """
+    Return the EmailMessage for a group of outbox rows.
+
+    A single row is sent unchanged; several rows become one digest that
+    lists every notification in the order it was queued.
+    """
+    first = emails[0]
+    if len(emails) == 1:
+        subject, body = first.subject, first.body
+    else:
+        subject = f'{first.digest_subject or first.subject} ({len(emails)})'
+        sections = [f'{email.subject}\n{email.body.strip()}' for email in emails]
+        body = f'\n\n{"-" * 40}\n\n'.join(sections) + '\n'
+    return EmailMessage(
+        subject=subject,
+        body=body,
+        from_email=first.from_email,
+        to=first.to,
+        connection=connection,
+    )
+
+
+def _record_failure(emails, error, now):
+    for email in emails:
+        if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            changes = {'status': OutboundEmail.STATUS_FAILED}
+        else:
+            delay = min(settings.EMAIL_OUTBOX_RETRY_SECONDS * 2 ** (email.attempts - 1), MAX_RETRY_SECONDS)
+            changes = {'next_attempt_at': now + timedelta(seconds=delay)}
+        OutboundEmail.objects.filter(pk=email.pk).update(lease_owner='', last_error=str(error), **changes)
+
+
+def dispatch_pending_emails(batch_size=None, now=None):
+    """
+    Send one batch of due emails over a single connection; return how many rows were sent.
+
+    ``now`` can be moved forward to flush digests before their window ends.
+    """
+    now = now or timezone.now()
+    owner = uuid.uuid4().hex
+    emails = _claim_batch(now, owner, batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        _record_failure(emails, exc, now)
+        return 0
+
+    sent = 0
+    try:
+        for group in _group_batch(emails):
+            try:
+                connection.send_messages([build_message(group, connection)])
+            except Exception as exc:
+                _record_failure(group, exc, now)
+                # Drop a possibly broken connection; the next message opens a new one.
+                connection.close()
+                continue
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in group], lease_owner=owner).update(
+                status=OutboundEmail.STATUS_SENT,
+                lease_owner='',
+                last_error='',
+                sent_at=timezone.now(),
+            )
+            sent += len(group)
+    finally:
+        connection.close()
+    return sent
+
+
+def prune_sent_emails(max_age_days):
+    """
+    Delete emails sent more than ``max_age_days`` ago and return how many were removed.
+    """
+    cutoff = timezone.now() - timedelta(days=max_age_days)
+    removed, _ = OutboundEmail.objects.filter(
+        status=OutboundEmail.STATUS_SENT,
+        sent_at__lt=cutoff,
+    ).delete()
+    return removed
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Notification Email Worker for PythonAnywhere Always-On Task
+
+This script delivers the emails queued by the scheduler, transactions and SMS
+signals (see notifications/outbox.py). Each pass sends one batch over a single
+SMTP connection; digests are coalesced there. Sent emails older than
+EMAIL_OUTBOX_KEEP_DAYS are pruned once an hour.
+"""
+
+import os
+import sys
+import time
+
+import django
+from django.utils import timezone
+
+# Add Django project to Python path
+project_dir = os.path.dirname(os.path.abspath(__file__))
+django_dir = os.path.join(project_dir, "..", "..")
+sys.path.insert(0, django_dir)
+
+# Set Django environment
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+# Import Django settings and functions AFTER django.setup()
+from django.conf import settings  # noqa: E402
+from config.db_connections import close_stale_connections  # noqa: E402
+from notifications.outbox import dispatch_pending_emails, prune_sent_emails  # noqa: E402
+
+POLL_SECONDS = 5
+PRUNE_EVERY_SECONDS = 3600
+
+
+def main_worker_loop(once: bool = False):
+    """
+    Main worker loop that continuously sends pending emails.
+    """
+    print("[{}] Email Worker started".format(timezone.now()))
+    last_prune = 0.0
+
+    while True:
+        try:
+            close_stale_connections()
+            sent = dispatch_pending_emails()
+            if sent:
+                print("[{}] Sent {} email(s)".format(timezone.now(), sent))
+
+            if time.monotonic() - last_prune >= PRUNE_EVERY_SECONDS:
+                removed = prune_sent_emails(settings.EMAIL_OUTBOX_KEEP_DAYS)
+                if removed:
+                    print("[{}] Pruned {} sent email(s)".format(timezone.now(), removed))
+                last_prune = time.monotonic()
+
+            if once:
+                break
+            # A full batch usually means more is waiting; go again right away.
+            if sent < settings.EMAIL_OUTBOX_BATCH_SIZE:
+                time.sleep(POLL_SECONDS)
+        except KeyboardInterrupt:
+            print("[{}] Email Worker stopped by user".format(timezone.now()))
+            break
+        except Exception as e:
+            print("[{}] Email Worker error: {}".format(timezone.now(), str(e)))
+            if once:
+                break
+            time.sleep(30)
+
+
+if __name__ == "__main__":
+    main_worker_loop(once="--once" in sys.argv)
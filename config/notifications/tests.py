@@ -0,0 +1,153 @@
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from notifications.models import OutboundEmail
+from notifications.outbox import dispatch_pending_emails, prune_sent_emails, queue_email
+from scheduler.test.factories import FlightRequestFactory, StudentProfileFactory
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    DEFAULT_FROM_EMAIL='from@test.com',
+    EMAIL_DIGEST_WINDOW_SECONDS=60,
+    EMAIL_OUTBOX_RETRY_SECONDS=60,
+    EMAIL_OUTBOX_MAX_ATTEMPTS=3,
+)
+class EmailOutboxTests(TestCase):
+    def later(self, seconds):
+        return timezone.now() + timedelta(seconds=seconds)
+
+    def test_rolled_back_transaction_sends_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                queue_email('Asunto', 'Mensaje', ['a@test.com'])
+                raise RuntimeError('rollback')
+
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_missing_sender_or_recipients_is_not_queued(self):
+        self.assertIsNone(queue_email('Asunto', 'Mensaje', [None, '']))
+        with override_settings(DEFAULT_FROM_EMAIL=None):
+            self.assertIsNone(queue_email('Asunto', 'Mensaje', ['a@test.com']))
+
+    def test_batch_is_sent_over_one_connection(self):
+        for index in range(5):
+            queue_email(f'Asunto {index}', 'Mensaje', [f'user{index}@test.com'])
+
+        with mock.patch('notifications.outbox.get_connection', wraps=get_connection) as connections:
+            self.assertEqual(dispatch_pending_emails(), 5)
+
+        connections.assert_called_once_with()
+        self.assertEqual([message.subject for message in mail.outbox], [f'Asunto {index}' for index in range(5)])
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists())
+        self.assertEqual(dispatch_pending_emails(), 0)
+
+    def test_burst_is_coalesced_into_one_digest(self):
+        for index in range(20):
+            queue_email(
+                f'Nueva solicitud {index}', f'Detalle {index}', ['ops@test.com'],
+                digest_key='requests', digest_subject='Nuevas solicitudes',
+            )
+        queue_email('Otro asunto', 'Mensaje', ['ops@test.com'])
+
+        # Digests wait for their window; plain emails go out right away.
+        self.assertEqual(dispatch_pending_emails(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+        self.assertEqual(dispatch_pending_emails(now=self.later(61)), 20)
+        digest = mail.outbox[1]
+        self.assertEqual(digest.subject, 'Nuevas solicitudes (20)')
+        self.assertEqual(digest.to, ['ops@test.com'])
+        self.assertIn('Nueva solicitud 0\nDetalle 0', digest.body)
+        self.assertIn('Nueva solicitud 19\nDetalle 19', digest.body)
+
+    def test_digest_includes_emails_still_inside_their_window(self):
+        first = queue_email('Primera', 'Mensaje', ['ops@test.com'], digest_key='requests')
+        OutboundEmail.objects.filter(pk=first.pk).update(next_attempt_at=timezone.now())
+        queue_email('Segunda', 'Mensaje', ['ops@test.com'], digest_key='requests')
+        queue_email('Otro destinatario', 'Mensaje', ['staff@test.com'], digest_key='requests')
+
+        self.assertEqual(dispatch_pending_emails(), 3)
+        self.assertEqual(sorted(message.subject for message in mail.outbox), ['Otro destinatario', 'Primera (2)'])
+
+    def test_failed_email_is_retried_with_backoff_then_given_up(self):
+        email = queue_email('Asunto', 'Mensaje', ['a@test.com'])
+        error = SMTPServerDisconnected('connection unexpectedly closed')
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=error):
+            self.assertEqual(dispatch_pending_emails(), 0)
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_PENDING, 1))
+            self.assertIn('unexpectedly closed', email.last_error)
+
+            # Not due again until the first backoff has passed, then twice as long.
+            self.assertEqual(dispatch_pending_emails(now=self.later(30)), 0)
+            email.refresh_from_db()
+            self.assertEqual(email.attempts, 1)
+            dispatch_pending_emails(now=self.later(61))
+            email.refresh_from_db()
+            self.assertEqual(email.attempts, 2)
+            self.assertGreater(email.next_attempt_at, self.later(180))
+
+            dispatch_pending_emails(now=self.later(300))
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), (OutboundEmail.STATUS_FAILED, 3))
+
+        self.assertEqual(dispatch_pending_emails(now=self.later(3600)), 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_one_failure_does_not_block_the_rest_of_the_batch(self):
+        queue_email('Falla', 'Mensaje', ['bad@test.com'])
+        queue_email('Llega', 'Mensaje', ['good@test.com'])
+        send_messages = mail.backends.locmem.EmailBackend.send_messages
+
+        def flaky_send(backend, messages):
+            if messages[0].to == ['bad@test.com']:
+                raise SMTPServerDisconnected('closed')
+            return send_messages(backend, messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', flaky_send):
+            self.assertEqual(dispatch_pending_emails(), 1)
+
+        self.assertEqual([message.subject for message in mail.outbox], ['Llega'])
+        self.assertEqual(OutboundEmail.objects.get(subject='Falla').status, OutboundEmail.STATUS_PENDING)
+
+    def test_leased_emails_are_not_sent_twice(self):
+        email = queue_email('Asunto', 'Mensaje', ['a@test.com'])
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            lease_owner='other-worker',
+            next_attempt_at=self.later(300),
+        )
+
+        self.assertEqual(dispatch_pending_emails(), 0)
+        # A lease that expired (worker died) can be taken over.
+        self.assertEqual(dispatch_pending_emails(now=self.later(301)), 1)
+
+    def test_prune_drops_old_sent_emails(self):
+        queue_email('Asunto', 'Mensaje', ['a@test.com'])
+        dispatch_pending_emails()
+
+        self.assertEqual(prune_sent_emails(max_age_days=1), 0)
+        OutboundEmail.objects.update(sent_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(prune_sent_emails(max_age_days=1), 1)
+
+    @override_settings(OPS_NOTIFICATION_EMAIL='ops@test.com')
+    def test_new_flight_requests_reach_staff_as_one_digest(self):
+        for _ in range(3):
+            student = StudentProfileFactory(balance=1000.00).user
+            FlightRequestFactory(student=student, status='pending')
+
+        self.assertEqual(mail.outbox, [])
+        dispatch_pending_emails(now=self.later(61))
+
+        to_ops = [message for message in mail.outbox if message.to == ['ops@test.com']]
+        self.assertEqual(len(to_ops), 1)
+        self.assertEqual(to_ops[0].subject, 'Nuevas solicitudes de vuelo (3)')
+        self.assertEqual(to_ops[0].body.count('Se recibió una nueva solicitud de vuelo.'), 3)
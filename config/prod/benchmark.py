@@ -0,0 +1,315 @@
+"""
+Synthetic session ledger used to benchmark the production report.
+
+build_synthetic_ledger() fills the session ledger with a reproducible mix of
+training flights, simulator sessions, external flights and flight reports,
+and rebuilds the daily production rollup over them. Callers run it inside a transaction they roll back; see the
+``benchmark_production_report`` management command.
+
+row_by_row_report() is the per-row reference calculation the production
+report is checked against.
+"""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fleet.models import Aircraft, Simulator
+from fms.models import SessionLedgerEntry
+from fms.rollups import rebuild_daily_rollups
+from prod.services.production import (
+    ProductionFilters,
+    ProductionReport,
+    ProductionTotals,
+    _add_breakdown,
+    _add_date_breakdown,
+    _build_report,
+    _ledger_queryset,
+)
+
+
+BENCHMARK_START = date(2020, 1, 1)
+
+SOURCE_WEIGHTS = (
+    (SessionLedgerEntry.SOURCE_0_100, 30),
+    (SessionLedgerEntry.SOURCE_100_120, 20),
+    (SessionLedgerEntry.SOURCE_120_170, 15),
+    (SessionLedgerEntry.SOURCE_SIM, 25),
+    (SessionLedgerEntry.SOURCE_EXTERNAL, 5),
+    (SessionLedgerEntry.SOURCE_REPORT, 5),
+)
+
+
+def _tenths(rng, low, high):
+    return Decimal(rng.randint(low * 10, high * 10)).scaleb(-1)
+
+
+def _cents(rng, low, high):
+    return Decimal(rng.randint(low * 100, high * 100)).scaleb(-2)
+
+
+def build_synthetic_ledger(start_date, years=3, sessions_per_day=20, seed=0, batch_size=2000):
+    """
+    Create ``years`` of ledger rows from ``start_date`` and return how many were created.
+
+    People keep their id but occasionally change name, so label resolution is
+    exercised too.
+    """
+    rng = random.Random(seed)
+    aircraft = [
+        Aircraft.objects.create(
+            manufacturer='Piper',
+            model='PA-28',
+            registration=f'BENCH{index}',
+            serial_number=f'BENCH-{seed}-{index}',
+            year_manufactured=1990,
+        )
+        for index in range(6)
+    ]
+    simulators = [Simulator.objects.create(name=f'BENCH-SIM-{seed}-{index}') for index in range(2)]
+    instructors = [(90_000_000 + index, f'Instructor{index}', 'Bench') for index in range(25)]
+    students = [(80_000_000 + index, f'Alumno{index}', 'Bench') for index in range(300)]
+    sources, weights = zip(*SOURCE_WEIGHTS)
+
+    entries = []
+    created = 0
+    source_id = 0
+    day = start_date
+    end_date = start_date + timedelta(days=365 * years)
+    while day < end_date:
+        for _ in range(sessions_per_day):
+            source_id += 1
+            source_model = rng.choices(sources, weights)[0]
+            instructor_id, instructor_first_name, instructor_last_name = rng.choice(instructors)
+            student_id, student_first_name, student_last_name = rng.choice(students)
+            if rng.random() < 0.01:
+                student_last_name = 'Renamed'
+            entry = SessionLedgerEntry(
+                source_model=source_model,
+                source_id=source_id,
+                session_date=day,
+                fuel_consumed=_tenths(rng, 0, 60),
+                fuel_rate_applied=_cents(rng, 2, 4),
+            )
+            if source_model != SessionLedgerEntry.SOURCE_REPORT:
+                entry.instructor_id = instructor_id
+                entry.instructor_first_name = instructor_first_name
+                entry.instructor_last_name = instructor_last_name
+                entry.student_id = student_id
+                entry.student_first_name = student_first_name
+                entry.student_last_name = student_last_name
+            if source_model == SessionLedgerEntry.SOURCE_SIM:
+                entry.simulator = rng.choice(simulators)
+                entry.fuel_consumed = Decimal('0.0')
+                entry.fuel_rate_applied = Decimal('0.00')
+            elif source_model == SessionLedgerEntry.SOURCE_EXTERNAL:
+                entry.aircraft_registration = f'N{rng.randint(100, 120)}EX'
+            else:
+                plane = rng.choice(aircraft)
+                entry.aircraft = plane
+                entry.aircraft_registration = plane.registration
+            if source_model in SessionLedgerEntry.TRAINING_FLIGHT_SOURCES or source_model == SessionLedgerEntry.SOURCE_SIM:
+                entry.hours = _tenths(rng, 0, 3)
+                entry.hourly_rate_applied = _cents(rng, 100, 150)
+                entry.resource_rate_applied = _cents(rng, 30, 150)
+                entry.instructor_rate_applied = _cents(rng, 10, 25)
+            entries.append(entry)
+
+            if len(entries) >= batch_size:
+                SessionLedgerEntry.objects.bulk_create(entries)
+                created += len(entries)
+                entries = []
+        day += timedelta(days=1)
+
+    SessionLedgerEntry.objects.bulk_create(entries)
+    rebuild_daily_rollups(start_date, end_date, batch_size=batch_size)
+    return created + len(entries)
+
+
+def report_signature(report):
+    """
+    Return every value of a production report as text, so Decimal exponents count too.
+    """
+    def totals(values):
+        return tuple(str(getattr(values, name)) for name in values.__dataclass_fields__)
+
+    breakdowns = tuple(
+        tuple((row.key, row.label, totals(row.totals)) for row in rows)
+        for rows in (
+            report.by_aircraft,
+            report.by_simulator,
+            report.by_instructor,
+            report.by_student,
+            report.by_date,
+        )
+    )
+    return totals(report.totals), breakdowns
+
+
+def row_by_row_report(filters: ProductionFilters) -> ProductionReport:
+    """
+    Reference implementation that adds up every ledger row in Python.
+
+    get_production_report() must return exactly the same report; the tests
+    and the ``benchmark_production_report`` command compare the two.
+    """
+
+    filters.validate()
+    report_totals = ProductionTotals()
+    breakdowns = {
+        'aircraft': {},
+        'simulator': {},
+        'instructor': {},
+        'student': {},
+        'date': {},
+    }
+
+    for entry in _ledger_queryset(filters).select_related('simulator').iterator():
+        if entry.source_model in SessionLedgerEntry.TRAINING_FLIGHT_SOURCES:
+            values = _flight_values(entry)
+            report_totals.add(values)
+            _add_flight_breakdowns(breakdowns, entry, values)
+        elif entry.source_model == SessionLedgerEntry.SOURCE_SIM:
+            values = _simulator_values(entry)
+            report_totals.add(values)
+            _add_simulator_breakdowns(breakdowns, entry, values)
+        elif entry.source_model == SessionLedgerEntry.SOURCE_EXTERNAL:
+            values = _fuel_values(entry)
+            report_totals.add(values)
+            _add_fuel_breakdowns(
+                breakdowns,
+                entry.session_date,
+                entry.aircraft_registration,
+                values,
+                instructor=(
+                    entry.instructor_id,
+                    f'{entry.instructor_first_name} {entry.instructor_last_name}',
+                ),
+                student=(
+                    entry.student_id,
+                    f'{entry.student_first_name} {entry.student_last_name}',
+                ),
+            )
+        else:
+            values = _fuel_values(entry)
+            report_totals.add(values)
+            _add_fuel_breakdowns(
+                breakdowns,
+                entry.session_date,
+                entry.aircraft_registration,
+                values,
+            )
+
+    return _build_report(filters, report_totals, breakdowns)
+
+
+def _flight_values(evaluation) -> ProductionTotals:
+    """Calculate production values contributed by one training flight."""
+
+    hours = evaluation.hours
+    gross_income = hours * evaluation.resource_rate_applied
+    instructor_cost = hours * evaluation.instructor_rate_applied
+    return ProductionTotals(
+        fuel_liters=evaluation.fuel_consumed,
+        fuel_cost_usd=evaluation.fuel_consumed * evaluation.fuel_rate_applied,
+        flight_hours=hours,
+        gross_flying_income_usd=gross_income,
+        instructor_flying_cost_usd=instructor_cost,
+        net_flying_revenue_usd=gross_income - instructor_cost,
+        student_flying_value_usd=hours * evaluation.hourly_rate_applied,
+    )
+
+
+def _simulator_values(evaluation) -> ProductionTotals:
+    """Calculate production values contributed by one simulator session."""
+
+    hours = evaluation.hours
+    gross_income = hours * evaluation.resource_rate_applied
+    instructor_cost = hours * evaluation.instructor_rate_applied
+    return ProductionTotals(
+        simulator_hours=hours,
+        gross_simulator_income_usd=gross_income,
+        instructor_simulator_cost_usd=instructor_cost,
+        net_simulator_revenue_usd=gross_income - instructor_cost,
+    )
+
+
+def _fuel_values(record) -> ProductionTotals:
+    """Calculate the fuel-only contribution of an external flight or report."""
+
+    return ProductionTotals(
+        fuel_liters=record.fuel_consumed,
+        fuel_cost_usd=record.fuel_consumed * record.fuel_rate_applied,
+    )
+
+
+def _add_flight_breakdowns(breakdowns, evaluation, values):
+    """Add a training flight to its aircraft, people, and date rows."""
+
+    _add_breakdown(
+        breakdowns['aircraft'],
+        evaluation.aircraft_registration,
+        evaluation.aircraft_registration,
+        values,
+    )
+    _add_breakdown(
+        breakdowns['instructor'],
+        evaluation.instructor_id,
+        f'{evaluation.instructor_first_name} {evaluation.instructor_last_name}',
+        values,
+    )
+    _add_breakdown(
+        breakdowns['student'],
+        evaluation.student_id,
+        f'{evaluation.student_first_name} {evaluation.student_last_name}',
+        values,
+    )
+    _add_date_breakdown(breakdowns, evaluation.session_date, values)
+
+
+def _add_simulator_breakdowns(breakdowns, evaluation, values):
+    """Add a simulator session to its simulator, people, and date rows."""
+
+    _add_breakdown(
+        breakdowns['simulator'],
+        evaluation.simulator_id,
+        evaluation.simulator.name,
+        values,
+    )
+    _add_breakdown(
+        breakdowns['instructor'],
+        evaluation.instructor_id,
+        f'{evaluation.instructor_first_name} {evaluation.instructor_last_name}',
+        values,
+    )
+    _add_breakdown(
+        breakdowns['student'],
+        evaluation.student_id,
+        f'{evaluation.student_first_name} {evaluation.student_last_name}',
+        values,
+    )
+    _add_date_breakdown(breakdowns, evaluation.session_date, values)
+
+
+def _add_fuel_breakdowns(
+    breakdowns,
+    session_date,
+    aircraft_registration,
+    values,
+    *,
+    instructor=None,
+    student=None,
+):
+    """Add fuel-only activity to every breakdown with known identifying data."""
+
+    _add_breakdown(
+        breakdowns['aircraft'],
+        aircraft_registration,
+        aircraft_registration,
+        values,
+    )
+    if instructor:
+        _add_breakdown(breakdowns['instructor'], instructor[0], instructor[1], values)
+    if student:
+        _add_breakdown(breakdowns['student'], student[0], student[1], values)
+    _add_date_breakdown(breakdowns, session_date, values)
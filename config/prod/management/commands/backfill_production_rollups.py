@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from fms.rollups import rebuild_daily_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily production rollup read by the production and fuel reports from the session ledger.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            help='Inclusive starting date in YYYY-MM-DD format (default: first session).',
+        )
+        parser.add_argument(
+            '--end',
+            help='Inclusive ending date in YYYY-MM-DD format (default: last session).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows read and inserted per batch (default: 500).',
+        )
+
+    def handle(self, *args, **options):
+        start_date = self._parse_date(options['start'], '--start')
+        end_date = self._parse_date(options['end'], '--end')
+        if start_date and end_date and start_date > end_date:
+            raise CommandError('--start cannot be later than --end.')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer.')
+
+        total = rebuild_daily_rollups(start_date, end_date, batch_size=batch_size)
+        period = f'{start_date or "first session"} to {end_date or "last session"}'
+        self.stdout.write(f'Period: {period} (inclusive)')
+        self.stdout.write(f'Daily production rollup rows: {total}')
+
+    @staticmethod
+    def _parse_date(value, option_name):
+        if value is None:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f'{option_name} must use YYYY-MM-DD format.')
+        return parsed
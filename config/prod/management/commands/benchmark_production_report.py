@@ -0,0 +1,80 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from prod.benchmark import BENCHMARK_START, build_synthetic_ledger, report_signature, row_by_row_report
+from prod.services import ProductionFilters, get_production_report
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the production report on a synthetic multi-year session ledger and '
+        'check it matches the row-by-row calculation. Nothing is kept in the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--years',
+            type=int,
+            default=3,
+            help='Years of synthetic sessions (default: 3).',
+        )
+        parser.add_argument(
+            '--sessions-per-day',
+            type=int,
+            default=20,
+            help='Synthetic sessions per day (default: 20).',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per implementation; the fastest is reported (default: 3).',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed of the synthetic data (default: 0).',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['years'], options['sessions_per_day'], options['repeat']) < 1:
+            raise CommandError('--years, --sessions-per-day and --repeat must be positive integers.')
+
+        with transaction.atomic():
+            rows = build_synthetic_ledger(
+                BENCHMARK_START,
+                years=options['years'],
+                sessions_per_day=options['sessions_per_day'],
+                seed=options['seed'],
+            )
+            filters = ProductionFilters(
+                BENCHMARK_START,
+                BENCHMARK_START + timedelta(days=365 * options['years']),
+            )
+            self.stdout.write(f'Synthetic ledger rows: {rows}')
+
+            grouped, grouped_seconds = self._time(get_production_report, filters, options['repeat'])
+            by_rows, by_rows_seconds = self._time(row_by_row_report, filters, options['repeat'])
+            identical = report_signature(grouped) == report_signature(by_rows)
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'Row by row: {by_rows_seconds * 1000:.1f} ms')
+        self.stdout.write(f'Grouped:    {grouped_seconds * 1000:.1f} ms')
+        self.stdout.write(f'Speedup:    {by_rows_seconds / grouped_seconds:.1f}x')
+        if not identical:
+            raise CommandError('The grouped report differs from the row-by-row report.')
+        self.stdout.write('Reports are identical.')
+
+    @staticmethod
+    def _time(build_report, filters, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            report = build_report(filters)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return report, best
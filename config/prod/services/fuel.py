@@ -3,27 +3,24 @@ from datetime import date
 from decimal import Decimal
 
 from django.core.exceptions import ValidationError
-from django.db.models import Count, DecimalField, F, Sum
+from django.db.models import Sum
 
 from fleet.models import Aircraft
-from fms.models import (
-    ExternalFlightEvaluation,
-    FlightEvaluation0_100,
-    FlightEvaluation100_120,
-    FlightEvaluation120_170,
-    FlightReport,
-)
-
-
-EVALUATION_MODELS = {
-    '0-100': FlightEvaluation0_100,
-    '100-120': FlightEvaluation100_120,
-    '120-170': FlightEvaluation120_170,
+from fms.models import DailyProductionRollup, ExternalFlightEvaluation, SessionLedgerEntry
+
+from .production import _scaled, _tenths, _thousandths
+
+
+# Evaluation types accepted by the service and the session ledger source of each
+SOURCE_MODELS = {
+    '0-100': SessionLedgerEntry.SOURCE_0_100,
+    '100-120': SessionLedgerEntry.SOURCE_100_120,
+    '120-170': SessionLedgerEntry.SOURCE_120_170,
+    'external': SessionLedgerEntry.SOURCE_EXTERNAL,
+    'flight-reports': SessionLedgerEntry.SOURCE_REPORT,
 }
-ADDITIONAL_SOURCES = ('external', 'flight-reports')
-ALL_SOURCES = (*EVALUATION_MODELS, *ADDITIONAL_SOURCES)
+ALL_SOURCES = tuple(SOURCE_MODELS)
 
-ZERO = Decimal('0')
 USD_QUANTUM = Decimal('0.01')
 
 
@@ -46,91 +43,38 @@ def get_fuel_consumed(
     evaluation_types: tuple[str, ...] | list[str] | None = None,
     aircraft_registration: str | None = None,
 ) -> FuelConsumptionReport:
-    """Return flight hours and fuel totals for an inclusive date range."""
+    """Return flight hours and fuel totals for an inclusive date range.
+
+    The totals are one aggregate over the daily production rollup, whose
+    fuel cost already applies each session's historical fuel rate.
+    """
     _validate_dates(start_date, end_date)
     selected_types = _normalize_evaluation_types(evaluation_types)
     aircraft = _normalize_aircraft(aircraft_registration)
 
-    evaluation_count = 0
-    flight_hours = ZERO
-    fuel_liters = ZERO
-    fuel_cost_usd = ZERO
-
-    for evaluation_type in (
-        source for source in selected_types if source in EVALUATION_MODELS
-    ):
-        queryset = EVALUATION_MODELS[evaluation_type].objects.filter(
-            session_date__range=(start_date, end_date),
-        )
-        if aircraft is not None:
-            queryset = queryset.filter(aircraft__registration__iexact=aircraft)
-
-        totals = queryset.aggregate(
-            evaluation_count=Count('pk'),
-            flight_hours=Sum('session_flight_hours', default=ZERO),
-            fuel_liters=Sum('fuel_consumed', default=ZERO),
-            fuel_cost_usd=Sum(
-                F('fuel_consumed') * F('fuel_rate_applied'),
-                output_field=DecimalField(max_digits=18, decimal_places=4),
-                default=ZERO,
-            ),
-        )
-        evaluation_count += totals['evaluation_count']
-        flight_hours += totals['flight_hours']
-        fuel_liters += totals['fuel_liters']
-        fuel_cost_usd += totals['fuel_cost_usd']
-
-    if 'external' in selected_types:
-        queryset = ExternalFlightEvaluation.objects.filter(
-            session_date__range=(start_date, end_date),
-        )
-        if aircraft is not None:
-            queryset = queryset.filter(aircraft_registration__iexact=aircraft)
-        totals = queryset.aggregate(
-            evaluation_count=Count('pk'),
-            flight_hours=Sum('session_flight_hours', default=ZERO),
-            fuel_liters=Sum('fuel_consumed', default=ZERO),
-            fuel_cost_usd=Sum(
-                F('fuel_consumed') * F('fuel_rate_applied'),
-                output_field=DecimalField(max_digits=18, decimal_places=4),
-                default=ZERO,
-            ),
-        )
-        evaluation_count += totals['evaluation_count']
-        flight_hours += totals['flight_hours']
-        fuel_liters += totals['fuel_liters']
-        fuel_cost_usd += totals['fuel_cost_usd']
-
-    if 'flight-reports' in selected_types:
-        queryset = FlightReport.objects.filter(
-            flight_date__range=(start_date, end_date),
-        )
-        if aircraft is not None:
-            queryset = queryset.filter(aircraft__registration__iexact=aircraft)
-        totals = queryset.aggregate(
-            evaluation_count=Count('pk'),
-            flight_hours=Sum('flight_hours', default=ZERO),
-            fuel_liters=Sum('fuel_consumed', default=ZERO),
-            fuel_cost_usd=Sum(
-                F('fuel_consumed') * F('fuel_rate_applied'),
-                output_field=DecimalField(max_digits=18, decimal_places=4),
-                default=ZERO,
-            ),
-        )
-        evaluation_count += totals['evaluation_count']
-        flight_hours += totals['flight_hours']
-        fuel_liters += totals['fuel_liters']
-        fuel_cost_usd += totals['fuel_cost_usd']
+    queryset = DailyProductionRollup.objects.filter(
+        session_date__range=(start_date, end_date),
+        source_model__in=[SOURCE_MODELS[source] for source in selected_types],
+    )
+    if aircraft is not None:
+        queryset = queryset.filter(aircraft_registration__iexact=aircraft)
+
+    totals = queryset.aggregate(
+        evaluation_count=Sum('sessions', default=0),
+        hours_tenths=Sum(_scaled('hours', 1), default=0),
+        fuel_tenths=Sum(_scaled('fuel_consumed', 1), default=0),
+        fuel_cost=Sum(_scaled('fuel_cost', 3), default=0),
+    )
 
     return FuelConsumptionReport(
         start_date=start_date,
         end_date=end_date,
         aircraft=aircraft,
         evaluation_types=selected_types,
-        evaluation_count=evaluation_count,
-        flight_hours=flight_hours,
-        fuel_liters=fuel_liters,
-        fuel_cost_usd=fuel_cost_usd.quantize(USD_QUANTUM),
+        evaluation_count=totals['evaluation_count'],
+        flight_hours=_tenths(totals['hours_tenths']),
+        fuel_liters=_tenths(totals['fuel_tenths']),
+        fuel_cost_usd=_thousandths(totals['fuel_cost']).quantize(USD_QUANTUM),
     )
 
 
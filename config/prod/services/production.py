@@ -3,22 +3,13 @@ from datetime import date
 from decimal import Decimal
 
 from django.core.exceptions import ValidationError
+from django.db.models import BigIntegerField, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, Round
+
+from fleet.models import Simulator
+from fms.models import DailyProductionRollup, SessionLedgerEntry
+
 
-from fms.models import (
-    ExternalFlightEvaluation,
-    FlightEvaluation0_100,
-    FlightEvaluation100_120,
-    FlightEvaluation120_170,
-    FlightReport,
-    SimEvaluation,
-)
-
-
-FLIGHT_EVALUATION_MODELS = (
-    FlightEvaluation0_100,
-    FlightEvaluation100_120,
-    FlightEvaluation120_170,
-)
 ZERO = Decimal('0')
 MONEY_QUANTUM = Decimal('0.01')
 
@@ -105,9 +96,16 @@ class ProductionReport:
 
 
 def get_production_report(filters: ProductionFilters) -> ProductionReport:
-    """Calculate totals and all required breakdowns from stored rate snapshots."""
+    """Calculate totals and all required breakdowns from stored rate snapshots.
+
+    Each breakdown is one GROUP BY query over the daily production rollup,
+    split by source model so every group keeps the meaning of its sessions.
+    Sums are taken over integer tenths and thousandths, which keeps them exact
+    on every database, and the few group rows are then merged in Python.
+    """
 
     filters.validate()
+    queryset = _filtered(DailyProductionRollup.objects.order_by(), filters)
     report_totals = ProductionTotals()
     breakdowns = {
         'aircraft': {},
@@ -117,74 +115,48 @@ def get_production_report(filters: ProductionFilters) -> ProductionReport:
         'date': {},
     }
 
-    for model in FLIGHT_EVALUATION_MODELS:
-        queryset = model.objects.filter(
-            session_date__range=(filters.start_date, filters.end_date),
-        ).select_related('aircraft')
-        queryset = _filter_training_queryset(queryset, filters, include_aircraft=True)
-        for evaluation in queryset.iterator():
-            values = _flight_values(evaluation)
-            report_totals.add(values)
-            _add_flight_breakdowns(breakdowns, evaluation, values)
-
-    external_queryset = ExternalFlightEvaluation.objects.filter(
-        session_date__range=(filters.start_date, filters.end_date),
-    )
-    if filters.aircraft_registrations:
-        external_queryset = external_queryset.filter(
-            aircraft_registration__in=filters.aircraft_registrations,
-        )
-    if filters.instructor_ids:
-        external_queryset = external_queryset.filter(instructor_id__in=filters.instructor_ids)
-    if filters.student_ids:
-        external_queryset = external_queryset.filter(student_id__in=filters.student_ids)
-    for evaluation in external_queryset.iterator():
-        values = _fuel_values(evaluation)
+    # Every session has a date, so the date groups also add up to the totals.
+    for row in _grouped(queryset, 'session_date'):
+        values = _group_values(row)
         report_totals.add(values)
-        _add_fuel_breakdowns(
-            breakdowns,
-            evaluation.session_date,
-            evaluation.aircraft_registration,
-            values,
-            instructor=(
-                evaluation.instructor_id,
-                f'{evaluation.instructor_first_name} {evaluation.instructor_last_name}',
-            ),
-            student=(
-                evaluation.student_id,
-                f'{evaluation.student_first_name} {evaluation.student_last_name}',
-            ),
-        )
+        _add_date_breakdown(breakdowns, row['session_date'], values)
 
-    report_queryset = FlightReport.objects.filter(
-        flight_date__range=(filters.start_date, filters.end_date),
-    ).select_related('aircraft')
-    if filters.aircraft_registrations:
-        report_queryset = report_queryset.filter(
-            aircraft__registration__in=filters.aircraft_registrations,
-        )
-    if filters.instructor_ids or filters.student_ids:
-        report_queryset = report_queryset.none()
-    for flight_report in report_queryset.iterator():
-        values = _fuel_values(flight_report)
-        report_totals.add(values)
-        _add_fuel_breakdowns(
-            breakdowns,
-            flight_report.flight_date,
-            flight_report.aircraft.registration,
-            values,
+    aircraft_rows = _grouped(
+        queryset.exclude(source_model=SessionLedgerEntry.SOURCE_SIM),
+        'aircraft_registration',
+    )
+    for row in aircraft_rows:
+        registration = row['aircraft_registration']
+        _add_breakdown(breakdowns['aircraft'], registration, registration, _group_values(row))
+
+    simulator_rows = _grouped(
+        queryset.filter(source_model=SessionLedgerEntry.SOURCE_SIM),
+        'simulator_id',
+        simulator_name=Subquery(Simulator.objects.filter(pk=OuterRef('simulator_id')).values('name')),
+    )
+    for row in simulator_rows:
+        _add_breakdown(breakdowns['simulator'], row['simulator_id'], row['simulator_name'] or '', _group_values(row))
+
+    # Flight reports carry no instructor or student.
+    people = queryset.exclude(source_model=SessionLedgerEntry.SOURCE_REPORT)
+    for role in ('instructor', 'student'):
+        rows = _grouped(
+            people,
+            f'{role}_id',
+            f'{role}_first_name',
+            f'{role}_last_name',
+            last_session=Max('session_date'),
         )
+        labels = _person_labels(_ledger_queryset(filters), role, rows)
+        for row in rows:
+            key = row[f'{role}_id']
+            _add_breakdown(breakdowns[role], key, labels[key], _group_values(row))
 
-    sim_queryset = SimEvaluation.objects.filter(
-        session_date__range=(filters.start_date, filters.end_date),
-    ).select_related('simulator')
-    sim_queryset = _filter_training_queryset(sim_queryset, filters)
-    if filters.simulator_ids:
-        sim_queryset = sim_queryset.filter(simulator_id__in=filters.simulator_ids)
-    for evaluation in sim_queryset.iterator():
-        values = _simulator_values(evaluation)
-        report_totals.add(values)
-        _add_simulator_breakdowns(breakdowns, evaluation, values)
+    return _build_report(filters, report_totals, breakdowns)
+
+
+def _build_report(filters, report_totals, breakdowns):
+    """Round every accumulated total and sort the breakdown rows."""
 
     report_totals.round_money()
     for group in breakdowns.values():
@@ -202,130 +174,133 @@ def get_production_report(filters: ProductionFilters) -> ProductionReport:
     )
 
 
-def _filter_training_queryset(queryset, filters, *, include_aircraft=False):
-    """Apply the filters shared by flight and simulator training sessions."""
+def _scaled(field_name, decimal_places):
+    """Return a decimal column as an integer count of its smallest unit."""
 
-    if include_aircraft and filters.aircraft_registrations:
-        queryset = queryset.filter(
-            aircraft__registration__in=filters.aircraft_registrations,
-        )
-    if filters.instructor_ids:
-        queryset = queryset.filter(instructor_id__in=filters.instructor_ids)
-    if filters.student_ids:
-        queryset = queryset.filter(student_id__in=filters.student_ids)
-    return queryset
+    return Cast(Round(F(field_name) * 10 ** decimal_places), BigIntegerField())
 
 
-def _flight_values(evaluation) -> ProductionTotals:
-    """Calculate production values contributed by one training flight."""
+def _grouped(queryset, *fields, **extra):
+    """Return integer sums of rollup rows per ``fields`` and source model.
 
-    hours = evaluation.session_flight_hours
-    gross_income = hours * evaluation.aircraft_rate_applied
-    instructor_cost = hours * evaluation.instructor_rate_applied
-    return ProductionTotals(
-        fuel_liters=evaluation.fuel_consumed,
-        fuel_cost_usd=evaluation.fuel_consumed * evaluation.fuel_rate_applied,
-        flight_hours=hours,
-        gross_flying_income_usd=gross_income,
-        instructor_flying_cost_usd=instructor_cost,
-        net_flying_revenue_usd=gross_income - instructor_cost,
-        student_flying_value_usd=hours * evaluation.hourly_rate_applied,
+    Hours and liters are summed in tenths, money in thousandths. ``extra``
+    adds more annotations to each group.
+    """
+
+    return list(
+        queryset.values(*fields, 'source_model').annotate(
+            hours_tenths=Sum(_scaled('hours', 1)),
+            fuel_tenths=Sum(_scaled('fuel_consumed', 1)),
+            fuel_cost=Sum(_scaled('fuel_cost', 3)),
+            resource_income=Sum(_scaled('resource_income', 3)),
+            instructor_cost=Sum(_scaled('instructor_cost', 3)),
+            student_value=Sum(_scaled('student_value', 3)),
+            **extra,
+        )
     )
 
 
-def _simulator_values(evaluation) -> ProductionTotals:
-    """Calculate production values contributed by one simulator session."""
+def _tenths(value) -> Decimal:
+    return Decimal(int(value)).scaleb(-1)
 
-    hours = evaluation.session_sim_hours
-    gross_income = hours * evaluation.simulator_rate_applied
-    instructor_cost = hours * evaluation.instructor_rate_applied
-    return ProductionTotals(
-        simulator_hours=hours,
-        gross_simulator_income_usd=gross_income,
-        instructor_simulator_cost_usd=instructor_cost,
-        net_simulator_revenue_usd=gross_income - instructor_cost,
-    )
 
+def _thousandths(value) -> Decimal:
+    return Decimal(int(value)).scaleb(-3)
 
-def _fuel_values(record) -> ProductionTotals:
-    """Calculate the fuel-only contribution of an external flight or report."""
 
+def _group_values(row) -> ProductionTotals:
+    """Convert the sums of one group into the values its sessions contribute."""
+
+    source_model = row['source_model']
+    if source_model in SessionLedgerEntry.TRAINING_FLIGHT_SOURCES:
+        return ProductionTotals(
+            fuel_liters=_tenths(row['fuel_tenths']),
+            fuel_cost_usd=_thousandths(row['fuel_cost']),
+            flight_hours=_tenths(row['hours_tenths']),
+            gross_flying_income_usd=_thousandths(row['resource_income']),
+            instructor_flying_cost_usd=_thousandths(row['instructor_cost']),
+            net_flying_revenue_usd=_thousandths(row['resource_income'] - row['instructor_cost']),
+            student_flying_value_usd=_thousandths(row['student_value']),
+        )
+    if source_model == SessionLedgerEntry.SOURCE_SIM:
+        return ProductionTotals(
+            simulator_hours=_tenths(row['hours_tenths']),
+            gross_simulator_income_usd=_thousandths(row['resource_income']),
+            instructor_simulator_cost_usd=_thousandths(row['instructor_cost']),
+            net_simulator_revenue_usd=_thousandths(row['resource_income'] - row['instructor_cost']),
+        )
     return ProductionTotals(
-        fuel_liters=record.fuel_consumed,
-        fuel_cost_usd=record.fuel_consumed * record.fuel_rate_applied,
+        fuel_liters=_tenths(row['fuel_tenths']),
+        fuel_cost_usd=_thousandths(row['fuel_cost']),
     )
 
 
-def _add_flight_breakdowns(breakdowns, evaluation, values):
-    """Add a training flight to its aircraft, people, and date rows."""
+def _person_labels(queryset, role, rows):
+    """Return the display name of every instructor or student id in ``rows``.
+
+    A person recorded under more than one name is labeled with the name of
+    their latest session, like the first row of the ledger's ordering;
+    ``queryset`` is the filtered ledger, read only when that name changed on
+    the day of the latest session.
+    """
+
+    latest = {}
+    for row in rows:
+        person_id = row[f'{role}_id']
+        name = f"{row[f'{role}_first_name']} {row[f'{role}_last_name']}"
+        names = latest.setdefault(person_id, {})
+        names[name] = max(names.get(name, row['last_session']), row['last_session'])
+
+    labels = {}
+    for person_id, names in latest.items():
+        last_session = max(names.values())
+        candidates = [name for name, session_date in names.items() if session_date == last_session]
+        if len(candidates) == 1:
+            labels[person_id] = candidates[0]
+            continue
+        # Renamed on the day of their latest session: the latest row decides.
+        first_name, last_name = (
+            queryset.filter(**{f'{role}_id': person_id})
+            .order_by('-session_date', '-source_id')
+            .values_list(f'{role}_first_name', f'{role}_last_name')
+            .first()
+        )
+        labels[person_id] = f'{first_name} {last_name}'
+    return labels
 
-    _add_breakdown(
-        breakdowns['aircraft'],
-        evaluation.aircraft.registration,
-        evaluation.aircraft.registration,
-        values,
-    )
-    _add_breakdown(
-        breakdowns['instructor'],
-        evaluation.instructor_id,
-        f'{evaluation.instructor_first_name} {evaluation.instructor_last_name}',
-        values,
-    )
-    _add_breakdown(
-        breakdowns['student'],
-        evaluation.student_id,
-        f'{evaluation.student_first_name} {evaluation.student_last_name}',
-        values,
-    )
-    _add_date_breakdown(breakdowns, evaluation.session_date, values)
 
+def _ledger_queryset(filters):
+    """Return the session ledger rows matching the report filters."""
 
-def _add_simulator_breakdowns(breakdowns, evaluation, values):
-    """Add a simulator session to its simulator, people, and date rows."""
+    return _filtered(SessionLedgerEntry.objects.all(), filters)
 
-    _add_breakdown(
-        breakdowns['simulator'],
-        evaluation.simulator_id,
-        evaluation.simulator.name,
-        values,
-    )
-    _add_breakdown(
-        breakdowns['instructor'],
-        evaluation.instructor_id,
-        f'{evaluation.instructor_first_name} {evaluation.instructor_last_name}',
-        values,
-    )
-    _add_breakdown(
-        breakdowns['student'],
-        evaluation.student_id,
-        f'{evaluation.student_first_name} {evaluation.student_last_name}',
-        values,
-    )
-    _add_date_breakdown(breakdowns, evaluation.session_date, values)
 
+def _filtered(queryset, filters):
+    """Filter session ledger or daily rollup rows by the report filters.
 
-def _add_fuel_breakdowns(
-    breakdowns,
-    session_date,
-    aircraft_registration,
-    values,
-    *,
-    instructor=None,
-    student=None,
-):
-    """Add fuel-only activity to every breakdown with known identifying data."""
+    Aircraft filters do not apply to simulator sessions, simulator filters only
+    apply to them, and flight reports carry no instructor or student so any
+    person filter leaves them out.
+    """
 
-    _add_breakdown(
-        breakdowns['aircraft'],
-        aircraft_registration,
-        aircraft_registration,
-        values,
+    queryset = queryset.filter(
+        session_date__range=(filters.start_date, filters.end_date),
     )
-    if instructor:
-        _add_breakdown(breakdowns['instructor'], instructor[0], instructor[1], values)
-    if student:
-        _add_breakdown(breakdowns['student'], student[0], student[1], values)
-    _add_date_breakdown(breakdowns, session_date, values)
+    if filters.aircraft_registrations:
+        queryset = queryset.filter(
+            Q(source_model=SessionLedgerEntry.SOURCE_SIM)
+            | Q(aircraft_registration__in=filters.aircraft_registrations)
+        )
+    if filters.simulator_ids:
+        queryset = queryset.filter(
+            ~Q(source_model=SessionLedgerEntry.SOURCE_SIM)
+            | Q(simulator_id__in=filters.simulator_ids)
+        )
+    if filters.instructor_ids:
+        queryset = queryset.filter(instructor_id__in=filters.instructor_ids)
+    if filters.student_ids:
+        queryset = queryset.filter(student_id__in=filters.student_ids)
+    return queryset
 
 
 def _add_date_breakdown(breakdowns, session_date, values):
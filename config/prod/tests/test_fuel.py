@@ -10,6 +10,7 @@ from django.test import TestCase
 
 from fleet.models import Aircraft
 from fms.forms import ExternalFlightEvaluationForm, FlightReportForm
+from fms.ledger import record_session
 from fms.models import (
     ExternalFlightEvaluation,
     FlightEvaluation0_100,
@@ -62,7 +63,9 @@ class FuelConsumptionTests(TestCase):
         values.update(overrides)
         # Reporting tests need persisted historical rows without invoking the
         # evaluation models' accounting side effects.
-        return model.objects.bulk_create([model(**values)])[0]
+        record = model.objects.bulk_create([model(**values)])[0]
+        record_session(record)
+        return record
 
     def create_external_evaluation(self, **overrides):
         values = {
@@ -82,9 +85,11 @@ class FuelConsumptionTests(TestCase):
             'aircraft_registration': 'N123EX',
         }
         values.update(overrides)
-        return ExternalFlightEvaluation.objects.bulk_create(
+        record = ExternalFlightEvaluation.objects.bulk_create(
             [ExternalFlightEvaluation(**values)]
         )[0]
+        record_session(record)
+        return record
 
     def create_flight_report(self, **overrides):
         values = {
@@ -96,7 +101,9 @@ class FuelConsumptionTests(TestCase):
             'aircraft': self.aircraft,
         }
         values.update(overrides)
-        return FlightReport.objects.bulk_create([FlightReport(**values)])[0]
+        record = FlightReport.objects.bulk_create([FlightReport(**values)])[0]
+        record_session(record)
+        return record
 
     def test_combines_all_evaluation_types_using_historical_fuel_rates(self):
         self.create_evaluation(FlightEvaluation0_100, fuel_consumed=Decimal('10.0'))
@@ -1,11 +1,22 @@
 from datetime import date
+from io import StringIO
 from decimal import Decimal
 
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.test import TestCase
 
 from fleet.models import Aircraft, Simulator
-from fms.models import ExternalFlightEvaluation, FlightEvaluation0_100, FlightReport, SimEvaluation
+from fms.ledger import forget_session, record_session
+from fms.models import (
+    DailyProductionRollup,
+    ExternalFlightEvaluation,
+    FlightEvaluation0_100,
+    FlightReport,
+    SimEvaluation,
+)
+from fms.rollups import rebuild_daily_rollups
+from prod.benchmark import build_synthetic_ledger, report_signature, row_by_row_report
 from prod.services import ProductionFilters, get_production_report
 
 
@@ -43,9 +54,11 @@ class ProductionReportTests(TestCase):
             'aircraft': self.aircraft,
         }
         values.update(overrides)
-        return FlightEvaluation0_100.objects.bulk_create(
+        record = FlightEvaluation0_100.objects.bulk_create(
             [FlightEvaluation0_100(**values)]
         )[0]
+        record_session(record)
+        return record
 
     def create_sim(self, **overrides):
         values = {
@@ -65,7 +78,9 @@ class ProductionReportTests(TestCase):
             'simulator': self.simulator,
         }
         values.update(overrides)
-        return SimEvaluation.objects.bulk_create([SimEvaluation(**values)])[0]
+        record = SimEvaluation.objects.bulk_create([SimEvaluation(**values)])[0]
+        record_session(record)
+        return record
 
     def create_external(self, **overrides):
         values = {
@@ -85,9 +100,11 @@ class ProductionReportTests(TestCase):
             'aircraft_registration': 'N123EX',
         }
         values.update(overrides)
-        return ExternalFlightEvaluation.objects.bulk_create(
+        record = ExternalFlightEvaluation.objects.bulk_create(
             [ExternalFlightEvaluation(**values)]
         )[0]
+        record_session(record)
+        return record
 
     def create_flight_report(self, **overrides):
         values = {
@@ -99,7 +116,9 @@ class ProductionReportTests(TestCase):
             'aircraft': self.aircraft,
         }
         values.update(overrides)
-        return FlightReport.objects.bulk_create([FlightReport(**values)])[0]
+        record = FlightReport.objects.bulk_create([FlightReport(**values)])[0]
+        record_session(record)
+        return record
 
     def test_report_calculates_flight_simulator_and_fuel_totals(self):
         self.create_flight()
@@ -172,6 +191,98 @@ class ProductionReportTests(TestCase):
         self.assertEqual(report.totals.flight_hours, Decimal('2.0'))
         self.assertEqual(report.totals.simulator_hours, ZERO)
 
+    def test_person_label_is_the_name_of_their_latest_session(self):
+        self.create_flight(student_last_name='Soltera', session_date=date(2026, 6, 10))
+        self.create_sim(student_last_name='Casada', session_date=date(2026, 6, 12))
+        self.create_flight(student_last_name='Soltera', session_date=date(2026, 6, 11))
+
+        report = get_production_report(
+            ProductionFilters(date(2026, 6, 5), date(2026, 8, 13))
+        )
+
+        self.assertEqual([row.label for row in report.by_student], ['Ana Casada'])
+
+    def test_grouped_report_matches_row_by_row_calculation(self):
+        build_synthetic_ledger(date(2025, 1, 1), years=1, sessions_per_day=4, seed=7)
+        start, end = date(2025, 1, 1), date(2025, 12, 31)
+        filter_sets = [
+            ProductionFilters(start, end),
+            ProductionFilters(date(2025, 3, 1), date(2025, 3, 31)),
+            ProductionFilters(start, end, aircraft_registrations=('BENCH1', 'N110EX')),
+            ProductionFilters(start, end, instructor_ids=(90_000_001, 90_000_002)),
+            ProductionFilters(start, end, student_ids=(80_000_010,)),
+        ]
+
+        for filters in filter_sets:
+            with self.subTest(filters=filters):
+                self.assertEqual(
+                    report_signature(get_production_report(filters)),
+                    report_signature(row_by_row_report(filters)),
+                )
+
+    def test_query_count_does_not_grow_with_the_ledger(self):
+        filters = ProductionFilters(date(2025, 1, 1), date(2025, 12, 31))
+        build_synthetic_ledger(date(2025, 1, 1), years=1, sessions_per_day=1, seed=3)
+        # One session a day, so no one has two names on the day of their latest session.
+        with self.assertNumQueries(5):
+            get_production_report(filters)
+
+    def test_daily_rollup_follows_saves_edits_and_deletes(self):
+        flight = self.create_flight()
+        self.create_flight(session_date=date(2026, 6, 11), fuel_consumed=Decimal('12.5'))
+        sim = self.create_sim()
+        self.create_external()
+        self.create_flight_report()
+
+        FlightEvaluation0_100.objects.filter(pk=flight.pk).update(
+            session_flight_hours=Decimal('1.3'),
+            student_last_name='Casada',
+        )
+        flight.refresh_from_db()
+        record_session(flight)
+        SimEvaluation.objects.filter(pk=sim.pk).delete()
+        forget_session(sim)
+
+        incremental = self.rollup_rows()
+        rebuild_daily_rollups()
+        self.assertEqual(incremental, self.rollup_rows())
+        self.assertFalse(DailyProductionRollup.objects.filter(source_model='sim').exists())
+
+    def rollup_rows(self):
+        return sorted(
+            tuple((name, str(value)) for name, value in row.items() if name != 'id')
+            for row in DailyProductionRollup.objects.values()
+        )
+
+    def test_deleted_sessions_leave_no_empty_rows(self):
+        flight = self.create_flight(session_date=date(2026, 6, 11))
+        self.create_flight()
+        FlightEvaluation0_100.objects.filter(pk=flight.pk).delete()
+        forget_session(flight)
+
+        report = get_production_report(
+            ProductionFilters(date(2026, 6, 5), date(2026, 8, 13))
+        )
+
+        self.assertEqual([row.key for row in report.by_date], ['2026-06-10'])
+        self.assertEqual(report.totals.flight_hours, Decimal('2.0'))
+
+    def test_backfill_command_rebuilds_the_rollup(self):
+        build_synthetic_ledger(date(2025, 1, 1), years=1, sessions_per_day=2, seed=5)
+        filters = ProductionFilters(date(2025, 1, 1), date(2025, 12, 31))
+        expected = report_signature(row_by_row_report(filters))
+        DailyProductionRollup.objects.filter(session_date__month=3).delete()
+        self.assertNotEqual(report_signature(get_production_report(filters)), expected)
+
+        call_command(
+            'backfill_production_rollups',
+            start='2025-03-01',
+            end='2025-03-31',
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(report_signature(get_production_report(filters)), expected)
+
     def test_rejects_reversed_date_range(self):
         with self.assertRaises(ValidationError):
             get_production_report(
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import FlightPeriod, FlightSlot, FlightRequest, CancellationsFee
+from .models import FlightPeriod, FlightSlot, FlightRequest, CancellationsFee, FlightRequestArchive
 from .domain_signals import FLIGHT_REQUEST_CANCELLED_BY_STAFF
 
 # Register your models here.
@@ -201,3 +201,18 @@ class CancellationsFeeAdmin(admin.ModelAdmin):
     
     reimburse_selected_fees.short_description = "Reembolsar multas seleccionadas"
     reimburse_selected_fees.allowed_permissions = ('view',)
+
+
+@admin.register(FlightRequestArchive)
+class FlightRequestArchiveAdmin(admin.ModelAdmin):
+    list_display = ('request_id', 'student_id', 'slot_date', 'slot_block', 'aircraft_registration', 'status', 'requested_at', 'archived_at')
+    list_filter = ('status', 'slot_block')
+    search_fields = ('request_id', 'student_id', 'aircraft_registration')
+    date_hierarchy = 'slot_date'
+
+    # Rows are written by the past-data cleanup only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
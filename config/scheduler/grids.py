@@ -0,0 +1,234 @@
+"""
+Slot grids of the flight period panels.
+
+build_period_grids() loads the slots of every requested period in a single
+query, with their instructor, student and aircraft, and places each one in
+the flat cell list of its PeriodGrid at ``day * len(blocks) + block``. The
+panels walk ``PeriodGrid.weeks``, so rendering a grid costs no further
+queries however many periods, aircraft or bookings it shows.
+
+The student panel is the same for every student who sees a period, so
+build_cached_period_grids() renders each period once and keeps the HTML in
+the SCHEDULER_GRID_CACHE_ALIAS cache, keyed by period id, the period's slot
+version and the panel variant (advanced or standard students):
+
+* the slot version is a token stored in the cache; invalidate_period_grids()
+  replaces it, for the given periods or for all of them, now and again when
+  the current transaction commits;
+* ``scheduler.signals`` invalidates on every FlightSlot and FlightPeriod save
+  or delete, which covers FlightRequest.create_request(), approve() and
+  cancel() since they save the slot. Code that changes slots with
+  ``QuerySet.update`` or ``bulk_create`` must call invalidate_period_grids()
+  itself;
+* fragments rendered inside a transaction are not stored;
+* a booking in one web worker, or a cleanup script run, must reach every
+  process, so nothing is cached when that cache is per process (LocMemCache):
+  every grid is rendered from the database instead.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from config.reference_cache import is_shared_cache
+
+from .models import FlightPeriod, FlightSlot
+
+
+WEEK_DAYS = 7
+
+
+@dataclass
+class GridRow:
+    """The slots of one block over the dates of a week (None where no slot exists)."""
+
+    block: str
+    slots: list
+
+
+@dataclass
+class GridWeek:
+    """Up to seven consecutive dates of a period with one row per block."""
+
+    dates: list[date]
+    rows: list[GridRow]
+
+
+@dataclass
+class PeriodGrid:
+    """The slots of one flight period, one cell per date and block."""
+
+    period: FlightPeriod
+    blocks: tuple[str, ...] = tuple(FlightPeriod.SLOT_BLOCKS)
+    dates: list[date] = field(init=False)
+    cells: list = field(init=False)
+    html: str = field(init=False, default='')
+
+    def __post_init__(self):
+        days = (self.period.end_date - self.period.start_date).days + 1
+        self.dates = [self.period.start_date + timedelta(days=offset) for offset in range(days)]
+        self.cells = [None] * (len(self.dates) * len(self.blocks))
+
+    def _index(self, day, block):
+        offset = (day - self.period.start_date).days
+        if block not in self.blocks or not 0 <= offset < len(self.dates):
+            return None
+        return offset * len(self.blocks) + self.blocks.index(block)
+
+    def place(self, slot):
+        """Put ``slot`` in its cell; slots outside the period dates or blocks are ignored."""
+        index = self._index(slot.date, slot.block)
+        if index is not None:
+            self.cells[index] = slot
+
+    def slot(self, day, block):
+        """Return the slot of ``day`` and ``block``, or None."""
+        index = self._index(day, block)
+        return None if index is None else self.cells[index]
+
+    @property
+    def weeks(self):
+        width = len(self.blocks)
+        weeks = []
+        for first in range(0, len(self.dates), WEEK_DAYS):
+            last = min(first + WEEK_DAYS, len(self.dates))
+            rows = [
+                GridRow(block, self.cells[first * width + position:last * width:width])
+                for position, block in enumerate(self.blocks)
+            ]
+            weeks.append(GridWeek(self.dates[first:last], rows))
+        return weeks
+
+
+@dataclass
+class AircraftGrid:
+    """The period grids of one aircraft, by start date."""
+
+    aircraft: object
+    periods: list[PeriodGrid] = field(default_factory=list)
+
+
+def _period_grids(periods):
+    if hasattr(periods, 'select_related'):
+        periods = periods.select_related('aircraft')
+    return {period.pk: PeriodGrid(period) for period in periods}
+
+
+def _place_slots(period_grids):
+    """Load the slots of every grid in ``period_grids`` with one query and place them."""
+    if not period_grids:
+        return
+    slots = FlightSlot.objects.filter(flight_period_id__in=list(period_grids)).select_related(
+        'instructor', 'student', 'aircraft',
+    )
+    for slot in slots:
+        period_grids[slot.flight_period_id].place(slot)
+
+
+def _by_aircraft(period_grids):
+    aircraft_grids = {}
+    for grid in period_grids.values():
+        aircraft = grid.period.aircraft
+        aircraft_grids.setdefault(aircraft.pk, AircraftGrid(aircraft)).periods.append(grid)
+    for aircraft_grid in aircraft_grids.values():
+        aircraft_grid.periods.sort(key=lambda grid: grid.period.start_date)
+    return list(aircraft_grids.values())
+
+
+def build_period_grids(periods):
+    """
+    Return an AircraftGrid per aircraft of ``periods`` (a FlightPeriod queryset or list).
+
+    Aircraft keep the order in which their first period appears; each aircraft's
+    periods are sorted by start date. Two queries in total: the periods and their slots.
+    """
+    period_grids = _period_grids(periods)
+    _place_slots(period_grids)
+    return _by_aircraft(period_grids)
+
+
+# ============================================================================
+# CACHED FRAGMENTS
+# ============================================================================
+
+GRID_CACHE_PREFIX = 'scheduler:grid'
+ALL_PERIODS = 'all'
+
+
+def _cache():
+    return caches[settings.SCHEDULER_GRID_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f"{GRID_CACHE_PREFIX}:{scope}:version"
+
+
+def _versions(scopes):
+    """Return ``{scope: token}``, creating the tokens that are not in the cache yet."""
+    keys = {scope: _version_key(scope) for scope in scopes}
+    tokens = _cache().get_many(keys.values())
+    missing = [key for key in keys.values() if key not in tokens]
+    if missing:
+        for key in missing:
+            _cache().add(key, uuid.uuid4().hex, None)
+        tokens.update(_cache().get_many(missing))
+    return {scope: tokens[key] for scope, key in keys.items()}
+
+
+def _drop(scopes):
+    _cache().set_many({_version_key(scope): uuid.uuid4().hex for scope in scopes}, None)
+
+
+def invalidate_period_grids(*period_ids):
+    """
+    Forget the cached grids of ``period_ids`` (of every period when none are given),
+    now and when the current transaction commits.
+    """
+    scopes = set(period_ids) or {ALL_PERIODS}
+    _drop(scopes)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _drop(scopes))
+
+
+def build_cached_period_grids(periods, template_name, variant):
+    """
+    Like build_period_grids(), with each PeriodGrid's ``html`` set to ``template_name``
+    rendered with ``period_data``.
+
+    Fragments come from the cache when the period's slot version has not
+    changed; only the missing periods load their slots and are rendered.
+    ``variant`` (e.g. ``'advanced'``) keeps the fragments of panels shown to
+    different audiences apart. On a per-process cache every period is rendered.
+    """
+    period_grids = _period_grids(periods)
+    if not period_grids:
+        return []
+
+    keys = {}
+    if is_shared_cache(_cache()):
+        versions = _versions([ALL_PERIODS, *period_grids])
+        keys = {
+            pk: f"{GRID_CACHE_PREFIX}:{pk}:{versions[ALL_PERIODS]}:{versions[pk]}:{variant}"
+            for pk in period_grids
+        }
+    fragments = _cache().get_many(keys.values()) if keys else {}
+    missing = {pk: grid for pk, grid in period_grids.items() if keys.get(pk) not in fragments}
+    _place_slots(missing)
+
+    rendered = {}
+    for pk, grid in period_grids.items():
+        if pk in missing:
+            grid.html = render_to_string(template_name, {'period_data': grid})
+            if pk in keys:
+                rendered[keys[pk]] = grid.html
+        else:
+            grid.html = mark_safe(fragments[keys[pk]])
+    if rendered and not connection.in_atomic_block:
+        _cache().set_many(rendered, settings.SCHEDULER_GRID_CACHE_TIMEOUT)
+    return _by_aircraft(period_grids)
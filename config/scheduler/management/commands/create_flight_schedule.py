@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from fleet.models import Aircraft
+from scheduler.models import FlightPeriod
+
+
+class Command(BaseCommand):
+    help = 'Create consecutive flight periods, with their slots, for one or more aircraft in a single transaction.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'registrations',
+            nargs='+',
+            help='Registrations of the aircraft to schedule.',
+        )
+        parser.add_argument(
+            '--start',
+            required=True,
+            type=date.fromisoformat,
+            help='First day of the schedule (YYYY-MM-DD, a Monday).',
+        )
+        parser.add_argument(
+            '--periods',
+            type=int,
+            default=1,
+            help='Number of consecutive periods per aircraft.',
+        )
+        parser.add_argument(
+            '--weeks',
+            type=int,
+            default=1,
+            help='Length of each period in weeks (1 to 3).',
+        )
+        parser.add_argument(
+            '--active',
+            action='store_true',
+            help='Activate the new periods.',
+        )
+        parser.add_argument(
+            '--navigation',
+            action='store_true',
+            help='Create navigation periods (M blocks unavailable).',
+        )
+
+    def handle(self, *args, **options):
+        if options['start'].weekday() != 0:
+            raise CommandError('La fecha de inicio debe ser un lunes.')
+
+        registrations = options['registrations']
+        aircraft_list = list(Aircraft.objects.filter(registration__in=registrations))
+        missing = set(registrations) - {aircraft.registration for aircraft in aircraft_list}
+        if missing:
+            raise CommandError(f'Aeronaves no encontradas: {", ".join(sorted(missing))}')
+
+        period_days = 7 * options['weeks']
+        date_ranges = []
+        for index in range(options['periods']):
+            start_date = options['start'] + timedelta(days=index * period_days)
+            date_ranges.append((start_date, start_date + timedelta(days=period_days - 1)))
+
+        try:
+            periods, created = FlightPeriod.create_schedule(
+                aircraft_list,
+                date_ranges,
+                is_active=options['active'],
+                for_navigation=options['navigation'],
+            )
+        except ValidationError as exc:
+            raise CommandError('; '.join(exc.messages)) from exc
+
+        self.stdout.write(f'Periods created: {len(periods)}, slots created: {created}')
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-18 04:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0022_cancellationsfee_reimbursement_tracking'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flightrequest',
+            name='idempotency_key',
+            field=models.CharField(blank=True, help_text='Clave enviada por el cliente para no duplicar la solicitud al reintentar', max_length=64, null=True, verbose_name='Clave de idempotencia'),
+        ),
+        migrations.AddConstraint(
+            model_name='flightrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(('idempotency_key__isnull', False)), fields=('student', 'idempotency_key'), name='scheduler_fr_idempotency_key'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0023_flight_request_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightRequestArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('request_id', models.PositiveBigIntegerField(unique=True, verbose_name='ID de solicitud')),
+                ('student_id', models.PositiveBigIntegerField(verbose_name='ID de usuario del estudiante')),
+                ('slot_date', models.DateField(verbose_name='Fecha del slot')),
+                ('slot_block', models.CharField(max_length=2, verbose_name='Bloque del slot')),
+                ('aircraft_registration', models.CharField(blank=True, default='', max_length=255, verbose_name='Matrícula de aeronave')),
+                ('status', models.CharField(max_length=15, verbose_name='Estatus')),
+                ('requested_at', models.DateTimeField(verbose_name='Fecha de solicitud')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de archivo')),
+            ],
+            options={
+                'verbose_name': 'Solicitud de vuelo archivada',
+                'verbose_name_plural': 'Solicitudes de vuelo archivadas',
+                'ordering': ['-slot_date', '-request_id'],
+                'indexes': [models.Index(fields=['student_id', '-slot_date'], name='scheduler_fr_archive_student')],
+            },
+        ),
+    ]
@@ -1,13 +1,22 @@
-from django.db import models, transaction
-from django.db.models import F
+from django.db import IntegrityError, models, transaction
 from django.utils import timezone
 from django.utils.timezone import localdate
 from datetime import timedelta
 from django.core.exceptions import ValidationError
 from accounts.models import StudentProfile
 from fleet.models import Aircraft
+from transactions import balances
 from . import domain_signals
 
+
+class SlotTakenError(ValidationError):
+    """The slot was booked by someone else first."""
+
+
+class IdempotencyKeyReusedError(ValidationError):
+    """The idempotency key was already used by the student for a different slot."""
+
+
 class FlightPeriod(models.Model):
     """Periodo de vuelo"""
     start_date = models.DateField(
@@ -46,18 +55,18 @@ class FlightPeriod(models.Model):
         help_text="Fecha de actualización",
     )
 
-    def generate_slots(self, for_navigation=False):
+    SLOT_BLOCKS = ['AM', 'M', 'PM']
+
+    def build_slots(self, for_navigation=False, today=None):
         """
-        Create FlightSlot objects for each day, each block, and each aircraft.
+        Return unsaved FlightSlot objects for each day and each block of the period.
         """
         from scheduler.models import FlightSlot
 
-        blocks = ['AM', 'M', 'PM']
-        aircraft = self.aircraft
-        created = 0
+        today = today or localdate()
+        slots = []
         
         # Generate slots for the entire period (from start_date to end_date)
-        today = localdate()
         current_date = self.start_date
         while current_date <= self.end_date:
             # Determine base status for this date
@@ -65,7 +74,7 @@ class FlightPeriod(models.Model):
             if current_date < today:
                 base_status = 'unavailable'
             
-            for block in blocks:
+            for block in self.SLOT_BLOCKS:
                 # Reset status for each block
                 status = base_status
                 
@@ -73,18 +82,91 @@ class FlightPeriod(models.Model):
                 if for_navigation and block == 'M':
                     status = 'unavailable'
                 
-                FlightSlot.objects.create(
+                slots.append(FlightSlot(
                     flight_period=self,
                     date=current_date,
                     block=block,
-                    aircraft=aircraft,
+                    aircraft=self.aircraft,
                     status=status,
                     for_navigation=for_navigation
-                )
-                created += 1
+                ))
             current_date += timedelta(days=1)
 
-        return created
+        return slots
+
+    def generate_slots(self, for_navigation=False):
+        """
+        Create FlightSlot objects for each day, each block, and each aircraft.
+
+        Returns the number of slots created; slots that already exist are kept.
+        """
+        return FlightPeriod.generate_slots_for_periods([self], for_navigation=for_navigation)
+
+    @classmethod
+    def generate_slots_for_periods(cls, periods, for_navigation=None):
+        """
+        Create the slots of several periods with a single bulk INSERT.
+
+        ``for_navigation=None`` uses each period's own flag. Slots whose
+        (date, block, aircraft) already exist are skipped, so generation can be
+        re-run safely. Returns the number of slots created.
+        """
+        from scheduler.grids import invalidate_period_grids
+        from scheduler.models import FlightSlot
+
+        periods = list(periods)
+        if not periods:
+            return 0
+
+        today = localdate()
+        slots = []
+        for period in periods:
+            navigation = period.for_navigation if for_navigation is None else for_navigation
+            slots.extend(period.build_slots(for_navigation=navigation, today=today))
+
+        with transaction.atomic():
+            existing = set(
+                FlightSlot.objects.filter(
+                    aircraft_id__in={period.aircraft_id for period in periods},
+                    date__range=(
+                        min(period.start_date for period in periods),
+                        max(period.end_date for period in periods),
+                    ),
+                ).values_list('date', 'block', 'aircraft_id')
+            )
+            new_slots = [
+                slot for slot in slots
+                if (slot.date, slot.block, slot.aircraft_id) not in existing
+            ]
+            # ignore_conflicts covers slots inserted concurrently after the lookup above.
+            FlightSlot.objects.bulk_create(new_slots, batch_size=500, ignore_conflicts=True)
+            # bulk_create sends no signals, so the cached panel grids are dropped here.
+            invalidate_period_grids(*(period.pk for period in periods))
+
+        return len(new_slots)
+
+    @classmethod
+    def create_schedule(cls, aircraft_list, date_ranges, is_active=False, for_navigation=False):
+        """
+        Create one period per aircraft and date range, with all their slots, atomically.
+
+        Every period is validated like a single period (length, overlap,
+        aircraft availability); any error rolls back the whole schedule.
+        Returns ``(periods, slots_created)``.
+        """
+        with transaction.atomic():
+            periods = []
+            for aircraft in aircraft_list:
+                for start_date, end_date in date_ranges:
+                    periods.append(cls.objects.create(
+                        aircraft=aircraft,
+                        start_date=start_date,
+                        end_date=end_date,
+                        is_active=is_active,
+                        for_navigation=for_navigation,
+                    ))
+            created = cls.generate_slots_for_periods(periods)
+        return periods, created
     
     def _check_flight_period_length(self, start_date, end_date):
         """Check if the flight period length is a multiple of 7 days."""
@@ -296,31 +378,75 @@ class FlightRequest(models.Model):
         verbose_name="Notas",
         help_text="Notas de la solicitud",
     )
+    idempotency_key = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        verbose_name="Clave de idempotencia",
+        help_text="Clave enviada por el cliente para no duplicar la solicitud al reintentar",
+    )
     #endregion
 
-    def create_request(self, student, slot):
-        """Create a flight request and update the slot status to unavailable."""
-        with transaction.atomic():
-            if slot.status != 'available':
-                raise ValidationError("El slot no está disponible")
-            if slot.flight_period.is_active != True:
-                raise ValidationError("El período de vuelo no está activo")
-            # Create the flight request
-            flight_request = FlightRequest(
-                student=student,
-                slot=slot,
-                status='pending'
-            )
-            # Update slot status to pending
-            slot.status = 'pending'
-            slot.student = student
-            slot.save()
-            # Update the instance for consistency
-            self.student = student
-            self.slot = slot
-            self.status = 'pending'
-            self.pk = flight_request.pk
-            self.save()
+    def create_request(self, student, slot, idempotency_key=None):
+        """
+        Create a flight request and mark the slot as pending.
+
+        The slot is claimed with a conditional UPDATE (only while it is still
+        available), so when many students book the same slot at once exactly
+        one wins and the rest fail fast with SlotTakenError. Repeating an
+        ``idempotency_key`` returns the request the student already created
+        with it instead of booking again.
+        """
+        if idempotency_key and self._load_idempotent_request(student, idempotency_key, slot):
+            return
+
+        try:
+            with transaction.atomic():
+                claimed = FlightSlot.objects.filter(pk=slot.pk, status='available').update(
+                    status='pending',
+                    student=student,
+                )
+                if not claimed:
+                    current_status = FlightSlot.objects.filter(pk=slot.pk).values_list('status', flat=True).first()
+                    if current_status in ('pending', 'reserved'):
+                        raise SlotTakenError("El slot no está disponible")
+                    raise ValidationError("El slot no está disponible")
+                if not FlightPeriod.objects.filter(pk=slot.flight_period_id, is_active=True).exists():
+                    raise ValidationError("El período de vuelo no está activo")
+
+                # Lock the student's profile so concurrent bookings by the same
+                # student cannot both pass the request limit in clean().
+                list(StudentProfile.objects.select_for_update().filter(user=student))
+
+                slot.status = 'pending'
+                slot.student = student
+                slot.save(update_fields=['status', 'student'])
+                # Update the instance for consistency
+                self.student = student
+                self.slot = slot
+                self.status = 'pending'
+                self.idempotency_key = idempotency_key or None
+                self.save()
+        except (SlotTakenError, IntegrityError):
+            # A retry with the same key may have lost the race to its own first attempt.
+            if idempotency_key and self._load_idempotent_request(student, idempotency_key, slot):
+                return
+            raise
+
+    def _load_idempotent_request(self, student, idempotency_key, slot):
+        """
+        Copy the request already created with ``idempotency_key`` into this instance, if any.
+
+        Raises IdempotencyKeyReusedError when that request is for a different slot.
+        """
+        existing = FlightRequest.objects.filter(student=student, idempotency_key=idempotency_key).first()
+        if existing is None:
+            return False
+        if existing.slot_id != slot.pk:
+            raise IdempotencyKeyReusedError("La clave de idempotencia ya se usó para otro slot")
+        self.pk = existing.pk
+        self.refresh_from_db()
+        return True
 
     @classmethod
     def create_approved_by_staff(cls, student, slot):
@@ -436,8 +562,12 @@ class FlightRequest(models.Model):
 
             # Apply fee if apply_fee is True
             if apply_fee:
-                self.student.student_profile.balance -= self.slot.flight_period.aircraft.hourly_rate
-                self.student.student_profile.save()
+                balances.adjust_student(
+                    self.student.student_profile,
+                    reason=balances.CANCELLATION_FEE,
+                    reference=balances.reference_to(self),
+                    balance=-self.slot.flight_period.aircraft.hourly_rate,
+                )
 
         # Emit domain signal after cancellation to notify listeners
         transaction.on_commit(
@@ -487,6 +617,13 @@ class FlightRequest(models.Model):
         verbose_name = "Solicitud de vuelo"
         verbose_name_plural = "Solicitudes de vuelo"
         ordering = ['-requested_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'idempotency_key'],
+                condition=models.Q(idempotency_key__isnull=False),
+                name='scheduler_fr_idempotency_key',
+            ),
+        ]
     
     def save(self, *args, **kwargs):
         self.full_clean()
@@ -555,8 +692,11 @@ class CancellationsFee(models.Model):
             if not fee.student_profile_id:
                 raise ValidationError('No se pudo identificar al estudiante de esta multa')
 
-            StudentProfile.objects.filter(pk=fee.student_profile_id).update(
-                balance=F('balance') + fee.amount
+            balances.adjust_student(
+                fee.student_profile,
+                reason=balances.CANCELLATION_FEE_REIMBURSED,
+                reference=balances.reference_to(fee),
+                balance=fee.amount,
             )
             fee.reimbursed_at = timezone.now()
             fee.reimbursed_by = reimbursed_by
@@ -573,3 +713,52 @@ class CancellationsFee(models.Model):
         verbose_name = "Multa por cancelación"
         verbose_name_plural = "Multas por cancelación"
         ordering = ['-date_added']
+
+
+class FlightRequestArchive(models.Model):
+    """Histórico compacto de solicitudes de vuelo eliminadas por la limpieza de datos pasados."""
+
+    #region model fields
+    request_id = models.PositiveBigIntegerField(
+        unique=True,
+        verbose_name="ID de solicitud",
+    )
+    student_id = models.PositiveBigIntegerField(
+        verbose_name="ID de usuario del estudiante",
+    )
+    slot_date = models.DateField(
+        verbose_name="Fecha del slot",
+    )
+    slot_block = models.CharField(
+        max_length=2,
+        verbose_name="Bloque del slot",
+    )
+    aircraft_registration = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        verbose_name="Matrícula de aeronave",
+    )
+    status = models.CharField(
+        max_length=15,
+        verbose_name="Estatus",
+    )
+    requested_at = models.DateTimeField(
+        verbose_name="Fecha de solicitud",
+    )
+    archived_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Fecha de archivo",
+    )
+    #endregion
+
+    def __str__(self):
+        return f"Solicitud {self.request_id} - {self.slot_date} {self.slot_block} ({self.status})"
+
+    class Meta:
+        verbose_name = "Solicitud de vuelo archivada"
+        verbose_name_plural = "Solicitudes de vuelo archivadas"
+        ordering = ['-slot_date', '-request_id']
+        indexes = [
+            models.Index(fields=['student_id', '-slot_date'], name='scheduler_fr_archive_student'),
+        ]
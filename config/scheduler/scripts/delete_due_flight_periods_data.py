@@ -2,16 +2,25 @@
 Clean up past flight scheduling data.
 
 Tasks:
-1. Delete flight periods whose end_date is before today (end_date < today).
-   Periods with end_date == today are kept. CASCADE deletes their slots and requests.
+1. Delete all flight requests whose slot date is before today, and mark those
+   slots as unavailable. With --archive each request is first copied to
+   FlightRequestArchive.
 
-2. Delete all flight requests whose slot date is before today, and mark those
-   slots as unavailable.
+2. Delete flight periods whose end_date is before today (end_date < today),
+   with their slots. Periods with end_date == today are kept.
 
 3. Mark any remaining past-dated slots (no request) as unavailable.
+
+Rows are read and deleted in batches of --batch-size ids, each batch in its
+own short transaction, so memory and lock time stay bounded however large
+the schedule grows; a run that stops halfway can simply be started again.
+--dry-run only counts what would change.
 """
+import argparse
 import os
 import sys
+from dataclasses import dataclass
+
 import django
 from django.utils.timezone import localdate
 from django.db import transaction
@@ -23,77 +32,186 @@ sys.path.insert(0, django_dir)
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
-from scheduler.models import FlightRequest, FlightSlot, FlightPeriod
+from scheduler.grids import invalidate_period_grids  # noqa: E402
+from scheduler.models import FlightRequest, FlightRequestArchive, FlightSlot, FlightPeriod  # noqa: E402
+
+DEFAULT_BATCH_SIZE = 500
+ACTIVE_SLOT_STATUSES = ['available', 'pending', 'reserved']
+
 
+@dataclass
+class CleanupResult:
+    """Rows changed by one cleanup run (or that would be, in a dry run)."""
 
-def delete_past_flight_periods(today):
+    deleted_requests: int = 0
+    archived_requests: int = 0
+    deleted_periods: int = 0
+    deleted_slots: int = 0
+    unavailable_slots: int = 0
+    dry_run: bool = False
+
+
+def _id_batches(queryset, batch_size):
     """
-    Delete all flight periods for which end_date < today.
-    If end_date is today, the period is kept. If end_date was yesterday or earlier, delete.
-    CASCADE removes all slots and flight requests for those periods.
+    Yield the ids of ``queryset`` in ascending batches of at most ``batch_size``.
+
+    Each batch starts after the last id of the previous one, so rows deleted
+    meanwhile never shift the next batch.
     """
-    past_periods = FlightPeriod.objects.filter(end_date__lt=today)
-    count = past_periods.count()
-    past_periods.delete()
-    if count:
-        print(f"Deleted {count} flight period(s) with end_date before {today}.")
-    return count
+    last_id = 0
+    while True:
+        ids = list(
+            queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def _archive_requests(requests):
+    """Copy flight requests to the compact archive; requests archived before are skipped."""
+    rows = requests.values(
+        'pk', 'student_id', 'slot__date', 'slot__block', 'slot__aircraft__registration', 'status', 'requested_at',
+    )
+    archived = FlightRequestArchive.objects.bulk_create(
+        [
+            FlightRequestArchive(
+                request_id=row['pk'],
+                student_id=row['student_id'],
+                slot_date=row['slot__date'],
+                slot_block=row['slot__block'],
+                aircraft_registration=row['slot__aircraft__registration'] or '',
+                status=row['status'],
+                requested_at=row['requested_at'],
+            )
+            for row in rows
+        ],
+        ignore_conflicts=True,
+    )
+    return len(archived)
 
 
-def delete_past_flight_requests_and_mark_slots_unavailable(today):
+def delete_past_flight_requests_and_mark_slots_unavailable(
+    today, batch_size=DEFAULT_BATCH_SIZE, dry_run=False, archive=False,
+):
     """
     Delete all flight requests whose slot date is before today.
     Mark each affected slot as unavailable (past slots are not bookable).
+
+    Returns ``(deleted, archived)``. Cancellation fees keep their amount and
+    student; only their link to the deleted request is cleared.
     """
-    past_requests = FlightRequest.objects.filter(slot__date__lt=today).select_related('slot')
-    slot_ids_to_mark_unavailable = []
-    deleted = 0
-    for request in past_requests:
-        slot_ids_to_mark_unavailable.append(request.slot_id)
-        req_id, slot_date = request.id, request.slot.date
-        request.delete()
-        deleted += 1
-        print(f"Deleted flight request {req_id} (slot date: {slot_date})")
-    if slot_ids_to_mark_unavailable:
-        updated = FlightSlot.objects.filter(pk__in=slot_ids_to_mark_unavailable).update(
-            status='unavailable', student=None, instructor=None, aircraft=None
-        )
-        print(f"Marked {updated} slot(s) as unavailable.")
+    past_requests = FlightRequest.objects.filter(slot__date__lt=today)
+    if dry_run:
+        count = past_requests.count()
+        if count:
+            print(f"[dry run] Would delete {count} flight request(s) with slot date before {today}.")
+        return count, count if archive else 0
+
+    deleted = archived = marked = 0
+    for ids in _id_batches(past_requests, batch_size):
+        with transaction.atomic():
+            batch = FlightRequest.objects.filter(pk__in=ids)
+            slot_ids = list(batch.values_list('slot_id', flat=True))
+            if archive:
+                archived += _archive_requests(batch)
+            deleted += batch.delete()[1].get(FlightRequest._meta.label, 0)
+            marked += FlightSlot.objects.filter(pk__in=slot_ids).update(
+                status='unavailable', student=None, instructor=None, aircraft=None
+            )
+    if marked:
+        # QuerySet.update sends no signals
+        invalidate_period_grids()
+        print(f"Marked {marked} slot(s) as unavailable.")
     if deleted:
         print(f"Deleted {deleted} flight request(s) with slot date before {today}.")
-    return deleted
+    if archived:
+        print(f"Archived {archived} flight request(s).")
+    return deleted, archived
 
 
-def mark_past_dated_slots_as_unavailable(today):
+def delete_past_flight_periods(today, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Delete all flight periods for which end_date < today, with their slots.
+    If end_date is today, the period is kept. If end_date was yesterday or earlier, delete.
+
+    Returns ``(periods, slots)`` deleted. Slots go first, a batch at a time,
+    so deleting a period never cascades over its whole schedule at once.
+    """
+    past_periods = FlightPeriod.objects.filter(end_date__lt=today)
+    past_slots = FlightSlot.objects.filter(flight_period__end_date__lt=today)
+    if dry_run:
+        periods, slots = past_periods.count(), past_slots.count()
+        if periods:
+            print(f"[dry run] Would delete {periods} flight period(s) and {slots} slot(s) with end_date before {today}.")
+        return periods, slots
+
+    slots = periods = 0
+    for ids in _id_batches(past_slots, batch_size):
+        with transaction.atomic():
+            slots += FlightSlot.objects.filter(pk__in=ids).delete()[1].get(FlightSlot._meta.label, 0)
+    for ids in _id_batches(past_periods, batch_size):
+        with transaction.atomic():
+            periods += FlightPeriod.objects.filter(pk__in=ids).delete()[1].get(FlightPeriod._meta.label, 0)
+    if periods:
+        print(f"Deleted {periods} flight period(s) and {slots} slot(s) with end_date before {today}.")
+    return periods, slots
+
+
+def mark_past_dated_slots_as_unavailable(today, dry_run=False):
     """
     Mark slots with date < today as unavailable if they are still available/pending/reserved.
     (Slots belonging to deleted periods are already gone; this covers slots from periods
-    that are still active but have past dates.)
+    that are still active but have past dates.) Runs as a single UPDATE.
     """
     overdue = FlightSlot.objects.filter(
-        status__in=['available', 'pending', 'reserved'],
+        status__in=ACTIVE_SLOT_STATUSES,
         date__lt=today
     )
-    for slot in overdue:
-        slot.status = 'unavailable'
-        slot.student = None
-        slot.save()
-        print(f"Marked slot as unavailable {slot.id}")
+    if dry_run:
+        count = overdue.exclude(flight_period__end_date__lt=today).count()
+        if count:
+            print(f"[dry run] Would mark {count} past slot(s) as unavailable.")
+        return count
+
+    updated = overdue.update(status='unavailable', student=None)
+    if updated:
+        invalidate_period_grids()
+        print(f"Marked {updated} past slot(s) as unavailable.")
+    return updated
 
 
-def run_all(today=None):
+def run_all(today=None, batch_size=DEFAULT_BATCH_SIZE, dry_run=False, archive=False):
     if today is None:
         today = localdate()
-    with transaction.atomic():
-        # 1) Delete past flight periods (and their slots/requests via CASCADE)
-        delete_past_flight_periods(today)
-        # 2) Delete any remaining past-dated flight requests and mark slots unavailable
-        delete_past_flight_requests_and_mark_slots_unavailable(today)
-        # 3) Mark any remaining past-dated slots as unavailable (e.g. no request but slot exists)
-        mark_past_dated_slots_as_unavailable(today)
-    print("Done.")
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+
+    result = CleanupResult(dry_run=dry_run)
+    # 1) Delete past-dated flight requests and mark their slots unavailable
+    result.deleted_requests, result.archived_requests = delete_past_flight_requests_and_mark_slots_unavailable(
+        today, batch_size=batch_size, dry_run=dry_run, archive=archive,
+    )
+    # 2) Delete past flight periods and their slots
+    result.deleted_periods, result.deleted_slots = delete_past_flight_periods(
+        today, batch_size=batch_size, dry_run=dry_run,
+    )
+    # 3) Mark any remaining past-dated slots as unavailable (e.g. no request but slot exists)
+    result.unavailable_slots = mark_past_dated_slots_as_unavailable(today, dry_run=dry_run)
+    print("Done." if not dry_run else "Done (dry run, nothing was changed).")
+    return result
 
 
 if __name__ == "__main__":
-    today = localdate()
-    run_all(today)
+    parser = argparse.ArgumentParser(description="Clean up past flight scheduling data.")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows deleted per transaction (default: {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change.")
+    parser.add_argument("--archive", action="store_true", help="Copy deleted flight requests to the archive first.")
+    args = parser.parse_args()
+    run_all(localdate(), batch_size=args.batch_size, dry_run=args.dry_run, archive=args.archive)
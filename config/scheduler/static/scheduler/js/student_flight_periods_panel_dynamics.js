@@ -101,12 +101,21 @@ document.addEventListener('DOMContentLoaded', function() {
         slotElement.textContent = 'Procesando...';
         slotElement.style.pointerEvents = 'none';
         
+        // Reuse the key when retrying this slot, so a request that reached the
+        // server before a network error is not booked twice
+        if (!slotElement.dataset.idempotencyKey) {
+            slotElement.dataset.idempotencyKey = window.crypto && window.crypto.randomUUID
+                ? window.crypto.randomUUID()
+                : `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+        }
+        
         // Make the request
         fetch(`/scheduler/flight-request/create/${slotId}/`, {
             method: 'POST',
             headers: {
                 'X-CSRFToken': window.csrfToken,
                 'Content-Type': 'application/json',
+                'Idempotency-Key': slotElement.dataset.idempotencyKey,
             },
         })
         .then(response => response.json())
@@ -115,6 +124,10 @@ document.addEventListener('DOMContentLoaded', function() {
                 showSuccessNotification('Sesión reservada exitosamente');
                 // Reload the page to show updated status
                 setTimeout(() => window.location.reload(), 1500);
+            } else if (data.slot_taken) {
+                showErrorNotification('Error al reservar la sesión: ' + data.error);
+                // Another student got the slot first: reload to show the current grid
+                setTimeout(() => window.location.reload(), 1500);
             } else {
                 showErrorNotification('Error al reservar la sesión: ' + data.error);
                 // Restore button state
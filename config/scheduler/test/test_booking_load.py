@@ -0,0 +1,72 @@
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.exceptions import ValidationError
+from django.db import OperationalError, connections
+from django.test import TransactionTestCase, override_settings
+
+from scheduler.models import FlightRequest, FlightSlot, SlotTakenError
+from .factories import *
+
+
+STUDENTS = 30
+THREADS = 16
+
+
+@override_settings(OPS_NOTIFICATION_EMAIL=None)
+class FlightRequestBookingLoadTest(TransactionTestCase):
+    """Fire hundreds of concurrent bookings at one period and check each slot has one winner."""
+
+    def setUp(self):
+        self.period = FlightPeriodFactory(is_active=True)
+        self.period.generate_slots()
+        self.slots = list(FlightSlot.objects.filter(flight_period=self.period, status='available'))
+        self.students = [
+            StudentProfileFactory(balance=100000.00).user
+            for _ in range(STUDENTS)
+        ]
+        self.start = threading.Event()
+
+    def book(self, student, slot):
+        """Try to book ``slot`` as ``student``; return 'won', 'taken' or 'rejected'."""
+        self.start.wait(timeout=30)
+        error = None
+        try:
+            for attempt in range(200):
+                try:
+                    FlightRequest().create_request(student, FlightSlot.objects.get(pk=slot.pk))
+                    return 'won'
+                except SlotTakenError:
+                    return 'taken'
+                except ValidationError:
+                    return 'rejected'
+                except OperationalError as exc:
+                    error = exc
+                    # SQLite allows a single writer; retry like a client would.
+                    time.sleep(random.uniform(0, min(0.05, 0.001 * 2 ** attempt)))
+            raise AssertionError(f'Booking kept failing with database lock errors: {error}')
+        finally:
+            connections.close_all()
+
+    def test_one_winner_per_slot(self):
+        attempts = [(student, slot) for student in self.students for slot in self.slots]
+        random.shuffle(attempts)
+
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            futures = [pool.submit(self.book, student, slot) for student, slot in attempts]
+            self.start.set()
+            outcomes = Counter(future.result() for future in futures)
+
+        self.assertGreaterEqual(len(attempts), 300)
+        self.assertEqual(outcomes['won'], len(self.slots))
+        self.assertEqual(outcomes['taken'], len(attempts) - len(self.slots))
+
+        requests = FlightRequest.objects.filter(slot__in=self.slots)
+        self.assertEqual(requests.count(), len(self.slots))
+        winners = dict(requests.values_list('slot_id', 'student_id'))
+        self.assertEqual(set(winners), {slot.pk for slot in self.slots})
+        for slot in FlightSlot.objects.filter(pk__in=winners):
+            self.assertEqual((slot.status, slot.student_id), ('pending', winners[slot.pk]))
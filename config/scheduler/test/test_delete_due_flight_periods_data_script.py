@@ -5,17 +5,20 @@ Verifies that:
 1. Flight periods with end_date < today are deleted (with their slots and requests).
 2. Flight requests with slot date < today are deleted and their slots marked unavailable.
 3. Remaining past-dated slots are marked unavailable.
-4. After the script runs, reservation logic and balance limits are unchanged (students
+4. Small batches, dry runs and archiving give the expected results.
+5. After the script runs, reservation logic and balance limits are unchanged (students
    with balance < 500 cannot create requests unless they have credit; balance >= 500
    allows balance // 500 requests).
 """
 from datetime import timedelta
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
-from scheduler.models import FlightPeriod, FlightSlot, FlightRequest
+from scheduler.models import FlightPeriod, FlightSlot, FlightRequest, FlightRequestArchive
 from scheduler.scripts.delete_due_flight_periods_data import run_all
 from .factories import (
     AircraftFactory,    
@@ -126,6 +129,48 @@ class DeleteDueFlightPeriodsDataScriptTest(TestCase):
             slot.refresh_from_db()
             self.assertEqual(slot.status, 'unavailable', f"Slot {slot.id} (date={slot.date}) should be unavailable")
 
+    def test_small_batches_give_the_same_result(self):
+        """A batch size of one row still deletes and marks everything."""
+        result = run_all(today=self.today, batch_size=1)
+        self.assertEqual(result.deleted_requests, 2)
+        self.assertEqual(result.deleted_periods, 1)
+        self.assertEqual(result.deleted_slots, 7 * 3)
+        self.assertEqual(list(FlightRequest.objects.values_list('pk', flat=True)), [self.fr_b_future.pk])
+        self.assertFalse(FlightSlot.objects.filter(flight_period_id=self.period_a.pk).exists())
+        self.assertFalse(FlightSlot.objects.filter(date__lt=self.today).exclude(status='unavailable').exists())
+
+    def test_dry_run_changes_nothing(self):
+        """A dry run reports the counts of a real run without writing."""
+        slot_statuses = dict(FlightSlot.objects.values_list('pk', 'status'))
+        dry = run_all(today=self.today, dry_run=True, archive=True)
+        self.assertEqual(FlightRequest.objects.count(), 3)
+        self.assertTrue(FlightPeriod.objects.filter(pk=self.period_a.pk).exists())
+        self.assertEqual(dict(FlightSlot.objects.values_list('pk', 'status')), slot_statuses)
+        self.assertFalse(FlightRequestArchive.objects.exists())
+
+        real = run_all(today=self.today, archive=True)
+        self.assertTrue(dry.dry_run)
+        for field in ('deleted_requests', 'archived_requests', 'deleted_periods', 'deleted_slots'):
+            self.assertEqual(getattr(dry, field), getattr(real, field), field)
+
+    def test_archive_keeps_a_compact_copy_of_deleted_requests(self):
+        """With archive=True each deleted request is copied once to FlightRequestArchive."""
+        run_all(today=self.today, archive=True)
+        run_all(today=self.today, archive=True)
+        archived = {row.request_id: row for row in FlightRequestArchive.objects.all()}
+        self.assertEqual(set(archived), {self.fr_a.pk, self.fr_b_past.pk})
+        row = archived[self.fr_b_past.pk]
+        self.assertEqual(row.student_id, self.dummy_student.pk)
+        self.assertEqual((row.slot_date, row.slot_block), (self.slot_b_past.date, self.slot_b_past.block))
+        self.assertEqual(row.aircraft_registration, self.aircraft_b.registration)
+        self.assertEqual(row.status, 'pending')
+
+    def test_rows_are_handled_in_batches_not_one_by_one(self):
+        """Rows are handled a batch at a time, not one query per row."""
+        with CaptureQueriesContext(connection) as queries:
+            run_all(today=self.today, batch_size=1000)
+        self.assertLess(len(queries), 30)
+
     def test_after_script_low_balance_student_cannot_create_request(self):
         """Student with balance < 500 and no credit cannot create a flight request."""
         run_all(today=self.today)
@@ -1,7 +1,11 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from datetime import date, timedelta
+from io import StringIO
 from scheduler.models import FlightPeriod, FlightSlot
 from .factories import *
 
@@ -390,4 +394,88 @@ class FlightPeriodModelTest(TestCase):
                 )
                 
                 actual_days = (period.end_date - period.start_date).days + 1  # +1 because it's inclusive
-                self.assertEqual(actual_days, expected_days)
\ No newline at end of file
+                self.assertEqual(actual_days, expected_days)
+
+class FlightPeriodBulkSlotGenerationTest(TestCase):
+    """Test bulk slot generation and multi-aircraft schedules."""
+
+    def setUp(self):
+        self.aircraft = AircraftFactory()
+        self.monday = date.today() - timedelta(days=date.today().weekday())
+
+    def test_generate_slots_uses_one_insert(self):
+        """Test that a 21-day period is generated without one INSERT per slot."""
+        period = FlightPeriodFactory(
+            aircraft=self.aircraft,
+            start_date=self.monday,
+            end_date=self.monday + timedelta(days=20),
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            created = period.generate_slots()
+
+        self.assertEqual(created, 63)
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+
+    def test_generate_slots_skips_existing_slots(self):
+        """Test that re-running generate_slots keeps existing slots and creates none."""
+        period = FlightPeriodFactory(aircraft=self.aircraft, start_date=self.monday)
+        period.generate_slots()
+        FlightSlot.objects.filter(flight_period=period, date=self.monday).delete()
+
+        self.assertEqual(period.generate_slots(), 3)
+        self.assertEqual(period.generate_slots(), 0)
+        self.assertEqual(FlightSlot.objects.filter(flight_period=period).count(), 21)
+
+    def test_generate_slots_keeps_status_rules(self):
+        """Test past days and navigation M blocks are unavailable."""
+        period = FlightPeriodFactory(aircraft=self.aircraft, start_date=date.today() - timedelta(days=1))
+        period.generate_slots(for_navigation=True)
+
+        slots = FlightSlot.objects.filter(flight_period=period)
+        self.assertFalse(slots.filter(date__lt=date.today()).exclude(status='unavailable').exists())
+        self.assertFalse(slots.filter(block='M').exclude(status='unavailable').exists())
+        self.assertTrue(slots.filter(date=date.today(), block='AM', status='available', for_navigation=True).exists())
+
+    def test_create_schedule_for_several_aircraft_and_periods(self):
+        """Test creating consecutive periods for several aircraft in one call."""
+        other = AircraftFactory()
+        ranges = [
+            (self.monday, self.monday + timedelta(days=6)),
+            (self.monday + timedelta(days=7), self.monday + timedelta(days=20)),
+        ]
+
+        periods, created = FlightPeriod.create_schedule([self.aircraft, other], ranges, for_navigation=True)
+
+        self.assertEqual(len(periods), 4)
+        self.assertEqual(created, 2 * 21 * 3)
+        self.assertEqual(FlightSlot.objects.filter(aircraft=other).count(), 63)
+        self.assertTrue(all(period.for_navigation for period in periods))
+
+    def test_create_schedule_rolls_back_on_invalid_period(self):
+        """Test that an overlapping period cancels the whole schedule."""
+        ranges = [
+            (self.monday, self.monday + timedelta(days=13)),
+            (self.monday + timedelta(days=7), self.monday + timedelta(days=13)),
+        ]
+
+        with self.assertRaises(ValidationError):
+            FlightPeriod.create_schedule([self.aircraft], ranges)
+
+        self.assertFalse(FlightPeriod.objects.exists())
+        self.assertFalse(FlightSlot.objects.exists())
+
+    def test_create_flight_schedule_command(self):
+        """Test the management command creates periods for the given registrations."""
+        other = AircraftFactory()
+        out = StringIO()
+
+        call_command(
+            'create_flight_schedule', self.aircraft.registration, other.registration,
+            '--start', self.monday.isoformat(), '--periods', '2', stdout=out,
+        )
+
+        self.assertIn('Periods created: 4, slots created: 84', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('create_flight_schedule', 'NO-EXISTE', '--start', self.monday.isoformat())
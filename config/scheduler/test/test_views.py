@@ -1,16 +1,29 @@
 import json
+import shutil
+import tempfile
 from django.core import mail
-from django.test import TestCase, Client, override_settings
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, Client, override_settings
 from django.contrib.auth import get_user_model
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from accounts.models import StudentProfile
-from scheduler.models import FlightPeriod, FlightRequest
+from notifications.outbox import dispatch_pending_emails
+from scheduler.grids import build_period_grids
+from scheduler import domain_signals
+from scheduler.models import FlightPeriod, FlightRequest, FlightSlot
 from .factories import *
 from datetime import date, timedelta
 
 User = get_user_model()
 
 
+def deliver_outbox():
+    """Send every queued notification, including digests still inside their window."""
+    dispatch_pending_emails(now=timezone.now() + timedelta(hours=1))
+
+
 class FlightRequestViewTest(TestCase):
     """Test flight request view functionality."""
 
@@ -107,6 +120,51 @@ class FlightRequestViewTest(TestCase):
         data = response.json()
         self.assertIn('error', data)
 
+    def test_create_flight_request_taken_slot_fails_fast(self):
+        """Test that a slot booked by another student returns 409."""
+        other = UserFactory()
+        StudentProfileFactory(user=other, balance=1000.00)
+        FlightRequest().create_request(other, self.slot)
+        self.client.force_login(self.student)
+
+        response = self.client.post(
+            reverse('scheduler:create_flight_request', args=[self.slot.id]),
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(response.json()['slot_taken'])
+        self.assertEqual(FlightRequest.objects.filter(slot=self.slot).count(), 1)
+
+    def test_create_flight_request_idempotency_key_replays_the_request(self):
+        """Test that retrying with the same Idempotency-Key does not book twice."""
+        self.client.force_login(self.student)
+        url = reverse('scheduler:create_flight_request', args=[self.slot.id])
+
+        first = self.client.post(url, HTTP_IDEMPOTENCY_KEY='retry-1')
+        second = self.client.post(url, HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.json()['request_id'], second.json()['request_id'])
+        self.assertEqual(FlightRequest.objects.filter(student=self.student).count(), 1)
+
+    def test_create_flight_request_idempotency_key_reused_for_another_slot_is_rejected(self):
+        """Test that an Idempotency-Key already used for one slot cannot book another."""
+        self.client.force_login(self.student)
+        other_slot = FlightSlotFactory(flight_period=self.period, block='PM', status='available')
+
+        self.client.post(reverse('scheduler:create_flight_request', args=[self.slot.id]), HTTP_IDEMPOTENCY_KEY='retry-1')
+        response = self.client.post(
+            reverse('scheduler:create_flight_request', args=[other_slot.id]),
+            HTTP_IDEMPOTENCY_KEY='retry-1',
+        )
+
+        self.assertEqual(response.status_code, 422)
+        self.assertIn('otro slot', response.json()['error'])
+        self.assertEqual(list(FlightRequest.objects.values_list('slot_id', flat=True)), [self.slot.id])
+        other_slot.refresh_from_db()
+        self.assertEqual(other_slot.status, 'available')
+
     def test_staff_create_approved_flight_request_get_success(self):
         """Staff can open the staff-create flight request form for a slot."""
         self.client.force_login(self.staff)
@@ -164,6 +222,7 @@ class FlightRequestViewTest(TestCase):
                 reverse('scheduler:staff_create_approved_flight_request', args=[self.slot.id]),
                 {'student': self.student.pk},
             )
+        deliver_outbox()
         student_messages = [m for m in mail.outbox if list(m.to) == [self.student.email]]
         self.assertEqual(len(student_messages), 1)
         self.assertIn('Sesión de vuelo asignada', student_messages[0].subject)
@@ -319,6 +378,9 @@ class FlightRequestViewTest(TestCase):
             slot=self.slot,
             status='pending',
         )
+        # Leave only the cancellation mails in the outbox.
+        deliver_outbox()
+        mail.outbox.clear()
         with self.captureOnCommitCallbacks(execute=True):
             response = self.client.post(
                 reverse('scheduler:cancel_flight_request', args=[flight_request.id]),
@@ -327,6 +389,7 @@ class FlightRequestViewTest(TestCase):
                 HTTP_X_REQUESTED_WITH='XMLHttpRequest',
             )
         self.assertEqual(response.status_code, 200)
+        deliver_outbox()
         to_ops = [m for m in mail.outbox if 'ops-notify@test.com' in m.to]
         self.assertTrue(to_ops, 'Expected mail to OPS_NOTIFICATION_EMAIL')
         self.assertIn('El estudiante ha cancelado', to_ops[0].body)
@@ -348,6 +411,9 @@ class FlightRequestViewTest(TestCase):
             slot=self.slot,
             status='pending',
         )
+        # Leave only the cancellation mails in the outbox.
+        deliver_outbox()
+        mail.outbox.clear()
         with self.captureOnCommitCallbacks(execute=True):
             response = self.client.post(
                 reverse('scheduler:cancel_flight_request', args=[flight_request.id]),
@@ -356,6 +422,7 @@ class FlightRequestViewTest(TestCase):
                 HTTP_X_REQUESTED_WITH='XMLHttpRequest',
             )
         self.assertEqual(response.status_code, 200)
+        deliver_outbox()
         to_student = [m for m in mail.outbox if self.student.email in m.to]
         self.assertTrue(to_student, 'Expected mail to student')
         self.assertIn('Solicitud de vuelo cancelada', to_student[0].subject)
@@ -491,6 +558,171 @@ class FlightPeriodViewTest(TestCase):
         self.assertIn('Este período ya está activo', data['error'])
 
 
+class FlightPeriodGridTest(TestCase):
+    """Test the slot grids of the flight period panels."""
+
+    def setUp(self):
+        self.client = Client()
+        self.staff = StaffUserFactory()
+        self.instructor = UserFactory(role='INSTRUCTOR')
+        self.monday = date.today() - timedelta(days=date.today().weekday())
+
+    def create_booked_period(self, start_date, weeks=1):
+        """Create an active period with every slot generated and its first slot booked."""
+        period = FlightPeriodFactory(
+            start_date=start_date, end_date=start_date + timedelta(days=7 * weeks - 1), is_active=True,
+        )
+        period.generate_slots()
+        FlightSlot.objects.filter(flight_period=period, date=start_date, block='AM').update(
+            status='reserved', student=UserFactory(), instructor=self.instructor,
+        )
+        return period
+
+    def test_grid_places_each_slot_by_date_and_block(self):
+        period = self.create_booked_period(self.monday, weeks=2)
+        FlightSlot.objects.filter(flight_period=period, date=self.monday + timedelta(days=8), block='M').delete()
+
+        [aircraft_grid] = build_period_grids(FlightPeriod.objects.all())
+        [grid] = aircraft_grid.periods
+
+        self.assertEqual(aircraft_grid.aircraft, period.aircraft)
+        self.assertEqual(len(grid.weeks), 2)
+        self.assertEqual(grid.weeks[1].dates[0], self.monday + timedelta(days=7))
+        am_row, m_row, pm_row = grid.weeks[0].rows
+        self.assertEqual((am_row.block, m_row.block, pm_row.block), ('AM', 'M', 'PM'))
+        self.assertEqual(am_row.slots[0].status, 'reserved')
+        self.assertEqual([slot.date for slot in pm_row.slots], grid.weeks[0].dates)
+        self.assertIsNone(grid.weeks[1].rows[1].slots[1])
+        self.assertIsNone(grid.slot(self.monday + timedelta(days=8), 'M'))
+
+    def test_staff_panel_query_count_does_not_grow_with_periods(self):
+        self.client.force_login(self.staff)
+        self.create_booked_period(self.monday)
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('scheduler:create_staff_flight_period_grids'))
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        baseline = count_queries()
+        for week in range(1, 4):
+            self.create_booked_period(self.monday + timedelta(days=7 * week), weeks=2)
+
+        self.assertEqual(count_queries(), baseline)
+
+    def test_instructor_panel_query_count_does_not_grow_with_periods(self):
+        self.client.force_login(self.instructor)
+        self.create_booked_period(self.monday)
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('scheduler:create_instructor_flight_period_grids'))
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        baseline = count_queries()
+        self.create_booked_period(self.monday + timedelta(days=7))
+
+        self.assertEqual(count_queries(), baseline)
+        self.assertContains(
+            self.client.get(reverse('scheduler:create_instructor_flight_period_grids')),
+            self.instructor.username,
+        )
+
+
+class StudentPeriodGridCacheTest(TransactionTestCase):
+    """Test the cached period grids of the student panel."""
+    # Fragments rendered inside a transaction are not cached, so these tests run in autocommit mode.
+
+    def setUp(self):
+        # Grids are only cached in a cache shared by every process, so use a file cache of our own.
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = override_settings(
+            CACHES={
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'grids': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir},
+            },
+            SCHEDULER_GRID_CACHE_ALIAS='grids',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.student = UserFactory()
+        StudentProfileFactory(user=self.student, balance=1000.00)
+        monday = date.today() - timedelta(days=date.today().weekday())
+        self.period = FlightPeriodFactory(start_date=monday + timedelta(days=7), is_active=True)
+        self.period.generate_slots()
+        self.slot = FlightSlot.objects.get(flight_period=self.period, date=self.period.start_date, block='AM')
+
+    def load_panel(self, user):
+        """Return the student panel's HTML and whether the slots were read from the database."""
+        client = Client()
+        client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('scheduler:create_student_flight_period_grids'))
+        self.assertEqual(response.status_code, 200)
+        slot_table = FlightSlot._meta.db_table
+        rendered = any(f'FROM "{slot_table}"' in query['sql'] for query in queries.captured_queries)
+        return response.content.decode(), rendered
+
+    def test_other_students_get_the_cached_grid(self):
+        html, rendered = self.load_panel(self.student)
+        self.assertTrue(rendered)
+
+        other = UserFactory()
+        StudentProfileFactory(user=other)
+        cached_html, rendered = self.load_panel(other)
+
+        self.assertFalse(rendered)
+        section = '<div class="flight-periods-section">'
+        self.assertEqual(cached_html.split(section)[1:], html.split(section)[1:])
+
+    def test_booking_approval_and_cancellation_refresh_the_grid(self):
+        self.assertIn(f'data-slot-id="{self.slot.pk}"', self.load_panel(self.student)[0])
+
+        flight_request = FlightRequest()
+        flight_request.create_request(self.student, FlightSlot.objects.get(pk=self.slot.pk))
+        html, rendered = self.load_panel(self.student)
+        self.assertTrue(rendered)
+        self.assertNotIn(f'data-slot-id="{self.slot.pk}"', html)
+        self.assertIn('slot-pending', html)
+
+        flight_request.approve()
+        html, rendered = self.load_panel(self.student)
+        self.assertTrue(rendered)
+        self.assertIn('slot-reserved', html)
+        self.assertFalse(self.load_panel(self.student)[1])
+
+        flight_request.cancel(cancelled_by=domain_signals.FLIGHT_REQUEST_CANCELLED_BY_STUDENT)
+        html, rendered = self.load_panel(self.student)
+        self.assertTrue(rendered)
+        self.assertIn(f'data-slot-id="{self.slot.pk}"', html)
+
+    def test_advanced_students_get_their_own_grid(self):
+        advanced_period = FlightPeriodFactory(
+            aircraft=AircraftFactory(is_advanced=True), start_date=self.period.start_date, is_active=True,
+        )
+        advanced = UserFactory()
+        StudentProfileFactory(user=advanced, advanced_student=True)
+
+        self.load_panel(self.student)
+        html, rendered = self.load_panel(advanced)
+
+        self.assertTrue(rendered)
+        self.assertIn(advanced_period.aircraft.registration, html)
+        self.assertNotIn(advanced_period.aircraft.registration, self.load_panel(self.student)[0])
+
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'grids': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'grids'},
+    })
+    def test_grids_are_not_cached_in_a_per_process_cache(self):
+        # Another web worker could not invalidate it after a booking.
+        self.assertTrue(self.load_panel(self.student)[1])
+        self.assertTrue(self.load_panel(self.student)[1])
+
 class ChangeSlotStatusViewTest(TestCase):
     """Test change slot status view functionality."""
 
@@ -5,10 +5,11 @@ from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
 from django.views.decorators.http import require_POST
 from django.http import JsonResponse
-from datetime import timedelta
 from .forms import CreateFlightPeriodForm, StaffCreateApprovedFlightRequestForm
-from .models import FlightPeriod, FlightSlot, FlightRequest, CancellationsFee
+from .models import FlightPeriod, FlightSlot, FlightRequest, CancellationsFee, IdempotencyKeyReusedError, SlotTakenError
+from .grids import build_cached_period_grids, build_period_grids
 from accounts.models import User
+from config.reference_cache import get_flight_instructors
 import json
 from . import domain_signals
 
@@ -87,62 +88,6 @@ def create_flight_period(request):
         form = CreateFlightPeriodForm()
     return render(request, 'scheduler/create_flight_period.html', {'form': form})
 
-def create_period_grids(periods):
-    """Generate a grid of slots for specified flight periods, grouped by aircraft."""
-    # Group periods by aircraft
-    aircraft_periods = {}
-    for period in periods:
-        aircraft = period.aircraft
-        if aircraft not in aircraft_periods:
-            aircraft_periods[aircraft] = []
-        aircraft_periods[aircraft].append(period)
-    
-    # Build grids for each aircraft
-    aircraft_grids = []
-    for aircraft, aircraft_period_list in aircraft_periods.items():
-        # Sort periods by start_date for this aircraft
-        aircraft_period_list.sort(key=lambda p: p.start_date)
-        
-        aircraft_data = {
-            'aircraft': aircraft,
-            'periods': []
-        }
-        
-        for period in aircraft_period_list:
-            # Generate dates for this period
-            dates = []
-            day = period.start_date
-            while day <= period.end_date:
-                dates.append(day)
-                day = day + timedelta(days=1)
-
-            blocks = ['AM', 'M', 'PM']
-
-            # Get all slots for this period
-            slots = FlightSlot.objects.filter(flight_period=period)
-            # Create index by (date, block) since all slots belong to the same aircraft
-            slot_index = {(s.date, s.block): s for s in slots}
-            
-            # Build grid data for this period
-            period_data = {
-                'period': period,
-                'dates': dates,
-                'blocks': blocks,
-                'grid': {}
-            }
-            
-            for date in dates:
-                period_data['grid'][date] = {}
-                for block in blocks:
-                    slot = slot_index.get((date, block))
-                    period_data['grid'][date][block] = slot
-            
-            aircraft_data['periods'].append(period_data)
-        
-        aircraft_grids.append(aircraft_data)
-    
-    return aircraft_grids
-
 @login_required
 @student_required
 def create_student_flight_period_grids(request):
@@ -164,7 +109,12 @@ def create_student_flight_period_grids(request):
         # Filter out periods for advanced aircraft - non-advanced students can't see them
         active_periods = active_periods.filter(aircraft__is_advanced=False)
 
-    aircraft_grids = create_period_grids(active_periods)
+    # Every student sees the same grid, so each period is rendered once per change and cached.
+    aircraft_grids = build_cached_period_grids(
+        active_periods,
+        'scheduler/partials/student_period_grid.html',
+        variant='advanced' if is_advanced_student else 'standard',
+    )
 
     context = {
         'aircraft_grids': aircraft_grids,
@@ -182,7 +132,7 @@ def create_instructor_flight_period_grids(request):
         messages.info(request, 'No hay períodos de vuelo activos en este momento.')
         return redirect('scheduler:instructor_flight_requests_dashboard')
 
-    aircraft_grids = create_period_grids(active_periods)
+    aircraft_grids = build_period_grids(active_periods)
 
     context = {
         'aircraft_grids': aircraft_grids,
@@ -196,7 +146,7 @@ def create_staff_flight_period_grids(request):
     """Generate a grid of slots for active and inactive flight periods."""
     periods = FlightPeriod.objects.all()
 
-    aircraft_grids = create_period_grids(periods)
+    aircraft_grids = build_period_grids(periods)
 
     context = {
         'aircraft_grids': aircraft_grids,
@@ -208,16 +158,27 @@ def create_staff_flight_period_grids(request):
 @student_required
 @require_POST
 def create_flight_request(request, slot_id):
-    """Create a flight request for a specific slot."""
+    """
+    Create a flight request for a specific slot.
+
+    Clients send an Idempotency-Key header so a retried POST returns the
+    request it already created; reusing a key for a different slot is
+    rejected with 422. A slot already booked by someone else fails fast with 409.
+    """
     slot = get_object_or_404(FlightSlot, id=slot_id)
+    idempotency_key = request.headers.get('Idempotency-Key', '').strip()[:64] or None
     try:
         flight_request = FlightRequest()
-        flight_request.create_request(request.user, slot)
+        flight_request.create_request(request.user, slot, idempotency_key=idempotency_key)
         return JsonResponse({
             'success': True,
             'message': 'Solicitud de vuelo creada exitosamente',
             'request_id': flight_request.id
         }) 
+    except SlotTakenError as e:
+        return JsonResponse({"error": e.messages[0], "slot_taken": True}, status=409)
+    except IdempotencyKeyReusedError as e:
+        return JsonResponse({"error": e.messages[0]}, status=422)
     except (ValidationError, ValueError) as e:
         # Handle Django ValidationError properly
         if hasattr(e, 'message_dict') and e.message_dict:
@@ -499,15 +460,9 @@ def assign_instructor_to_slot(request, slot_id):
 def get_available_instructors(request):
     """Get list of available instructors (staff only)."""
     try:
-        instructors = User.objects.filter(
-            role='INSTRUCTOR',
-            instructor_profile__instructor_type__in=['VUELO', 'DUAL'],
-            is_active=True
-        ).values('id', 'username', 'first_name', 'last_name')
-        
         return JsonResponse({
             'success': True,
-            'instructors': list(instructors)
+            'instructors': get_flight_instructors(),
         })
     except Exception as e:
         return JsonResponse({'error': f'Error al obtener instructores: {str(e)}'}, status=500)
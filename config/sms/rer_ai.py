@@ -11,8 +11,9 @@ from django.conf import settings
 from django.db import transaction
 from django.db.models import Prefetch
 from django.utils import timezone
-from openai import OpenAI, OpenAIError
+from openai import OpenAIError
 
+from config.openai_client import get_openai_client
 from sms.models import MitigationAction, Risk, RiskEvaluationReport
 
 
@@ -187,7 +188,7 @@ def _openai_client():
     api_key = os.getenv('OPENAI_API_KEY')
     if not api_key:
         raise RERAIError('OPENAI_API_KEY is not configured.')
-    return OpenAI(api_key=api_key)
+    return get_openai_client()
 
 
 def _validate_results(response, payload):
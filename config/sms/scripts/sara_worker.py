@@ -24,6 +24,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
 # Import Django models and functions
+from config.db_connections import close_stale_connections
 from sms.models import VoluntaryHazardReport
 from sms.views import run_ai_analysis_for_voluntary_hazard_report
 
@@ -124,6 +125,8 @@ def process_pending_reports():
         print("[{}] Found {} pending reports".format(timezone.now(), pending_reports.count()))
 
         for report in pending_reports:
+            # Reports take a while to analyse; recycle broken or expired connections between them.
+            close_stale_connections()
             success = run_ai_analysis(report)
             if success:
                 print("[{}] Report {} processed successfully".format(timezone.now(), report.id))
@@ -145,6 +148,7 @@ def main_worker_loop():
     
     while True:
         try:
+            close_stale_connections()
             process_pending_reports()
 
             # Wait 30 seconds before next scan
@@ -1,7 +1,7 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.core.mail import EmailMessage
 from django.conf import settings
+from notifications.outbox import queue_email
 from .models import VoluntaryHazardReport, MitigationAction, Risk
 import logging
 
@@ -28,7 +28,7 @@ SARA
 @receiver(post_save, sender=VoluntaryHazardReport)
 def send_vhr_analysis_email(instance, created, **kwargs):
     """
-    Send an email notification when the VHR AI analysis is completed.
+    Queue an email notification when the VHR AI analysis is completed.
     Only sends email once per report when status becomes 'COMPLETED'.
     """
     # Don't send on creation or if status is not COMPLETED
@@ -61,21 +61,20 @@ def send_vhr_analysis_email(instance, created, **kwargs):
             report_description=instance.description
         )
 
-        email = EmailMessage(
-            subject=SMS_NOTIFICATION_SUBJECT,
-            body=message_body,
-            from_email=settings.EMAIL_HOST_USER,
-            to=recipients
+        queue_email(
+            SMS_NOTIFICATION_SUBJECT,
+            message_body,
+            recipients,
+            settings.EMAIL_HOST_USER,
         )
-        email.send(fail_silently=False)
-        
-        # Mark email as sent to prevent duplicate emails
+
+        # Mark email as sent (queued in the outbox) to prevent duplicate emails
         instance.analysis_email_sent = True
         instance.save(update_fields=['analysis_email_sent'])
         
-        logger.info(f"VHR analysis email sent to recipients: {recipients}")
+        logger.info(f"VHR analysis email queued for recipients: {recipients}")
     except Exception as e:
-        logger.error(f"Failed to send VHR analysis email to recipients: {recipients}. Error: {e}")
+        logger.error(f"Failed to queue VHR analysis email for recipients: {recipients}. Error: {e}")
 
 
 def check_and_update_report_resolved_status(report):
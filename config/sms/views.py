@@ -3,7 +3,6 @@ import json
 from types import SimpleNamespace
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
-from openai import OpenAI
 from .forms import (
     RiskEvaluationReportForm,
     RiskResidualReviewFormSet,
@@ -14,8 +13,6 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.template.loader import render_to_string
-from django.contrib.staticfiles.finders import find
 from django.db import transaction
 from django.db.models import Count
 from .models import (
@@ -28,10 +25,10 @@ from .models import (
 from .rer_readiness import evaluate_rer_readiness
 from django.conf import settings
 from accounts.models import User
+from config.openai_client import get_openai_client
+from config.pdf_renderer import logo_data_uri, render_pdf, stylesheet
 import logging
 import sys
-import weasyprint
-from pathlib import Path
 from django.utils import timezone
 
 
@@ -112,12 +109,8 @@ def run_ai_analysis_for_voluntary_hazard_report(report):
     logger.info("API key retrieved successfully (length: {} characters)".format(len(api_key) if api_key else 0))
 
     try:
-        logger.info("Attempting to initialize OpenAI client")
-        
-        # Initialize the OpenAI client with the retrieved key
-        client = OpenAI(api_key=api_key)
-        
-        logger.info("OpenAI client initialized successfully")
+        # Reuse the process-wide client and its open connections
+        client = get_openai_client()
 
         # Make a request to the responses endpoint
         logger.info("Making API request to OpenAI responses endpoint")
@@ -541,33 +534,18 @@ def download_vhr_pdf(request, report_id):
         return redirect('sms:vhr_action_panel', report_id=report_id)
     
     try:
-        # Find the static image path (logo)
-        raw_logo_path = find('sms/img/evaluation_logo.png')
-        if raw_logo_path:
-            logo_path = Path(raw_logo_path).as_posix()
-            logo_uri = f'file:///{logo_path}'
-        else:
-            logo_uri = ''
+        # Compiled once per process by the shared PDF renderer
+        css = stylesheet('sms/pdf_vhr.css')
+        if css is None:
+            messages.error(request, 'No se encontró el archivo CSS para generar el PDF del VHR.')
+            return redirect('sms:vhr_action_panel', report_id=report_id)
 
-        # Render the PDF template with report data and logo path
-        html_string = render_to_string('sms/pdf_vhr.html', {
+        # Render the PDF template with report data and the inlined logo
+        pdf = render_pdf('sms/pdf_vhr.html', {
             'report': report,
-            'logo_path': logo_uri,
+            'logo_path': logo_data_uri('sms/img/evaluation_logo.png'),
             'user': request.user
-        })
-        
-        # Get the base URL for static files
-        base_url = request.build_absolute_uri()
-
-        # Find the CSS file path
-        css_path = find('sms/pdf_vhr.css')
-        if not css_path:
-            messages.error(request, 'No se encontró el archivo CSS para generar el PDF del VHR.')
-            return redirect('sms:vhr_action_panel', report_id=report_id)
-        
-        # Generate PDF using WeasyPrint with CSS
-        html_doc = weasyprint.HTML(string=html_string, base_url=base_url)
-        pdf = html_doc.write_pdf(stylesheets=[weasyprint.CSS(filename=css_path)] if css_path else None)
+        }, stylesheets=[css])
         
         # Create HTTP response with PDF content
         response = HttpResponse(pdf, content_type='application/pdf')
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import StudentTransaction
+from .models import BalanceCheckpoint, BalanceJournalEntry, StudentTransaction
 
 @admin.register(StudentTransaction)
 class StudentTransactionAdmin(admin.ModelAdmin):
@@ -71,4 +71,34 @@ class StudentTransactionAdmin(admin.ModelAdmin):
         """Override delete_queryset to ensure balance updates"""
         # Call each object's delete method to trigger balance updates
         for obj in queryset:
-            obj.delete()
\ No newline at end of file
+            obj.delete()
+
+@admin.register(BalanceJournalEntry)
+class BalanceJournalEntryAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'entity_type', 'entity_id', 'field', 'delta', 'value_after', 'account', 'reason', 'reference')
+    list_filter = ('entity_type', 'field', 'account', 'reason')
+    search_fields = ('reference',)
+    date_hierarchy = 'created_at'
+
+    # The journal is append-only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(BalanceCheckpoint)
+class BalanceCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('posted_at', 'student_profile', 'balance')
+    search_fields = ('student_profile__user__national_id', 'student_profile__user__username')
+    list_select_related = ('student_profile__user',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,158 @@
+"""
+Running totals: student balance and hours, aircraft and simulator hours.
+
+Every change goes through this module instead of read-modify-write plus
+``save()``:
+
+* each call changes one row with a single UPDATE of ``F()`` expressions, so
+  concurrent requests add up instead of overwriting each other, and only the
+  changed columns are written;
+* every changed column is journaled in BalanceJournalEntry, with the change
+  actually applied and the value it produced, in the same transaction as the
+  UPDATE, so replaying the journal reproduces the running totals;
+* the in-memory instance passed in is refreshed with the new values;
+* a student's balance entries name the counter account of their reason,
+  which makes them the double-entry ledger of ``transactions.ledger``.
+
+QuerySet.update() sends no signals, so the aircraft and simulator reference
+caches are invalidated here.
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from config.reference_cache import AIRCRAFT, SIMULATORS, invalidate
+
+from . import ledger
+from .models import BalanceJournalEntry
+
+# Journal reasons
+FLIGHT_EVALUATION = 'flight_evaluation'
+FLIGHT_EVALUATION_DELETED = 'flight_evaluation_deleted'
+FLIGHT_EVALUATION_CORRECTED = 'flight_evaluation_corrected'
+SIM_EVALUATION = 'sim_evaluation'
+SIM_EVALUATION_DELETED = 'sim_evaluation_deleted'
+FLIGHT_REPORT = 'flight_report'
+FLIGHT_REPORT_DELETED = 'flight_report_deleted'
+TRANSACTION_CONFIRMED = 'transaction_confirmed'
+TRANSACTION_REVERSED = 'transaction_reversed'
+CANCELLATION_FEE = 'cancellation_fee'
+CANCELLATION_FEE_REIMBURSED = 'cancellation_fee_reimbursed'
+MANUAL_ADJUSTMENT = 'manual_adjustment'
+
+# Ledger account each reason's balance changes are posted against
+LEDGER_ACCOUNTS = {
+    FLIGHT_EVALUATION: BalanceJournalEntry.FLIGHT,
+    FLIGHT_EVALUATION_DELETED: BalanceJournalEntry.FLIGHT,
+    FLIGHT_EVALUATION_CORRECTED: BalanceJournalEntry.FLIGHT,
+    TRANSACTION_CONFIRMED: BalanceJournalEntry.PAYMENTS,
+    TRANSACTION_REVERSED: BalanceJournalEntry.PAYMENTS,
+    CANCELLATION_FEE: BalanceJournalEntry.FEES,
+    CANCELLATION_FEE_REIMBURSED: BalanceJournalEntry.FEES,
+}
+
+
+def reference_to(obj) -> str:
+    """
+    Return the journal reference of ``obj``, e.g. ``fms.SimEvaluation:12``.
+    """
+    return f"{obj._meta.label}:{obj.pk}"
+
+
+def _apply(instance, entity_type, deltas, reason, reference, floor_at_zero=(), touch=False, accounts=None):
+    deltas = {field: Decimal(str(delta)) for field, delta in deltas.items() if delta}
+    if not deltas:
+        return {}
+
+    updates = {}
+    for field, delta in deltas.items():
+        expression = F(field) + Value(delta)
+        if field in floor_at_zero:
+            expression = Greatest(expression, Value(Decimal('0')))
+        updates[field] = expression
+    if touch:
+        updates['updated_at'] = timezone.now()
+
+    model = type(instance)
+    clamped = [field for field in deltas if field in floor_at_zero]
+    with transaction.atomic():
+        before = {}
+        if clamped:
+            # A clamped field may change by less than its delta: lock the row and read where it starts.
+            before = model.objects.select_for_update().filter(pk=instance.pk).values(*clamped).first()
+            if before is None:
+                raise model.DoesNotExist(f"{model._meta.object_name} {instance.pk} does not exist.")
+        if not model.objects.filter(pk=instance.pk).update(**updates):
+            raise model.DoesNotExist(f"{model._meta.object_name} {instance.pk} does not exist.")
+        # The UPDATE holds the row until commit, so these are exactly the values it produced.
+        values = model.objects.filter(pk=instance.pk).values(*deltas).get()
+        applied = {
+            field: values[field] - before[field] if field in before else delta
+            for field, delta in deltas.items()
+        }
+        BalanceJournalEntry.objects.bulk_create([
+            BalanceJournalEntry(
+                entity_type=entity_type,
+                entity_id=instance.pk,
+                field=field,
+                delta=delta,
+                value_after=values[field],
+                account=(accounts or {}).get(field, ''),
+                reason=reason,
+                reference=reference,
+            )
+            for field, delta in applied.items()
+            if delta
+        ])
+
+    for field, value in values.items():
+        setattr(instance, field, value)
+    return values
+
+
+def adjust_student(profile, *, reason, reference='', floor_at_zero=(),
+                   balance=0, flight_hours=0, nav_flight_hours=0, sim_hours=0):
+    """
+    Add the given deltas to a StudentProfile and return its new values.
+
+    Fields named in ``floor_at_zero`` stop at 0 instead of going negative.
+    """
+    deltas = {
+        'balance': balance,
+        'flight_hours': flight_hours,
+        'nav_flight_hours': nav_flight_hours,
+        'sim_hours': sim_hours,
+    }
+    if not any(deltas.values()):
+        return {}
+
+    accounts = {ledger.BALANCE: LEDGER_ACCOUNTS.get(reason, BalanceJournalEntry.ADJUSTMENT)}
+    with transaction.atomic():
+        values = _apply(profile, BalanceJournalEntry.STUDENT, deltas, reason, reference, floor_at_zero, accounts=accounts)
+        if ledger.BALANCE in values:
+            ledger.checkpoint_if_due(profile)
+    return values
+
+
+def adjust_aircraft_hours(aircraft, hours, *, reason, reference=''):
+    """
+    Add ``hours`` to an aircraft's total hours and return its new values.
+    """
+    values = _apply(aircraft, BalanceJournalEntry.AIRCRAFT, {'total_hours': hours}, reason, reference, touch=True)
+    if values:
+        invalidate(AIRCRAFT)
+    return values
+
+
+def adjust_simulator_hours(simulator, hours, *, reason, reference=''):
+    """
+    Add ``hours`` to a simulator's total hours and return its new values.
+    """
+    values = _apply(simulator, BalanceJournalEntry.SIMULATOR, {'total_hours': hours}, reason, reference, touch=True)
+    if values:
+        invalidate(SIMULATORS)
+    return values
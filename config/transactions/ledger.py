@@ -0,0 +1,166 @@
+"""
+Double-entry ledger of student balances.
+
+StudentProfile.balance is a cached running total kept by
+``transactions.balances``, which journals every change to it as a
+BalanceJournalEntry of field ``balance`` in the same transaction and while
+the UPDATE holds the student's row. Those journal entries are the ledger:
+each one moves its delta between the student's account and the counter
+account of its reason, and a student's entries are ordered the same way by
+id and by created_at. post() journals the entries that do not change the
+cached balance: the opening balance of a new student and reconciliation
+adjustments.
+
+Every LEDGER_CHECKPOINT_INTERVAL entries a BalanceCheckpoint stores the
+balance reached. balance_as_of() reads the newest checkpoint before the
+requested time through its index and adds up at most that many entries, so a
+historical balance never rescans the student's whole history.
+reconcile_balances() compares the ledger with the cached balance of every
+student in one pass; see the ``reconcile_balances`` management command.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+
+from accounts.models import StudentProfile
+
+from .models import BalanceCheckpoint, BalanceJournalEntry
+
+BALANCE = 'balance'
+OPENING_BALANCE = 'opening_balance'
+RECONCILIATION = 'reconciliation'
+
+ZERO = Decimal('0.00')
+
+
+@dataclass(frozen=True)
+class BalanceDrift:
+    student_profile_id: int
+    national_id: int
+    cached_balance: Decimal
+    ledger_balance: Decimal
+
+    @property
+    def difference(self):
+        return self.cached_balance - self.ledger_balance
+
+
+def _all_entries():
+    return BalanceJournalEntry.objects.filter(entity_type=BalanceJournalEntry.STUDENT, field=BALANCE)
+
+
+def entries(profile):
+    """
+    Return the ledger entries of a student: the journal entries of their balance.
+    """
+    return _all_entries().filter(entity_id=profile.pk)
+
+
+def post(profile, amount, account, reason, reference=''):
+    """
+    Post ``amount`` to a student's ledger against ``account`` without changing their balance.
+
+    ``profile.balance`` is recorded as the value the entry leads to. A
+    positive amount credits the student (debits ``account``), a negative one
+    debits the student. Returns the entry, or None for a zero amount.
+    """
+    amount = Decimal(str(amount))
+    if not amount:
+        return None
+
+    with transaction.atomic():
+        entry = BalanceJournalEntry.objects.create(
+            entity_type=BalanceJournalEntry.STUDENT,
+            entity_id=profile.pk,
+            field=BALANCE,
+            delta=amount,
+            value_after=profile.balance,
+            account=account,
+            reason=reason,
+            reference=reference,
+        )
+        checkpoint_if_due(profile)
+    return entry
+
+
+def checkpoint_if_due(profile):
+    """
+    Store a BalanceCheckpoint once LEDGER_CHECKPOINT_INTERVAL entries follow the previous one.
+    """
+    last = (
+        BalanceCheckpoint.objects.filter(student_profile_id=profile.pk)
+        .order_by('-entry_id')
+        .values('entry_id', 'balance')
+        .first()
+    )
+    pending = entries(profile)
+    if last:
+        pending = pending.filter(id__gt=last['entry_id'])
+    totals = pending.aggregate(
+        count=Count('id'), total=Sum('delta'), entry_id=Max('id'), posted_at=Max('created_at'),
+    )
+    if totals['count'] < settings.LEDGER_CHECKPOINT_INTERVAL:
+        return None
+
+    start = last['balance'] if last else ZERO
+    return BalanceCheckpoint.objects.create(
+        student_profile_id=profile.pk,
+        entry_id=totals['entry_id'],
+        posted_at=totals['posted_at'],
+        balance=start + totals['total'],
+    )
+
+
+def balance_as_of(profile, when=None):
+    """
+    Return a student's ledger balance at ``when`` (default: now).
+    """
+    posted = entries(profile)
+    checkpoints = BalanceCheckpoint.objects.filter(student_profile_id=profile.pk)
+    if when is not None:
+        posted = posted.filter(created_at__lte=when)
+        checkpoints = checkpoints.filter(posted_at__lte=when)
+
+    checkpoint = checkpoints.order_by('-posted_at', '-entry_id').values('entry_id', 'balance').first()
+    start = ZERO
+    if checkpoint:
+        posted = posted.filter(id__gt=checkpoint['entry_id'])
+        start = checkpoint['balance']
+    return start + (posted.aggregate(total=Sum('delta'))['total'] or ZERO)
+
+
+def reconcile_balances():
+    """
+    Return a BalanceDrift for every student whose cached balance differs from the ledger.
+    """
+    ledger = dict(
+        _all_entries().order_by()
+        .values('entity_id')
+        .annotate(total=Sum('delta'))
+        .values_list('entity_id', 'total')
+    )
+    drifts = []
+    profiles = StudentProfile.objects.order_by('pk').values_list('pk', 'user__national_id', 'balance')
+    for pk, national_id, balance in profiles.iterator():
+        ledger_balance = ledger.get(pk, ZERO)
+        if balance != ledger_balance:
+            drifts.append(BalanceDrift(pk, national_id, balance, ledger_balance))
+    return drifts
+
+
+def settle_drift(drift):
+    """
+    Post an adjustment that brings the ledger in line with the cached balance.
+    """
+    return post(
+        StudentProfile(pk=drift.student_profile_id, balance=drift.cached_balance),
+        drift.difference,
+        BalanceJournalEntry.ADJUSTMENT,
+        RECONCILIATION,
+        reference=f"{timezone.now():%Y-%m-%d}",
+    )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.ledger import reconcile_balances, settle_drift
+
+
+class Command(BaseCommand):
+    help = 'Compare every cached student balance with the balance ledger.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Post a reconciliation adjustment so the ledger matches each cached balance.',
+        )
+
+    def handle(self, *args, **options):
+        drifts = reconcile_balances()
+        for drift in drifts:
+            self.stdout.write(
+                f'{drift.national_id}: balance={drift.cached_balance:.2f} '
+                f'ledger={drift.ledger_balance:.2f} difference={drift.difference:+.2f}'
+            )
+
+        if not drifts:
+            self.stdout.write('All balances match the ledger.')
+        elif options['fix']:
+            for drift in drifts:
+                settle_drift(drift)
+            self.stdout.write(f'Adjusted {len(drifts)} ledger(s).')
+        else:
+            raise CommandError(f'{len(drifts)} balance(s) differ from the ledger.')
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-18 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0011_remove_fuel_transaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceJournalEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('STUDENT', 'Estudiante'), ('AIRCRAFT', 'Aeronave'), ('SIMULATOR', 'Simulador')], max_length=10, verbose_name='Tipo de entidad')),
+                ('entity_id', models.PositiveBigIntegerField(verbose_name='ID de entidad')),
+                ('field', models.CharField(max_length=30, verbose_name='Campo')),
+                ('delta', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Variación')),
+                ('value_after', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Valor resultante')),
+                ('reason', models.CharField(max_length=50, verbose_name='Motivo')),
+                ('reference', models.CharField(blank=True, max_length=100, verbose_name='Referencia')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de registro')),
+            ],
+            options={
+                'verbose_name': 'Movimiento de balance',
+                'verbose_name_plural': 'Movimientos de balance',
+                'db_table': 'balance_journal_db',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['entity_type', 'entity_id', 'created_at'], name='balance_journal_entity_idx')],
+            },
+        ),
+    ]
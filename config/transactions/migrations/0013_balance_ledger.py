@@ -0,0 +1,101 @@
+# Generated by Django 5.2.3 on 2026-10-18 05:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+# Ledger account of each reason journaled before the ledger existed
+REASON_ACCOUNTS = {
+    'flight_evaluation': 'VUELO',
+    'flight_evaluation_deleted': 'VUELO',
+    'flight_evaluation_corrected': 'VUELO',
+    'transaction_confirmed': 'PAGOS',
+    'transaction_reversed': 'PAGOS',
+    'cancellation_fee': 'MULTAS',
+    'cancellation_fee_reimbursed': 'MULTAS',
+}
+
+
+def open_ledgers(apps, schema_editor):
+    """
+    Give the journaled balance changes their ledger account and open the
+    ledger of every student with the part of their balance not journaled yet.
+    """
+    StudentProfile = apps.get_model('accounts', 'StudentProfile')
+    BalanceJournalEntry = apps.get_model('transactions', 'BalanceJournalEntry')
+
+    balance_entries = BalanceJournalEntry.objects.filter(entity_type='STUDENT', field='balance')
+    for reason, account in REASON_ACCOUNTS.items():
+        balance_entries.filter(reason=reason).update(account=account)
+    balance_entries.filter(account='').update(account='AJUSTE')
+
+    journaled = dict(
+        balance_entries.order_by()
+        .values('entity_id')
+        .annotate(total=Sum('delta'))
+        .values_list('entity_id', 'total')
+    )
+    entries = []
+    for pk, balance in StudentProfile.objects.values_list('pk', 'balance').iterator():
+        opening = balance - journaled.get(pk, 0)
+        if opening:
+            entries.append(BalanceJournalEntry(
+                entity_type='STUDENT',
+                entity_id=pk,
+                field='balance',
+                delta=opening,
+                value_after=balance,
+                account='APERTURA',
+                reason='opening_balance',
+            ))
+    BalanceJournalEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0044_staffprofile_production_permission'),
+        ('transactions', '0012_balance_journal_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='balancejournalentry',
+            name='account',
+            field=models.CharField(blank=True, choices=[('PAGOS', 'Pagos y cargos'), ('VUELO', 'Vuelos'), ('MULTAS', 'Multas'), ('APERTURA', 'Saldo inicial'), ('AJUSTE', 'Ajustes')], max_length=10, verbose_name='Contrapartida'),
+        ),
+        migrations.RemoveIndex(
+            model_name='balancejournalentry',
+            name='balance_journal_entity_idx',
+        ),
+        migrations.AddIndex(
+            model_name='balancejournalentry',
+            index=models.Index(fields=['entity_type', 'entity_id', 'field', 'created_at'], name='balance_journal_field_idx'),
+        ),
+        migrations.CreateModel(
+            name='BalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posted_at', models.DateTimeField(verbose_name='Fecha del asiento')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Balance')),
+                ('student_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_checkpoints', to='accounts.studentprofile', verbose_name='Estudiante')),
+                ('entry', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoint', to='transactions.balancejournalentry', verbose_name='Último asiento incluido')),
+            ],
+            options={
+                'verbose_name': 'Corte de balance',
+                'verbose_name_plural': 'Cortes de balance',
+                'db_table': 'balance_checkpoints_db',
+                'ordering': ['-posted_at', '-entry_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='balancecheckpoint',
+            index=models.Index(fields=['student_profile', 'posted_at', 'entry'], name='balance_checkpoint_idx'),
+        ),
+        migrations.RunPython(open_ledgers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='balancejournalentry',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('entity_type', 'STUDENT'), ('field', 'balance'), _negated=True), models.Q(('account', ''), _negated=True), _connector='OR'), name='balance_journal_ledger_account'),
+        ),
+    ]
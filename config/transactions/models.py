@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
@@ -145,23 +145,21 @@ class StudentTransaction(models.Model):
     
     def _update_student_balance(self, add=True):
         """Helper method to update student balance"""
-        # Refresh the student profile from database to get current balance
-        self.student_profile.refresh_from_db()
-        
+        from .balances import TRANSACTION_CONFIRMED, TRANSACTION_REVERSED, adjust_student, reference_to
+
         if self.type == 'CREDITO':
-            if add:
-                self.student_profile.balance += self.amount
-            else:
-                self.student_profile.balance -= self.amount
+            amount = self.amount
         elif self.type == 'DEBITO':
-            if add:
-                self.student_profile.balance -= self.amount
-            else:
-                self.student_profile.balance += self.amount
+            amount = -self.amount
         else:
             return
-            
-        self.student_profile.save()
+
+        adjust_student(
+            self.student_profile,
+            reason=TRANSACTION_CONFIRMED if add else TRANSACTION_REVERSED,
+            reference=reference_to(self),
+            balance=amount if add else -amount,
+        )
     
     def save(self, *args, **kwargs):
         """Override save method to handle balance updates and validation"""
@@ -178,20 +176,25 @@ class StudentTransaction(models.Model):
             self.confirmation_date = timezone.now()
         
         # Handle balance updates based on confirmation status changes
+        balance_change = None
         if original_obj:
             # Existing transaction being modified
             if not original_obj.confirmed and self.confirmed:
                 # Transaction being confirmed - add to balance
-                self._update_student_balance(add=True)
+                balance_change = True
             elif original_obj.confirmed and not self.confirmed:
                 # Transaction being unconfirmed - subtract from balance
-                self._update_student_balance(add=False)
+                balance_change = False
         else:
             # New transaction - only update balance if it's confirmed
             if self.confirmed:
-                self._update_student_balance(add=True)
+                balance_change = True
         
-        super().save(*args, **kwargs)
+        # Saved first so the balance journal can reference the transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if balance_change is not None:
+                self._update_student_balance(add=balance_change)
     
     def delete(self, *args, **kwargs):
         """Override delete method to validate data before deleting a transaction"""
@@ -205,3 +208,168 @@ class StudentTransaction(models.Model):
             except StudentTransaction.DoesNotExist:
                 pass
         super().delete(*args, **kwargs)
+
+
+class BalanceJournalEntry(models.Model):
+    """
+    Append-only record of every change made through transactions.balances.
+
+    The entries of a student's ``balance`` are also the double-entry ledger
+    of that balance: each one moves ``delta`` between the student's account
+    and its counter ``account`` (see debit_account and credit_account). They
+    are read by ``transactions.ledger``; see BalanceCheckpoint for historical
+    balances.
+    """
+
+    #region CHOICE DEFINITIONS
+
+    STUDENT = 'STUDENT'
+    AIRCRAFT = 'AIRCRAFT'
+    SIMULATOR = 'SIMULATOR'
+
+    ENTITY_TYPES = [
+        (STUDENT, 'Estudiante'),
+        (AIRCRAFT, 'Aeronave'),
+        (SIMULATOR, 'Simulador'),
+    ]
+
+    # Ledger accounts: the student's balance and the accounts it moves against
+    STUDENT_ACCOUNT = 'ESTUDIANTE'
+    PAYMENTS = 'PAGOS'
+    FLIGHT = 'VUELO'
+    FEES = 'MULTAS'
+    OPENING = 'APERTURA'
+    ADJUSTMENT = 'AJUSTE'
+
+    ACCOUNTS = [
+        (PAYMENTS, 'Pagos y cargos'),
+        (FLIGHT, 'Vuelos'),
+        (FEES, 'Multas'),
+        (OPENING, 'Saldo inicial'),
+        (ADJUSTMENT, 'Ajustes'),
+    ]
+    #endregion
+
+    #region MODEL FIELDS
+    entity_type = models.CharField(
+        max_length=10,
+        choices=ENTITY_TYPES,
+        verbose_name='Tipo de entidad',
+    )
+    entity_id = models.PositiveBigIntegerField(
+        verbose_name='ID de entidad',
+    )
+    field = models.CharField(
+        max_length=30,
+        verbose_name='Campo',
+    )
+    delta = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name='Variación',
+    )
+    value_after = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name='Valor resultante',
+    )
+    account = models.CharField(
+        max_length=10,
+        choices=ACCOUNTS,
+        blank=True,
+        verbose_name='Contrapartida',
+    )
+    reason = models.CharField(
+        max_length=50,
+        verbose_name='Motivo',
+    )
+    reference = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Referencia',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de registro',
+    )
+    #endregion
+
+    class Meta:
+        db_table = 'balance_journal_db'
+        ordering = ['-created_at', '-id']
+        verbose_name = 'Movimiento de balance'
+        verbose_name_plural = 'Movimientos de balance'
+        indexes = [
+            models.Index(
+                fields=['entity_type', 'entity_id', 'field', 'created_at'],
+                name='balance_journal_field_idx',
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=~models.Q(entity_type='STUDENT', field='balance') | ~models.Q(account=''),
+                name='balance_journal_ledger_account',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_entity_type_display()} {self.entity_id} - {self.field} {self.delta:+} ({self.reason})"
+
+    @property
+    def debit_account(self):
+        """The account a balance entry moves its amount from."""
+        return self.account if self.delta > 0 else self.STUDENT_ACCOUNT
+
+    @property
+    def credit_account(self):
+        """The account a balance entry moves its amount to."""
+        return self.STUDENT_ACCOUNT if self.delta > 0 else self.account
+
+
+class BalanceCheckpoint(models.Model):
+    """
+    Balance Checkpoint Model
+
+    Student balance after a given ledger entry (a balance journal entry),
+    written every LEDGER_CHECKPOINT_INTERVAL entries. A historical balance is
+    the newest checkpoint before the requested time (one index lookup) plus
+    the few entries posted after it.
+    """
+
+    #region MODEL FIELDS
+    student_profile = models.ForeignKey(
+        'accounts.StudentProfile',
+        on_delete=models.CASCADE,
+        related_name='balance_checkpoints',
+        verbose_name='Estudiante',
+    )
+    entry = models.OneToOneField(
+        BalanceJournalEntry,
+        on_delete=models.CASCADE,
+        related_name='checkpoint',
+        verbose_name='Último asiento incluido',
+    )
+    posted_at = models.DateTimeField(
+        verbose_name='Fecha del asiento',
+    )
+    balance = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name='Balance',
+    )
+    #endregion
+
+    class Meta:
+        db_table = 'balance_checkpoints_db'
+        ordering = ['-posted_at', '-entry_id']
+        verbose_name = 'Corte de balance'
+        verbose_name_plural = 'Cortes de balance'
+        indexes = [
+            models.Index(
+                fields=['student_profile', 'posted_at', 'entry'],
+                name='balance_checkpoint_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.student_profile} - {self.posted_at:%Y-%m-%d %H:%M}: ${self.balance}"
@@ -1,13 +1,18 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from .models import StudentTransaction
-from django.core.mail import send_mail
+from accounts.models import StudentProfile
+
+from . import ledger
+from .models import BalanceJournalEntry, StudentTransaction
 from django.conf import settings
 import logging
 
+from notifications.outbox import queue_email
+
 logger = logging.getLogger('transactions.signals')
 
 TRANSACTION_NOTIFICATION_SUBJECT = """Nueva transacción agregada"""
+TRANSACTION_NOTIFICATION_DIGEST_KEY = "transactions.transaction_created"
 TRANSACTION_NOTIFICATION_MESSAGE = """
 Se ha agregado una nueva transacción de ${amount} a la cuenta de {student_name}.
 Tipo de transacción: {transaction_type}
@@ -18,23 +23,31 @@ Estado: Pendiente de confirmación
 @receiver(post_save, sender=StudentTransaction)
 def send_transaction_confirmation_email(sender, instance, created, **kwargs):
     """
-    Signal handler to send transaction confirmation email when transaction is saved.
+    Signal handler to queue the transaction confirmation email when a transaction is created.
     """
     if created and instance.confirmed is False:
-        try:
-            # Send email to the school director
-            send_mail(
-                TRANSACTION_NOTIFICATION_SUBJECT,
-                TRANSACTION_NOTIFICATION_MESSAGE.format(
-                    amount=instance.amount,
-                    transaction_type=instance.type,
-                    student_name=instance.student_profile.user.get_full_name(),
-                    date_added=instance.date_added,
-                ),
-                settings.DEFAULT_FROM_EMAIL,
-                [settings.TRANSACTIONS_NOTIFICATION_EMAIL],
-                fail_silently=False,
-            )
-            logger.info(f"Email sent to {settings.TRANSACTIONS_NOTIFICATION_EMAIL} with subject 'Nueva transacción agregada'")
-        except Exception as e:
-            logger.error(f"Failed to send transaction confirmation email to {settings.TRANSACTIONS_NOTIFICATION_EMAIL}: {e}")
+        # Queued with the transaction; a burst of new transactions arrives as one digest.
+        queued = queue_email(
+            TRANSACTION_NOTIFICATION_SUBJECT,
+            TRANSACTION_NOTIFICATION_MESSAGE.format(
+                amount=instance.amount,
+                transaction_type=instance.type,
+                student_name=instance.student_profile.user.get_full_name(),
+                date_added=instance.date_added,
+            ),
+            [settings.TRANSACTIONS_NOTIFICATION_EMAIL],
+            settings.DEFAULT_FROM_EMAIL,
+            digest_key=TRANSACTION_NOTIFICATION_DIGEST_KEY,
+            digest_subject="Nuevas transacciones agregadas",
+        )
+        if queued:
+            logger.info(f"Email queued for {settings.TRANSACTIONS_NOTIFICATION_EMAIL} with subject 'Nueva transacción agregada'")
+        else:
+            logger.warning("Transaction confirmation email skipped: missing TRANSACTIONS_NOTIFICATION_EMAIL or DEFAULT_FROM_EMAIL")
+
+
+@receiver(post_save, sender=StudentProfile)
+def post_opening_balance(sender, instance, created, **kwargs):
+    """Open the ledger of a new student with the balance it was created with."""
+    if created and instance.balance:
+        ledger.post(instance, instance.balance, BalanceJournalEntry.OPENING, ledger.OPENING_BALANCE)
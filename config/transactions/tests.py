@@ -1,15 +1,27 @@
+import copy
+import io
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 from decimal import Decimal
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.db import OperationalError, connection, connections
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from accounts.models import StudentProfile, User
 from fleet.models import Aircraft
 from fms.models import FlightEvaluation0_100, FlightEvaluation100_120
+from scheduler.test.factories import AircraftFactory, StudentProfileFactory
 
-from .models import StudentTransaction
+from . import balances, ledger
+from .models import BalanceCheckpoint, BalanceJournalEntry, StudentTransaction
 
 
 class MissingFuelEvaluationsTest(TestCase):
@@ -153,3 +165,247 @@ class MissingFuelEvaluationsTest(TestCase):
 
         self.older_evaluation.refresh_from_db()
         self.assertEqual(self.older_evaluation.fuel_consumed, Decimal('0.0'))
+
+
+class BalanceMutationTests(TestCase):
+    """Running totals change with one UPDATE per entity and every change is journaled."""
+
+    def setUp(self):
+        self.profile = StudentProfileFactory(balance=Decimal('1000.00'))
+        self.aircraft = AircraftFactory(total_hours=Decimal('100.0'))
+
+    def test_adjust_student_updates_only_the_changed_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            balances.adjust_student(
+                self.profile,
+                reason=balances.FLIGHT_EVALUATION,
+                reference='fms.FlightEvaluation0_100:1',
+                balance=Decimal('-150.50'),
+                flight_hours=Decimal('1.2'),
+            )
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"balance"', updates[0])
+        self.assertNotIn('"sim_hours"', updates[0])
+        self.assertNotIn('"student_age"', updates[0])
+
+        self.assertEqual(self.profile.balance, Decimal('849.50'))
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.balance, self.profile.flight_hours), (Decimal('849.50'), Decimal('1.2')))
+
+        journal = BalanceJournalEntry.objects.filter(entity_id=self.profile.pk, reason=balances.FLIGHT_EVALUATION)
+        entries = {entry.field: entry for entry in journal}
+        self.assertEqual(set(entries), {'balance', 'flight_hours'})
+        self.assertEqual((entries['balance'].delta, entries['balance'].value_after), (Decimal('-150.50'), Decimal('849.50')))
+        self.assertEqual(entries['balance'].entity_type, BalanceJournalEntry.STUDENT)
+        self.assertEqual(entries['balance'].reference, 'fms.FlightEvaluation0_100:1')
+
+    def test_floor_at_zero_stops_hours_at_zero(self):
+        balances.adjust_student(self.profile, reason=balances.SIM_EVALUATION, sim_hours=Decimal('1.8'))
+        balances.adjust_student(
+            self.profile,
+            reason=balances.SIM_EVALUATION_DELETED,
+            floor_at_zero=('sim_hours',),
+            sim_hours=Decimal('-3.0'),
+        )
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.sim_hours, Decimal('0'))
+        # The journal keeps the change applied, so it still replays to the stored value.
+        journal = BalanceJournalEntry.objects.filter(entity_id=self.profile.pk, field='sim_hours').order_by('id')
+        self.assertEqual(
+            list(journal.values_list('delta', 'value_after')),
+            [(Decimal('1.80'), Decimal('1.8')), (Decimal('-1.80'), Decimal('0'))],
+        )
+
+    def test_a_clamped_change_that_changes_nothing_is_not_journaled(self):
+        values = balances.adjust_student(
+            self.profile,
+            reason=balances.SIM_EVALUATION_DELETED,
+            floor_at_zero=('sim_hours',),
+            sim_hours=Decimal('-3.0'),
+        )
+
+        self.assertEqual(values, {'sim_hours': Decimal('0')})
+        self.assertFalse(BalanceJournalEntry.objects.filter(entity_id=self.profile.pk, field='sim_hours').exists())
+
+    def test_zero_deltas_write_nothing(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(balances.adjust_student(self.profile, reason=balances.FLIGHT_EVALUATION), {})
+
+    def test_adjust_aircraft_hours(self):
+        balances.adjust_aircraft_hours(self.aircraft, Decimal('1.5'), reason=balances.FLIGHT_REPORT)
+
+        self.aircraft.refresh_from_db()
+        self.assertEqual(self.aircraft.total_hours, Decimal('101.5'))
+        entry = BalanceJournalEntry.objects.get(entity_type=BalanceJournalEntry.AIRCRAFT)
+        self.assertEqual((entry.entity_id, entry.value_after), (self.aircraft.pk, Decimal('101.5')))
+
+    def test_missing_row_raises_does_not_exist(self):
+        self.profile.delete()
+        with self.assertRaises(StudentProfile.DoesNotExist):
+            balances.adjust_student(self.profile, reason=balances.CANCELLATION_FEE, balance=-10)
+        self.assertFalse(BalanceJournalEntry.objects.filter(reason=balances.CANCELLATION_FEE).exists())
+
+    def test_confirming_and_unconfirming_a_transaction_is_journaled(self):
+        payment = StudentTransaction.objects.create(
+            student_profile=self.profile,
+            amount=Decimal('200.00'),
+            type=StudentTransaction.CREDIT,
+        )
+        payment.confirmed = True
+        payment.save()
+        payment.unconfirm()
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.balance, Decimal('1000.00'))
+        journal = BalanceJournalEntry.objects.filter(reference=balances.reference_to(payment)).order_by('id')
+        self.assertEqual(
+            list(journal.values_list('reason', 'delta', 'value_after')),
+            [
+                (balances.TRANSACTION_CONFIRMED, Decimal('200.00'), Decimal('1200.00')),
+                (balances.TRANSACTION_REVERSED, Decimal('-200.00'), Decimal('1000.00')),
+            ],
+        )
+
+
+@override_settings(LEDGER_CHECKPOINT_INTERVAL=3)
+class BalanceLedgerTests(TestCase):
+    """Balance journal entries form the double-entry ledger, which can answer historical balances."""
+
+    def setUp(self):
+        self.profile = StudentProfileFactory(balance=Decimal('1000.00'))
+
+    def charge(self, amount):
+        balances.adjust_student(self.profile, reason=balances.FLIGHT_EVALUATION, balance=-Decimal(amount))
+
+    def test_new_student_opens_the_ledger_with_their_balance(self):
+        entry = ledger.entries(self.profile).get()
+        self.assertEqual(
+            (entry.debit_account, entry.credit_account, entry.delta, entry.value_after, entry.reason),
+            (BalanceJournalEntry.OPENING, BalanceJournalEntry.STUDENT_ACCOUNT, Decimal('1000.00'), Decimal('1000.00'), ledger.OPENING_BALANCE),
+        )
+
+    def test_changes_are_posted_against_the_account_of_their_reason(self):
+        self.charge('150.00')
+        balances.adjust_student(self.profile, reason=balances.TRANSACTION_CONFIRMED, balance=Decimal('80.00'))
+
+        # A balance change is journaled once, and that entry is its ledger entry.
+        charge, payment = ledger.entries(self.profile).order_by('id')[1:]
+        self.assertEqual(
+            (charge.debit_account, charge.credit_account, charge.delta),
+            (BalanceJournalEntry.STUDENT_ACCOUNT, BalanceJournalEntry.FLIGHT, Decimal('-150.00')),
+        )
+        self.assertEqual(
+            (payment.debit_account, payment.credit_account),
+            (BalanceJournalEntry.PAYMENTS, BalanceJournalEntry.STUDENT_ACCOUNT),
+        )
+        self.assertEqual(BalanceJournalEntry.objects.filter(entity_id=self.profile.pk).count(), 3)
+        self.assertEqual(ledger.balance_as_of(self.profile), Decimal('930.00'))
+
+    def test_hours_only_changes_are_not_posted(self):
+        balances.adjust_student(self.profile, reason=balances.SIM_EVALUATION, sim_hours=Decimal('1.5'))
+        self.assertEqual(ledger.entries(self.profile).count(), 1)
+
+    def test_historical_balances_start_from_the_nearest_checkpoint(self):
+        history = [(timezone.now(), Decimal('1000.00'))]
+        for amount in ('100.00', '50.00', '25.00', '10.00', '5.00', '1.00', '2.00'):
+            self.charge(amount)
+            self.profile.refresh_from_db()
+            history.append((timezone.now(), self.profile.balance))
+
+        # Opening entry plus seven charges: checkpoints after the 3rd and 6th entries.
+        self.assertEqual(
+            list(BalanceCheckpoint.objects.filter(student_profile=self.profile).order_by('posted_at').values_list('balance', flat=True)),
+            [Decimal('850.00'), Decimal('810.00')],
+        )
+        for when, expected in history:
+            with self.assertNumQueries(2):
+                self.assertEqual(ledger.balance_as_of(self.profile, when), expected)
+        self.assertEqual(ledger.balance_as_of(self.profile, history[0][0] - timedelta(days=1)), Decimal('0.00'))
+
+    def test_reconciliation_reports_and_settles_drift(self):
+        in_sync = StudentProfileFactory(balance=Decimal('20.00'))
+        balances.adjust_student(in_sync, reason=balances.CANCELLATION_FEE, balance=Decimal('-30.00'))
+        # Changed behind the ledger's back.
+        StudentProfile.objects.filter(pk=self.profile.pk).update(balance=Decimal('1250.00'))
+
+        drifts = ledger.reconcile_balances()
+        self.assertEqual(
+            [(drift.student_profile_id, drift.difference) for drift in drifts],
+            [(self.profile.pk, Decimal('250.00'))],
+        )
+
+        out = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command('reconcile_balances', stdout=out)
+        self.assertIn('difference=+250.00', out.getvalue())
+
+        call_command('reconcile_balances', '--fix', stdout=io.StringIO())
+        self.assertEqual(ledger.reconcile_balances(), [])
+        self.assertEqual(ledger.balance_as_of(self.profile), Decimal('1250.00'))
+
+
+WORKERS = 8
+ADJUSTMENTS_PER_WORKER = 25
+
+
+class ConcurrentBalanceMutationTest(TransactionTestCase):
+    """Many sessions adjusting the same rows at once must not lose any update."""
+
+    def setUp(self):
+        self.profile = StudentProfileFactory(balance=Decimal('0.00'))
+        self.aircraft = AircraftFactory(total_hours=Decimal('0.0'))
+        self.start = threading.Event()
+
+    def retry(self, adjustment, *args, **kwargs):
+        for attempt in range(200):
+            try:
+                return adjustment(*args, **kwargs)
+            except OperationalError:
+                # SQLite allows a single writer; retry like a client would.
+                time.sleep(random.uniform(0, min(0.05, 0.001 * 2 ** attempt)))
+        raise AssertionError('Adjustment kept failing with database lock errors')
+
+    def adjust(self, profile, aircraft, amounts):
+        self.start.wait(timeout=30)
+        try:
+            for amount in amounts:
+                self.retry(balances.adjust_student, profile, reason=balances.FLIGHT_EVALUATION, balance=amount, flight_hours=1)
+                self.retry(balances.adjust_aircraft_hours, aircraft, 1, reason=balances.FLIGHT_EVALUATION)
+        finally:
+            connections.close_all()
+
+    def test_no_lost_updates(self):
+        batches = [
+            [Decimal(random.randint(-20000, 20000)) / 100 for _ in range(ADJUSTMENTS_PER_WORKER)]
+            for _ in range(WORKERS)
+        ]
+
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            # Each session works on its own stale copy, like concurrent requests do.
+            futures = [
+                pool.submit(self.adjust, copy.copy(self.profile), copy.copy(self.aircraft), amounts)
+                for amounts in batches
+            ]
+            self.start.set()
+            for future in futures:
+                future.result()
+
+        total = WORKERS * ADJUSTMENTS_PER_WORKER
+        self.profile.refresh_from_db()
+        self.aircraft.refresh_from_db()
+        self.assertEqual(self.profile.balance, sum(sum(amounts) for amounts in batches))
+        self.assertEqual(self.profile.flight_hours, total)
+        self.assertEqual(self.aircraft.total_hours, total)
+
+        self.assertEqual(ledger.balance_as_of(self.profile), self.profile.balance)
+
+        journal = BalanceJournalEntry.objects.filter(entity_type=BalanceJournalEntry.STUDENT, field='balance')
+        self.assertEqual(journal.count(), total)
+        # Every UPDATE saw the one before it: the journal replays to the final balance.
+        running = Decimal('0.00')
+        for delta, value_after in journal.order_by('id').values_list('delta', 'value_after'):
+            running += delta
+            self.assertEqual(value_after, running)
@@ -14,6 +14,7 @@ from .models import StudentTransaction
 from .forms import StudentTransactionForm, FuelTransactionSearchForm
 from accounts.models import StudentProfile, User
 from fms.models import FlightEvaluation0_100, FlightEvaluation100_120, FlightEvaluation120_170
+from fms.ledger import record_session
 
 
 FUEL_EVALUATION_MODELS = (
@@ -319,7 +320,13 @@ def update_fuel_consumed(request):
                 aircraft = evaluation.aircraft
                 transaction_amount = round(fuel_consumed * aircraft.fuel_cost, 2)
 
-                model_class.objects.filter(pk=evaluation_id).update(fuel_consumed=fuel_consumed)
+                # update() skips auto_now; bump updated_at so cached PDFs are rendered again.
+                model_class.objects.filter(pk=evaluation_id).update(
+                    fuel_consumed=fuel_consumed,
+                    updated_at=timezone.now(),
+                )
+                evaluation.fuel_consumed = fuel_consumed
+                record_session(evaluation)
                 StudentTransaction.objects.create(
                     student_profile=student_profile,
                     amount=transaction_amount,